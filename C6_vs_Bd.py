@@ -20,6 +20,7 @@ import pandas as pd
 from openpyxl.styles import PatternFill
 
 from .core_utils import normalize_appui_num, is_plugin_output_file
+from .file_index import get_index
 from .qgis_utils import detect_etude_field as _detect_etude_field
 
 warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
@@ -46,7 +47,7 @@ class C6_vs_Bd:
         - GESPOT_*.xlsx (exports GESPOT)
         """
         parts = [df] if not df.empty else []
-        for subdir, _, files in os.walk(repertoire):
+        for subdir, _, files in get_index(repertoire).walk():
             for name in files:
                 if not name.endswith('.xlsx') or "~$" in name or name.startswith("ANALYSE_"):
                     continue
@@ -129,12 +130,17 @@ class C6_vs_Bd:
             return df
         return pd.concat(parts, ignore_index=True)
 
-    def extraire_poteaux_in_out(self, table_poteau, table_etude_cap_ft, colonne_cap_ft):
+    def extraire_poteaux_in_out(self, table_poteau, table_etude_cap_ft, colonne_cap_ft,
+                                assignment=None):
         """
         Extraction poteaux FT IN + OUT en une seule passe.
         
         Un seul acces couche, un seul index spatial, une seule iteration des features.
         Fusionne liste_poteau_cap_ft() et liste_poteaux_ft_out().
+
+        Args:
+            assignment: PoleAssignment batch optionnel ; remplace l'index
+                spatial CAP FT s'il a ete calcule pour ces couches
         
         Returns:
             tuple: (df_in, df_out)
@@ -148,14 +154,20 @@ class C6_vs_Bd:
             raise ValueError(f"[C6_vs_Bd] Couche '{table_etude_cap_ft}' introuvable dans le projet QGIS")
         etude_cap_ft = _lyrs_cap[0]
 
+        if assignment is not None and not assignment.matches(
+                infra_pt_pot.id(), etude_cap_ft.id(), colonne_cap_ft):
+            assignment = None
+
         # Index spatial des polygones CAP FT (une seule construction)
-        cap_ft_index = QgsSpatialIndex(etude_cap_ft.getFeatures())
+        cap_ft_index = None
         cap_ft_cache = {}
-        for feat in etude_cap_ft.getFeatures():
-            cap_ft_cache[feat.id()] = {
-                'geom': feat.geometry(),
-                'etude': feat[colonne_cap_ft]
-            }
+        if assignment is None:
+            cap_ft_index = QgsSpatialIndex(etude_cap_ft.getFeatures())
+            for feat in etude_cap_ft.getFeatures():
+                cap_ft_cache[feat.id()] = {
+                    'geom': feat.geometry(),
+                    'etude': feat[colonne_cap_ft]
+                }
 
         listePoteaux = []
         listePoteauxComplet = []
@@ -172,12 +184,20 @@ class C6_vs_Bd:
             if not pt_geom or pt_geom.isEmpty():
                 continue
 
-            candidate_ids = cap_ft_index.intersects(pt_geom.boundingBox())
+            if assignment is not None:
+                candidates = [
+                    {'etude': nom} for nom in
+                    assignment.studies_for(feat_pot.id(), include_border=False)[:1]
+                ]
+            else:
+                candidates = [
+                    cap_ft_cache.get(cid)
+                    for cid in cap_ft_index.intersects(pt_geom.boundingBox())
+                ]
             is_covered = False
 
-            for cid in candidate_ids:
-                cap_data = cap_ft_cache.get(cid)
-                if cap_data and cap_data['geom'].contains(pt_geom):
+            for cap_data in candidates:
+                if cap_data and ('geom' not in cap_data or cap_data['geom'].contains(pt_geom)):
                     inf_num = feat_pot["inf_num"]
                     etudes = cap_data['etude']
 
@@ -251,7 +271,7 @@ class C6_vs_Bd:
 
         # Récupérer les noms de fichiers Excel C6 dans le répertoire
         fichiers_c6 = set()
-        for subdir, _, files in os.walk(repertoire_c6):
+        for subdir, _, files in get_index(repertoire_c6).walk():
             for name in files:
                 if not name.endswith('.xlsx'):
                     continue
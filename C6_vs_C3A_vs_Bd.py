@@ -140,8 +140,13 @@ class C6_vs_C3A_vs_Bd:
 
         return df4, df4_rempl
 
-    def liste_poteau_etudes(self, table_poteau, table_decoupage, champs_dcp, valeur_chp_dcp):
-        """Récupérer les données liées à la base de données"""
+    def liste_poteau_etudes(self, table_poteau, table_decoupage, champs_dcp, valeur_chp_dcp,
+                            assignment=None):
+        """Récupérer les données liées à la base de données
+
+        assignment: PoleAssignment batch optionnel ; remplace la passe
+        spatiale s'il a ete calcule pour ces couches et ce champ.
+        """
         infra_pt_pot = get_layer_safe(table_poteau, "C6_C3A_BD")
         decoupage = get_layer_safe(table_decoupage, "C6_C3A_BD")
 
@@ -170,21 +175,39 @@ class C6_vs_C3A_vs_Bd:
         orderby_cap_ft = QgsFeatureRequest.OrderBy([clause_cap_ft])
         request_cap_ft.setOrderBy(orderby_cap_ft)
 
+        if assignment is not None and not assignment.matches(
+                infra_pt_pot.id(), decoupage.id(), champs_dcp):
+            assignment = None
+
         idx_pot = QgsSpatialIndex()
         poteaux = {}
         for feat_pot in infra_pt_pot.getFeatures(request):
             if feat_pot.hasGeometry():
-                idx_pot.addFeature(feat_pot)
+                if assignment is None:
+                    idx_pot.addFeature(feat_pot)
                 poteaux[feat_pot.id()] = feat_pot
 
-        for feat_dcp in decoupage.getFeatures(request_cap_ft):
-            if not feat_dcp.hasGeometry():
-                continue
-            geom_dcp = feat_dcp.geometry()
-            bbox = geom_dcp.boundingBox()
-            for fid in idx_pot.intersects(bbox):
-                feat_pot = poteaux[fid]
-                if geom_dcp.contains(feat_pot.geometry()):
+        if assignment is not None:
+            fids_par_etude = [
+                fids for _nom, fids in
+                assignment.poles_by_study(include_border=False, name_pattern=valeur_chp_dcp)
+            ]
+        else:
+            fids_par_etude = []
+            for feat_dcp in decoupage.getFeatures(request_cap_ft):
+                if not feat_dcp.hasGeometry():
+                    continue
+                geom_dcp = feat_dcp.geometry()
+                bbox = geom_dcp.boundingBox()
+                fids_par_etude.append([
+                    fid for fid in idx_pot.intersects(bbox)
+                    if geom_dcp.contains(poteaux[fid].geometry())
+                ])
+
+        for fids in fids_par_etude:
+            for fid in fids:
+                feat_pot = poteaux.get(fid)
+                if feat_pot is not None:
                     raw_inf_num = feat_pot["inf_num"]
                     if not raw_inf_num or raw_inf_num == NULL:
                         continue
@@ -5,6 +5,7 @@ import os
 import openpyxl
 from .qgis_utils import extraire_poteaux_etude
 from .core_utils import normalize_appui_num
+from .file_index import get_index
 
 
 class CapFt:
@@ -14,22 +15,26 @@ class CapFt:
         """Le constructeur de ma classe
         Il prend pour attribut de classe les *** """
 
-    def extraire_donnees_capft(self, table_poteau, table_etude_cap_ft, colonne_cap_ft):
+    def extraire_donnees_capft(self, table_poteau, table_etude_cap_ft, colonne_cap_ft,
+                               assignment=None):
         """Extraction complete CAP_FT en une seule passe.
         
+        Args:
+            assignment: PoleAssignment batch optionnel (evite la passe spatiale)
+
         Returns:
             tuple: (doublons, hors_etude, dico_qgis, dico_poteaux_prives)
         """
         return extraire_poteaux_etude(
             table_poteau, table_etude_cap_ft, colonne_cap_ft,
-            'POT-FT', 'CAP_FT'
+            'POT-FT', 'CAP_FT', assignment=assignment
         )
 
     def LectureFichiersExcelsCap_ft(self, repertoire):
         """Fonction pour parcourir les fichiers Excel pour renseigner la référence des appuis."""
         dicoPoteauFt_SousTraitant = {}
 
-        for subdir, _, files in os.walk(repertoire):
+        for subdir, _, files in get_index(repertoire).walk():
             for name in files:
                 if "FicheAppui_" in name and name.endswith('.xlsx'):
                     cheminComplet = os.path.join(subdir, name)
@@ -39,6 +39,11 @@ from .security_rules import (
 
 )
 
+from . import process_pool
+
+from .comac_excel import lire_feuille_comac
+from .file_index import get_index
+
 from .pcm_parser import (
 
     parse_pcm_file,
@@ -202,13 +207,14 @@ class Comac:
 
 
     def extraire_donnees_comac(self, table_poteau, table_etude_comac, colonne_comac,
-                               be_type='nge'):
+                               be_type='nge', assignment=None):
 
         """Extraction complete COMAC en une seule passe.
 
         
         Args:
             be_type: 'nge' (POT-BT uniquement) ou 'axione' (POT-FT + POT-BT)
+            assignment: PoleAssignment batch optionnel (evite la passe spatiale)
 
         Returns:
 
@@ -222,13 +228,13 @@ class Comac:
 
             table_poteau, table_etude_comac, colonne_comac,
 
-            pot_filter, 'COMAC', keep_commune=True
+            pot_filter, 'COMAC', keep_commune=True, assignment=assignment
 
         )
 
 
 
-    def LectureFichiersExcelsComac(self, repertoire, zone_climatique='ZVN'):
+    def LectureFichiersExcelsComac(self, repertoire, zone_climatique='ZVN', is_cancelled=None):
 
         """
 
@@ -252,6 +258,8 @@ class Comac:
 
             zone_climatique: 'ZVN' (vent normal) ou 'ZVF' (vent fort)
 
+            is_cancelled: callable d'annulation (QgsTask.isCanceled)
+
         
 
         Returns:
@@ -303,9 +311,11 @@ class Comac:
 
         fichiers_valides = 0
 
+        candidats = []  # (dossier, nom, chemin) des Excel COMAC a lire
 
 
-        for subdir, _, files in os.walk(repertoire):
+
+        for subdir, _, files in get_index(repertoire).walk():
 
             for name in files:
 
@@ -343,275 +353,264 @@ class Comac:
 
                     if is_comac_pattern or is_in_etude_folder:
 
-                        filepath = os.path.join(subdir, name)
-
-                        try:
-
-                            document = openpyxl.load_workbook(filepath, data_only=True)
-
-                        except Exception as e:
-
-                            impossibiliteDelireFichier[filepath] = str(e)
-
-                            continue
+                        candidats.append((subdir, name, os.path.join(subdir, name)))
 
 
 
-                        try:
-
-                            feuille_1 = document.worksheets[0]
-
-                            code_insee_fichier = self._normalize_insee_code(
-
-                                feuille_1.cell(row=1, column=9).value
+        # Lecture openpyxl dans le pool de processus, regles metier ici
+        lectures = process_pool.map_ordered(
+            lire_feuille_comac, [c[2] for c in candidats], is_cancelled=is_cancelled
+        )
 
-                            )
+        for (subdir, name, filepath), lecture in zip(candidats, lectures):
 
-                        except Exception as e:
+            if lecture is None:
 
-                            impossibiliteDelireFichier[filepath] = f"Feuille illisible : {e}"
+                continue
 
-                            document.close()
+            if lecture['erreur']:
 
-                            continue
+                impossibiliteDelireFichier[filepath] = lecture['erreur']
 
+                continue
 
+            code_insee_fichier = self._normalize_insee_code(lecture['insee'])
 
-                        listePoteauBt = []
+            listePoteauBt = []
 
-                        listeVerifSecu = []  # Vérifications par ligne
+            listeVerifSecu = []  # Vérifications par ligne
 
-                        cables_appui_fichier = {}  # {appui → [refs]} pour ce fichier
+            cables_appui_fichier = {}  # {appui → [refs]} pour ce fichier
 
 
 
-                        # Lecture à partir de la ligne 4
+            # Lecture à partir de la ligne 4
 
-                        # Col A (idx 0): N° poteau, Col G (idx 6): distance cable/BT
+            # Col A (idx 0): N° poteau, Col G (idx 6): distance cable/BT
 
-                        # Col AO (idx 40): Type ligne FO, Col AU (idx 46): Longueur à facturer
+            # Col AO (idx 40): Type ligne FO, Col AU (idx 46): Longueur à facturer
 
-                        for row in feuille_1.iter_rows(min_row=4, min_col=1, max_col=50, values_only=True):
+            for row in lecture['lignes']:
 
-                            # Validation NULL stricte (pattern Maj_Ft_Bt.py)
+                # Validation NULL stricte (pattern Maj_Ft_Bt.py)
 
-                            if not row or len(row) == 0:
+                if not row or len(row) == 0:
 
-                                continue
+                    continue
 
-                            
+                
 
-                            numPotBt = row[0]  # Col A
+                numPotBt = row[0]  # Col A
 
-                            if not numPotBt or numPotBt == '' or str(numPotBt).strip() == '':
+                if not numPotBt or numPotBt == '' or str(numPotBt).strip() == '':
 
-                                continue
+                    continue
 
-                            
-                            nompot_raw = str(numPotBt).strip()
+                
+                nompot_raw = str(numPotBt).strip()
 
-                            # Filtrer les portees/distances (pas des numeros de poteaux)
-                            # Ex: "Supports FT_X à E000Y/03158", "E000X_03158 à E000Y_03158"
-                            if ' à ' in nompot_raw or ' a ' in nompot_raw.lower():
-                                continue
-                            if nompot_raw.lower().startswith('support'):
-                                continue
+                # Filtrer les portees/distances (pas des numeros de poteaux)
+                # Ex: "Supports FT_X à E000Y/03158", "E000X_03158 à E000Y_03158"
+                if ' à ' in nompot_raw or ' a ' in nompot_raw.lower():
+                    continue
+                if nompot_raw.lower().startswith('support'):
+                    continue
 
-                            nompot = nompot_raw.replace("BT ", "BT-")
+                nompot = nompot_raw.replace("BT ", "BT-")
 
-                            nompot_cle = self._build_support_key(nompot, code_insee_fichier)
+                nompot_cle = self._build_support_key(nompot, code_insee_fichier)
 
-                            if not nompot_cle:
+                if not nompot_cle:
 
-                                continue
+                    continue
 
 
-                            listePoteauBt.append(nompot_cle)
+                listePoteauBt.append(nompot_cle)
 
-                            # Extraction coordonnees XY (col K=10, L=11) Lambert 93
-                            coord_x_raw = row[10] if len(row) > 10 and row[10] else None
-                            coord_y_raw = row[11] if len(row) > 11 and row[11] else None
-                            if coord_x_raw and coord_y_raw:
-                                try:
-                                    cx = float(str(coord_x_raw).replace(',', '.').replace(' ', ''))
-                                    cy = float(str(coord_y_raw).replace(',', '.').replace(' ', ''))
-                                    if cx > 100000 and cy > 6000000:
-                                        dicoCoordsPoteaux[nompot_cle] = (cx, cy)
-                                except (ValueError, TypeError):
-                                    pass
+                # Extraction coordonnees XY (col K=10, L=11) Lambert 93
+                coord_x_raw = row[10] if len(row) > 10 and row[10] else None
+                coord_y_raw = row[11] if len(row) > 11 and row[11] else None
+                if coord_x_raw and coord_y_raw:
+                    try:
+                        cx = float(str(coord_x_raw).replace(',', '.').replace(' ', ''))
+                        cy = float(str(coord_y_raw).replace(',', '.').replace(' ', ''))
+                        if cx > 100000 and cy > 6000000:
+                            dicoCoordsPoteaux[nompot_cle] = (cx, cy)
+                    except (ValueError, TypeError):
+                        pass
 
-                            
-                            # Extraction données sécurité avec validation NULL explicite
+                
+                # Extraction données sécurité avec validation NULL explicite
 
-                            hauteur_hors_sol_raw = row[EXCEL_COL_HAUTEUR_HORS_SOL] if len(row) > EXCEL_COL_HAUTEUR_HORS_SOL and row[EXCEL_COL_HAUTEUR_HORS_SOL] else None
+                hauteur_hors_sol_raw = row[EXCEL_COL_HAUTEUR_HORS_SOL] if len(row) > EXCEL_COL_HAUTEUR_HORS_SOL and row[EXCEL_COL_HAUTEUR_HORS_SOL] else None
 
-                            conducteur_raw = row[EXCEL_COL_CONDUCTEUR] if len(row) > EXCEL_COL_CONDUCTEUR and row[EXCEL_COL_CONDUCTEUR] else None
+                conducteur_raw = row[EXCEL_COL_CONDUCTEUR] if len(row) > EXCEL_COL_CONDUCTEUR and row[EXCEL_COL_CONDUCTEUR] else None
 
-                            type_ligne_fo = row[EXCEL_COL_FO_TYPE_LIGNE] if len(row) > EXCEL_COL_FO_TYPE_LIGNE and row[EXCEL_COL_FO_TYPE_LIGNE] else None
+                type_ligne_fo = row[EXCEL_COL_FO_TYPE_LIGNE] if len(row) > EXCEL_COL_FO_TYPE_LIGNE and row[EXCEL_COL_FO_TYPE_LIGNE] else None
 
-                            longueur_raw = row[EXCEL_COL_LONGUEUR_FACTURER] if len(row) > EXCEL_COL_LONGUEUR_FACTURER and row[EXCEL_COL_LONGUEUR_FACTURER] else None
+                longueur_raw = row[EXCEL_COL_LONGUEUR_FACTURER] if len(row) > EXCEL_COL_LONGUEUR_FACTURER and row[EXCEL_COL_LONGUEUR_FACTURER] else None
 
-                            
+                
 
-                            # Parse longueur (portée)
+                # Parse longueur (portée)
 
-                            portee = 0.0
+                portee = 0.0
 
-                            if longueur_raw:
+                if longueur_raw:
 
-                                try:
+                    try:
 
-                                    portee = float(str(longueur_raw).replace(',', '.').replace('m', '').strip())
+                        portee = float(str(longueur_raw).replace(',', '.').replace('m', '').strip())
 
-                                except (ValueError, AttributeError):
+                    except (ValueError, AttributeError):
 
-                                    portee = 0.0
+                        portee = 0.0
 
-                            
+                
 
-                            # Parse hauteur hors sol (distance câble/sol)
+                # Parse hauteur hors sol (distance câble/sol)
 
-                            hauteur_sol = 0.0
+                hauteur_sol = 0.0
 
-                            if hauteur_hors_sol_raw:
+                if hauteur_hors_sol_raw:
 
-                                try:
+                    try:
 
-                                    hauteur_sol = float(str(hauteur_hors_sol_raw).replace(',', '.').replace('m', '').strip())
+                        hauteur_sol = float(str(hauteur_hors_sol_raw).replace(',', '.').replace('m', '').strip())
 
-                                except (ValueError, AttributeError):
+                    except (ValueError, AttributeError):
 
-                                    hauteur_sol = 0.0
+                        hauteur_sol = 0.0
 
-                            
+                
 
-                            # Parse boîtier fibre optique (col AR): oui/non ou 0/1 (format PCM)
+                # Parse boîtier fibre optique (col AR): oui/non ou 0/1 (format PCM)
 
-                            boitier_raw = row[EXCEL_COL_BOITIER] if len(row) > EXCEL_COL_BOITIER else None
+                boitier_raw = row[EXCEL_COL_BOITIER] if len(row) > EXCEL_COL_BOITIER else None
 
-                            boitier_val = normaliser_boitier(boitier_raw)
+                boitier_val = normaliser_boitier(boitier_raw)
 
-                            if boitier_val in ('oui', 'non'):
+                if boitier_val in ('oui', 'non'):
 
-                                nompot_norm_b = normalize_appui_num(nompot_cle, keep_commune=True)
+                    nompot_norm_b = normalize_appui_num(nompot_cle, keep_commune=True)
 
-                                if nompot_norm_b:
+                    if nompot_norm_b:
 
-                                    dicoBoitierParAppui[nompot_norm_b] = boitier_val
+                        dicoBoitierParAppui[nompot_norm_b] = boitier_val
 
-                            
+                
 
-                            # Parse références câbles concaténées depuis col AO
+                # Parse références câbles concaténées depuis col AO
 
-                            refs_cables = self.parse_references_cables_comac(
+                refs_cables = self.parse_references_cables_comac(
 
-                                str(type_ligne_fo) if type_ligne_fo else ''
+                    str(type_ligne_fo) if type_ligne_fo else ''
 
-                            )
+                )
 
-                            if refs_cables:
+                if refs_cables:
 
-                                nompot_norm = normalize_appui_num(nompot_cle, keep_commune=True)
+                    nompot_norm = normalize_appui_num(nompot_cle, keep_commune=True)
 
-                                if nompot_norm:
+                    if nompot_norm:
 
-                                    cables_appui_fichier[nompot_norm] = refs_cables
+                        cables_appui_fichier[nompot_norm] = refs_cables
 
-                            
+                
 
-                            # Capacité FO depuis code câble (première ref pour compat existante)
+                # Capacité FO depuis code câble (première ref pour compat existante)
 
-                            capacite_fo = get_capacite_fo_from_code(type_ligne_fo) if type_ligne_fo else 0
+                capacite_fo = get_capacite_fo_from_code(type_ligne_fo) if type_ligne_fo else 0
 
-                            
+                
 
-                            # Vérification portée
+                # Vérification portée
 
-                            verif_portee = None
+                verif_portee = None
 
-                            if portee > 0 and capacite_fo > 0:
+                if portee > 0 and capacite_fo > 0:
 
-                                verif_portee = verifier_portee(portee, capacite_fo, zone_climatique)
+                    verif_portee = verifier_portee(portee, capacite_fo, zone_climatique)
 
-                            
+                
 
-                            # Vérification distance câble/sol (>= 4m)
+                # Vérification distance câble/sol (>= 4m)
 
-                            verif_hauteur_sol = None
+                verif_hauteur_sol = None
 
-                            if hauteur_sol > 0:
+                if hauteur_sol > 0:
 
-                                verif_hauteur_sol = verifier_distance_sol(hauteur_sol)
+                    verif_hauteur_sol = verifier_distance_sol(hauteur_sol)
 
-                            
+                
 
-                            # Stockage résultat
+                # Stockage résultat
 
-                            listeVerifSecu.append({
+                listeVerifSecu.append({
 
-                                'poteau': nompot_cle,
+                    'poteau': nompot_cle,
 
-                                'portee': portee,
+                    'portee': portee,
 
-                                'capacite_fo': capacite_fo,
+                    'capacite_fo': capacite_fo,
 
-                                'type_ligne_fo': type_ligne_fo,
+                    'type_ligne_fo': type_ligne_fo,
 
-                                'hauteur_sol': hauteur_sol,
+                    'hauteur_sol': hauteur_sol,
 
-                                'conducteur': conducteur_raw,
+                    'conducteur': conducteur_raw,
 
-                                'verif_portee': verif_portee,
+                    'verif_portee': verif_portee,
 
-                                'verif_hauteur_sol': verif_hauteur_sol
+                    'verif_hauteur_sol': verif_hauteur_sol
 
-                            })
+                })
 
 
 
-                        fichiers_trouves += 1
+            fichiers_trouves += 1
 
-                        
+            
 
-                        if listePoteauBt:
+            if listePoteauBt:
 
-                            # Utiliser chemin relatif comme clé pour éviter conflits de noms
+                # Utiliser chemin relatif comme clé pour éviter conflits de noms
 
-                            rel_path = os.path.relpath(filepath, repertoire)
+                rel_path = os.path.relpath(filepath, repertoire)
 
-                            etude_name = os.path.basename(subdir)  # Nom du dossier parent = nom étude
+                etude_name = os.path.basename(subdir)  # Nom du dossier parent = nom étude
 
-                            key = etude_name if etude_name not in dicoPoteauBt_SousTraitant else rel_path
+                key = etude_name if etude_name not in dicoPoteauBt_SousTraitant else rel_path
 
-                            
+                
 
-                            dicoPoteauBt_SousTraitant[key] = listePoteauBt
+                dicoPoteauBt_SousTraitant[key] = listePoteauBt
 
-                            dicoVerifSecu[key] = listeVerifSecu
+                dicoVerifSecu[key] = listeVerifSecu
 
-                            # Agréger câbles par appui (tous fichiers confondus)
+                # Agréger câbles par appui (tous fichiers confondus)
 
-                            for appui, refs in cables_appui_fichier.items():
+                for appui, refs in cables_appui_fichier.items():
 
-                                if appui not in dicoCablesParAppui:
+                    if appui not in dicoCablesParAppui:
 
-                                    dicoCablesParAppui[appui] = refs
+                        dicoCablesParAppui[appui] = refs
 
-                                else:
+                    else:
 
-                                    dicoCablesParAppui[appui].extend(refs)
+                        dicoCablesParAppui[appui].extend(refs)
 
-                            fichiers_valides += 1
+                fichiers_valides += 1
 
 
 
-                            if name in fichiersComacExistants:
+                if name in fichiersComacExistants:
 
-                                fichiersComacEnDoublons.append((name, fichiersComacExistants[name], rel_path))
+                    fichiersComacEnDoublons.append((name, fichiersComacExistants[name], rel_path))
 
 
 
-                            fichiersComacExistants[name] = rel_path
+                fichiersComacExistants[name] = rel_path
 
         
 
@@ -147,31 +147,48 @@ class MajFtBtTask(QgsTask):
         xmin, ymin, xmax, ymax = bbox
         return xmin <= x <= xmax and ymin <= y <= ymax
 
+    def _etudes_candidates(self, pot, etudes, assignment):
+        """Etudes candidates d'un poteau : affectation batch ou polygones extraits."""
+        if assignment is None:
+            return etudes
+        noms = assignment.studies_for(pot.get('fid'), include_border=False)
+        if not noms:
+            return []
+        raw = noms[0]
+        return [{'nom_etudes': str(raw).upper() if raw else "", 'bbox': None}]
+
     def _process_spatial_pure_python(self):
         """Traitement spatial 100% Python - aucun appel QGIS."""
         poteaux_ft = self.raw_data.get('poteaux_ft', [])
         poteaux_bt = self.raw_data.get('poteaux_bt', [])
         etudes_cap_ft = self.raw_data.get('etudes_cap_ft', [])
         etudes_comac = self.raw_data.get('etudes_comac', [])
+        assignment_ft = self.raw_data.get('assignment_ft')
+        assignment_bt = self.raw_data.get('assignment_bt')
+        if assignment_ft is not None:
+            etudes_cap_ft = assignment_ft.study_names()
+        if assignment_bt is not None:
+            etudes_comac = assignment_bt.study_names()
         
         # === FT: Point-in-polygon ===
         data_ft = []
         for pot in poteaux_ft:
             x, y = pot['x'], pot['y']
-            for etude in etudes_cap_ft:
-                # Test bbox d'abord (rapide)
-                if self._point_in_bbox(x, y, etude['bbox']):
-                    # Test précis polygon
-                    if self._point_in_polygon(x, y, etude['vertices']):
-                        inf_num = pot['inf_num']
-                        num_court = normalize_appui_num(inf_num)
-                        data_ft.append({
-                            'gid': pot['gid'],
-                            'N° appui': num_court,
-                            'inf_num': inf_num,
-                            'Nom Etudes': etude['nom_etudes']
-                        })
-                        break  # Un poteau = une seule étude
+            for etude in self._etudes_candidates(pot, etudes_cap_ft, assignment_ft):
+                # bbox None : affectation batch, appartenance deja resolue
+                if etude['bbox'] is not None and (
+                        not self._point_in_bbox(x, y, etude['bbox'])
+                        or not self._point_in_polygon(x, y, etude['vertices'])):
+                    continue
+                inf_num = pot['inf_num']
+                num_court = normalize_appui_num(inf_num)
+                data_ft.append({
+                    'gid': pot['gid'],
+                    'N° appui': num_court,
+                    'inf_num': inf_num,
+                    'Nom Etudes': etude['nom_etudes']
+                })
+                break  # Un poteau = une seule étude
         
         # Diagnostic: combien de correspondances spatiales FT trouvees?
         QgsMessageLog.logMessage(
@@ -202,18 +219,20 @@ class MajFtBtTask(QgsTask):
         data_bt = []
         for pot in poteaux_bt:
             x, y = pot['x'], pot['y']
-            for etude in etudes_comac:
-                if self._point_in_bbox(x, y, etude['bbox']):
-                    if self._point_in_polygon(x, y, etude['vertices']):
-                        inf_num = pot['inf_num']
-                        num_court = normalize_appui_num(inf_num)
-                        data_bt.append({
-                            'gid': pot['gid'],
-                            'N° appui': num_court,
-                            'inf_num': inf_num,
-                            'Nom Etudes': etude['nom_etudes']
-                        })
-                        break
+            for etude in self._etudes_candidates(pot, etudes_comac, assignment_bt):
+                if etude['bbox'] is not None and (
+                        not self._point_in_bbox(x, y, etude['bbox'])
+                        or not self._point_in_polygon(x, y, etude['vertices'])):
+                    continue
+                inf_num = pot['inf_num']
+                num_court = normalize_appui_num(inf_num)
+                data_bt.append({
+                    'gid': pot['gid'],
+                    'N° appui': num_court,
+                    'inf_num': inf_num,
+                    'Nom Etudes': etude['nom_etudes']
+                })
+                break
         
         # Diagnostic: combien de correspondances spatiales BT trouvees?
         QgsMessageLog.logMessage(
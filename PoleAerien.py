@@ -98,6 +98,11 @@ class PoleAerien:
                 close_shared_connection()
             except Exception:
                 pass
+            try:
+                from .process_pool import shutdown as shutdown_process_pool
+                shutdown_process_pool()
+            except Exception:
+                pass
             if self._dlg:
                 try:
                     self._dlg.close()
@@ -14,6 +14,7 @@ Logique:
 5. Générer les anomalies
 """
 
+from contextlib import closing
 from qgis.core import (
     Qgis,
     QgsProject,
@@ -34,13 +35,12 @@ from .qgis_utils import (
 from .db_connection import extract_sro_from_layer, get_shared_connection
 from .cable_analyzer import CableAnalyzer, AppuiChargeResult, extraire_appuis_from_layer
 from .security_rules import get_capacites_possibles
+from .c6_annexe import lire_feuille_annexe
 
 from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass, field
 import os
-import re
 import warnings
-import openpyxl
 
 warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
 
@@ -188,7 +188,16 @@ class PoliceC6:
         try:
             self._check_cancel()
             
-            # 1. Charger les câbles découpés depuis PostgreSQL
+            # 1. Extraire les appuis depuis la couche QGIS
+            appuis = extraire_appuis_from_layer(layer_appuis)
+            
+            if not appuis:
+                result.erreur = "Aucun appui trouvé dans la couche"
+                return result
+            
+            self._check_cancel()
+            
+            # 2. Câbles découpés depuis PostgreSQL, indexés lot par lot
             QgsMessageLog.logMessage(
                 f"Chargement câbles découpés pour SRO: {sro}",
                 "PoleAerien", MSG_INFO
@@ -199,29 +208,18 @@ class PoliceC6:
                     result.erreur = "Impossible de se connecter à la base PostgreSQL"
                     return result
             
-            cables_decoupes = self.db_connection.execute_fddcpi2(sro)
+            index = self.cable_analyzer.creer_index(appuis, only_aerien=only_aerien)
+            with closing(self.db_connection.iter_fddcpi2(sro)) as chunks:
+                for chunk in chunks:
+                    index.add_chunk(chunk)
+                    self._check_cancel()
             
-            if not cables_decoupes:
+            if not index.nb_cables:
                 result.erreur = f"Aucun câble trouvé pour SRO: {sro}"
                 return result
             
-            self._check_cancel()
-            
-            # 2. Extraire les appuis depuis la couche QGIS
-            appuis = extraire_appuis_from_layer(layer_appuis)
-            
-            if not appuis:
-                result.erreur = "Aucun appui trouvé dans la couche"
-                return result
-            
-            self._check_cancel()
-            
             # 3. Analyser la charge par appui
-            self.cable_analyzer.analyser_charge_appuis(
-                appuis=appuis,
-                cables_decoupes=cables_decoupes,
-                only_aerien=only_aerien
-            )
+            self.cable_analyzer.analyser_charge_index(appuis, index)
             
             self._check_cancel()
             
@@ -271,6 +269,7 @@ class PoliceC6:
         Un appui peut avoir PLUSIEURS lignes Excel, une par câble.
         La colonne num_appui peut être vide sur les lignes de continuation
         (cellules fusionnées ou répétition implicite).
+        Lecture en flux (c6_annexe), seul le gras des cellules câble est lu.
         
         Args:
             chemin_c6: Chemin vers le fichier Excel Annexe C6
@@ -281,182 +280,17 @@ class PoliceC6:
             - liste_brute: Liste de dicts avec toutes les colonnes
             - boitier_par_appui: Dict[num_appui, str] (PB/PEO ou vide)
         """
-        donnees_par_appui = {}
-        liste_brute = []
-        boitier_par_appui = {}
-        
         if not os.path.exists(chemin_c6):
             QgsMessageLog.logMessage(
                 f"Fichier C6 introuvable: {chemin_c6}",
                 "PoleAerien", MSG_WARNING
             )
-            return donnees_par_appui, liste_brute, boitier_par_appui
-        
-        try:
-            wb = openpyxl.load_workbook(chemin_c6, data_only=True)
-            
-            sheet = None
-            for name in ['Export 1', 'export 1', 'Appui', 'APPUI', 'appui', 'Appuis']:
-                if name in wb.sheetnames:
-                    sheet = wb[name]
-                    break
-            
-            if not sheet:
-                sheet = wb.active
-            
-            # Scanner les lignes pour trouver la VRAIE ligne d'en-têtes
-            # (la ligne 1 est souvent des métadonnées: n° commande, date, etc.)
-            header_row_idx = None
-            headers = []
-            col_num_appui = -1
-            col_nom_cable = -1
-            col_effort_dispo = -1
-            col_pose_boitier = -1
-            
-            appui_candidates = [
-                'n° appui', 'n°appui', 'num_appui', 'numero_appui',
-                'numappui', 'pt_ad_numsu', 'num appui'
-            ]
-            cable_candidates = [
-                'nom du câble', 'nom du cable', 'nom_cable', 'nomcable',
-                'nom_du_cable', 'nom_du_câble', 'cable', 'câble'
-            ]
-            effort_candidates = [
-                'effort disponible avant ajout câble',
-                'effort disponible avant ajout cable',
-                'effort disponible avant ajout',
-                'effort dispo avant ajout',
-                'effort disponible'
-            ]
-            boitier_candidates = [
-                "pose d'un boitier optique", "pose d'un boîtier optique",
-                "pose d'un boitier", "pose d'un boîtier",
-                'pose boitier optique', 'pose boîtier optique',
-                'pose boitier', 'pose boîtier',
-                'pose_boitier', 'pose_boîtier'
-            ]
-            
-            for row_idx, row in enumerate(sheet.iter_rows(min_row=1, max_row=15, values_only=True), start=1):
-                if not row:
-                    continue
-                row_headers = [str(cell or '').strip().lower() for cell in row]
-                
-                test_appui = self._find_column_index(row_headers, appui_candidates)
-                test_cable = self._find_column_index(row_headers, cable_candidates)
-                
-                # On a trouvé la ligne d'en-têtes si les 2 colonnes sont trouvées
-                # ET qu'elles pointent vers des colonnes différentes
-                if test_appui >= 0 and test_cable >= 0 and test_appui != test_cable:
-                    header_row_idx = row_idx
-                    headers = row_headers
-                    col_num_appui = test_appui
-                    col_nom_cable = test_cable
-                    col_effort_dispo = self._find_column_index(row_headers, effort_candidates)
-                    col_pose_boitier = self._find_column_index(row_headers, boitier_candidates)
-                    break
-            
-            if header_row_idx is None or col_num_appui == -1:
-                # Log toutes les premières lignes pour debug
-                debug_rows = []
-                for r_idx, r in enumerate(sheet.iter_rows(min_row=1, max_row=5, values_only=True), start=1):
-                    if r:
-                        debug_rows.append(f"  Row{r_idx}: {[str(c or '')[:30] for c in r[:5]]}")
-                QgsMessageLog.logMessage(
-                    f"En-têtes C6 non trouvées. Premières lignes:\n" + "\n".join(debug_rows),
-                    "PoleAerien", MSG_WARNING
-                )
-                wb.close()
-                return donnees_par_appui, liste_brute, boitier_par_appui
-            
-            current_appui = None
-            appuis_edf = set()
-            
-            for row_idx, row in enumerate(
-                sheet.iter_rows(min_row=header_row_idx + 1, values_only=False),
-                start=header_row_idx + 1
-            ):
-                if not row or all(c.value is None for c in row):
-                    continue
-                
-                raw_num = str(row[col_num_appui].value or '').strip() if col_num_appui < len(row) else ''
-                nom_cable = str(row[col_nom_cable].value or '').strip() if col_nom_cable >= 0 and col_nom_cable < len(row) else ''
-                cable_is_bold = False
-                if col_nom_cable >= 0 and col_nom_cable < len(row):
-                    font = row[col_nom_cable].font
-                    cable_is_bold = bool(font and font.bold)
-                
-                # Détecter appui EDF: colonne "Effort disponible avant ajout câble" renseignée
-                effort_val = None
-                if col_effort_dispo >= 0 and col_effort_dispo < len(row):
-                    effort_val = row[col_effort_dispo].value
-                
-                # Détecter pose boîtier (PB ou PEO)
-                boitier_val = ''
-                if col_pose_boitier >= 0 and col_pose_boitier < len(row):
-                    bv = str(row[col_pose_boitier].value or '').strip().upper()
-                    if bv in ('PB', 'PEO'):
-                        boitier_val = bv
-                
-                if raw_num:
-                    current_appui = normalize_appui_num(raw_num)
-                    if current_appui not in donnees_par_appui:
-                        donnees_par_appui[current_appui] = []
-                    # Appui EDF = effort disponible NON renseigné (pas de valeur)
-                    # Appui Orange = effort disponible renseigné (a une valeur)
-                    if col_effort_dispo >= 0 and (effort_val is None or str(effort_val).strip() == ''):
-                        appuis_edf.add(current_appui)
-                    # Enregistrer pose boîtier (première valeur non vide trouvée)
-                    if boitier_val and current_appui not in boitier_par_appui:
-                        boitier_par_appui[current_appui] = boitier_val
-                
-                if current_appui and nom_cable:
-                    is_cable = bool(re.match(r'^L\d', nom_cable, re.IGNORECASE))
-                    
-                    if is_cable and cable_is_bold:
-                        donnees_par_appui[current_appui].append(nom_cable)
-                    
-                    liste_brute.append({
-                        'ligne': row_idx,
-                        'num_appui': raw_num or current_appui,
-                        'num_appui_norm': current_appui,
-                        'nom_cable': nom_cable,
-                        'is_cable': is_cable,
-                        'is_bold': cable_is_bold,
-                        'is_edf': current_appui in appuis_edf
-                    })
-            
-            # Exclure les appuis EDF (ceux SANS effort disponible)
-            if appuis_edf:
-                for appui_edf in appuis_edf:
-                    donnees_par_appui.pop(appui_edf, None)
-            
-            wb.close()
-            
-            return donnees_par_appui, liste_brute, boitier_par_appui
-            
-        except Exception as e:
-            QgsMessageLog.logMessage(
-                f"Erreur lecture C6: {e}",
-                "PoleAerien", MSG_WARNING
-            )
-            return donnees_par_appui, liste_brute, boitier_par_appui
-
-    def _find_column_index(self, headers: List[str], candidates: List[str]) -> int:
-        """Trouve l'index d'une colonne parmi plusieurs noms possibles."""
-        def normalize(s):
-            """Supprime accents et caractères spéciaux pour comparaison."""
-            import unicodedata
-            s = unicodedata.normalize('NFD', s)
-            s = ''.join(c for c in s if unicodedata.category(c) != 'Mn')
-            return s.lower().strip()
+            return {}, [], {}
         
-        for candidate in candidates:
-            c_norm = normalize(candidate)
-            for idx, header in enumerate(headers):
-                h_norm = normalize(header)
-                if c_norm in h_norm or h_norm in c_norm:
-                    return idx
-        return -1
+        lecture = lire_feuille_annexe(chemin_c6)
+        if lecture['erreur']:
+            QgsMessageLog.logMessage(lecture['erreur'], "PoleAerien", MSG_WARNING)
+        return lecture['donnees_par_appui'], lecture['liste_brute'], lecture['boitier_par_appui']
 
     # =========================================================================
     # ANALYSE APPUIS (conservé de l'ancienne version)
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Snapshot des appuis d'une couche poteaux, construit en un seul parcours.
+
+Chaque appui est lu une fois (numero brut, WKB, coordonnees, commune) ;
+les deux variantes de numerotation utilisees par les modules sont des vues :
+- keep_commune=True  : COMAC ("78/63041", distingue les communes)
+- keep_commune=False : Police C6 ("78", comme les annexes C6 Excel)
+
+Les vues partagent les memes bytes WKB (pas de copie) et sont construites
+a la demande puis memorisees. Module pur Python (aucune dependance QGIS).
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    from .core_utils import normalize_appui_num
+except ImportError:
+    from core_utils import normalize_appui_num
+
+
+class AppuiRecord:
+    """Appui lu une fois : numeros normalises des deux variantes + geometrie."""
+
+    __slots__ = (
+        'num_commune', 'num_plain', 'inf_num_commune', 'inf_num_plain', 'commune',
+        'feature_id', 'geom_wkb', 'x', 'y', 'inf_type', 'etat', 'noe_codext',
+    )
+
+    def __init__(self, num_appui, inf_num=None, feature_id=None, geom_wkb=None,
+                 x=None, y=None, inf_type='', etat='', noe_codext=''):
+        self.num_commune = normalize_appui_num(num_appui, keep_commune=True)
+        self.num_plain = normalize_appui_num(num_appui, keep_commune=False)
+        self.inf_num_commune = normalize_appui_num(inf_num, keep_commune=True)
+        self.inf_num_plain = normalize_appui_num(inf_num, keep_commune=False)
+        commune = str(num_appui).split('/', 1)[1].strip() if num_appui and '/' in str(num_appui) else ''
+        self.commune = commune or None
+        self.feature_id = feature_id
+        self.geom_wkb = geom_wkb
+        self.x = x
+        self.y = y
+        self.inf_type = inf_type or ''
+        self.etat = etat or ''
+        self.noe_codext = noe_codext or ''
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Champs du record (numeros deja normalises), pour le bundle SRO."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, values: Dict[str, Any]) -> 'AppuiRecord':
+        """Reconstruit un record depuis to_dict() sans renormaliser."""
+        record = cls.__new__(cls)
+        for name in cls.__slots__:
+            setattr(record, name, values.get(name))
+        return record
+
+    def as_dict(self, keep_commune: bool) -> Dict[str, Any]:
+        """Format historique de extraire_appuis_wkb()."""
+        if keep_commune:
+            num, inf_num = self.num_commune, self.inf_num_commune
+        else:
+            num, inf_num = self.num_plain, self.inf_num_plain
+        return {
+            'num_appui': num,
+            'inf_num': inf_num or num,
+            'feature_id': self.feature_id,
+            'geom_wkb': self.geom_wkb,
+            'inf_type': self.inf_type,
+            'etat': self.etat,
+            'noe_codext': self.noe_codext,
+        }
+
+
+class AppuisSnapshot:
+    """Appuis d'une couche (layer_id) et vues memorisees par variante."""
+
+    def __init__(self, records: Iterable[AppuiRecord], layer_id: str = ''):
+        self.records: List[AppuiRecord] = [r for r in records if r.num_commune or r.num_plain]
+        self.layer_id = layer_id
+        self._views: Dict[bool, List[Dict[str, Any]]] = {}
+
+    def __len__(self):
+        return len(self.records)
+
+    def matches(self, layer_id: Optional[str]) -> bool:
+        """True si le snapshot provient de la couche layer_id."""
+        return bool(layer_id) and layer_id == self.layer_id
+
+    def to_dict(self) -> Dict[str, Any]:
+        """{'layer_id', 'records'} : WKB et attributs de chaque appui (bundle SRO)."""
+        return {'layer_id': self.layer_id, 'records': [r.to_dict() for r in self.records]}
+
+    @classmethod
+    def from_dict(cls, values: Dict[str, Any]) -> 'AppuisSnapshot':
+        """Reconstruit le snapshot enregistre par to_dict()."""
+        return cls((AppuiRecord.from_dict(r) for r in values.get('records', [])),
+                   layer_id=values.get('layer_id', ''))
+
+    def view(self, keep_commune: bool) -> List[Dict[str, Any]]:
+        """Liste de dicts {'num_appui', 'inf_num', 'feature_id', 'geom_wkb', ...}."""
+        key = bool(keep_commune)
+        if key not in self._views:
+            self._views[key] = [
+                r.as_dict(key) for r in self.records
+                if (r.num_commune if key else r.num_plain)
+            ]
+        return self._views[key]
+
+    def coords(self, keep_commune: bool = True) -> Dict[str, tuple]:
+        """{num_appui: (x, y)} pour les appuis avec coordonnees."""
+        return {
+            (r.num_commune if keep_commune else r.num_plain): (r.x, r.y)
+            for r in self.records if r.x is not None and r.y is not None
+        }
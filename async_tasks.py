@@ -839,6 +839,36 @@ class ComacTask(AsyncTaskBase):
 
         self.qgis_data = qgis_data or {}
 
+        self._appuis_data = None
+
+        self._gt_reader = None
+
+    
+
+    def _appuis_geoms(self):
+
+        """Appuis deserialises (QgsGeometry) une seule fois par tache."""
+
+        if self._appuis_data is None:
+
+            self._appuis_data = _deserialize_appuis_wkb(self.qgis_data.get('appuis', []))
+
+        return self._appuis_data
+
+    
+
+    def _gracethd_reader(self, gracethd_dir):
+
+        """GraceTHDReader partage par la tache : t_cableline/t_noeud lus une fois."""
+
+        if self._gt_reader is None:
+
+            from .gracethd_reader import GraceTHDReader
+
+            self._gt_reader = GraceTHDReader(gracethd_dir)
+
+        return self._gt_reader
+
     
 
     def execute(self):
@@ -921,7 +951,9 @@ class ComacTask(AsyncTaskBase):
 
             self.params['chemin_comac'],
 
-            self.params.get('zone_climatique', 'ZVN')
+            self.params.get('zone_climatique', 'ZVN'),
+
+            is_cancelled=self.isCanceled
 
         )
 
@@ -1038,14 +1070,14 @@ class ComacTask(AsyncTaskBase):
 
             try:
 
-                from .db_connection import DatabaseConnection
+                from .db_connection import DatabaseConnection, get_shared_connection
 
                 from .cable_analyzer import compter_cables_par_appui, verifier_boitiers
 
                 
 
 
-                appuis_data = _deserialize_appuis_wkb(self.qgis_data.get('appuis', []))
+                appuis_data = self._appuis_geoms()
 
                 
 
@@ -1093,9 +1125,8 @@ class ComacTask(AsyncTaskBase):
 
                 if be_type == 'axione' and gracethd_dir:
                     # Axione: charger cables depuis GraceTHD
-                    from .gracethd_reader import GraceTHDReader
                     self.emit_message(f"Vérif câbles: GraceTHD ({gracethd_dir})...", "grey")
-                    reader = GraceTHDReader(gracethd_dir)
+                    reader = self._gracethd_reader(gracethd_dir)
                     cables_all = reader.load_cables_as_segments('DI')
                     bpe_list = reader.load_bpe()
                 else:
@@ -1186,7 +1217,17 @@ class ComacTask(AsyncTaskBase):
                     # GraceTHD: tolerance large (cable = route complete). Endpoint: 1.5m (cables parfois decales de l'appui)
                     cable_tol = 2.0 if cable_match == 'line' else 1.5
 
-                    cables_par_appui = compter_cables_par_appui(cables, appuis_data, tolerance=cable_tol, group_by_gid=True, match_mode=cable_match, cab_types={'CDI'})
+                    cables_par_appui = None
+                    if cable_match == 'endpoint' and sro:
+                        # BDD: comptage serveur (index GiST), repli client si la fonction SQL manque
+                        db_count = get_shared_connection()
+                        if db_count.connect():
+                            cables_par_appui = db_count.compter_cables_par_appui_sql(
+                                sro, appuis_data, tolerance=cable_tol, group_by_gid=True,
+                                cab_types={'CDI'}, min_capa=6
+                            )
+                    if cables_par_appui is None:
+                        cables_par_appui = compter_cables_par_appui(cables, appuis_data, tolerance=cable_tol, group_by_gid=True, match_mode=cable_match, cab_types={'CDI'})
 
                     # Diagnostic: combien d'appuis ont des cables matches
                     nb_with_cables = sum(1 for v in cables_par_appui.values() if v.get('count', 0) > 0)
@@ -1520,7 +1561,8 @@ class ComacTask(AsyncTaskBase):
                 self.emit_message("Lecture fichiers PCM...", "grey")
 
                 etudes_pcm, erreurs_pcm = parse_repertoire_pcm(
-                    chemin_comac, self.params.get('zone_climatique', 'ZVN')
+                    chemin_comac, self.params.get('zone_climatique', 'ZVN'),
+                    is_cancelled=self.isCanceled
                 )
 
                 if etudes_pcm:
@@ -1560,7 +1602,7 @@ class ComacTask(AsyncTaskBase):
 
                         # Deserialiser appuis si pas deja fait (has_verif_work=False)
                         if not appuis_data:
-                            appuis_data = _deserialize_appuis_wkb(self.qgis_data.get('appuis', []))
+                            appuis_data = self._appuis_geoms()
 
                         self.emit_progress(93)
                         self.emit_message("Verif portees: reconstruction troncons reference...", "grey")
@@ -1570,8 +1612,7 @@ class ComacTask(AsyncTaskBase):
 
                         troncons_ref = []
                         if be_type == 'axione' and gracethd_dir:
-                            from .gracethd_reader import GraceTHDReader
-                            reader_p = GraceTHDReader(gracethd_dir)
+                            reader_p = self._gracethd_reader(gracethd_dir)
                             cables_nodes = reader_p.load_cables_with_nodes('DI')
                             troncons_ref = extraire_portees_gracethd(
                                 cables_nodes, appuis_data, tolerance=2.0
@@ -1677,12 +1718,13 @@ class ComacTask(AsyncTaskBase):
                 if not etudes_pcm:
                     etudes_pcm, _ = _parse_pcm_batch(
                         chemin_comac_pcm,
-                        self.params.get('zone_climatique', 'ZVN')
+                        self.params.get('zone_climatique', 'ZVN'),
+                        is_cancelled=self.isCanceled
                     )
 
                 if etudes_pcm:
                     if not appuis_data:
-                        appuis_data = _deserialize_appuis_wkb(self.qgis_data.get('appuis', []))
+                        appuis_data = self._appuis_geoms()
 
                     if appuis_data:
                         poteaux_bdd_dicts = []
@@ -2942,7 +2984,7 @@ class GespotC6Task(AsyncTaskBase):
                 self.emit_message(msg, 'grey')
 
         result = run_comparison(gespot_dir, c6_dir, export_dir,
-                                progress_cb=_prog)
+                                progress_cb=_prog, is_cancelled=self.isCanceled)
 
         if self.isCanceled():
             return False
@@ -2975,6 +3017,30 @@ class GespotC6Task(AsyncTaskBase):
         return True
 
 
+class ProjectDetectionTask(AsyncTaskBase):
+    """Detection de la structure d'un projet hors thread GUI.
+
+    Un seul parcours de l'arborescence (partages reseau lents) ;
+    annulable entre deux dossiers. Parametre requis : project_root.
+    Resultat : {'detection': DetectionResult}.
+    """
+
+    def __init__(self, params: dict):
+        super().__init__('Detection projet', params)
+
+    def execute(self) -> bool:
+        from .project_detector import DetectionCancelled, detect_project
+
+        try:
+            detection = detect_project(self.params['project_root'],
+                                       is_cancelled=self.isCanceled)
+        except DetectionCancelled:
+            return False
+
+        self.result = {'detection': detection}
+        return True
+
+
 def _run_one_study(
     etude_name, c6_file,
     cables_par_appui_cached, appuis_data,
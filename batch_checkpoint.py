@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+Point de reprise d'un batch : resultats de modules persistes au fil de l'eau.
+
+Un manifeste JSON (modules demandes, modules termines) et un pickle par
+module termine (ModuleResultStore, cle = identifiant du run). Apres un
+crash ou une fermeture de QGIS, le batch suivant du meme projet peut
+reprendre : les modules termines sont restaures pour le rapport unifie et
+le DAG repart du premier module incomplet. La reprise n'est proposee que si
+le run a moins de CHECKPOINT_MAX_AGE_S et si les empreintes des entrees
+(module_fingerprint : dossiers livrables, couches, SRO, empreinte BDD) des
+modules termines sont inchangees. Module pur Python.
+"""
+
+import json
+import os
+import shutil
+import threading
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+
+try:
+    from .module_fingerprint import ModuleResultStore
+except ImportError:
+    from module_fingerprint import ModuleResultStore
+
+CHECKPOINT_VERSION = 2
+_MANIFEST = 'manifest.json'
+
+# Au-dela, un batch interrompu n'est plus propose a la reprise (secondes)
+CHECKPOINT_MAX_AGE_S = 24 * 3600
+
+
+class BatchCheckpoint:
+    """Manifeste + resultats par module dans un dossier dedie au projet."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._manifest: Optional[Dict] = None
+        self._store = ModuleResultStore(os.path.join(directory, 'modules'))
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.directory, _MANIFEST)
+
+    def _read_manifest(self) -> Optional[Dict]:
+        try:
+            with open(self.manifest_path, encoding='utf-8') as handle:
+                manifest = json.load(handle)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(manifest, dict) or manifest.get('version') != CHECKPOINT_VERSION:
+            return None
+        return manifest
+
+    def _write_manifest(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self.manifest_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as handle:
+                json.dump(self._manifest, handle, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.manifest_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def resumable(self, fingerprints: Optional[Dict[str, Optional[str]]] = None,
+                  max_age_s: float = CHECKPOINT_MAX_AGE_S) -> Optional[Dict]:
+        """Manifeste d'un run interrompu avec au moins un module termine, sinon None.
+
+        Args:
+            fingerprints: empreintes courantes des entrees par module ; si
+                fourni, chaque module termine doit avoir une empreinte connue
+                et identique a celle du run interrompu
+            max_age_s: age maximal du run interrompu
+        """
+        manifest = self._read_manifest()
+        if not manifest or not manifest.get('completed'):
+            return None
+        if set(manifest['completed']) >= set(manifest.get('modules', [])):
+            return None
+        try:
+            started = datetime.fromisoformat(manifest.get('started', ''))
+        except (TypeError, ValueError):
+            return None
+        if (datetime.now() - started).total_seconds() > max_age_s:
+            return None
+        if fingerprints is not None:
+            stored = manifest.get('fingerprints') or {}
+            for key in manifest['completed']:
+                current = fingerprints.get(key)
+                if not current or stored.get(key) != current:
+                    return None
+        return manifest
+
+    def begin(self, modules: List[str], label: str = '',
+              fingerprints: Optional[Dict[str, Optional[str]]] = None) -> str:
+        """Demarre un nouveau run (efface le precedent). Retourne son identifiant.
+
+        fingerprints : empreintes des entrees par module, verifiees a la reprise.
+        """
+        self.clear()
+        self._manifest = {
+            'version': CHECKPOINT_VERSION,
+            'run_id': uuid.uuid4().hex,
+            'label': label,
+            'started': datetime.now().isoformat(timespec='seconds'),
+            'modules': list(modules),
+            'fingerprints': dict(fingerprints or {}),
+            'completed': {},
+        }
+        self._write_manifest()
+        return self._manifest['run_id']
+
+    def resume(self, modules: List[str],
+               fingerprints: Optional[Dict[str, Optional[str]]] = None,
+               max_age_s: float = CHECKPOINT_MAX_AGE_S) -> Dict[str, Dict]:
+        """Reprend le run interrompu : {module: resultat} des modules termines et demandes.
+
+        Memes conditions que resumable(). Les modules demandes absents du run
+        precedent y sont ajoutes ; les empreintes enregistrees sont celles
+        des entrees courantes.
+        """
+        manifest = self.resumable(fingerprints, max_age_s)
+        if manifest is None:
+            return {}
+        self._manifest = manifest
+        results = {}
+        for key in list(manifest['completed']):
+            entry = self._store.load(key, manifest['run_id'])
+            if entry is None:
+                del manifest['completed'][key]
+            elif key in modules:
+                results[key] = entry['result']
+        manifest['modules'] = list(dict.fromkeys(list(manifest['modules']) + list(modules)))
+        if fingerprints is not None:
+            manifest.setdefault('fingerprints', {}).update(
+                {key: fingerprints.get(key) for key in modules}
+            )
+        self._write_manifest()
+        return results
+
+    def record(self, key: str, result: Dict) -> bool:
+        """Persiste le resultat d'un module termine. False si non serialisable."""
+        if self._manifest is None:
+            return False
+        if not self._store.save(key, self._manifest['run_id'], result):
+            return False
+        self._manifest['completed'][key] = datetime.now().isoformat(timespec='seconds')
+        self._write_manifest()
+        return True
+
+    def clear(self) -> None:
+        """Supprime le point de reprise (batch termine ou reprise refusee)."""
+        self._manifest = None
+        shutil.rmtree(self.directory, ignore_errors=True)
@@ -7,14 +7,16 @@ All modules share the same pre-extracted data via ExtractedData.
 
 Principles:
 - ExtractedData is read-only after creation (no mutation in workers)
-- fddcpi2 queried once here; workers receive list[CableSegment] directly
+- fddcpi2 streamed once here (iter_fddcpi2); workers receive list[CableSegment] directly
 - BPE and attaches queried once here for both COMAC and Police C6
 - Each workflow skips its own extraction when ExtractedData is provided
 """
 
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field, fields
 from typing import List, Dict, Any, Optional
 from .compat import MSG_INFO, MSG_WARNING, MSG_CRITICAL
+from .appuis_snapshot import AppuisSnapshot
+from .sro_bundle import load_bundle, save_bundle
 
 
 @dataclass
@@ -37,9 +39,12 @@ class ExtractedData:
     all_inf_nums_comac: Any = field(default_factory=set)
     coords_qgis_comac: Dict = field(default_factory=dict)
 
-    # Appuis WKB: two variants (COMAC needs /commune, Police C6 does not)
-    appuis_wkb_commune: List = field(default_factory=list)
-    appuis_wkb_plain: List = field(default_factory=list)
+    # Appuis: one layer pass, two views (COMAC needs /commune, Police C6 does not)
+    appuis: Any = None                  # AppuisSnapshot
+
+    # Affectation poteaux -> etudes (PoleAssignment), calculee une fois
+    assignment_capft: Any = None
+    assignment_comac: Any = None
 
     # C6 vs BD extraction (DataFrames)
     df_c6bd_in: Any = None
@@ -48,6 +53,7 @@ class ExtractedData:
     # PostgreSQL data (queried once, shared)
     cables: Optional[List] = None       # list[CableSegment] from fddcpi2 or GraceTHD
     cables_source: str = ''             # 'fddcpi2' | 'gracethd' | ''
+    cables_fingerprint: str = ''        # empreinte BDD/GraceTHD lue a l'extraction ('' si inconnue)
     bpe_list: List = field(default_factory=list)
     attaches_raw: List = field(default_factory=list)
 
@@ -55,6 +61,52 @@ class ExtractedData:
     sro: str = ''
     be_type: str = 'nge'
 
+    @property
+    def appuis_wkb_commune(self) -> List:
+        return self.appuis.view(keep_commune=True) if self.appuis else []
+
+    @property
+    def appuis_wkb_plain(self) -> List:
+        return self.appuis.view(keep_commune=False) if self.appuis else []
+
+
+# Affectations liees aux couches du projet courant (ids de couches) : non enregistrees
+_BUNDLE_EXCLUDED_FIELDS = ('assignment_capft', 'assignment_comac')
+
+
+def save_extracted_bundle(data: ExtractedData, path: str) -> str:
+    """Enregistre ExtractedData dans un bundle SRO hors ligne (sro_bundle)."""
+    values = {}
+    for f in fields(ExtractedData):
+        if f.name in _BUNDLE_EXCLUDED_FIELDS:
+            continue
+        value = getattr(data, f.name)
+        if f.name == 'cables' and value is not None:
+            value = [asdict(c) for c in value]
+        elif f.name == 'appuis' and value is not None:
+            value = value.to_dict()
+        values[f.name] = value
+    return save_bundle(path, data.sro, values)
+
+
+def load_extracted_bundle(path: str) -> ExtractedData:
+    """Reconstruit ExtractedData depuis un bundle SRO (rejeu sans PostgreSQL)."""
+    from .db_connection import CableSegment
+    values = load_bundle(path)['fields']
+    known = {f.name for f in fields(ExtractedData)} - set(_BUNDLE_EXCLUDED_FIELDS)
+    values = {name: value for name, value in values.items() if name in known}
+    if values.get('cables') is not None:
+        try:
+            values['cables'] = [CableSegment(**c) for c in values['cables']]
+        except TypeError as e:
+            raise ValueError(f"Bundle SRO invalide ({path}): cables illisibles ({e})") from e
+    if values.get('appuis') is not None:
+        try:
+            values['appuis'] = AppuisSnapshot.from_dict(values['appuis'])
+        except (AttributeError, TypeError) as e:
+            raise ValueError(f"Bundle SRO invalide ({path}): appuis illisibles ({e})") from e
+    return ExtractedData(**values)
+
 
 class BatchDataExtractor:
     """Centralised QGIS + PostgreSQL extraction for batch runs.
@@ -102,17 +154,20 @@ class BatchDataExtractor:
         needs_appuis = bool({'comac', 'police_c6'} & keys)
         needs_pg = bool({'comac', 'police_c6'} & keys)
 
-        if needs_capft and lyr_pot and lyr_cap:
-            self._extract_capft(data, lyr_pot.name(), lyr_cap.name(), capft_col)
+        self.extract_assignments(
+            data,
+            lyr_pot,
+            lyr_cap if (needs_capft or needs_c6bd) else None,
+            lyr_com if needs_comac else None,
+            capft_col or c6bd_col,
+            comac_col,
+        )
 
-        if needs_comac and lyr_pot and lyr_com:
-            self._extract_comac(data, lyr_pot.name(), lyr_com.name(), comac_col, be_type)
-
-        if needs_c6bd and lyr_pot and lyr_cap:
-            self._extract_c6bd(data, lyr_pot.name(), lyr_cap.name(), c6bd_col)
+        self.extract_layer_dicts(data, keys, lyr_pot, lyr_cap, lyr_com,
+                                 capft_col, comac_col, c6bd_col)
 
         if needs_appuis and lyr_pot and sro:
-            self._extract_appuis(data, lyr_pot)
+            self.extract_appuis(data, lyr_pot)
 
         if needs_pg and sro:
             self._extract_pg(data, sro, be_type, gracethd_dir)
@@ -123,6 +178,41 @@ class BatchDataExtractor:
     #  Phase A: QGIS extractions (main thread)
     # ------------------------------------------------------------------
 
+    def extract_assignments(self, data, lyr_pot, lyr_cap, lyr_com, capft_col, comac_col):
+        """Compute pole -> study assignments once for CAP_FT and COMAC layers.
+
+        Consumers check PoleAssignment.matches() and fall back to their own
+        spatial pass when layers or study field differ.
+        """
+        if lyr_pot and lyr_cap and capft_col:
+            data.assignment_capft = self._extract_assignment(lyr_pot, lyr_cap, capft_col)
+        if lyr_pot and lyr_com and comac_col:
+            data.assignment_comac = self._extract_assignment(lyr_pot, lyr_com, comac_col)
+
+    def extract_layer_dicts(self, data, module_keys, lyr_pot, lyr_cap, lyr_com,
+                            capft_col='', comac_col='', c6bd_col=''):
+        """CAP_FT / COMAC / C6 vs BD dictionaries for module_keys (main thread)."""
+        keys = set(module_keys)
+        if 'capft' in keys and lyr_pot and lyr_cap:
+            self._extract_capft(data, lyr_pot.name(), lyr_cap.name(), capft_col)
+
+        if 'comac' in keys and lyr_pot and lyr_com:
+            self._extract_comac(data, lyr_pot.name(), lyr_com.name(), comac_col, data.be_type)
+
+        if {'c6bd', 'c6c3a', 'police_c6'} & keys and lyr_pot and lyr_cap:
+            self._extract_c6bd(data, lyr_pot.name(), lyr_cap.name(), c6bd_col)
+
+    def _extract_assignment(self, lyr_pot, lyr_etude, col):
+        from .qgis_utils import compute_pole_assignment
+        try:
+            return compute_pole_assignment(lyr_pot, lyr_etude, col)
+        except Exception as e:
+            from qgis.core import QgsMessageLog, Qgis
+            QgsMessageLog.logMessage(
+                f"BatchExtractor._extract_assignment: {e}", "PoleAerien", MSG_WARNING
+            )
+            return None
+
     def _extract_capft(self, data, pot_name, cap_name, col):
         from .CapFt import CapFt
         try:
@@ -130,7 +220,8 @@ class BatchDataExtractor:
             (data.doublons_capft, data.hors_etude_capft,
              data.dico_qgis_capft, data.dico_prives_capft,
              data.all_inf_nums_capft, data.coords_qgis_capft) = (
-                cap.extraire_donnees_capft(pot_name, cap_name, col)
+                cap.extraire_donnees_capft(
+                    pot_name, cap_name, col, assignment=data.assignment_capft)
             )
         except Exception as e:
             from qgis.core import QgsMessageLog, Qgis
@@ -145,7 +236,9 @@ class BatchDataExtractor:
             (data.doublons_comac, data.hors_etude_comac,
              data.dico_qgis_comac, data.dico_prives_comac,
              data.all_inf_nums_comac, data.coords_qgis_comac) = (
-                com.extraire_donnees_comac(pot_name, com_name, col, be_type=be_type)
+                com.extraire_donnees_comac(
+                    pot_name, com_name, col, be_type=be_type,
+                    assignment=data.assignment_comac)
             )
         except Exception as e:
             from qgis.core import QgsMessageLog, Qgis
@@ -158,7 +251,7 @@ class BatchDataExtractor:
         try:
             c6bd = C6_vs_Bd()
             data.df_c6bd_in, data.df_c6bd_out = c6bd.extraire_poteaux_in_out(
-                pot_name, cap_name, col
+                pot_name, cap_name, col, assignment=data.assignment_capft
             )
         except Exception as e:
             from qgis.core import QgsMessageLog, Qgis
@@ -166,15 +259,15 @@ class BatchDataExtractor:
                 f"BatchExtractor._extract_c6bd: {e}", "PoleAerien", MSG_WARNING
             )
 
-    def _extract_appuis(self, data, lyr_pot):
-        from .cable_analyzer import extraire_appuis_wkb
+    def extract_appuis(self, data, lyr_pot):
+        """Single layer pass for both appuis numbering variants (AppuisSnapshot)."""
+        from .cable_analyzer import extraire_appuis_snapshot
         try:
-            data.appuis_wkb_commune = extraire_appuis_wkb(lyr_pot, keep_commune=True)
-            data.appuis_wkb_plain = extraire_appuis_wkb(lyr_pot, keep_commune=False)
+            data.appuis = extraire_appuis_snapshot(lyr_pot)
         except Exception as e:
             from qgis.core import QgsMessageLog, Qgis
             QgsMessageLog.logMessage(
-                f"BatchExtractor._extract_appuis: {e}", "PoleAerien", MSG_WARNING
+                f"BatchExtractor.extract_appuis: {e}", "PoleAerien", MSG_WARNING
             )
 
     # ------------------------------------------------------------------
@@ -193,7 +286,17 @@ class BatchDataExtractor:
         try:
             db = get_shared_connection()
             if db.connect():
-                data.cables = db.execute_fddcpi2(sro)
+                # Streaming : un lot de segments a la fois, pas de fetchall() en double
+                cables = []
+                try:
+                    for chunk in db.iter_fddcpi2(sro):
+                        cables.extend(chunk)
+                except Exception:
+                    # Comme execute_fddcpi2 : liste vide (et non None) si la requete echoue
+                    data.cables = []
+                    data.cables_source = 'fddcpi2'
+                    raise
+                data.cables = cables
                 data.cables_source = 'fddcpi2'
                 from qgis.core import QgsMessageLog, Qgis
                 QgsMessageLog.logMessage(
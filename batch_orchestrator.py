@@ -7,18 +7,28 @@ workflow.start_analysis() calls, and routes workflow signals
 back to the BatchRunner callback system.
 """
 
+import dataclasses
+import hashlib
 import os
 import time
 
 from qgis.PyQt.QtCore import QObject
-from qgis.core import QgsMessageLog, QgsTask, QgsApplication, QgsProject
+from qgis.core import QgsMessageLog, QgsTask, QgsApplication, QgsProject, QgsSettings
 from .compat import MSG_INFO, MSG_WARNING, MSG_CRITICAL, FIELD_TYPE_STRING
 
 from .project_detector import DetectionResult
 from .db_layer_loader import DbLayerLoader
-from .qgis_utils import detect_etude_field as _detect_etude_field, reset_crs_cache, show_feature_count
+from .qgis_utils import (
+    detect_etude_field as _detect_etude_field, layer_fingerprint, reset_crs_cache, show_feature_count,
+)
 from .report_export_task import UnifiedReportExportTask
-from .batch_extractor import BatchDataExtractor
+from .batch_extractor import BatchDataExtractor, ExtractedData, load_extracted_bundle, save_extracted_bundle
+from .core_utils import get_profile_cache_dir
+from .sro_bundle import bundle_path
+from .module_fingerprint import FingerprintJob, ModuleResultStore, path_fingerprint, plan_reuse
+from .batch_checkpoint import BatchCheckpoint
+from . import file_index, process_pool
+from .session_cache import DEFAULT_MAX_AGE_S, SessionCache
 
 class _LoadProjectLayersTask(QgsTask):
     """Background task: PG connection + layer creation for project mode.
@@ -98,22 +108,77 @@ class _LoadProjectLayersTask(QgsTask):
         pass
 
 
+class _ProjectLayers:
+    """Couches BDD d'un chargement Mode Projet (conservees par le cache de session)."""
+
+    def __init__(self, loader, lyr_pot, lyr_cap, lyr_com, counts):
+        self.loader = loader
+        self.lyr_pot = lyr_pot
+        self.lyr_cap = lyr_cap
+        self.lyr_com = lyr_com
+        self.counts = dict(counts)
+
+
+# Donnees BDD de session reutilisables sans empreinte BDD (fddcpi2_fingerprint absente)
+_SESSION_PG_UNVERIFIED_MAX_AGE_S = 300
+
+
 class _PreExtractPgTask(QgsTask):
-    def __init__(self, sro, be_type, gracethd_dir):
-        super().__init__(f"Prechargement batch ({sro})")
+    """Prechargement batch : donnees PostgreSQL (si sro) et empreintes des entrees.
+
+    Les empreintes (hachage des dossiers livrables, empreinte fddcpi2 en BDD)
+    sont calculees ici plutot que sur le thread GUI (FingerprintJob). Les
+    donnees BDD du batch precedent (cache de session) ne sont reprises que
+    si l'empreinte BDD est inchangee.
+    """
+
+    def __init__(self, sro, be_type, gracethd_dir, fingerprint_job=None,
+                 cables_reader=None, cached=None, cached_age=None):
+        super().__init__(f"Prechargement batch ({sro or 'empreintes'})")
         self.sro = sro
         self.be_type = be_type
         self.gracethd_dir = gracethd_dir
+        self.fingerprint_job = fingerprint_job
+        self.cables_reader = cables_reader
+        self.cached = cached
+        self.cached_age = cached_age
         self.data = None
+        self.reused = ''
+        self.fingerprints = None
         self.error_msg = None
 
+    def _cached_reason(self, current):
+        """'empreinte' | 'age' si les donnees de session restent valables, sinon ''."""
+        if self.cached is None:
+            return ''
+        if current:
+            return 'empreinte' if current == self.cached.cables_fingerprint else ''
+        if self.cached_age is not None and self.cached_age <= _SESSION_PG_UNVERIFIED_MAX_AGE_S:
+            return 'age'
+        return ''
+
     def run(self):
+        if self.fingerprint_job is not None:
+            try:
+                self.fingerprints = self.fingerprint_job.run()
+            except Exception as e:
+                QgsMessageLog.logMessage(
+                    f"Empreintes des entrees indisponibles: {e}", "PoleAerien", MSG_INFO
+                )
+        if not self.sro:
+            return True
         try:
+            current = self.cables_reader() if self.cables_reader else None
+            self.reused = self._cached_reason(current)
+            if self.reused:
+                self.data = dataclasses.replace(self.cached)
+                return True
             extractor = BatchDataExtractor()
             self.data = extractor.extract_all(
                 ['comac'], None, None, None,
                 self.sro, self.be_type, self.gracethd_dir
             )
+            self.data.cables_fingerprint = current or ''
             return True
         except Exception as e:
             self.error_msg = str(e)
@@ -205,6 +270,24 @@ class BatchOrchestrator(QObject):
         self._pending_prefetch_keys = None
         # P-02: pre-extracted batch data (populated before runner.start)
         self._extracted_data = None
+        # Relance incrementale : empreintes des entrees par module + stockage
+        self._module_fingerprints = {}
+        self._result_store = None
+        # Point de reprise : resultats persistes au fil de l'eau
+        self._checkpoint = None
+        self._resume_results = {}
+        # File de projets (batch_queue) en cours, lancee depuis le dialogue
+        self._queue = None
+        self._queue_root = ''
+        self._queue_done = 0
+        # Cache des dessins COMAC partage (file de projets), sinon un par rapport
+        self.drawing_cache = None
+        # False quand plusieurs SRO partagent le projet QGIS (file de projets)
+        self.manage_project_layers = True
+        # Cache de session : couches BDD et donnees extraites reutilisees
+        # d'un batch a l'autre tant que les couches sources n'ont pas change
+        self._session = SessionCache()
+        self._watched_layer_ids = set()
 
         # Register launchers
         self._runner.set_launcher('maj', self._launch_maj)
@@ -242,6 +325,8 @@ class BatchOrchestrator(QObject):
         # Connect dialog signals
         self._dlg.start_requested.connect(self._on_start)
         self._dlg.cancel_requested.connect(self._on_cancel)
+        if hasattr(self._dlg, 'queue_requested'):
+            self._dlg.queue_requested.connect(self._on_queue_requested)
 
     # ------------------------------------------------------------------
     #  Start / Cancel
@@ -260,6 +345,10 @@ class BatchOrchestrator(QObject):
         self._module_progress = {}
         self._batch_results = {}
         self._extracted_data = None
+        self._module_fingerprints = {}
+        self._result_store = None
+        self._checkpoint = None
+        self._resume_results = {}
         self._fddcpi_cache = {}
         self._sro_appuis_cache = {}
         self._be_type = 'nge'
@@ -269,10 +358,15 @@ class BatchOrchestrator(QObject):
         self._prefetch_task = None
         self._pending_prefetch_keys = None
         reset_crs_cache()
+        # Pool de processus (lecture PCM / Excel COMAC) : -1 = auto, 0 = desactive
+        process_pool.configure(QgsSettings().value("PoleAerien/pool/workers", process_pool.AUTO, type=int))
+        # Livraisons re-indexees a chaque batch (fichiers deposes entre deux lancements)
+        file_index.clear()
         self._dlg.textBrowser.clear()
 
         # QP-06: Nettoyage couches temporaires du batch precedent
-        self._cleanup_temp_layers()
+        if self.manage_project_layers:
+            self._cleanup_temp_layers()
 
         # Detect BE type (NGE vs Axione)
         det = self._detection()
@@ -336,10 +430,13 @@ class BatchOrchestrator(QObject):
             lyr_pot = self._lyr_pot()
             if lyr_pot:
                 sro_for_fetch = extract_sro_from_layer(lyr_pot) or ''
+        session = self._session_cache()
+        if session is not None:
+            session.bind((sro_for_fetch, ''))
         if self._start_async_pre_extract(module_keys, sro_for_fetch):
             return
 
-        self._runner.start(module_keys)
+        self._start_runner(module_keys)
 
     def _detect_be_type(self, sro, det):
         """Detect bureau d'etudes (NGE/Axione).
@@ -662,6 +759,9 @@ class BatchOrchestrator(QObject):
             )
 
     def _on_cancel(self):
+        if self._queue is not None:
+            self._queue.cancel()
+            return
         # Cancel layer loading task if in progress
         if self._layer_load_task:
             self._layer_load_task.cancel()
@@ -709,7 +809,11 @@ class BatchOrchestrator(QObject):
         self._dlg.set_progress(int(mapped))
 
     def _finalize_batch_ui(self):
-        self._create_absent_poteaux_layers()
+        # Batch complet : point de reprise inutile (conserve si module en echec)
+        if self._checkpoint is not None and self._checkpoint.resumable() is None:
+            self._checkpoint.clear()
+        if self.manage_project_layers:
+            self._create_absent_poteaux_layers()
         self._cleanup_project_mode_layers()
         self._dlg.reset_after_batch()
         self._runner.finalize_batch()
@@ -727,6 +831,7 @@ class BatchOrchestrator(QObject):
             'include_comac_drawings': self._dlg.include_comac_drawings,
             'include_data_dictionary': self._dlg.include_data_dictionary,
             'sro': det.sro if det else '',
+            'drawing_cache': self.drawing_cache,
         })
         self._report_task.signals.progress.connect(self._on_report_progress)
         self._report_task.signals.message.connect(self._relay_message)
@@ -762,10 +867,19 @@ class BatchOrchestrator(QObject):
         self._dlg.set_progress_step(f"{name} ({_idx + 1}/{_total})")
 
     def _on_module_finished(self, key, success, msg):
+        if success and self._checkpoint is not None and key in self._batch_results:
+            if not self._checkpoint.record(key, self._batch_results[key]):
+                QgsMessageLog.logMessage(
+                    f"Point de reprise {key} non enregistre (non serialisable)", "PoleAerien", MSG_INFO
+                )
+        if key == 'maj':
+            # MAJ FT/BT ecrit dans infra_pt_pot en SQL direct (aucun signal de couche)
+            self._session.invalidate_role('pot')
         self._module_progress[key] = 100
         self._dlg.set_progress(self._compute_global_progress())
 
     def _on_batch_finished(self, results):
+        self._save_module_results(results)
         self._log_batch_recap(results)
         self._start_report_task()
 
@@ -794,6 +908,8 @@ class BatchOrchestrator(QObject):
 
             dur = elapsed.get(key)
             dur_str = f" ({dur:.1f}s)" if dur else ""
+            if result.get('_reused_from'):
+                dur_str = f" (reutilise, resultat du {result['_reused_from']})"
 
             if dur:
                 try:
@@ -975,6 +1091,74 @@ class BatchOrchestrator(QObject):
         self._dlg.reset_after_batch()
         self._dlg.log_message("Batch annulé.", 'warning')
 
+    # ------------------------------------------------------------------
+    #  File de projets (plusieurs SRO d'une livraison)
+    # ------------------------------------------------------------------
+    def _on_queue_requested(self, root, project_dirs, module_keys):
+        """Traite les SRO d'une livraison a la suite (batch_queue.ProjectQueue).
+
+        Chaque projet garde ses propres modules detectes ; synthese consolidee
+        ecrite dans le dossier de la livraison.
+        """
+        if self._queue is not None or self._runner.is_running or not project_dirs:
+            return
+        from .batch_queue import ProjectQueue
+        from .headless_job import SroJob
+        from .job_queue import DEFAULT_MEMORY_PER_SRO_MB, available_memory_mb, parallel_slots
+
+        settings = QgsSettings()
+        slots = parallel_slots(
+            settings.value("PoleAerien/queue/max_parallel", 2, type=int),
+            available_mb=available_memory_mb(),
+            memory_per_sro_mb=settings.value(
+                "PoleAerien/queue/memory_per_sro_mb", DEFAULT_MEMORY_PER_SRO_MB, type=int
+            ),
+        )
+        self._queue_root = root
+        self._queue_done = 0
+        self._queue = ProjectQueue(
+            [SroJob(project_dir=d, modules=list(module_keys)) for d in project_dirs],
+            slots,
+            include_comac_drawings=self._dlg.include_comac_drawings,
+            include_data_dictionary=self._dlg.include_data_dictionary,
+            only_detected_modules=True,
+        )
+        self._queue.log_message.connect(self._dlg.log_message)
+        self._queue.project_finished.connect(self._on_queue_project_finished)
+        self._queue.queue_finished.connect(self._on_queue_finished)
+        self._dlg.textBrowser.clear()
+        self._dlg.set_running(True)
+        self._dlg.set_progress_step(f"File de projets : 0/{len(project_dirs)}")
+        self._queue.start()
+
+    def _on_queue_project_finished(self, outcome):
+        self._queue_done += 1
+        total = max(len(self._queue), 1) if self._queue is not None else 1
+        self._dlg.set_progress(int(self._queue_done * 100 / total))
+        self._dlg.set_progress_step(f"File de projets : {self._queue_done}/{total}")
+        for filepath in outcome.reports:
+            self._dlg.log_result_link(filepath)
+
+    def _on_queue_finished(self, outcomes):
+        from .batch_runner import MODULE_REGISTRY
+        from .job_queue import write_summary_workbook
+
+        self._queue = None
+        ok = sum(1 for o in outcomes if o.status == 'OK')
+        self._dlg.log_message(
+            f"File de projets terminee : {ok}/{len(outcomes)} SRO sans erreur",
+            'success' if ok == len(outcomes) else 'warning'
+        )
+        filename = f"synthese_file_{time.strftime('%Y%m%d_%H%M%S')}.xlsx"
+        try:
+            path = write_summary_workbook(
+                os.path.join(self._queue_root, filename), outcomes, MODULE_REGISTRY
+            )
+            self._dlg.log_result_link(path)
+        except OSError as e:
+            self._dlg.log_message(f"Synthese non ecrite : {e}", 'error')
+        self._dlg.reset_after_batch()
+
     # ------------------------------------------------------------------
     #  Helper: get common params from dialog
     # ------------------------------------------------------------------
@@ -1067,6 +1251,14 @@ class BatchOrchestrator(QObject):
             self._dlg.reset_after_batch()
             return
 
+        cached = self._cached_project_layers(sro, extent_wkt)
+        if cached is not None:
+            self._dlg.log_message(
+                "Mode Projet: couches BDD de la session reutilisees", 'info'
+            )
+            self._register_project_layers(cached)
+            return
+
         if not extent_wkt:
             self._dlg.log_message(
                 f"Mode Projet: chargement depuis BDD (SRO={sro})", 'info'
@@ -1085,6 +1277,33 @@ class BatchOrchestrator(QObject):
         if not task:
             return
 
+        loaded = _ProjectLayers(task.loader, task.lyr_pot, task.lyr_cap, task.lyr_com, task.counts)
+        session = self._session_cache()
+        if session is not None:
+            session.put('layers', loaded)
+        self._register_project_layers(loaded)
+
+    def _cached_project_layers(self, sro, extent_wkt):
+        """Couches BDD du batch precedent (meme SRO et emprise), sinon None."""
+        session = self._session_cache()
+        if session is None:
+            return None
+        session.bind((sro, extent_wkt))
+        cached = session.get('layers')
+        if cached is None:
+            return None
+        try:
+            alive = all(lyr.isValid() for lyr in (cached.lyr_pot, cached.lyr_cap, cached.lyr_com) if lyr)
+        except RuntimeError:
+            # Couche supprimee du projet par l'utilisateur (objet C++ detruit)
+            alive = False
+        if not alive:
+            session.put('layers', None)
+            return None
+        return cached
+
+    def _register_project_layers(self, task):
+        """Main thread: register DB layers in QgsProject (new or session cache), start batch."""
         self._db_loader = task.loader
 
         # Always add layers to QGIS project so that get_layer_safe() and
@@ -1188,15 +1407,29 @@ class BatchOrchestrator(QObject):
             if self._start_async_pre_extract(keys, sro_pm):
                 return
 
-            self._runner.start(keys)
+            self._start_runner(keys)
 
     def _start_async_pre_extract(self, module_keys, sro):
+        self._watch_session_layers()
+        self._prepare_pole_assignments(module_keys)
+        self._prepare_appuis_snapshot(module_keys)
+
+        cables_reader = self._cables_reader()
+        fingerprint_job = self._fingerprint_job(module_keys, cables_reader)
         cable_modules = set(module_keys) & {'comac', 'police_c6'}
-        if not cable_modules or not sro:
+        fetch_sro = sro if cable_modules else ''
+        if fetch_sro and self._sro_bundle_mode() == 'replay' and self._replay_sro_bundle(sro):
+            fetch_sro = ''
+
+        if not fetch_sro and fingerprint_job is None:
             return False
 
+        cached, cached_age = self._session_pg_data(fetch_sro) if fetch_sro else (None, None)
         self._pending_prefetch_keys = list(module_keys)
-        self._prefetch_task = _PreExtractPgTask(sro, self._be_type, self._gracethd_dir)
+        self._prefetch_task = _PreExtractPgTask(
+            fetch_sro, self._be_type, self._gracethd_dir, fingerprint_job,
+            cables_reader, cached, cached_age
+        )
         self._prefetch_task.taskCompleted.connect(self._on_pre_extract_done)
         self._prefetch_task.taskTerminated.connect(self._on_pre_extract_failed)
         QgsApplication.taskManager().addTask(self._prefetch_task)
@@ -1207,16 +1440,188 @@ class BatchOrchestrator(QObject):
         self._prefetch_task = None
         keys = self._pending_prefetch_keys
         self._pending_prefetch_keys = None
+        if task and task.fingerprints is not None:
+            self._module_fingerprints = task.fingerprints
         if task and task.data:
-            self._extracted_data = task.data
-            if task.data.cables is not None:
-                self._fddcpi_cache = {'sro': task.data.sro, 'cables': task.data.cables}
-                self._dlg.log_message(
-                    f"[P-02] cables pre-fetches: {len(task.data.cables)} segments (source: {task.data.cables_source})",
-                    'info'
-                )
+            if task.reused:
+                detail = ('empreinte BDD inchangee' if task.reused == 'empreinte'
+                          else 'empreinte BDD indisponible, cache recent')
+                self._dlg.log_message(f"[P-02] donnees BDD de la session reutilisees ({detail})", 'info')
+            self._adopt_pg_data(task.data)
+            session = self._session_cache()
+            if session is not None and task.reused != 'age':
+                session.put('pg', dataclasses.replace(
+                    task.data, appuis=None, assignment_capft=None, assignment_comac=None
+                ))
+            if keys and self._sro_bundle_mode() == 'record':
+                self._record_sro_bundle(keys)
         if keys:
-            self._runner.start(keys)
+            self._start_runner(keys)
+
+    def _adopt_pg_data(self, data):
+        """Donnees PostgreSQL pre-extraites (tache P-02 ou cache de session)."""
+        self._adopt_extracted_data(data)
+        if data.cables is not None:
+            self._fddcpi_cache = {'sro': data.sro, 'cables': data.cables}
+            self._dlg.log_message(
+                f"[P-02] cables pre-fetches: {len(data.cables)} segments (source: {data.cables_source})",
+                'info'
+            )
+
+    def _session_pg_data(self, sro):
+        """(donnees BDD du batch precedent, age s) si meme SRO et infra_pt_pot inchangee.
+
+        La tache de prechargement ne les reprend que si l'empreinte BDD
+        (fddcpi2_fingerprint / GraceTHD) n'a pas change depuis.
+        """
+        session = self._session_cache()
+        data = session.get('pg') if session is not None else None
+        if data is None or data.sro != sro or data.be_type != self._be_type:
+            return None, None
+        return data, session.age('pg')
+
+    @staticmethod
+    def _sro_bundle_mode():
+        """Mode bundle SRO hors ligne : 'record' | 'replay' | '' (QgsSettings)."""
+        mode = QgsSettings().value("PoleAerien/sro_bundle/mode", "", type=str)
+        return mode if mode in ('record', 'replay') else ''
+
+    def _record_sro_bundle(self, module_keys):
+        """Enregistre l'extraction complete du batch (main thread).
+
+        Les donnees PostgreSQL (cables, BPE, attaches) et les appuis sont deja
+        dans _extracted_data ; les dictionnaires CAP_FT / COMAC / C6 vs BD
+        sont extraits ici depuis les couches du batch avant l'ecriture.
+        """
+        data = self._extracted_data
+        if data is None:
+            return
+        lyr_cap = self._lyr_capft()
+        lyr_com = self._lyr_comac()
+        cap_col = self._auto_field(lyr_cap) if lyr_cap else ''
+        BatchDataExtractor().extract_layer_dicts(
+            data, module_keys, self._lyr_pot(), lyr_cap, lyr_com,
+            capft_col=cap_col,
+            comac_col=self._auto_field(lyr_com) if lyr_com else '',
+            c6bd_col=cap_col,
+        )
+        try:
+            path = save_extracted_bundle(
+                data, bundle_path(get_profile_cache_dir('bundles'), data.sro)
+            )
+        except (OSError, TypeError, ValueError) as e:
+            self._dlg.log_message(f"[Bundle] enregistrement impossible: {e}", 'warning')
+            return
+        self._dlg.log_message(f"[Bundle] SRO {data.sro} enregistre: {path}", 'info')
+
+    def _replay_sro_bundle(self, sro):
+        """Charge le bundle du SRO a la place de la pre-extraction PostgreSQL.
+
+        Returns:
+            True si le bundle a ete charge
+        """
+        path = bundle_path(get_profile_cache_dir('bundles'), sro)
+        if not os.path.isfile(path):
+            self._dlg.log_message(
+                f"[Bundle] aucun bundle pour {sro}, extraction PostgreSQL", 'warning'
+            )
+            return False
+        try:
+            data = load_extracted_bundle(path)
+        except (OSError, TypeError, ValueError) as e:
+            self._dlg.log_message(f"[Bundle] lecture impossible ({e}), extraction PostgreSQL", 'warning')
+            return False
+        appuis = data.appuis
+        self._adopt_extracted_data(data)
+        if appuis is not None:
+            # Rejeu : appuis enregistres, rattaches a la couche poteaux courante
+            lyr_pot = self._lyr_pot()
+            if lyr_pot:
+                appuis.layer_id = lyr_pot.id()
+            data.appuis = appuis
+        if data.cables is not None:
+            self._fddcpi_cache = {'sro': data.sro, 'cables': data.cables}
+        self._dlg.log_message(
+            f"[Bundle] rejeu {sro}: {len(data.cables or [])} segments, "
+            f"{len(data.bpe_list)} BPE, {len(data.attaches_raw)} attaches, "
+            f"{len(data.appuis or [])} appuis (sans PostgreSQL)",
+            'info'
+        )
+        return True
+
+    def _prepare_pole_assignments(self, module_keys):
+        """Affectation poteaux -> etudes calculee une fois pour tout le batch.
+
+        Main thread (acces couches QGIS). MAJ, CAP_FT, COMAC, C6 vs BD et
+        C6-C3A reutilisent le resultat au lieu de refaire leur passe spatiale.
+        """
+        keys = set(module_keys)
+        lyr_pot = self._lyr_pot()
+        lyr_cap = self._lyr_capft() if keys & {'maj', 'capft', 'c6bd', 'c6c3a'} else None
+        lyr_com = self._lyr_comac() if keys & {'maj', 'comac'} else None
+        if not lyr_pot or not (lyr_cap or lyr_com):
+            return
+
+        _t0 = time.perf_counter()
+        data = ExtractedData()
+        session = self._session_cache()
+        if session is not None:
+            data.assignment_capft = session.get('assignment_capft') if lyr_cap else None
+            data.assignment_comac = session.get('assignment_comac') if lyr_com else None
+        lyr_cap = lyr_cap if data.assignment_capft is None else None
+        lyr_com = lyr_com if data.assignment_comac is None else None
+        self._extracted_data = data
+        if not (lyr_cap or lyr_com):
+            self._dlg.log_message("Affectation poteaux/etudes reutilisee (session)", 'info')
+            return
+        BatchDataExtractor().extract_assignments(
+            data, lyr_pot, lyr_cap, lyr_com,
+            self._auto_field(lyr_cap) if lyr_cap else '',
+            self._auto_field(lyr_com) if lyr_com else '',
+        )
+        if session is not None:
+            session.put('assignment_capft', data.assignment_capft)
+            session.put('assignment_comac', data.assignment_comac)
+        self._dlg.log_message(
+            f"Affectation poteaux/etudes calculee en {time.perf_counter() - _t0:.2f}s",
+            'info'
+        )
+
+    def _prepare_appuis_snapshot(self, module_keys):
+        """Appuis de infra_pt_pot lus une fois pour COMAC et Police C6 (main thread)."""
+        if not set(module_keys) & {'comac', 'police_c6'}:
+            return
+        lyr_pot = self._lyr_pot()
+        if not lyr_pot:
+            return
+        if self._extracted_data is None:
+            self._extracted_data = ExtractedData()
+        session = self._session_cache()
+        cached = session.get('appuis') if session is not None else None
+        if cached is not None:
+            self._extracted_data.appuis = cached
+            return
+        BatchDataExtractor().extract_appuis(self._extracted_data, lyr_pot)
+        if session is not None:
+            session.put('appuis', self._extracted_data.appuis)
+
+    def _adopt_extracted_data(self, data):
+        """Remplace _extracted_data en conservant les champs calcules sur le main thread."""
+        if self._extracted_data:
+            data.assignment_capft = self._extracted_data.assignment_capft
+            data.assignment_comac = self._extracted_data.assignment_comac
+            data.appuis = self._extracted_data.appuis
+        self._extracted_data = data
+
+    def _appuis_snapshot(self):
+        """AppuisSnapshot batch ou None."""
+        return self._extracted_data.appuis if self._extracted_data else None
+
+    def _pole_assignment(self, kind):
+        """PoleAssignment batch ('capft' | 'comac') ou None."""
+        if not self._extracted_data:
+            return None
+        return getattr(self._extracted_data, f'assignment_{kind}', None)
 
     def _on_pre_extract_failed(self):
         task = self._prefetch_task
@@ -1225,10 +1630,299 @@ class BatchOrchestrator(QObject):
         self._pending_prefetch_keys = None
         if task and task.isCanceled():
             return
+        if task and task.fingerprints is not None:
+            self._module_fingerprints = task.fingerprints
         if task and task.error_msg:
             self._dlg.log_message(f"[P-02] pre-extraction ignoree: {task.error_msg}", 'warning')
         if keys:
-            self._runner.start(keys)
+            self._start_runner(keys)
+
+    # ------------------------------------------------------------------
+    #  Cache de session (session_cache)
+    # ------------------------------------------------------------------
+    def _session_cache(self):
+        """SessionCache, ou None si desactive (reglage ou file de projets)."""
+        if not self.manage_project_layers:
+            return None
+        settings = QgsSettings()
+        if not settings.value("PoleAerien/session_cache/enabled", True, type=bool):
+            self._session.clear()
+            return None
+        self._session.max_age_s = settings.value(
+            "PoleAerien/session_cache/max_age_s", DEFAULT_MAX_AGE_S, type=int
+        )
+        return self._session
+
+    def _watch_session_layers(self):
+        """Couches du batch suivies : modification validee -> parties du cache invalidees."""
+        if self._session_cache() is None:
+            return
+        for role, lyr in (('pot', self._lyr_pot()), ('cap', self._lyr_capft()), ('com', self._lyr_comac())):
+            if not lyr:
+                continue
+            # Filtre (subset) et emprise : un filtre change ne declenche aucun signal committed*
+            self._session.track_layer(role, lyr.id(), (lyr.subsetString(), lyr.extent().toString()))
+            if lyr.id() in self._watched_layer_ids:
+                continue
+            self._watched_layer_ids.add(lyr.id())
+            lyr.committedFeaturesAdded.connect(self._on_session_layer_committed)
+            lyr.committedFeaturesRemoved.connect(self._on_session_layer_committed)
+            lyr.committedAttributeValuesChanges.connect(self._on_session_layer_committed)
+            lyr.committedGeometriesChanges.connect(self._on_session_layer_committed)
+
+    def _on_session_layer_committed(self, layer_id, *_args):
+        dropped = self._session.invalidate_layer(layer_id)
+        if dropped:
+            QgsMessageLog.logMessage(
+                f"Cache de session: couche modifiee, invalide {', '.join(dropped)}",
+                "PoleAerien", MSG_INFO
+            )
+
+    # ------------------------------------------------------------------
+    #  Relance incrementale (module_fingerprint)
+    # ------------------------------------------------------------------
+    # Entrees par module : attributs DetectionResult (fichiers/dossiers) + couches
+    _MODULE_INPUTS = {
+        'maj':       (('ftbt_excel',), ('pot', 'cap', 'com')),
+        'capft':     (('capft_dir',), ('pot', 'cap')),
+        'comac':     (('comac_dir',), ('pot', 'com')),
+        'c6bd':      (('c6_dir',), ('pot', 'cap')),
+        'police_c6': (('c6_dir',), ('pot', 'cap')),
+        'c6c3a':     (('c6_annexe_file', 'c6_dir', 'c7_file', 'c3a_file'), ('pot', 'cap')),
+        'gespot_c6': (('gespot_dir', 'c6_dir'), ()),
+    }
+
+    def _start_runner(self, module_keys):
+        """runner.start() en reutilisant les resultats inchanges ou repris.
+
+        La reprise est proposee ici : les empreintes des entrees, calculees
+        par la tache de prechargement, valident le point de reprise.
+        """
+        self._resume_results = self._offer_resume(module_keys)
+        reused = set(self._plan_incremental(module_keys))
+        resumed = self._resume_results
+        self._resume_results = {}
+        for key, result in resumed.items():
+            self._batch_results.setdefault(key, result)
+        reused.update(resumed)
+        if self._checkpoint is not None:
+            if not resumed:
+                det = self._detection()
+                self._checkpoint.begin(
+                    module_keys, label=(det.sro if det else '') or self._dlg.sro or '',
+                    fingerprints=self._module_fingerprints,
+                )
+            for key in reused.difference(resumed):
+                self._checkpoint.record(key, self._batch_results[key])
+        self._runner.start(module_keys, reused=sorted(reused))
+
+    def _scope_id(self):
+        """Identifiant du projet courant (dossier livrable, sinon SRO), ou ''."""
+        det = self._detection()
+        scope = (det.project_root if det else '') or self._dlg.sro or ''
+        if not scope:
+            return ''
+        return hashlib.md5(scope.encode('utf-8')).hexdigest()[:16]
+
+    def _incremental_store(self):
+        """Stockage des resultats du projet courant, ou None si desactive."""
+        if not QgsSettings().value("PoleAerien/incremental/enabled", True, type=bool):
+            return None
+        scope_id = self._scope_id()
+        if not scope_id:
+            return None
+        return ModuleResultStore(get_profile_cache_dir('results', scope_id))
+
+    @staticmethod
+    def _checkpoint_enabled():
+        return QgsSettings().value("PoleAerien/checkpoint/enabled", True, type=bool)
+
+    def _open_checkpoint(self):
+        """Point de reprise du projet courant, ou None si desactive."""
+        if not self._checkpoint_enabled():
+            return None
+        scope_id = self._scope_id()
+        if not scope_id:
+            return None
+        return BatchCheckpoint(get_profile_cache_dir('checkpoints', scope_id))
+
+    def _offer_resume(self, module_keys):
+        """Propose la reprise d'un batch interrompu du meme projet.
+
+        Returns:
+            {module: resultat} des modules termines a restaurer (vide si refus)
+        """
+        self._checkpoint = checkpoint = self._open_checkpoint()
+        if checkpoint is None:
+            return {}
+        fingerprints = self._module_fingerprints
+        manifest = checkpoint.resumable(fingerprints)
+        if manifest is None:
+            if checkpoint.resumable(max_age_s=float('inf')) is not None:
+                self._dlg.log_message(
+                    "Batch interrompu non repris : entrees modifiees depuis "
+                    "(dossiers, couches, SRO, BDD) ou point de reprise trop ancien",
+                    'info'
+                )
+            return {}
+        from .batch_runner import MODULE_REGISTRY
+        done = [k for k in manifest['completed'] if k in module_keys]
+        if not done:
+            return {}
+        names = ', '.join(MODULE_REGISTRY.get(k, k) for k in done)
+        ask = getattr(self._dlg, 'ask_resume', None)
+        message = (
+            f"Un batch interrompu du {manifest.get('started', '?').replace('T', ' ')} "
+            f"a deja termine : {names}.\n\nReprendre a partir du premier module incomplet ?"
+        )
+        if ask is None or not ask(message):
+            return {}
+        results = checkpoint.resume(module_keys, fingerprints)
+        if results:
+            self._dlg.log_message(
+                f"Reprise du batch interrompu : {len(results)} module(s) restaure(s) "
+                f"[{', '.join(MODULE_REGISTRY.get(k, k) for k in results)}]",
+                'info'
+            )
+        return results
+
+    def _plan_incremental(self, module_keys):
+        """Resultats reutilises copies dans _batch_results.
+
+        Les empreintes ont ete calculees par la tache de prechargement
+        (_module_fingerprints) ; sans empreinte, le module est recalcule.
+
+        Returns:
+            Liste des modules a ne pas relancer
+        """
+        store = self._incremental_store()
+        if store is None or not self._module_fingerprints:
+            return []
+        from .batch_runner import MODULE_DAG, MODULE_REGISTRY
+
+        fingerprints = {key: self._module_fingerprints.get(key) for key in module_keys}
+        self._result_store = store
+
+        entries = {
+            key: store.load(key, fp) for key, fp in fingerprints.items() if fp
+        }
+        stored = {key: fingerprints[key] for key, entry in entries.items() if entry}
+        depends_on = {key: node['depends_on'] for key, node in MODULE_DAG.items()}
+        reused = sorted(plan_reuse(module_keys, fingerprints, stored, depends_on))
+        for key in reused:
+            result = entries[key]['result']
+            result['_reused_from'] = entries[key]['saved_at']
+            self._batch_results[key] = result
+            if key == 'police_c6':
+                # Couches cables / anomalies recreees comme lors d'un calcul
+                self._police_wf.load_result_layers(result)
+
+        recomputed = [k for k in module_keys if k not in reused]
+        if reused:
+            self._dlg.log_message(
+                f"Relance incrementale : "
+                f"{len(reused)} reutilise(s) [{', '.join(MODULE_REGISTRY.get(k, k) for k in reused)}], "
+                f"{len(recomputed)} recalcule(s) [{', '.join(MODULE_REGISTRY.get(k, k) for k in recomputed)}]",
+                'info'
+            )
+        return reused
+
+    def _cables_reader(self):
+        """Lecture memorisee de l'empreinte des cables (appelee dans la tache de prechargement)."""
+        be_type, gracethd_dir, sro = self._be_type, self._gracethd_dir, self._cables_sro()
+        memo = []
+
+        def _read_cables():
+            if not memo:
+                try:
+                    memo.append(self._read_cables_fingerprint(be_type, gracethd_dir, sro))
+                except Exception as e:
+                    QgsMessageLog.logMessage(
+                        f"Empreinte cables indisponible: {e}", "PoleAerien", MSG_INFO
+                    )
+                    memo.append(None)
+            return memo[0]
+
+        return _read_cables
+
+    def _fingerprint_job(self, module_keys, cables_reader):
+        """Entrees des empreintes (main thread) ; hachage fait par la tache de prechargement.
+
+        Empreintes utilisees par la relance incrementale et pour valider un
+        point de reprise.
+
+        Returns:
+            FingerprintJob, ou None si relance incrementale et reprise sont desactivees
+        """
+        scope_id = self._scope_id()
+        if not scope_id or (self._incremental_store() is None and not self._checkpoint_enabled()):
+            return None
+        inputs = {key: self._fingerprint_inputs(key) for key in module_keys}
+        digest_path = os.path.join(get_profile_cache_dir('results', scope_id), 'digests.json')
+        return FingerprintJob(digest_path, inputs, cables_reader)
+
+    def _fingerprint_inputs(self, key):
+        """(chemins a hacher, parties connues, depend des cables) ou None si non verifiable."""
+        files, layers = self._MODULE_INPUTS.get(key, ((), ()))
+        det = self._detection()
+        getters = {'pot': self._lyr_pot, 'cap': self._lyr_capft, 'com': self._lyr_comac}
+        try:
+            paths = {name: getattr(det, name, '') for name in files}
+            parts = {}
+            for name in layers:
+                lyr = getters[name]()
+                parts[f'layer_{name}'] = layer_fingerprint(lyr) if lyr else ''
+                if lyr and name != 'pot':
+                    parts[f'field_{name}'] = self._auto_field(lyr)
+            parts['be_type'] = self._be_type
+            if key == 'comac':
+                from .comac_db_reader import get_reference_fingerprint
+                parts['comac_ref'] = get_reference_fingerprint()
+                parts['spatial_tolerance'] = getattr(self._dlg, 'spatial_tolerance', 7.5)
+        except Exception as e:
+            QgsMessageLog.logMessage(
+                f"Empreinte {key} indisponible: {e}", "PoleAerien", MSG_INFO
+            )
+            return None
+        return paths, parts, key in ('comac', 'police_c6')
+
+    def _cables_sro(self):
+        """SRO de l'empreinte fddcpi2 (Mode Projet, sinon detection)."""
+        sro = self._dlg.sro if self._dlg.is_project_mode else ''
+        if not sro:
+            det = self._detection()
+            sro = det.sro if det else ''
+        return sro
+
+    @staticmethod
+    def _read_cables_fingerprint(be_type, gracethd_dir, sro):
+        """Empreinte des cables de reference (GraceTHD ou fddcpi2 serveur). Hors GUI thread."""
+        if be_type == 'axione':
+            return path_fingerprint(gracethd_dir)
+        if not sro:
+            return None
+        from .db_connection import DatabaseConnection
+        db = DatabaseConnection()
+        try:
+            fp = db.fddcpi2_fingerprint(sro)
+        finally:
+            db.disconnect()
+        return f"{sro}|{fp}" if fp else None
+
+    def _save_module_results(self, runner_results):
+        """Memorise les resultats recalcules avec l'empreinte de leurs entrees."""
+        store = self._result_store
+        if store is None:
+            return
+        for key, run_res in runner_results.items():
+            fp = self._module_fingerprints.get(key)
+            result = self._batch_results.get(key)
+            if run_res.get('reused') or not run_res.get('success') or not fp or result is None:
+                continue
+            if not store.save(key, fp, result):
+                QgsMessageLog.logMessage(
+                    f"Resultat {key} non memorise (non serialisable)", "PoleAerien", MSG_INFO
+                )
 
     def _log_spatial_sro(self, task):
         """Extract SRO from etude zones found by spatial intersection.
@@ -1285,10 +1979,16 @@ class BatchOrchestrator(QObject):
             return
 
         if not self._dlg.load_layers_in_qgis:
-            self._db_loader.cleanup_layers()
-            QgsMessageLog.logMessage(
-                "Mode Projet: couches temporaires supprimees", "PoleAerien", MSG_INFO
-            )
+            session = self._session_cache()
+            cached = session.get('layers') if session is not None else None
+            if cached is not None and cached.loader is self._db_loader:
+                # Retirees du projet mais conservees pour la prochaine relance
+                self._db_loader.detach_layers()
+                msg = "Mode Projet: couches temporaires retirees (cache de session)"
+            else:
+                self._db_loader.cleanup_layers()
+                msg = "Mode Projet: couches temporaires supprimees"
+            QgsMessageLog.logMessage(msg, "PoleAerien", MSG_INFO)
 
         self._pm_lyr_pot = None
         self._pm_lyr_cap = None
@@ -1342,7 +2042,9 @@ class BatchOrchestrator(QObject):
         col_com = self._auto_field(lyr_com)
         self._maj_wf.start_analysis(
             lyr_pot, lyr_cap, lyr_com, det.ftbt_excel,
-            col_cap=col_cap, col_com=col_com
+            col_cap=col_cap, col_com=col_com,
+            assignment_ft=self._pole_assignment('capft'),
+            assignment_bt=self._pole_assignment('comac')
         )
 
     def _on_maj_done(self, result):
@@ -1439,7 +2141,8 @@ class BatchOrchestrator(QObject):
 
         self._capft_wf.start_analysis(
             lyr_pot, lyr_cap, col_cap,
-            det.capft_dir, export_dir
+            det.capft_dir, export_dir,
+            pole_assignment=self._pole_assignment('capft')
         )
 
     def _on_capft_analysis(self, result):
@@ -1502,7 +2205,9 @@ class BatchOrchestrator(QObject):
             be_type=self._be_type,
             gracethd_dir=self._gracethd_dir,
             sro=sro,
-            spatial_tolerance=spatial_tol
+            spatial_tolerance=spatial_tol,
+            pole_assignment=self._pole_assignment('comac'),
+            appuis_snapshot=self._appuis_snapshot()
         )
 
     def _on_comac_analysis(self, result):
@@ -1563,7 +2268,8 @@ class BatchOrchestrator(QObject):
         # col_cap=None → auto-detect in workflow
         self._c6bd_wf.start_analysis(
             lyr_pot, lyr_cap, None,
-            c6_path, export_dir
+            c6_path, export_dir,
+            pole_assignment=self._pole_assignment('capft')
         )
 
     def _on_c6bd_analysis(self, result):
@@ -1626,6 +2332,8 @@ class BatchOrchestrator(QObject):
             params['fddcpi_cables_cache'] = self._fddcpi_cache.get('cables')
         if self._sro_appuis_cache:
             params['sro_appuis_cache'] = self._sro_appuis_cache
+        if self._appuis_snapshot():
+            params['appuis_snapshot'] = self._appuis_snapshot()
 
         # BE type routing (Axione -> GraceTHD)
         params['be_type'] = self._be_type
@@ -1713,6 +2421,7 @@ class BatchOrchestrator(QObject):
             params['table_decoupage'] = lyr_cap.name()
             params['champs_dcp'] = self._auto_field(lyr_cap)
             params['valeur_dcp'] = '%'
+            params['pole_assignment'] = self._pole_assignment('capft')
 
         if det.has_c3a:
             params['fichier_c3a'] = det.c3a_file
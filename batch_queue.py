@@ -0,0 +1,315 @@
+# -*- coding: utf-8 -*-
+"""
+File de projets : plusieurs SRO traites a la suite par le meme QGIS.
+
+Chaque SRO est traite en Mode Projet par son propre BatchOrchestrator
+(preflight, MODULE_DAG, rapport unifie), pilote par HeadlessDialog a la
+place de dialog_v2. Jusqu'a `slots` SRO tournent simultanement
+(job_queue.parallel_slots). Caches partages d'un SRO a l'autre : referentiel
+COMAC (niveau module, charge une fois) et cache des dessins COMAC (une
+instance pour toute la file). La connexion BDD reste unique : les SRO
+paralleles y accedent a tour de role (verrou de DatabaseConnection, tenu
+pendant toute une lecture fddcpi2 en flux).
+"""
+
+import os
+import sys
+import time
+from collections import deque
+
+from qgis.PyQt.QtCore import QObject, QTimer, pyqtSignal
+
+from .batch_orchestrator import BatchOrchestrator
+from .batch_runner import BatchRunner, MODULE_REGISTRY
+from .core_utils import get_profile_cache_dir
+from .headless_job import OutcomeRecorder, SroOutcome
+from .pcm_drawing import DrawingCache
+from .project_detector import detect_project, detected_modules, extract_sro_from_project_name
+from .workflows.c6bd_workflow import C6BdWorkflow
+from .workflows.c6c3a_workflow import C6C3AWorkflow
+from .workflows.capft_workflow import CapFtWorkflow
+from .workflows.comac_workflow import ComacWorkflow
+from .workflows.gespot_workflow import GespotWorkflow
+from .workflows.maj_workflow import MajWorkflow
+from .workflows.police_workflow import PoliceWorkflow
+
+# Duree maximale d'un SRO avant annulation (secondes)
+DEFAULT_SRO_TIMEOUT_S = 4 * 3600
+
+
+class _NoLayerCombo:
+    """Combo de couches vide : en Mode Projet les couches viennent de la BDD."""
+
+    def currentLayer(self):
+        return None
+
+
+class _LogSink:
+    def clear(self):
+        pass
+
+
+class HeadlessDialog(QObject):
+    """Sous-ensemble de dialog_v2 utilise par BatchOrchestrator, sans widget."""
+
+    start_requested = pyqtSignal(list)
+    cancel_requested = pyqtSignal()
+    batch_done = pyqtSignal()
+
+    def __init__(self, detection, include_comac_drawings=False,
+                 include_data_dictionary=True, stream=None, on_log=None, resume=False):
+        super().__init__()
+        self.detection = detection
+        self.resume = resume
+        self.include_comac_drawings = include_comac_drawings
+        self.include_data_dictionary = include_data_dictionary
+        self.is_project_mode = True
+        self.load_layers_in_qgis = False
+        self.spatial_tolerance = 7.5
+        self.textBrowser = _LogSink()
+        self.comboInfraPtPot = _NoLayerCombo()
+        self.comboEtudeCapFt = _NoLayerCombo()
+        self.comboEtudeComac = _NoLayerCombo()
+        self.running = False
+        self.reports = []
+        self.errors = []
+        self._stream = stream or sys.stderr
+        self._on_log = on_log
+
+    @property
+    def sro(self):
+        return self.detection.sro
+
+    def get_export_dir(self):
+        return self.detection.export_dir
+
+    def log_message(self, msg, level='info'):
+        if level == 'error':
+            self.errors.append(msg)
+        if self._on_log:
+            self._on_log(msg, level)
+        else:
+            print(f"[{level.upper()}] {msg}", file=self._stream, flush=True)
+
+    def log_result_link(self, filepath):
+        self.reports.append(filepath)
+        self.log_message(f"Rapport : {filepath}", 'success')
+
+    def set_running(self, running):
+        self.running = running
+
+    def set_progress(self, percent):
+        pass
+
+    def set_progress_step(self, text):
+        pass
+
+    def ask_resume(self, message):
+        # Sans interface : reprise seulement si demandee (--resume). Le point
+        # de reprise a deja ete valide par les empreintes des entrees.
+        self.log_message(message.replace('\n', ' '), 'info')
+        if not self.resume:
+            self.log_message("Reprise non demandee (--resume) : batch relance en entier", 'info')
+        return self.resume
+
+    def reset_after_batch(self):
+        self.running = False
+        self.batch_done.emit()
+
+
+class _QueuedProject:
+    """Etat d'un SRO en cours dans la file."""
+
+    def __init__(self, index, label, outcome, dlg, orchestrator):
+        self.index = index
+        self.label = label
+        self.outcome = outcome
+        self.dlg = dlg
+        self.orchestrator = orchestrator
+        self.t0 = time.perf_counter()
+        self.timer = None
+
+
+class ProjectQueue(QObject):
+    """Traite une liste de SroJob, `slots` SRO a la fois.
+
+    Signals:
+        project_started(str): dossier projet lance
+        project_finished(object): SroOutcome d'un SRO termine
+        queue_finished(list): SroOutcome de tous les SRO, dans l'ordre de la file
+        log_message(str, str): message prefixe par le SRO, niveau
+    """
+
+    project_started = pyqtSignal(str)
+    project_finished = pyqtSignal(object)
+    queue_finished = pyqtSignal(list)
+    log_message = pyqtSignal(str, str)
+
+    def __init__(self, sro_jobs, slots=1, include_comac_drawings=False,
+                 include_data_dictionary=True, timeout_s=DEFAULT_SRO_TIMEOUT_S,
+                 only_detected_modules=False, resume=False, parent=None):
+        super().__init__(parent)
+        self._jobs = list(sro_jobs)
+        self._slots = max(1, int(slots))
+        self._include_comac_drawings = include_comac_drawings
+        self._include_data_dictionary = include_data_dictionary
+        self._timeout_s = timeout_s
+        self._only_detected = only_detected_modules
+        self._resume = resume
+        self._pending = deque()
+        self._active = {}
+        # Orchestrateurs termines conserves jusqu'a la fin (signaux Qt tardifs)
+        self._retired = []
+        self._outcomes = []
+        self._running = False
+        self._cancelled = False
+        self._drawing_cache = None
+
+    def __len__(self):
+        return len(self._jobs)
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    @property
+    def slots(self) -> int:
+        return self._slots
+
+    def start(self):
+        if self._running or not self._jobs:
+            return
+        self._running = True
+        self._cancelled = False
+        self._pending = deque(enumerate(self._jobs))
+        self._outcomes = [None] * len(self._jobs)
+        self._drawing_cache = DrawingCache(get_profile_cache_dir('drawings'))
+        self.log_message.emit(
+            f"File de projets : {len(self._jobs)} SRO, {self._slots} en parallele", 'info'
+        )
+        self._fill()
+
+    def cancel(self):
+        """Annule les SRO en cours ; les SRO en attente ne sont pas lances."""
+        if not self._running:
+            return
+        self._cancelled = True
+        while self._pending:
+            index, job = self._pending.popleft()
+            self._outcomes[index] = SroOutcome(
+                sro=job.sro or extract_sro_from_project_name(os.path.basename(job.project_dir)) or '',
+                project_dir=job.project_dir, errors=["Annule avant lancement"],
+            )
+        for entry in list(self._active.values()):
+            entry.outcome.errors.append("Annule")
+            entry.dlg.cancel_requested.emit()
+            self._on_project_done(entry.index)
+
+    def _fill(self):
+        while self._running and not self._cancelled and self._pending and len(self._active) < self._slots:
+            index, job = self._pending.popleft()
+            try:
+                self._launch(index, job)
+            except Exception as e:
+                self._active.pop(index, None)
+                self._outcomes[index] = SroOutcome(
+                    sro=job.sro, project_dir=job.project_dir, errors=[f"Erreur lancement : {e}"],
+                )
+                self.log_message.emit(f"[{os.path.basename(job.project_dir)}] Erreur lancement : {e}", 'error')
+        if self._running and not self._active and (self._cancelled or not self._pending):
+            self._finish()
+
+    def _launch(self, index, job):
+        detection = detect_project(job.project_dir)
+        if job.sro:
+            detection.sro = job.sro
+        if job.export_dir:
+            os.makedirs(job.export_dir, exist_ok=True)
+            detection.export_dir = job.export_dir
+        label = detection.sro or os.path.basename(job.project_dir)
+        outcome = SroOutcome(sro=detection.sro, project_dir=job.project_dir)
+
+        dlg = HeadlessDialog(
+            detection, self._include_comac_drawings, self._include_data_dictionary,
+            on_log=lambda msg, level, lbl=label: self.log_message.emit(f"[{lbl}] {msg}", level),
+            resume=self._resume,
+        )
+        runner = BatchRunner()
+        orchestrator = BatchOrchestrator(
+            dlg, runner,
+            MajWorkflow(), CapFtWorkflow(), ComacWorkflow(),
+            C6BdWorkflow(), PoliceWorkflow(), C6C3AWorkflow(),
+            None, gespot_wf=GespotWorkflow(),
+        )
+        orchestrator.drawing_cache = self._drawing_cache
+        # Couches temporaires du projet QGIS partagees entre SRO simultanes
+        orchestrator.manage_project_layers = False
+        entry = _QueuedProject(index, label, outcome, dlg, orchestrator)
+        dlg.batch_done.connect(lambda i=index: self._on_project_done(i))
+
+        modules = list(job.modules)
+        if self._only_detected:
+            found = detected_modules(detection)
+            skipped = [k for k in modules if not found.get(k, (False,))[0]]
+            modules = [k for k in modules if k not in skipped]
+            if skipped:
+                dlg.log_message(
+                    "Non detecte(s), ignore(s) : "
+                    + ', '.join(MODULE_REGISTRY.get(k, k) for k in skipped), 'warning'
+                )
+
+        recorder = OutcomeRecorder(outcome, modules)
+        runner.module_started.connect(recorder.module_started)
+        runner.module_finished.connect(recorder.module_finished)
+        runner.modules_finished.connect(recorder.modules_finished)
+
+        self._active[index] = entry
+        self.project_started.emit(job.project_dir)
+        if not modules:
+            outcome.errors.append("Aucun module applicable")
+            self._on_project_done(index)
+            return
+        dlg.start_requested.emit(modules)
+        if not dlg.running:
+            # Preflight ou qualite donnees bloquant : SRO non lance
+            self._on_project_done(index)
+            return
+
+        def _on_timeout():
+            dlg.log_message(f"Delai depasse ({self._timeout_s:.0f}s), annulation", 'error')
+            outcome.errors.append("Delai depasse")
+            dlg.cancel_requested.emit()
+            self._on_project_done(index)
+
+        entry.timer = QTimer(self)
+        entry.timer.setSingleShot(True)
+        entry.timer.timeout.connect(_on_timeout)
+        entry.timer.start(int(self._timeout_s * 1000))
+
+    def _on_project_done(self, index):
+        entry = self._active.pop(index, None)
+        if entry is None:
+            return
+        if entry.timer is not None:
+            entry.timer.stop()
+        outcome = entry.outcome
+        outcome.duration_s = round(time.perf_counter() - entry.t0, 1)
+        outcome.reports = list(entry.dlg.reports)
+        if not outcome.started and not outcome.errors:
+            outcome.errors = list(entry.dlg.errors) or ["Batch non lance"]
+        self._outcomes[index] = outcome
+        self._retired.append(entry)
+        level = {'OK': 'success', 'ERREURS': 'warning'}.get(outcome.status, 'error')
+        self.log_message.emit(
+            f"[{entry.label}] {outcome.status} ({outcome.duration_s:.0f}s)", level
+        )
+        self.project_finished.emit(outcome)
+        # Relance differee : ne pas demarrer un SRO depuis les signaux du precedent
+        QTimer.singleShot(0, self._fill)
+
+    def _finish(self):
+        self._running = False
+        outcomes = [o for o in self._outcomes if o is not None]
+        self._retired = []
+        self._drawing_cache = None
+        self.queue_finished.emit(outcomes)
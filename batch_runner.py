@@ -95,11 +95,14 @@ class BatchRunner(QObject):
         """
         self._launchers[module_key] = launcher_fn
 
-    def start(self, module_keys: list):
+    def start(self, module_keys: list, reused=None):
         """Start batch execution respecting DAG dependencies.
 
         Args:
             module_keys: List of module keys to execute (order irrelevant, DAG governs).
+            reused: Keys whose previous result is reused (inputs unchanged or
+                restored from a checkpoint):
+                recorded as done without launching, dependencies satisfied.
         """
         if self._running:
             return
@@ -108,19 +111,24 @@ class BatchRunner(QObject):
         if not valid_keys:
             self.log_message.emit("Aucun module valide selectionne.", 'warning')
             return
+        reused_keys = [k for k in valid_keys if k in set(reused or ())]
 
-        self._results = {}
+        self._results = {
+            k: {'success': True, 'message': 'resultat reutilise', 'reused': True}
+            for k in reused_keys
+        }
         self._running = True
         self._cancelled = False
         self._sequential_done = False
         self._group_index = 0
         self._active_group_keys = set()
         self._background_active = set()
-        self._launch_position = 0
+        self._launch_position = len(reused_keys)
 
-        background, sequential = self._split_background(valid_keys)
+        to_run = [k for k in valid_keys if k not in reused_keys]
+        background, sequential = self._split_background(to_run)
         try:
-            self._plan = self._compute_plan(sequential, set(valid_keys))
+            self._plan = self._compute_plan(sequential, set(valid_keys), set(reused_keys))
         except RuntimeError as exc:
             self._running = False
             self.log_message.emit(f"Plan batch invalide : {exc}", 'error')
@@ -131,7 +139,12 @@ class BatchRunner(QObject):
         self.log_message.emit(
             f"Lancement de {self._total_modules} module(s) : {names}", 'info'
         )
-        self.batch_progress.emit(0)
+        for key in reused_keys:
+            self.log_message.emit(
+                f"{MODULE_REGISTRY.get(key, key)} : resultat precedent reutilise, non relance",
+                'info'
+            )
+        self._update_progress()
 
         for key in background:
             QTimer.singleShot(100, lambda k=key: self._launch_single(k))
@@ -159,16 +172,16 @@ class BatchRunner(QObject):
         seq = [k for k in keys if not MODULE_DAG.get(k, {}).get('background')]
         return bg, seq
 
-    def _compute_plan(self, sequential_keys, all_selected):
+    def _compute_plan(self, sequential_keys, all_selected, done=None):
         """Group sequential_keys by DAG group number.
 
         Returns list of lists: [[group0_keys], [group1_keys], ...].
         Empty groups are skipped. Dependencies on non-selected modules
-        are auto-satisfied.
+        are auto-satisfied, as are those already in done (reused results).
         """
         selected = set(all_selected)
         remaining = set(sequential_keys)
-        done = set()
+        done = set(done or ())
         plan = []
 
         while remaining:
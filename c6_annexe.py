@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+Lecture de l'Annexe C6 (Police C6) : câbles en gras par appui.
+
+La feuille est lue en flux par xlsx_stream (pas de chargement openpyxl
+complet) ; le gras n'est résolu que pour la cellule du nom de câble.
+Les lignes et valeurs vues sont celles d'openpyxl.load_workbook(data_only=True) :
+lignes complétées jusqu'à la dernière colonne de la feuille pour la
+recherche des en-têtes, cellules fusionnées hors ancre vides.
+
+Module pur Python.
+"""
+
+import re
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from .core_utils import normalize_appui_num
+    from .xlsx_stream import XlsxReader, XlsxSheet
+except ImportError:
+    from core_utils import normalize_appui_num
+    from xlsx_stream import XlsxReader, XlsxSheet
+
+# Onglets essayés dans l'ordre, sinon feuille active
+SHEET_NAMES = ['Export 1', 'export 1', 'Appui', 'APPUI', 'appui', 'Appuis']
+# La ligne d'en-têtes est cherchée dans les premières lignes (métadonnées au-dessus)
+HEADER_SCAN_ROWS = 15
+
+APPUI_CANDIDATES = [
+    'n° appui', 'n°appui', 'num_appui', 'numero_appui',
+    'numappui', 'pt_ad_numsu', 'num appui'
+]
+CABLE_CANDIDATES = [
+    'nom du câble', 'nom du cable', 'nom_cable', 'nomcable',
+    'nom_du_cable', 'nom_du_câble', 'cable', 'câble'
+]
+EFFORT_CANDIDATES = [
+    'effort disponible avant ajout câble',
+    'effort disponible avant ajout cable',
+    'effort disponible avant ajout',
+    'effort dispo avant ajout',
+    'effort disponible'
+]
+BOITIER_CANDIDATES = [
+    "pose d'un boitier optique", "pose d'un boîtier optique",
+    "pose d'un boitier", "pose d'un boîtier",
+    'pose boitier optique', 'pose boîtier optique',
+    'pose boitier', 'pose boîtier',
+    'pose_boitier', 'pose_boîtier'
+]
+
+_RE_CABLE = re.compile(r'^L\d', re.IGNORECASE)
+
+
+def _normalize(s: str) -> str:
+    """Supprime accents et caractères spéciaux pour comparaison."""
+    s = unicodedata.normalize('NFD', s)
+    s = ''.join(c for c in s if unicodedata.category(c) != 'Mn')
+    return s.lower().strip()
+
+
+def find_column_index(headers: List[str], candidates: List[str]) -> int:
+    """Trouve l'index d'une colonne parmi plusieurs noms possibles."""
+    normalized = [_normalize(h) for h in headers]
+    for candidate in candidates:
+        c_norm = _normalize(candidate)
+        for idx, h_norm in enumerate(normalized):
+            if c_norm in h_norm or h_norm in c_norm:
+                return idx
+    return -1
+
+
+def _padded(values: list, width: int) -> list:
+    return values + [None] * (width - len(values)) if len(values) < width else values
+
+
+def _detect_header(head: Dict[int, list], width: int) -> Optional[Tuple[int, int, int, int, int]]:
+    """(ligne, col appui, col câble, col effort, col boîtier) ou None."""
+    for row_idx in range(1, HEADER_SCAN_ROWS + 1):
+        row_headers = [str(cell or '').strip().lower()
+                       for cell in _padded(head.get(row_idx, []), width)]
+        test_appui = find_column_index(row_headers, APPUI_CANDIDATES)
+        test_cable = find_column_index(row_headers, CABLE_CANDIDATES)
+        # Ligne d'en-têtes : les 2 colonnes trouvées, sur des colonnes différentes
+        if test_appui >= 0 and test_cable >= 0 and test_appui != test_cable:
+            return (row_idx, test_appui, test_cable,
+                    find_column_index(row_headers, EFFORT_CANDIDATES),
+                    find_column_index(row_headers, BOITIER_CANDIDATES))
+    return None
+
+
+def _empty_result() -> Dict:
+    return {'donnees_par_appui': {}, 'liste_brute': [], 'boitier_par_appui': {}, 'erreur': ''}
+
+
+def _read_sheet(book: XlsxReader, sheet: XlsxSheet,
+                width: Optional[int] = None) -> Tuple[Optional[Dict], int]:
+    """Un passage sur la feuille.
+
+    La largeur de la feuille (colonnes complétées des lignes d'en-têtes)
+    n'est connue qu'en fin de flux : la détection est faite avec la largeur
+    déclarée, puis vérifiée. Retourne (None, largeur) si elle change le
+    résultat et qu'un second passage est nécessaire.
+    """
+    rows = sheet.rows(merged_as_empty=True)
+    head, styles_head, pending = {}, {}, []
+    for row in rows:
+        if row[0] > HEADER_SCAN_ROWS:
+            pending.append(row)
+            break
+        head[row[0]], styles_head[row[0]] = row[1], row[2]
+    guess = width or max(sheet.declared_max_column, sheet.max_column, 1)
+    header = _detect_header(head, guess)
+
+    result = _empty_result()
+    if header is not None:
+        _read_rows(book, header, result,
+                   [(idx, head[idx], styles_head[idx]) for idx in sorted(head) if idx > header[0]],
+                   pending, rows)
+    else:
+        for _row in rows:
+            pass
+
+    final = max(sheet.max_column, 1)
+    if width is None and final != guess and _detect_header(head, final) != header:
+        return None, final
+    if header is None:
+        debug_rows = [f"  Row{idx}: {[str(c or '')[:30] for c in _padded(head.get(idx, []), final)[:5]]}"
+                      for idx in range(1, 6)]
+        result['erreur'] = "En-têtes C6 non trouvées. Premières lignes:\n" + "\n".join(debug_rows)
+    return result, final
+
+
+def _read_rows(book: XlsxReader, header: Tuple[int, int, int, int, int],
+               result: Dict, *row_sources) -> None:
+    _row_idx, col_num_appui, col_nom_cable, col_effort_dispo, col_pose_boitier = header
+    donnees_par_appui = result['donnees_par_appui']
+    liste_brute = result['liste_brute']
+    boitier_par_appui = result['boitier_par_appui']
+    current_appui = None
+    appuis_edf = set()
+
+    for source in row_sources:
+        for row_idx, values, styles in source:
+            if all(v is None for v in values):
+                continue
+            size = len(values)
+            raw_num = str(values[col_num_appui] or '').strip() if col_num_appui < size else ''
+            nom_cable = ''
+            cable_is_bold = False
+            if col_nom_cable < size:
+                nom_cable = str(values[col_nom_cable] or '').strip()
+                cable_is_bold = bool(nom_cable) and book.is_bold(styles[col_nom_cable])
+
+            # Appui EDF : colonne "Effort disponible avant ajout câble" vide
+            effort_val = None
+            if 0 <= col_effort_dispo < size:
+                effort_val = values[col_effort_dispo]
+
+            # Pose boîtier (PB ou PEO)
+            boitier_val = ''
+            if 0 <= col_pose_boitier < size:
+                bv = str(values[col_pose_boitier] or '').strip().upper()
+                if bv in ('PB', 'PEO'):
+                    boitier_val = bv
+
+            if raw_num:
+                current_appui = normalize_appui_num(raw_num)
+                if current_appui not in donnees_par_appui:
+                    donnees_par_appui[current_appui] = []
+                # Appui EDF = effort disponible non renseigné, Orange = renseigné
+                if col_effort_dispo >= 0 and (effort_val is None or str(effort_val).strip() == ''):
+                    appuis_edf.add(current_appui)
+                if boitier_val and current_appui not in boitier_par_appui:
+                    boitier_par_appui[current_appui] = boitier_val
+
+            if current_appui and nom_cable:
+                is_cable = bool(_RE_CABLE.match(nom_cable))
+                if is_cable and cable_is_bold:
+                    donnees_par_appui[current_appui].append(nom_cable)
+                liste_brute.append({
+                    'ligne': row_idx,
+                    'num_appui': raw_num or current_appui,
+                    'num_appui_norm': current_appui,
+                    'nom_cable': nom_cable,
+                    'is_cable': is_cable,
+                    'is_bold': cable_is_bold,
+                    'is_edf': current_appui in appuis_edf,
+                })
+
+    # Exclure les appuis EDF (sans effort disponible)
+    for appui_edf in appuis_edf:
+        donnees_par_appui.pop(appui_edf, None)
+
+
+def lire_feuille_annexe(chemin: str) -> Dict:
+    """Câbles par appui d'une Annexe C6.
+
+    Un appui peut occuper plusieurs lignes (une par câble), la colonne
+    N° appui étant vide sur les lignes de continuation.
+
+    Returns:
+        dict: donnees_par_appui {num: [câbles en gras]}, liste_brute (une
+        entrée par ligne câble), boitier_par_appui {num: 'PB'/'PEO'},
+        erreur ('' si lecture OK)
+    """
+    try:
+        with XlsxReader(chemin) as book:
+            name = next((n for n in SHEET_NAMES if n in book.sheetnames), book.active)
+            result, width = _read_sheet(book, book.sheet(name))
+            if result is None:
+                result, _ = _read_sheet(book, book.sheet(name), width)
+            return result
+    except Exception as e:
+        result = _empty_result()
+        result['erreur'] = f"Erreur lecture C6: {e}"
+        return result
@@ -12,6 +12,8 @@ from qgis.core import (
 )
 
 from .db_connection import CableSegment
+from .cable_index import CablePoleIndex
+from .appuis_snapshot import AppuiRecord, AppuisSnapshot
 from .compat import MSG_INFO, MSG_WARNING
 
 
@@ -25,6 +27,20 @@ def _safe_attr_text(feature, idx):
     return '' if not text or text.upper() == 'NULL' else text
 
 
+def _appui_point(geom) -> Optional[QgsPointXY]:
+    """Point d'un appui (QgsPointXY ou QgsGeometry ponctuelle)."""
+    if geom is None:
+        return None
+    if isinstance(geom, QgsPointXY):
+        return geom
+    if geom.isNull() or geom.isEmpty():
+        return None
+    if geom.isMultipart():
+        points = geom.asMultiPoint()
+        return points[0] if points else None
+    return geom.asPoint()
+
+
 @dataclass
 class AppuiChargeResult:
     """Résultat de l'analyse de charge pour un appui"""
@@ -85,17 +101,45 @@ class CableAnalyzer:
         Returns:
             Dict[num_appui, AppuiChargeResult]
         """
-        self.resultats = {}
+        index = self.creer_index(appuis, only_aerien)
+        index.add_chunk(cables_decoupes)
+        return self.analyser_charge_index(appuis, index)
+
+    def creer_index(self, appuis: List[Dict], only_aerien: bool = True) -> CablePoleIndex:
+        """
+        Index câbles -> appuis vide, alimenté lot par lot (iter_fddcpi2).
         
-        # Filtrer câbles aériens + façade si demandé
-        if only_aerien:
-            cables = [c for c in cables_decoupes if c.posemode in (1, 2)]
-        else:
-            cables = cables_decoupes
+        Args:
+            appuis: Liste de dicts avec 'num_appui' et 'geom'
+            only_aerien: Si True, n'indexe que les câbles aériens/façade
+        """
+        poles = {}
+        for appui in appuis:
+            num_appui = str(appui.get('num_appui', ''))
+            point = _appui_point(appui.get('geom'))
+            if num_appui and point is not None:
+                poles[num_appui] = (point.x(), point.y())
+        return CablePoleIndex(poles, self.tolerance, (1, 2) if only_aerien else None)
+
+    def analyser_charge_index(
+        self,
+        appuis: List[Dict],
+        index: CablePoleIndex
+    ) -> Dict[str, AppuiChargeResult]:
+        """
+        Résultats par appui depuis un index câbles -> appuis complet.
+        
+        Args:
+            appuis: Liste de dicts avec 'num_appui' et 'geom'
+            index: Index construit par creer_index() puis add_chunk()
+        
+        Returns:
+            Dict[num_appui, AppuiChargeResult]
+        """
+        self.resultats = {}
         
         QgsMessageLog.logMessage(
-            f"Analyse charge: {len(appuis)} appuis, {len(cables)} câbles "
-            f"({'aériens/façade' if only_aerien else 'tous'})",
+            f"Analyse charge: {len(appuis)} appuis, {index.nb_indexed}/{index.nb_cables} câbles indexés",
             "PoleAerien", MSG_INFO
         )
         
@@ -110,8 +154,7 @@ class CableAnalyzer:
             if isinstance(geom, QgsPointXY):
                 geom = QgsGeometry.fromPointXY(geom)
             
-            # Trouver les câbles qui touchent cet appui
-            cables_touchant = self._find_cables_touching_appui(geom, cables)
+            cables_touchant = index.cables_for(num_appui)
             
             # Calculer les stats
             result = AppuiChargeResult(
@@ -119,46 +162,13 @@ class CableAnalyzer:
                 geom=geom,
                 nb_cables_bdd=len(cables_touchant),
                 capacite_totale_bdd=sum(c.cab_capa for c in cables_touchant),
-                cables_details=cables_touchant
+                cables_details=list(cables_touchant)
             )
             
             self.resultats[num_appui] = result
         
         return self.resultats
     
-    def _find_cables_touching_appui(
-        self,
-        appui_geom: QgsGeometry,
-        cables: List[CableSegment]
-    ) -> List[CableSegment]:
-        """
-        Trouve tous les câbles dont une extrémité touche l'appui.
-        """
-        touching = []
-        appui_point = appui_geom.asPoint()
-        
-        for cable in cables:
-            # Parser la géométrie WKT du câble
-            cable_geom = QgsGeometry.fromWkt(cable.geom_wkt)
-            if not cable_geom or cable_geom.isEmpty():
-                continue
-            
-            # Vérifier les extrémités
-            if cable_geom.type() == 1:  # LineString
-                line = cable_geom.asPolyline()
-                if len(line) >= 2:
-                    start_point = line[0]
-                    end_point = line[-1]
-                    
-                    # Distance aux extrémités
-                    dist_start = appui_point.distance(start_point)
-                    dist_end = appui_point.distance(end_point)
-                    
-                    if dist_start <= self.tolerance or dist_end <= self.tolerance:
-                        touching.append(cable)
-        
-        return touching
-    
     def enrichir_avec_c6(
         self,
         donnees_c6: Dict[str, str]
@@ -280,6 +290,20 @@ class CableAnalyzer:
         }
 
 
+def _num_appui_field(layer: QgsVectorLayer, field_num_appui: str) -> Optional[str]:
+    """Champ numero d'appui de la couche (premier candidat present), ou None."""
+    field_names = [f.name() for f in layer.fields()]
+    for candidate in [field_num_appui, 'inf_num', 'INF_NUM', 'num_appui', 'NUM_APPUI', 'pt_ad_numsu', 'PT_AD_NUMSU']:
+        if candidate in field_names:
+            return candidate
+    QgsMessageLog.logMessage(
+        f"Champ numéro d'appui non trouvé dans {layer.name()}. "
+        f"Champs disponibles: {field_names[:10]}...",
+        "PoleAerien", MSG_WARNING
+    )
+    return None
+
+
 def extraire_appuis_from_layer(layer: QgsVectorLayer, field_num_appui: str = 'num_appui',
                                keep_commune: bool = False) -> List[Dict]:
     """
@@ -298,21 +322,8 @@ def extraire_appuis_from_layer(layer: QgsVectorLayer, field_num_appui: str = 'nu
     if not layer or not layer.isValid():
         return appuis
     
-    # Chercher le bon nom de champ
-    field_names = [f.name() for f in layer.fields()]
-    actual_field = None
-    
-    for candidate in [field_num_appui, 'inf_num', 'INF_NUM', 'num_appui', 'NUM_APPUI', 'pt_ad_numsu', 'PT_AD_NUMSU']:
-        if candidate in field_names:
-            actual_field = candidate
-            break
-    
+    actual_field = _num_appui_field(layer, field_num_appui)
     if not actual_field:
-        QgsMessageLog.logMessage(
-            f"Champ numéro d'appui non trouvé dans {layer.name()}. "
-            f"Champs disponibles: {field_names[:10]}...",
-            "PoleAerien", MSG_WARNING
-        )
         return appuis
     
     from .core_utils import normalize_appui_num
@@ -340,11 +351,65 @@ def extraire_appuis_from_layer(layer: QgsVectorLayer, field_num_appui: str = 'nu
     return appuis
 
 
+def extraire_appuis_snapshot(layer: QgsVectorLayer,
+                             field_num_appui: str = 'num_appui') -> AppuisSnapshot:
+    """Lit les appuis de la couche en un seul parcours (numeros bruts, WKB, x/y).
+
+    Les deux variantes de numerotation (avec / sans /commune) sont des vues
+    du snapshot : un seul parcours de couche et une seule serialisation WKB
+    pour COMAC et Police C6.
+
+    Args:
+        layer: Couche de points (poteaux)
+        field_num_appui: Nom du champ contenant le numero d'appui
+
+    Returns:
+        AppuisSnapshot (thread-safe : bytes WKB, aucune QgsGeometry)
+    """
+    if not layer or not layer.isValid():
+        return AppuisSnapshot([])
+    actual_field = _num_appui_field(layer, field_num_appui)
+    if not actual_field:
+        return AppuisSnapshot([], layer.id())
+
+    fields = layer.fields()
+    idx_num = fields.indexFromName(actual_field)
+    idx_inf_num = fields.indexFromName('inf_num')
+    idx_inf_type = fields.indexFromName('inf_type')
+    idx_etat = fields.indexFromName('etat')
+    idx_noe_codext = fields.indexFromName('noe_codext')
+
+    records = []
+    for feature in layer.getFeatures():
+        num_appui = feature[idx_num]
+        if not num_appui:
+            continue
+        geom = feature.geometry()
+        geom_wkb = x = y = None
+        if geom and not geom.isNull():
+            geom_wkb = geom.asWkb().data()
+            point = geom.centroid().asPoint() if geom.isMultipart() else geom.asPoint()
+            x, y = point.x(), point.y()
+        records.append(AppuiRecord(
+            num_appui,
+            inf_num=_safe_attr_text(feature, idx_inf_num),
+            feature_id=feature.id(),
+            geom_wkb=geom_wkb,
+            x=x,
+            y=y,
+            inf_type=_safe_attr_text(feature, idx_inf_type),
+            etat=_safe_attr_text(feature, idx_etat),
+            noe_codext=_safe_attr_text(feature, idx_noe_codext),
+        ))
+    return AppuisSnapshot(records, layer.id())
+
+
 def extraire_appuis_wkb(layer: QgsVectorLayer, field_num_appui: str = 'num_appui',
                         keep_commune: bool = False) -> List[Dict]:
     """Extrait appuis depuis couche QGIS et serialise geometries en WKB.
     
-    Combine extraire_appuis_from_layer() + WKB serialization en un seul appel.
+    Vue d'un extraire_appuis_snapshot() : pour les deux variantes, construire
+    le snapshot une fois et appeler snapshot.view(keep_commune).
     Le resultat est thread-safe (pas de QgsGeometry, juste des bytes WKB).
     
     Args:
@@ -355,20 +420,7 @@ def extraire_appuis_wkb(layer: QgsVectorLayer, field_num_appui: str = 'num_appui
     Returns:
         Liste de dicts {'num_appui': str, 'feature_id': int, 'geom_wkb': bytes|None}
     """
-    raw_appuis = extraire_appuis_from_layer(layer, field_num_appui, keep_commune=keep_commune)
-    appuis_wkb = []
-    for appui in raw_appuis:
-        geom = appui.get('geom')
-        appuis_wkb.append({
-            'num_appui': appui.get('num_appui', ''),
-            'inf_num': appui.get('inf_num', ''),
-            'feature_id': appui.get('feature_id'),
-            'geom_wkb': geom.asWkb().data() if geom and not geom.isNull() else None,
-            'inf_type': appui.get('inf_type', ''),
-            'etat': appui.get('etat', ''),
-            'noe_codext': appui.get('noe_codext', ''),
-        })
-    return appuis_wkb
+    return extraire_appuis_snapshot(layer, field_num_appui).view(keep_commune)
 
 
 def _parse_attaches_geoms(attaches_raw: List[Dict]) -> List[Dict]:
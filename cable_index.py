@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Lecture par lots des curseurs serveur et index cables -> appuis incremental.
+
+fddcpi2 est lu en streaming (DatabaseConnection.iter_fddcpi2) : chaque lot
+est indexe des son arrivee, sans attendre la liste complete des segments.
+L'index rattache un segment aux appuis proches de ses extremites (segments
+decoupes aux appuis) via une grille de cellules de la taille de la tolerance.
+
+Module pur Python (aucune dependance QGIS) : les extremites sont lues
+directement dans le WKT (ST_AsText) des segments.
+"""
+
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+Point = Tuple[float, float]
+
+
+def fetch_chunks(cursor, itersize: int, convert: Callable) -> Iterator[List]:
+    """Lots de itersize lignes converties (fetchmany) jusqu'a epuisement du curseur."""
+    while True:
+        rows = cursor.fetchmany(itersize)
+        if not rows:
+            return
+        yield [convert(row) for row in rows]
+
+
+def _parse_point(text: str) -> Point:
+    coords = text.split()
+    return float(coords[0]), float(coords[1])
+
+
+def wkt_endpoints(wkt: str) -> Optional[Tuple[Point, Point]]:
+    """Extremites (debut, fin) d'un LINESTRING ou de la 1re partie d'un MULTILINESTRING."""
+    if not wkt:
+        return None
+    start = wkt.find('(')
+    if start < 0:
+        return None
+    body = wkt[start:].lstrip('( ')
+    end = body.find(')')
+    if end < 0:
+        return None
+    points = body[:end].split(',')
+    if len(points) < 2:
+        return None
+    try:
+        return _parse_point(points[0]), _parse_point(points[-1])
+    except (ValueError, IndexError):
+        return None
+
+
+class CablePoleIndex:
+    """Index cables -> appuis construit lot par lot.
+
+    Un segment est rattache a un appui si l'une de ses extremites est a
+    moins de tolerance de l'appui (meme regle que le comptage fddcpi2).
+    Seuls les segments de pose aerienne/facade sont indexes par defaut.
+    """
+
+    def __init__(self, poles: Dict[str, Point], tolerance: float = 0.5,
+                 posemodes: Optional[Iterable[int]] = (1, 2)):
+        self.tolerance = tolerance
+        self.posemodes = set(posemodes) if posemodes is not None else None
+        self._cell = max(float(tolerance), 1.0)
+        self._poles = dict(poles)
+        self._grid: Dict[Tuple[int, int], List[str]] = {}
+        for num, (x, y) in self._poles.items():
+            self._grid.setdefault(self._key(x, y), []).append(num)
+        self._cables: Dict[str, List] = {num: [] for num in self._poles}
+        self.nb_cables = 0
+        self.nb_indexed = 0
+
+    def _key(self, x: float, y: float) -> Tuple[int, int]:
+        return int(x // self._cell), int(y // self._cell)
+
+    def _poles_near(self, point: Point) -> List[str]:
+        x, y = point
+        kx, ky = self._key(x, y)
+        tol2 = self.tolerance * self.tolerance
+        found = []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for num in self._grid.get((kx + dx, ky + dy), ()):
+                    px, py = self._poles[num]
+                    if (px - x) ** 2 + (py - y) ** 2 <= tol2:
+                        found.append(num)
+        return found
+
+    def add_chunk(self, cables: Iterable) -> None:
+        """Indexe un lot de segments (CableSegment ou equivalent)."""
+        for cable in cables:
+            self.nb_cables += 1
+            if self.posemodes is not None and getattr(cable, 'posemode', 0) not in self.posemodes:
+                continue
+            endpoints = wkt_endpoints(getattr(cable, 'geom_wkt', ''))
+            if endpoints is None:
+                continue
+            self.nb_indexed += 1
+            nums = self._poles_near(endpoints[0])
+            for num in self._poles_near(endpoints[1]):
+                if num not in nums:
+                    nums.append(num)
+            for num in nums:
+                self._cables[num].append(cable)
+
+    def cables_for(self, num_appui: str) -> List:
+        """Segments touchant l'appui, dans l'ordre de lecture."""
+        return self._cables.get(num_appui, [])
@@ -12,9 +12,11 @@ Tables: commune, cables, supports, hypothese, armements, fleche,
 
 import os
 import threading
-from dataclasses import dataclass
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
 from typing import Dict, List, Optional
-from .core_utils import safe_float, safe_int
+from .core_utils import get_profile_cache_dir, safe_float, safe_int
+from .comac_snapshot import ComacSnapshot, fingerprint_sql
 from .compat import MSG_INFO, MSG_WARNING, MSG_CRITICAL
 
 try:
@@ -96,7 +98,7 @@ _cache_hypotheses: Dict[str, HypotheseClimatique] = {}
 _cache_armements: List[str] = []
 _cache_capacites_possibles: Dict[str, List[int]] = {}  # reference -> [capacités]
 _cache_loaded: bool = False
-_cache_source: str = ""  # "postgresql" or "gpkg"
+_cache_source: str = ""  # "postgresql", "snapshot" or "gpkg"
 
 
 # =============================================================================
@@ -148,19 +150,34 @@ def _extract_fournisseur(nom: str) -> str:
     return ''
 
 
-def _get_pg_connection():
-    """Obtient une connexion PostgreSQL via la connexion partagee.
-    
-    Reutilise l'instance singleton de DatabaseConnection pour eviter
-    de multiplier les connexions au serveur PostgreSQL.
-    Verifie que le schema comac existe avant de retourner la connexion.
+@contextmanager
+def _pg_session():
+    """Connexion PostgreSQL partagee, reservee au thread courant (None si indisponible).
+
+    Reutilise l'instance singleton de DatabaseConnection sous son verrou
+    (SRO paralleles de batch_queue). En sortie la transaction de lecture
+    est terminee (rollback) ; la connexion partagee n'est pas fermee.
     """
     if not _HAS_PSYCOPG2:
-        return None
-    
+        yield None
+        return
+    from .db_connection import get_shared_connection
+    db = get_shared_connection()
+    with db.locked():
+        conn = _get_pg_connection(db)
+        try:
+            yield conn
+        finally:
+            if conn is not None:
+                try:
+                    conn.rollback()
+                except Exception:
+                    pass
+
+
+def _get_pg_connection(db):
+    """Connexion psycopg2 de db si le schema comac existe, sinon None."""
     try:
-        from .db_connection import get_shared_connection
-        db = get_shared_connection()
         if not db.connect():
             return None
         conn = db.connection
@@ -212,14 +229,11 @@ def _query_with_conn(conn, sql: str, params: tuple = ()) -> List[dict]:
 
 
 def _query_pg(sql: str, params: tuple = ()) -> List[dict]:
-    """Execute requete sur PostgreSQL (ouvre/ferme connexion)."""
-    conn = _get_pg_connection()
-    if not conn:
-        return []
-    try:
+    """Execute requete sur PostgreSQL (connexion partagee)."""
+    with _pg_session() as conn:
+        if not conn:
+            return []
         return _query_with_conn(conn, sql, params)
-    finally:
-        conn.close()
 
 
 def _query(sql_pg: str, params: tuple = ()) -> List[dict]:
@@ -354,11 +368,126 @@ def _load_capacites_possibles(conn=None) -> Dict[str, List[int]]:
     return capas
 
 
-def _ensure_loaded():
-    """Charge les données si pas encore fait - CRIT-02: Thread-safe"""
+# =============================================================================
+# SNAPSHOT LOCAL (profil QGIS) - evite le rechargement a chaque demarrage
+# =============================================================================
+
+def _get_snapshot() -> ComacSnapshot:
+    return ComacSnapshot(os.path.join(get_profile_cache_dir('comac'), 'comac_snapshot.sqlite'))
+
+
+def _server_fingerprint(conn) -> Optional[str]:
+    """Empreinte serveur des tables de reference (None si indisponible)."""
+    rows = _query_with_conn(conn, fingerprint_sql(PG_SCHEMA))
+    if not rows:
+        return None
+    return next(iter(rows[0].values()), None)
+
+
+def _snapshot_payload() -> Dict:
+    """Serialise les caches courants (noms de tables COMAC)."""
+    return {
+        'cables': {k: asdict(v) for k, v in _cache_cables.items()},
+        'supports': {k: asdict(v) for k, v in _cache_supports.items()},
+        'commune': {k: asdict(v) for k, v in _cache_communes.items()},
+        'hypothese': {k: asdict(v) for k, v in _cache_hypotheses.items()},
+        'armements': list(_cache_armements),
+        'cable_capacites_possibles': dict(_cache_capacites_possibles),
+    }
+
+
+def _apply_snapshot(payload: Dict) -> None:
+    """Restaure les caches depuis un snapshot (appele sous _cache_lock)."""
     global _cache_cables, _cache_supports, _cache_communes, _cache_hypotheses
-    global _cache_armements, _cache_capacites_possibles, _cache_loaded, _cache_source
-    
+    global _cache_armements, _cache_capacites_possibles
+    _cache_cables = {k: CableReference(**v) for k, v in payload['cables'].items()}
+    _cache_supports = {k: SupportReference(**v) for k, v in payload['supports'].items()}
+    _cache_communes = {k: CommuneInfo(**v) for k, v in payload['commune'].items()}
+    _cache_hypotheses = {k: HypotheseClimatique(**v) for k, v in payload['hypothese'].items()}
+    _cache_armements = list(payload['armements'])
+    _cache_capacites_possibles = {k: list(v) for k, v in payload['cable_capacites_possibles'].items()}
+
+
+def _log(message: str, level) -> None:
+    try:
+        from qgis.core import QgsMessageLog
+        QgsMessageLog.logMessage(message, "PoleAerien", level)
+    except Exception:
+        pass
+
+
+def _load_caches(pg_conn, snapshot: ComacSnapshot, force_live: bool) -> None:
+    """Remplit les caches depuis PostgreSQL ou le snapshot (appele sous _cache_lock)."""
+    global _cache_cables, _cache_supports, _cache_communes, _cache_hypotheses
+    global _cache_armements, _cache_capacites_possibles, _cache_source
+
+    if not pg_conn:
+        payload = None if force_live else snapshot.load()
+        if payload is not None:
+            _apply_snapshot(payload)
+            _cache_source = "snapshot"
+            _log("[COMAC_DB] PostgreSQL non disponible: snapshot local utilise "
+                 "(non verifie)", MSG_WARNING)
+        else:
+            _log("[COMAC_DB] PostgreSQL non disponible (schema comac)", MSG_WARNING)
+        return
+
+    fingerprint = _server_fingerprint(pg_conn)
+    payload = None if (force_live or not fingerprint) else snapshot.load(fingerprint)
+    if payload is not None:
+        try:
+            _apply_snapshot(payload)
+            _cache_source = "snapshot"
+            _log(f"[COMAC_DB] Snapshot local a jour: {len(_cache_cables)} cables, "
+                 f"{len(_cache_supports)} supports, {len(_cache_communes)} communes", MSG_INFO)
+            return
+        except (KeyError, TypeError) as e:
+            _log(f"[COMAC_DB] Snapshot local illisible, chargement complet: {e}", MSG_WARNING)
+
+    _cache_source = "postgresql"
+    try:
+        _cache_cables = _load_cables(pg_conn)
+        _cache_supports = _load_supports(pg_conn)
+        _cache_communes = _load_communes(pg_conn)
+        _cache_hypotheses = _load_hypotheses(pg_conn)
+        _cache_armements = _load_armements(pg_conn)
+        _cache_capacites_possibles = _load_capacites_possibles(pg_conn)
+        try:
+            from qgis.core import QgsMessageLog, Qgis
+            QgsMessageLog.logMessage(
+                f"[COMAC_DB] Charge: {len(_cache_cables)} cables, "
+                f"{len(_cache_supports)} supports, {len(_cache_communes)} communes, "
+                f"{len(_cache_armements)} armements, "
+                f"{len(_cache_capacites_possibles)} refs multi-capa",
+                "PoleAerien", MSG_INFO
+            )
+        except Exception:
+            pass
+        if fingerprint and _cache_cables:
+            try:
+                snapshot.save(fingerprint, _snapshot_payload())
+            except (OSError, TypeError, ValueError) as e:
+                _log(f"[COMAC_DB] Ecriture snapshot echouee: {e}", MSG_WARNING)
+    except Exception as e:
+        try:
+            from qgis.core import QgsMessageLog, Qgis
+            QgsMessageLog.logMessage(f"[COMAC_DB] ERR: Chargement BD echoue: {e}", "PoleAerien", MSG_CRITICAL)
+        except Exception:
+            pass
+
+
+def _ensure_loaded(force_live: bool = False):
+    """Charge les données si pas encore fait - CRIT-02: Thread-safe
+
+    Snapshot local reutilise si son empreinte correspond a celle du serveur ;
+    sinon chargement complet puis reecriture du snapshot. Sans PostgreSQL,
+    le dernier snapshot est utilise tel quel.
+
+    Args:
+        force_live: Ignorer le snapshot (reload_database)
+    """
+    global _cache_loaded
+
     if _cache_loaded:
         return
     
@@ -366,45 +495,11 @@ def _ensure_loaded():
         if _cache_loaded:
             return
         
-        # Connexion unique pour tout le chargement
-        pg_conn = _get_pg_connection()
-        if not pg_conn:
-            try:
-                from qgis.core import QgsMessageLog, Qgis
-                QgsMessageLog.logMessage("[COMAC_DB] PostgreSQL non disponible (schema comac)", "PoleAerien", MSG_WARNING)
-            except Exception:
-                pass
-            _cache_loaded = True
-            return
-        
-        _cache_source = "postgresql"
-        try:
-            _cache_cables = _load_cables(pg_conn)
-            _cache_supports = _load_supports(pg_conn)
-            _cache_communes = _load_communes(pg_conn)
-            _cache_hypotheses = _load_hypotheses(pg_conn)
-            _cache_armements = _load_armements(pg_conn)
-            _cache_capacites_possibles = _load_capacites_possibles(pg_conn)
-            try:
-                from qgis.core import QgsMessageLog, Qgis
-                QgsMessageLog.logMessage(
-                    f"[COMAC_DB] Charge: {len(_cache_cables)} cables, "
-                    f"{len(_cache_supports)} supports, {len(_cache_communes)} communes, "
-                    f"{len(_cache_armements)} armements, "
-                    f"{len(_cache_capacites_possibles)} refs multi-capa",
-                    "PoleAerien", MSG_INFO
-                )
-            except Exception:
-                pass
-        except Exception as e:
-            try:
-                from qgis.core import QgsMessageLog, Qgis
-                QgsMessageLog.logMessage(f"[COMAC_DB] ERR: Chargement BD echoue: {e}", "PoleAerien", MSG_CRITICAL)
-            except Exception:
-                pass
-        finally:
-            pg_conn.close()
-        
+        snapshot = _get_snapshot()
+
+        # Connexion partagee reservee pour tout le chargement
+        with _pg_session() as pg_conn:
+            _load_caches(pg_conn, snapshot, force_live)
         _cache_loaded = True
 
 
@@ -414,11 +509,17 @@ def reload_database():
     with _cache_lock:
         _cache_loaded = False
         _cache_source = ""
+    _ensure_loaded(force_live=True)
+
+
+def get_reference_fingerprint() -> Optional[str]:
+    """Empreinte des tables de reference chargees (snapshot local), ou None."""
     _ensure_loaded()
+    return _get_snapshot().fingerprint()
 
 
 def get_source() -> str:
-    """Retourne la source actuelle ('postgresql' ou 'gpkg' ou '')."""
+    """Retourne la source actuelle ('postgresql', 'snapshot', 'gpkg' ou '')."""
     _ensure_loaded()
     return _cache_source
 
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+Lecture brute des exports Excel COMAC, executable dans un processus de travail.
+
+Seule la lecture openpyxl (partie couteuse, liee au GIL) est faite ici :
+le filtrage des supports, les verifications securite et la resolution des
+capacites restent dans Comac.LectureFichiersExcelsComac. Module pur Python.
+"""
+
+from typing import Dict
+
+import openpyxl
+
+# Premiere ligne de donnees et nombre de colonnes lues (jusqu'a AX)
+PREMIERE_LIGNE = 4
+NB_COLONNES = 50
+
+
+def lire_feuille_comac(filepath: str) -> Dict:
+    """Premiere feuille d'un export COMAC.
+
+    Returns:
+        dict: insee (cellule I1 brute), lignes (tuples des lignes avec une
+        valeur en colonne A), erreur ('' si lecture OK)
+    """
+    try:
+        document = openpyxl.load_workbook(filepath, data_only=True, read_only=True)
+    except Exception as e:
+        return {'insee': None, 'lignes': [], 'erreur': str(e)}
+    try:
+        feuille = document.worksheets[0]
+        insee = feuille.cell(row=1, column=9).value
+        lignes = [
+            row for row in feuille.iter_rows(min_row=PREMIERE_LIGNE, min_col=1,
+                                             max_col=NB_COLONNES, values_only=True)
+            if row and row[0] not in (None, '')
+        ]
+    except Exception as e:
+        return {'insee': None, 'lignes': [], 'erreur': f"Feuille illisible : {e}"}
+    finally:
+        document.close()
+    return {'insee': insee, 'lignes': lignes, 'erreur': ''}
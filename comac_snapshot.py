@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Snapshot local (SQLite) des tables de reference COMAC.
+
+Evite le rechargement complet du schema comac a chaque demarrage de QGIS :
+le snapshot est valide par une empreinte serveur bon marche (nombre de
+lignes + max(xmin) par table, les tables comac n'ayant pas de date de
+modification). Module pur Python (sqlite3 + json), sans dependance QGIS.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Optional
+
+# Incrementer si le format des donnees serialisees change
+SNAPSHOT_VERSION = 1
+
+SNAPSHOT_TABLES = (
+    'cables', 'supports', 'commune', 'hypothese', 'armements', 'cable_capacites_possibles',
+)
+
+
+def fingerprint_sql(schema: str) -> str:
+    """Requete d'empreinte : md5 des (count, max(xmin)) de chaque table."""
+    parts = ", ".join(
+        f"(SELECT count(*) || ':' || COALESCE(max(xmin::text::bigint), 0) FROM {schema}.{table})"
+        for table in SNAPSHOT_TABLES
+    )
+    return f"SELECT md5(concat_ws('|', {parts}))"
+
+
+class ComacSnapshot:
+    """Fichier SQLite {meta, tables} : une ligne JSON par table de reference."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self, fingerprint: Optional[str] = None) -> Optional[Dict]:
+        """Retourne {table: donnees} ou None si absent, d'une autre version,
+        ou d'une autre empreinte (fingerprint None = pas de verification)."""
+        if not os.path.isfile(self.path):
+            return None
+        try:
+            with sqlite3.connect(self.path) as conn:
+                meta = dict(conn.execute("SELECT key, value FROM meta"))
+                if meta.get('version') != str(SNAPSHOT_VERSION):
+                    return None
+                if fingerprint is not None and meta.get('fingerprint') != fingerprint:
+                    return None
+                payload = {
+                    name: json.loads(data)
+                    for name, data in conn.execute("SELECT name, payload FROM tables")
+                }
+        except (sqlite3.Error, ValueError):
+            return None
+        if set(payload) != set(SNAPSHOT_TABLES):
+            return None
+        return payload
+
+    def fingerprint(self) -> Optional[str]:
+        """Empreinte enregistree, ou None."""
+        try:
+            with sqlite3.connect(self.path) as conn:
+                row = conn.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+        except sqlite3.Error:
+            return None
+        return row[0] if row else None
+
+    def save(self, fingerprint: str, payload: Dict) -> None:
+        """Ecrit le snapshot de facon atomique (fichier temporaire + os.replace)."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            conn = sqlite3.connect(tmp_path)
+            try:
+                conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+                conn.execute("CREATE TABLE tables (name TEXT PRIMARY KEY, payload TEXT)")
+                conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+                    ('version', str(SNAPSHOT_VERSION)),
+                    ('fingerprint', fingerprint),
+                ])
+                conn.executemany("INSERT INTO tables VALUES (?, ?)", [
+                    (name, json.dumps(payload[name], ensure_ascii=False))
+                    for name in SNAPSHOT_TABLES
+                ])
+                conn.commit()
+            finally:
+                conn.close()
+            os.replace(tmp_path, self.path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
@@ -64,7 +64,7 @@ PAL_HIGHLIGHT = QPalette.ColorRole.Highlight
 # ---------------------------------------------------------------------------
 # QFrame shapes / shadows
 # ---------------------------------------------------------------------------
-from qgis.PyQt.QtWidgets import QFrame, QDialogButtonBox
+from qgis.PyQt.QtWidgets import QFrame, QDialogButtonBox, QMessageBox
 
 FRAME_HLINE = QFrame.Shape.HLine
 FRAME_SUNKEN = QFrame.Shadow.Sunken
@@ -72,6 +72,9 @@ FRAME_SUNKEN = QFrame.Shadow.Sunken
 BTN_OK = QDialogButtonBox.StandardButton.Ok
 BTN_CANCEL = QDialogButtonBox.StandardButton.Cancel
 
+MSGBOX_YES = QMessageBox.StandardButton.Yes
+MSGBOX_NO = QMessageBox.StandardButton.No
+
 # ---------------------------------------------------------------------------
 # Qgis.MessageLevel (forme longue QGIS >= 3.36, fallback forme courte)
 # ---------------------------------------------------------------------------
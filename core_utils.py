@@ -289,3 +289,33 @@ def match_poles_spatial(coords_a, coords_b, tolerance=_SPATIAL_TOLERANCE_DEFAULT
 
     matches.sort(key=lambda m: m[2])
     return matches
+
+
+# =============================================================================
+# CACHE DISQUE (profil utilisateur QGIS)
+# =============================================================================
+
+def get_profile_cache_dir(*parts) -> str:
+    """Retourne (et cree) un repertoire de cache persistant sous le profil QGIS.
+
+    Hors QGIS (tests, scripts), le cache est place a cote du plugin, comme
+    le fichier de mesures de perf_logger.
+
+    Args:
+        *parts: Sous-dossiers (ex: 'drawings')
+
+    Returns:
+        Chemin absolu du repertoire (cree si absent)
+    """
+    import os
+    try:
+        from qgis.core import QgsApplication
+        base_dir = os.path.dirname(QgsApplication.qgisUserDatabaseFilePath())
+    except Exception:
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+    path = os.path.join(base_dir, "PoleAerien_cache", *parts)
+    try:
+        os.makedirs(path, exist_ok=True)
+    except OSError:
+        pass
+    return path
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Lecture colonnaire des CSV GraceTHD (t_ptech, t_cable, t_ebp...).
+
+Le fichier est lu une seule fois en memoire ; l'encodage est detecte sur un
+echantillon du debut du fichier (utf-8, sinon latin-1) puis le contenu est
+decode une fois. Seules les colonnes demandees sont conservees, en listes
+de chaines, et les index de cles sont construits pendant le meme parcours.
+
+Valeurs identiques a csv.DictReader : chaines brutes (non nettoyees), None
+pour une colonne manquante en fin de ligne courte, lignes vides ignorees.
+Module pur Python.
+"""
+
+import csv
+import io
+from typing import Dict, Iterable, List, Optional
+
+# Taille de l'echantillon utilise pour detecter l'encodage
+SAMPLE_SIZE = 64 * 1024
+
+
+class CsvTable:
+    """Colonnes demandees d'un CSV {nom: [valeurs]} et index {champ: {cle: ligne}}."""
+
+    def __init__(self, columns: Dict[str, list], n_rows: int,
+                 indexes: Optional[Dict[str, Dict[str, int]]] = None,
+                 encoding: str = ''):
+        self._columns = columns
+        self._n_rows = n_rows
+        self._indexes = indexes or {}
+        self.encoding = encoding
+
+    def __len__(self) -> int:
+        return self._n_rows
+
+    @property
+    def fields(self) -> List[str]:
+        return list(self._columns)
+
+    def has_field(self, name: str) -> bool:
+        return name in self._columns
+
+    def column(self, name: str, default: str = '') -> list:
+        """Valeurs d'une colonne (default sur toutes les lignes si absente)."""
+        values = self._columns.get(name)
+        return values if values is not None else [default] * self._n_rows
+
+    def get(self, idx: int, name: str, default: str = ''):
+        """Equivalent de row.get(name, default) sur une ligne DictReader."""
+        values = self._columns.get(name)
+        return default if values is None else values[idx]
+
+    def index(self, name: str) -> Dict[str, int]:
+        """Index {valeur nettoyee: derniere ligne} construit a la lecture."""
+        return self._indexes.get(name, {})
+
+
+def detect_encoding(data: bytes, sample_size: int = SAMPLE_SIZE) -> str:
+    """'utf-8' si l'echantillon de debut se decode en utf-8, sinon 'latin-1'."""
+    sample = data[:sample_size]
+    try:
+        sample.decode('utf-8')
+    except UnicodeDecodeError as e:
+        # Caractere multi-octets coupe par la fin de l'echantillon
+        truncated = e.end == len(sample) and len(data) > len(sample)
+        return 'utf-8' if truncated and e.reason == 'unexpected end of data' else 'latin-1'
+    return 'utf-8'
+
+
+def read_csv_table(path: str, field_names: Optional[Iterable[str]] = None,
+                   index_fields: Iterable[str] = (), delimiter: str = ';',
+                   sample_size: int = SAMPLE_SIZE) -> CsvTable:
+    """CSV complet en colonnes (toutes si field_names est None).
+
+    index_fields : colonnes indexees pendant la lecture (cle nettoyee non vide
+    -> derniere ligne), sans seconde passe sur la table.
+    """
+    with open(path, 'rb') as handle:
+        data = handle.read()
+    encoding = detect_encoding(data, sample_size)
+    try:
+        text = data.decode(encoding)
+    except UnicodeDecodeError:
+        # Octet non utf-8 apres l'echantillon : latin-1 accepte toutes les valeurs
+        encoding = 'latin-1'
+        text = data.decode(encoding)
+    del data
+
+    reader = csv.reader(io.StringIO(text, newline=None), delimiter=delimiter)
+    header = next(reader, [])
+    positions = {name: pos for pos, name in enumerate(header)}
+    wanted = list(positions) if field_names is None else [n for n in field_names if n in positions]
+    index_fields = [n for n in index_fields if n in positions]
+
+    columns = {name: [] for name in wanted}
+    indexes = {name: {} for name in index_fields}
+    targets = [(columns[name].append, positions[name]) for name in wanted]
+    index_targets = [(indexes[name], positions[name]) for name in index_fields]
+
+    n_rows = 0
+    for row in reader:
+        if not row:
+            continue
+        size = len(row)
+        for append, pos in targets:
+            append(row[pos] if pos < size else None)
+        for index, pos in index_targets:
+            if pos < size:
+                key = row[pos].strip()
+                if key:
+                    index[key] = n_rows
+        n_rows += 1
+    return CsvTable(columns, n_rows, indexes, encoding)
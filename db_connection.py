@@ -3,19 +3,47 @@ Module de connexion PostgreSQL pour Police C6 v2.0
 Connexion automatique via les credentials QGIS existants
 """
 
+import functools
+import itertools
 import psycopg2
+import threading
 import time
 from psycopg2 import sql
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from typing import Callable, Iterator, List, Optional, Tuple
 from qgis.core import QgsSettings, QgsMessageLog, Qgis, QgsDataSourceUri
 from .compat import MSG_INFO, MSG_WARNING, MSG_CRITICAL
+from .cable_index import fetch_chunks
 
 
 # Configuration cible
 TARGET_HOST = "10.241.228.107"
 TARGET_DATABASE = "auvergne"  # Nom en minuscule pour comparaison
 
+# Lecture fddcpi2 en streaming : lignes par aller-retour du curseur serveur
+FDDCPI2_ITERSIZE = 2000
+
+# Suffixe des curseurs serveur nommes (uniques sur la connexion)
+_CURSOR_IDS = itertools.count(1)
+
+
+def _serialized(method):
+    """Acces exclusif a la connexion : les SRO paralleles (batch_queue) la partagent."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+# Colonnes dans l'ordre de fddcpi2 ; geom brute non transferee (seul le WKT est utilise)
+_FDDCPI2_SELECT = (
+    'SELECT gid_dc2, gid_dc, gid, sro, nro, length, cab_type, cab_capa, cab_modulo, '
+    'isole, date_modif, modif_par, NULL AS geom, cab_nature, commentaire, collecte, '
+    'cb_etiquet, fon, projet, "DCE", dist_type, affectation, posemode, '
+    'ST_AsText(geom) AS geom_wkt FROM rip_avg_nge.{}(%s)'
+)
+
 
 @dataclass
 class CableSegment:
@@ -49,6 +77,10 @@ class DatabaseConnection:
     """
     Gère la connexion à la base PostgreSQL RIP AVG NGE.
     Récupère automatiquement les credentials depuis QGIS.
+
+    Une seule connexion psycopg2, partagee par les threads : chaque requete
+    (et toute la lecture d'un iter_fddcpi2) s'execute sous un verrou, pour
+    qu'un commit/rollback d'un SRO ne ferme pas le curseur d'un autre.
     """
     
     _RETRY_DELAYS = (1.0, 2.0)
@@ -63,6 +95,12 @@ class DatabaseConnection:
         self.password = None
         self._connection_name = None
         self._circuit_open_until = 0.0
+        self._fddcpi2_cached = None  # None = non verifie sur cette connexion
+        self._lock = threading.RLock()
+
+    def locked(self):
+        """Verrou de la connexion, pour un acces direct a self.connection."""
+        return self._lock
     
     def find_auvergne_connection(self) -> Optional[str]:
         """
@@ -120,6 +158,7 @@ class DatabaseConnection:
         
         return params
     
+    @_serialized
     def is_connected(self) -> bool:
         """Verifie si la connexion est active (ping leger)."""
         if not self.connection:
@@ -137,6 +176,7 @@ class DatabaseConnection:
             self.connection = None
             return False
 
+    @_serialized
     def connect(self) -> bool:
         """
         Etablit la connexion a la base de donnees.
@@ -188,6 +228,7 @@ class DatabaseConnection:
                     user=self.user,
                     password=self.password
                 )
+                self._fddcpi2_cached = None
                 return True
             except Exception as e:
                 QgsMessageLog.logMessage(
@@ -206,6 +247,7 @@ class DatabaseConnection:
         """Reconnecte si la connexion a ete perdue. Alias de connect()."""
         return self.connect()
 
+    @_serialized
     def disconnect(self):
         """Ferme la connexion."""
         if self.connection:
@@ -217,82 +259,147 @@ class DatabaseConnection:
                 )
             self.connection = None
     
-    def execute_fddcpi2(self, sro: str) -> List[CableSegment]:
+    def _fddcpi2_function(self, cursor) -> str:
+        """Nom de la fonction a appeler : fddcpi2_cached si deployee (sql/fddcpi2_cache)."""
+        if self._fddcpi2_cached is None:
+            cursor.execute("SELECT to_regprocedure('rip_avg_nge.fddcpi2_cached(text)') IS NOT NULL")
+            self._fddcpi2_cached = bool(cursor.fetchone()[0])
+        return 'fddcpi2_cached' if self._fddcpi2_cached else 'fddcpi2'
+
+    @staticmethod
+    def _segment_from_row(row) -> CableSegment:
+        """Construit un CableSegment depuis une ligne _FDDCPI2_SELECT."""
+        return CableSegment(
+            gid_dc2=row[0] or 0,
+            gid_dc=row[1] or 0,
+            gid=row[2] or 0,
+            sro=row[3] or '',
+            nro=row[4] or '',
+            length=row[5] or 0.0,
+            cab_type=row[6] or '',
+            cab_capa=row[7] or 0,
+            cab_modulo=row[8] or 0,
+            isole=row[9] or '',
+            date_modif=str(row[10]) if row[10] else '',
+            modif_par=row[11] or '',
+            cab_nature=row[13] or '',
+            commentaire=row[14] or '',
+            collecte=row[15] or '',
+            cb_etiquet=row[16] or '',
+            fon=row[17] or '',
+            projet=row[18] or '',
+            dce=row[19] or '',
+            dist_type=row[20] or '',
+            affectation=row[21] or '',
+            posemode=row[22] or 0,
+            geom_wkt=row[23] or ''
+        )
+
+    def iter_fddcpi2(self, sro: str, itersize: int = FDDCPI2_ITERSIZE) -> Iterator[List[CableSegment]]:
+        """
+        Streaming fddcpi2 : curseur serveur (nomme), lots de itersize segments.
+
+        Seul le lot courant est en memoire cote client ; le consommateur peut
+        indexer chaque lot pendant que le suivant transite sur le reseau.
+        Le verrou de la connexion est tenu jusqu'a epuisement ou fermeture
+        du generateur (closing), dans le thread qui le consomme.
+
+        Args:
+            sro: Code SRO
+            itersize: Nombre de lignes par aller-retour serveur
+
+        Yields:
+            Listes de CableSegment (ordre fddcpi2 conserve)
+
+        Raises:
+            Exception psycopg2 en cas d'erreur (transaction annulee)
+
+        Lecture abandonnee avant la fin (annulation) : transaction annulee
+        aussi, ce qui libere le pg_advisory_xact_lock de fddcpi2_cached.
+        """
+        with self._lock:
+            yield from self._iter_fddcpi2(sro, itersize)
+
+    def _iter_fddcpi2(self, sro: str, itersize: int) -> Iterator[List[CableSegment]]:
+        if not self.connection:
+            if not self.connect():
+                return
+
+        cursor = None
+        completed = False
+        try:
+            probe = self.connection.cursor()
+            try:
+                fn_name = self._fddcpi2_function(probe)
+            finally:
+                probe.close()
+
+            cursor = self.connection.cursor(name=f"fddcpi2_{next(_CURSOR_IDS)}")
+            cursor.itersize = itersize
+            cursor.execute(
+                sql.SQL(_FDDCPI2_SELECT).format(sql.Identifier(fn_name)), (sro,)
+            )
+            yield from fetch_chunks(cursor, itersize, self._segment_from_row)
+            completed = True
+        finally:
+            if cursor is not None:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+            if completed:
+                if self._fddcpi2_cached:
+                    # Persister le cache (recalcul eventuel) pour les prochains appels
+                    self.connection.commit()
+            else:
+                # Erreur ou lecture interrompue (GeneratorExit : annulation,
+                # closing()) : liberer la transaction et son verrou consultatif
+                try:
+                    self.connection.rollback()
+                except Exception:
+                    pass
+
+    @_serialized
+    def execute_fddcpi2(self, sro: str, itersize: int = FDDCPI2_ITERSIZE,
+                        on_chunk: Optional[Callable[[List[CableSegment]], None]] = None
+                        ) -> List[CableSegment]:
         """
         Exécute la fonction fddcpi2 et retourne les câbles découpés.
+
+        Utilise le cache serveur fddcpi2_cached s'il est deploye : seuls les
+        SRO dont l'empreinte des sources a change sont recalcules. Lecture
+        en streaming (iter_fddcpi2) : pas de fetchall() en double du resultat.
         
         Args:
             sro: Code SRO (ex: '63041/B1I/PMZ/00003')
+            itersize: Taille des lots du curseur serveur
+            on_chunk: Callback optionnel appele sur chaque lot (indexation incrementale)
         
         Returns:
             Liste de CableSegment
         """
-        if not self.connection:
-            if not self.connect():
-                return []
-        
-        cursor = None
+        _t0 = time.perf_counter()
+        segments = []
         try:
-            cursor = self.connection.cursor()
-            
-            # Exécuter la fonction avec le SRO
-            query = sql.SQL("SELECT *, ST_AsText(geom) as geom_wkt FROM rip_avg_nge.fddcpi2(%s)")
-            cursor.execute(query, (sro,))
-            
-            rows = cursor.fetchall()
-            segments = []
-            
-            for row in rows:
-                segment = CableSegment(
-                    gid_dc2=row[0] or 0,
-                    gid_dc=row[1] or 0,
-                    gid=row[2] or 0,
-                    sro=row[3] or '',
-                    nro=row[4] or '',
-                    length=row[5] or 0.0,
-                    cab_type=row[6] or '',
-                    cab_capa=row[7] or 0,
-                    cab_modulo=row[8] or 0,
-                    isole=row[9] or '',
-                    date_modif=str(row[10]) if row[10] else '',
-                    modif_par=row[11] or '',
-                    cab_nature=row[13] or '',
-                    commentaire=row[14] or '',
-                    collecte=row[15] or '',
-                    cb_etiquet=row[16] or '',
-                    fon=row[17] or '',
-                    projet=row[18] or '',
-                    dce=row[19] or '',
-                    dist_type=row[20] or '',
-                    affectation=row[21] or '',
-                    posemode=row[22] or 0,
-                    geom_wkt=row[23] or ''
-                )
-                segments.append(segment)
-            
-            QgsMessageLog.logMessage(
-                f"fddcpi2({sro}): {len(segments)} segments de câbles récupérés",
-                "PoleAerien", MSG_INFO
-            )
-            return segments
-            
+            for chunk in self.iter_fddcpi2(sro, itersize):
+                segments.extend(chunk)
+                if on_chunk is not None:
+                    on_chunk(chunk)
         except Exception as e:
             QgsMessageLog.logMessage(
                 f"Erreur exécution fddcpi2: {e}",
                 "PoleAerien", MSG_WARNING
             )
-            try:
-                self.connection.rollback()
-            except Exception:
-                pass
             return []
-        finally:
-            if cursor is not None:
-                try:
-                    cursor.close()
-                except Exception:
-                    pass
+
+        QgsMessageLog.logMessage(
+            f"fddcpi2({sro}): {len(segments)} segments de câbles récupérés "
+            f"en {time.perf_counter() - _t0:.2f}s",
+            "PoleAerien", MSG_INFO
+        )
+        return segments
     
+    @_serialized
     def fetch_sro_list(self) -> List[str]:
         """
         Recupere la liste des SRO depuis rip_avg_nge.za_sro.
@@ -331,6 +438,45 @@ class DatabaseConnection:
                 except Exception:
                     pass
 
+    @_serialized
+    def fddcpi2_fingerprint(self, sro: str) -> Optional[str]:
+        """Empreinte serveur des donnees fddcpi2 du SRO (sql/fddcpi2_cache).
+
+        Returns:
+            Chaine md5, ou None si la fonction n'est pas deployee ou en erreur
+        """
+        if not self.connection:
+            if not self.connect():
+                return None
+
+        cursor = None
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute("SELECT to_regprocedure('rip_avg_nge.fddcpi2_fingerprint(text)') IS NOT NULL")
+            if not cursor.fetchone()[0]:
+                return None
+            cursor.execute("SELECT rip_avg_nge.fddcpi2_fingerprint(%s)", (sro,))
+            row = cursor.fetchone()
+            self.connection.commit()
+            return row[0] if row else None
+        except Exception as e:
+            QgsMessageLog.logMessage(
+                f"Erreur empreinte fddcpi2: {e}",
+                "PoleAerien", MSG_WARNING
+            )
+            try:
+                self.connection.rollback()
+            except Exception:
+                pass
+            return None
+        finally:
+            if cursor is not None:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+
+    @_serialized
     def get_cables_aeriens(self, sro: str) -> List[CableSegment]:
         """
         Récupère les câbles aériens et façade (posemode in (1, 2)).
@@ -338,6 +484,7 @@ class DatabaseConnection:
         all_segments = self.execute_fddcpi2(sro)
         return [s for s in all_segments if s.posemode in (1, 2)]
 
+    @_serialized
     def query_bpe_by_sro(self, sro: str) -> List[dict]:
         """
         Récupère les BPE d'un SRO avec leur géométrie et type.
@@ -396,6 +543,7 @@ class DatabaseConnection:
                     pass
 
 
+    @_serialized
     def query_attaches_by_sro(self, sro: str) -> List[dict]:
         """
         Recupere les attaches d'un SRO avec leur geometrie.
@@ -455,6 +603,7 @@ class DatabaseConnection:
                 except Exception:
                     pass
 
+    @_serialized
     def query_sro_be(self, sro: str) -> Optional[str]:
         """
         Determine le bureau d'etudes (NGE ou Axione) pour un SRO.
@@ -505,6 +654,111 @@ class DatabaseConnection:
                 except Exception:
                     pass
 
+    @_serialized
+    def compter_cables_par_appui_sql(self, sro: str, appuis: List[dict],
+                                     tolerance: float = 1.5, group_by_gid: bool = False,
+                                     with_attaches: bool = False,
+                                     cab_types: Optional[set] = None,
+                                     min_capa: int = 0) -> Optional[dict]:
+        """
+        Comptage cables/appui cote serveur (rip_avg_nge.compter_cables_appuis).
+
+        Meme semantique que cable_analyzer.compter_cables_par_appui en mode
+        'endpoint' (fddcpi2) : tolerance, extension via attaches, dedup GID.
+
+        Args:
+            sro: Code SRO
+            appuis: Liste de dicts avec 'num_appui' et 'geom' (QgsGeometry point)
+            with_attaches: Inclure les extensions via rip_avg_nge.attaches
+            cab_types: Set de cab_type acceptes (None = tous)
+            min_capa: Capacite minimale retenue (ex: 6 pour exclure le cuivre)
+
+        Returns:
+            Dict[num_appui, {'count', 'capacites', 'cables'}], ou None si la
+            fonction SQL est absente ou en erreur (repli sur le calcul client)
+        """
+        if not self.connection:
+            if not self.connect():
+                return None
+
+        result = {}
+        positions = {}
+        cursor = None
+        try:
+            from .cable_analyzer import _appui_point
+
+            for appui in appuis:
+                num = appui.get('num_appui', '')
+                if not num:
+                    continue
+                result[num] = {'count': 0, 'capacites': [], 'cables': []}
+                pt = _appui_point(appui.get('geom'))
+                if pt is not None:
+                    positions[num] = (pt.x(), pt.y())
+                else:
+                    positions.pop(num, None)
+
+            cursor = self.connection.cursor()
+            cursor.execute(
+                "SELECT num_appui, gid_dc2, gid, cab_capa, posemode, cb_etiquet, cab_type "
+                "FROM rip_avg_nge.compter_cables_appuis(%s, %s, %s, %s, %s, %s, %s, %s)",
+                (
+                    sro,
+                    list(positions),
+                    [xy[0] for xy in positions.values()],
+                    [xy[1] for xy in positions.values()],
+                    tolerance,
+                    group_by_gid,
+                    sorted(cab_types) if cab_types is not None else None,
+                    with_attaches,
+                )
+            )
+            rows = cursor.fetchall()
+
+            for row in rows:
+                data = result.get(row[0])
+                if data is None:
+                    continue
+                capacite = row[3] or 0
+                if capacite < min_capa:
+                    continue
+                data['count'] += 1
+                if capacite:
+                    data['capacites'].append(capacite)
+                data['cables'].append({
+                    'id': row[1] or 0,
+                    'gid': row[2] or 0,
+                    'capacite': capacite,
+                    'posemode': row[4] or 0,
+                    'cb_etiquet': row[5] or '',
+                    'cab_type': row[6] or '',
+                })
+
+            nb_with_cables = sum(1 for v in result.values() if v['count'] > 0)
+            QgsMessageLog.logMessage(
+                f"compter_cables_appuis({sro}): {len(rows)} matches, "
+                f"{nb_with_cables}/{len(result)} appuis avec cables (serveur)",
+                "PoleAerien", MSG_INFO
+            )
+            return result
+
+        except Exception as e:
+            QgsMessageLog.logMessage(
+                f"compter_cables_appuis indisponible, repli client: {e}",
+                "PoleAerien", MSG_WARNING
+            )
+            try:
+                self.connection.rollback()
+            except Exception:
+                pass
+            return None
+        finally:
+            if cursor is not None:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+
 
 # ---------------------------------------------------------------------------
 #  Shared singleton instance
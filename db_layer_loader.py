@@ -255,6 +255,21 @@ class DbLayerLoader:
                 project.removeMapLayer(layer_id)
         self._loaded_layers.clear()
 
+    def detach_layers(self) -> List:
+        """Take loaded layers out of the QGIS project without deleting them.
+
+        Ownership returns to Python: the caller keeps them alive for reuse
+        (session cache) and adds them back with addMapLayer().
+        """
+        project = QgsProject.instance()
+        layers = []
+        for layer_id in self._loaded_layers:
+            layer = project.mapLayer(layer_id)
+            if layer:
+                layers.append(project.takeMapLayer(layer))
+        self._loaded_layers.clear()
+        return layers
+
     @property
     def loaded_layer_ids(self) -> List[str]:
         """IDs of layers added to the QGIS project by this loader."""
@@ -16,7 +16,7 @@ from qgis.PyQt.QtWidgets import (
     QTextBrowser, QProgressBar, QFileDialog,
     QWidget, QSplitter,
     QRadioButton, QButtonGroup, QDialogButtonBox,
-    QDoubleSpinBox,
+    QDoubleSpinBox, QMessageBox,
 )
 from qgis.PyQt.QtCore import Qt, QSize, QEvent, pyqtSignal
 from qgis.PyQt.QtGui import QTextCursor, QFont, QPalette, QColor
@@ -29,11 +29,11 @@ from .compat import (
     WF_NO_HELP, CASE_INSENSITIVE, MATCH_CONTAINS,
     PAL_BASE, PAL_WINDOW, PAL_WINDOW_TEXT, PAL_MID, PAL_MIDLIGHT,
     PAL_BRIGHT_TEXT, PAL_HIGHLIGHT,
-    FRAME_HLINE, FRAME_SUNKEN, BTN_OK, BTN_CANCEL,
+    FRAME_HLINE, FRAME_SUNKEN, BTN_OK, BTN_CANCEL, MSGBOX_YES, MSGBOX_NO,
     LAYER_FILTER_POINT, LAYER_FILTER_POLYGON,
 )
-from .project_detector import detect_project, DetectionResult, analyse_livrable
-from .async_tasks import SmoothProgressController
+from .project_detector import detected_modules, DetectionResult, analyse_livrable
+from .async_tasks import SmoothProgressController, ProjectDetectionTask, run_async_task
 
 
 PLUGIN_DIR = os.path.dirname(__file__)
@@ -423,11 +423,14 @@ class PoleAerienDialogV2(QDialog):
     start_requested = pyqtSignal(list)
     cancel_requested = pyqtSignal()
     help_requested = pyqtSignal()
+    # Dossier livraison, dossiers projets, modules
+    queue_requested = pyqtSignal(str, list, list)
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setObjectName("PoleAerienBatch")
         self._detection = DetectionResult()
+        self._detection_task = None
         self._is_running = False
         self._module_rows = {}
         self._project_mode = False
@@ -942,6 +945,16 @@ class PoleAerienDialogV2(QDialog):
         )
         lay.addWidget(self.diagButton)
 
+        self.queueBtn = QPushButton("File de projets...")
+        self.queueBtn.setIcon(_qgs_icon('mActionFileOpen.svg'))
+        self.queueBtn.setIconSize(QSize(16, 16))
+        self.queueBtn.setCursor(CURSOR_POINTING)
+        self.queueBtn.setToolTip(
+            "Analyser tous les projets SRO d'un dossier de livraison\n"
+            "a la suite (Mode Projet), avec une synthese consolidee."
+        )
+        lay.addWidget(self.queueBtn)
+
         lay.addStretch()
 
         self.cancelBtn = QPushButton("  Annuler")
@@ -988,6 +1001,7 @@ class PoleAerienDialogV2(QDialog):
         self.cancelBtn.clicked.connect(self._on_cancel_clicked)
         self.helpButton.clicked.connect(lambda: self.help_requested.emit())
         self.diagButton.clicked.connect(self._run_diagnostic)
+        self.queueBtn.clicked.connect(self._on_queue_clicked)
         self._mode_group.buttonClicked.connect(self._on_mode_changed)
         self.textBrowser.anchorClicked.connect(self._on_link_clicked)
         self._chk_comac_drawings.toggled.connect(lambda _: self._save_ui_state())
@@ -1059,8 +1073,7 @@ class PoleAerienDialogV2(QDialog):
         """Re-run detection on the current project path (resync after folder rename)."""
         path = self.projectPathEdit.text()
         if path and os.path.isdir(path):
-            self._run_detection(path)
-            self._log_info("Detection resynchronisee.")
+            self._run_detection(path, then=lambda: self._log_info("Detection resynchronisee."))
 
     def _on_sro_text_changed(self, text):
         """Validate SRO as user types in the editable field."""
@@ -1117,8 +1130,48 @@ class PoleAerienDialogV2(QDialog):
             return
         self._run_detection(path)
 
-    def _run_detection(self, path):
-        self._detection = detect_project(path)
+    def _run_detection(self, path, then=None):
+        """Detection en arriere-plan (QgsTask) ; then() une fois le resultat applique.
+
+        Une nouvelle detection annule la precedente (changement de dossier).
+        Lancement bloque tant que le resultat n'est pas applique : le
+        resultat du dossier precedent n'est plus utilisable.
+        """
+        self._cancel_detection()
+        self._detection = DetectionResult()
+        task = ProjectDetectionTask({'project_root': path})
+        self._detection_task = task
+        self._det_summary.setText("Detection en cours...")
+        self._det_summary.setVisible(True)
+        self._validate_start()
+
+        def _done(result):
+            if self._detection_task is not task:
+                return
+            self._detection_task = None
+            self._apply_detection(result['detection'])
+            if then is not None:
+                then()
+
+        def _failed(err):
+            if self._detection_task is not task:
+                return
+            self._detection_task = None
+            self._det_summary.setVisible(False)
+            self._log_err(f"Detection impossible : {err}")
+            self._validate_start()
+
+        task.signals.finished.connect(_done)
+        task.signals.error.connect(_failed)
+        run_async_task(task)
+
+    def _cancel_detection(self):
+        task, self._detection_task = self._detection_task, None
+        if task is not None:
+            task.cancel()
+
+    def _apply_detection(self, detection):
+        self._detection = detection
         d = self._detection
 
         # Header
@@ -1167,17 +1220,7 @@ class PoleAerienDialogV2(QDialog):
         self._det_summary.setVisible(bool(lines))
 
         # Module rows with diagnostic hints
-        module_map = {
-            'maj':       (d.has_ftbt,  d.ftbt_excel,  'FT-BT KO'),
-            'capft':     (d.has_capft, d.capft_dir,   'CAP FT'),
-            'comac':     (d.has_comac, d.comac_dir,   'COMAC'),
-            'c6bd':      (d.has_c6,    d.c6_dir,      'C6 (via CAP FT)'),
-            'police_c6': (d.has_c6,    d.c6_dir,      'C6 (via CAP FT)'),
-            'c6c3a':     ((d.has_c6 or d.has_c6_annexe) and (d.has_c7 or d.has_c3a),
-                          d.c6_annexe_file or d.c6_dir, 'C6 annexe'),
-            'gespot_c6': (d.has_gespot and d.has_c6,
-                          d.gespot_dir, 'GESPOT'),
-        }
+        module_map = detected_modules(d)
         for key, row in self._module_rows.items():
             found, mp, res_label = module_map.get(key, (False, '', ''))
             diag = '' if found else d.get_diagnostic(res_label)
@@ -1188,6 +1231,7 @@ class PoleAerienDialogV2(QDialog):
 
         # Log with diagnostics for missing resources
         self._log_info(f"Projet : {d.project_name}")
+        self._log_dim(f"  Analyse : {d.scan_entries} entrees en {d.scan_s:.2f} s")
         if d.sro:
             self._log_ok(f"  SRO : {d.sro}")
         if d.has_gracethd:
@@ -1215,6 +1259,7 @@ class PoleAerienDialogV2(QDialog):
                 self._log_warn(f"  {label} : {hint}")
 
     def _reset_detection(self):
+        self._cancel_detection()
         self._detection = DetectionResult()
         self._project_tag.setVisible(False)
         self._subtitle.setText("  -  Selectionnez un dossier projet")
@@ -1263,6 +1308,9 @@ class PoleAerienDialogV2(QDialog):
         has_proj = bool(proj_path) and os.path.isdir(proj_path)
         if not has_proj:
             reasons.append("Aucun dossier projet valide")
+        detecting = has_proj and self._detection_task is not None
+        if detecting:
+            reasons.append("Detection du projet en cours")
 
         has_mod = any(r.is_selected for r in self._module_rows.values())
         if not has_mod:
@@ -1309,7 +1357,7 @@ class PoleAerienDialogV2(QDialog):
         sel_count = sum(1 for r in self._module_rows.values() if r.is_selected)
         mode_label = "Projet (BDD)" if self._project_mode else "Couches QGIS"
 
-        ready = (has_proj and has_mod and sro_ok and layers_ok
+        ready = (has_proj and not detecting and has_mod and sro_ok and layers_ok
                  and not self._is_running)
 
         return {
@@ -1438,6 +1486,36 @@ class PoleAerienDialogV2(QDialog):
     def _on_cancel_clicked(self):
         self.cancel_requested.emit()
 
+    def _on_queue_clicked(self):
+        """Choix d'un dossier de livraison : un SRO par sous-dossier projet."""
+        from .job_queue import find_project_dirs
+
+        start_dir = os.path.dirname(self.projectPathEdit.text()) if self.projectPathEdit.text() else ""
+        root = QFileDialog.getExistingDirectory(
+            self, "Sélectionner le dossier de livraison (un sous-dossier par SRO)", start_dir
+        )
+        if not root:
+            return
+        project_dirs = find_project_dirs(root)
+        if not project_dirs:
+            self._log_warn(f"Aucun dossier projet SRO dans {root}")
+            return
+        # Modules coches, sinon tous ; chaque projet ne lance que ses modules detectes
+        mods = self.selected_modules() or [
+            'maj', 'capft', 'comac', 'c6bd', 'police_c6', 'c6c3a', 'gespot_c6'
+        ]
+        names = '\n'.join(f"  {os.path.basename(d)}" for d in project_dirs[:15])
+        if len(project_dirs) > 15:
+            names += f"\n  ... (+{len(project_dirs) - 15})"
+        answer = QMessageBox.question(
+            self, "File de projets",
+            f"{len(project_dirs)} projet(s) detecte(s) :\n{names}\n\n"
+            f"Lancer l'analyse en Mode Projet (BDD) ?",
+            MSGBOX_YES | MSGBOX_NO, MSGBOX_YES,
+        )
+        if answer == MSGBOX_YES:
+            self.queue_requested.emit(root, project_dirs, mods)
+
     def set_running(self, running):
         self._is_running = running
         self.startBtn.setVisible(not running)
@@ -1456,6 +1534,7 @@ class PoleAerienDialogV2(QDialog):
         self._chk_load_layers.setEnabled(not running)
         self._spin_spatial_tol.setEnabled(not running)
         self.refreshBtn.setEnabled(not running)
+        self.queueBtn.setEnabled(not running)
 
         for row in self._module_rows.values():
             row.checkbox.setEnabled(not running and row._found)
@@ -1478,6 +1557,13 @@ class PoleAerienDialogV2(QDialog):
         else:
             self._progress_step.setVisible(False)
 
+    def ask_resume(self, message):
+        """Propose de reprendre un batch interrompu. True si accepte."""
+        answer = QMessageBox.question(
+            self, "Reprendre le batch", message, MSGBOX_YES | MSGBOX_NO, MSGBOX_YES
+        )
+        return answer == MSGBOX_YES
+
     def reset_after_batch(self):
         self._is_running = False
         self.smooth_progress.set_target(100)
@@ -1498,6 +1584,7 @@ class PoleAerienDialogV2(QDialog):
         self._chk_load_layers.setEnabled(True)
         self._spin_spatial_tol.setEnabled(True)
         self.refreshBtn.setEnabled(True)
+        self.queueBtn.setEnabled(True)
         for row in self._module_rows.values():
             row.checkbox.setEnabled(row._found)
         self._validate_start()
@@ -1516,10 +1603,13 @@ class PoleAerienDialogV2(QDialog):
             return
 
         # Ensure detection is up-to-date
+        if not self._detection.project_name:
+            self._run_detection(path, then=lambda: self._log_diagnostic(path))
+            return
+        self._log_diagnostic(path)
+
+    def _log_diagnostic(self, path):
         d = self._detection
-        if not d.project_name:
-            self._run_detection(path)
-            d = self._detection
 
         # Deep analysis
         analysis = analyse_livrable(d)
@@ -2039,6 +2129,7 @@ class PoleAerienDialogV2(QDialog):
         _ThemeColors._widget_palette_ref = None
         if self._is_running:
             self.cancel_requested.emit()
+        self._cancel_detection()
         self._save_ui_state()
         if self.smooth_progress:
             self.smooth_progress.reset()
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+Index des fichiers d'une arborescence de livraison.
+
+Un seul parcours os.scandir par racine, au lieu d'un os.walk ou d'un glob
+recursif par recherche (find_c6_file en faisait jusqu'a neuf par etude).
+Les recherches (C6, PCM, COMAC, FicheAppui_) sont servies par un multimap
+nom normalise -> fichiers, ou par filtrage fnmatch des noms indexes.
+
+Les index sont partages par racine (get_index) : verifications
+pre-lancement et modules d'un meme batch lisent le meme parcours.
+clear() au lancement d'un batch (fichiers ajoutes entre deux batchs).
+Module pur Python.
+"""
+
+import fnmatch
+import glob
+import os
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    from .core_utils import is_plugin_output_file
+except ImportError:
+    from core_utils import is_plugin_output_file
+
+# Age maximal d'un index partage (livraison modifiee hors batch)
+DEFAULT_MAX_AGE_S = 600
+
+# Ignores par find/glob comme par glob.glob (caches, verrous Office/LibreOffice)
+_HIDDEN_PREFIXES = ('.', '~$')
+
+_lock = threading.Lock()
+_indexes: Dict[str, 'FileIndex'] = {}
+
+
+def normalize_name(name: str) -> str:
+    """Cle de recherche : casse ignoree (partages Windows)."""
+    return name.lower()
+
+
+class FileIndex:
+    """Fichiers d'une arborescence, parcourue une fois dans l'ordre d'os.walk.
+
+    Profondeur d'un fichier : 0 a la racine, 1 dans un sous-dossier direct...
+    Comme os.walk : liens symboliques vers des dossiers listes mais non
+    parcourus, dossiers illisibles ignores. Comme glob : find/glob ignorent
+    les noms commencant par '.' ou '~$' et le contenu des dossiers caches
+    (walk les liste).
+    """
+
+    def __init__(self, root: str):
+        self.root = os.path.normpath(root)
+        self.built_at = time.monotonic()
+        self._dirs: List[Tuple[str, List[str], List[str]]] = []
+        self._depths: List[int] = []
+        # Fichiers d'un dossier contigus : [debut, fin) dans _files
+        self._spans: List[Tuple[int, int]] = []
+        self._files: List[Tuple[int, str, str]] = []
+        self._by_name: Dict[str, List[int]] = {}
+        self._by_dirname: Dict[str, List[int]] = {}
+        self._scan()
+
+    def _scan(self) -> None:
+        stack = [(self.root, 0, False)]
+        while stack:
+            path, depth, hidden = stack.pop()
+            try:
+                with os.scandir(path) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+            dirnames, filenames, walk_into = [], [], []
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if not is_dir:
+                    filenames.append(entry.name)
+                    continue
+                dirnames.append(entry.name)
+                try:
+                    if not entry.is_symlink():
+                        walk_into.append(entry.path)
+                except OSError:
+                    pass
+            dir_id = len(self._dirs)
+            self._dirs.append((path, dirnames, filenames))
+            self._depths.append(depth)
+            if depth and not hidden:
+                self._by_dirname.setdefault(normalize_name(os.path.basename(path)), []).append(dir_id)
+            first = len(self._files)
+            for name in ([] if hidden else filenames):
+                if name.startswith(_HIDDEN_PREFIXES):
+                    continue
+                key = normalize_name(name)
+                self._by_name.setdefault(key, []).append(len(self._files))
+                self._files.append((dir_id, name, key))
+            self._spans.append((first, len(self._files)))
+            # Pile : sous-dossiers empiles a l'envers pour garder l'ordre d'os.walk
+            stack.extend((sub, depth + 1, hidden or os.path.basename(sub).startswith('.'))
+                         for sub in reversed(walk_into))
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def walk(self) -> Iterator[Tuple[str, List[str], List[str]]]:
+        """(dossier, sous-dossiers, fichiers) comme os.walk (listes a ne pas modifier)."""
+        return iter(self._dirs)
+
+    def find(self, name: str, parent: Optional[str] = None,
+             max_depth: Optional[int] = None) -> List[str]:
+        """Chemins des fichiers nommes name (casse ignoree), ordre os.walk.
+
+        parent : nom du dossier contenant le fichier (hors racine) ;
+        max_depth : profondeur maximale du fichier.
+        """
+        parent_key = normalize_name(parent) if parent is not None else None
+        paths = []
+        for file_id in self._by_name.get(normalize_name(name), ()):
+            dir_id, file_name, _key = self._files[file_id]
+            depth = self._depths[dir_id]
+            if max_depth is not None and depth > max_depth:
+                continue
+            dirpath = self._dirs[dir_id][0]
+            if parent_key is not None and (
+                    depth == 0 or normalize_name(os.path.basename(dirpath)) != parent_key):
+                continue
+            paths.append(os.path.join(dirpath, file_name))
+        return paths
+
+    def glob(self, pattern: str, parent: Optional[str] = None,
+             max_depth: Optional[int] = None) -> List[str]:
+        """Chemins des fichiers dont le nom correspond au motif fnmatch (casse ignoree).
+
+        Avec parent ou max_depth, seuls les dossiers concernes sont examines.
+        """
+        if parent is not None:
+            dir_ids = self._by_dirname.get(normalize_name(parent), ())
+        else:
+            dir_ids = range(len(self._dirs))
+        pattern = normalize_name(pattern)
+        paths = []
+        for dir_id in dir_ids:
+            if max_depth is not None and self._depths[dir_id] > max_depth:
+                continue
+            start, end = self._spans[dir_id]
+            dirpath = self._dirs[dir_id][0]
+            for _dir_id, name, key in self._files[start:end]:
+                if fnmatch.fnmatchcase(key, pattern):
+                    paths.append(os.path.join(dirpath, name))
+        return paths
+
+
+def find_c6_file(index: FileIndex, nom_etude: str) -> Optional[str]:
+    """Fichier C6 d'une etude (sous-dossiers CMD 1, CMD 2... compris), ou None."""
+    nom_fichier = f"{nom_etude}.xlsx"
+    # Recherches (priorite decroissante) : (methode, nom ou motif, dossier parent, profondeur max)
+    # Profondeur 0 = racine, 1 = sous-dossier direct
+    recherches = [
+        # Pattern principal: **/nom_etude/nom_etude.xlsx (recursif,
+        # inclut le sous-dossier direct nom_etude/nom_etude.xlsx)
+        (index.find, nom_fichier, nom_etude, None),
+        # Sous-dossier direct avec nom etude
+        (index.glob, "*Annexe*C6*.xlsx", nom_etude, 1),
+        (index.glob, "*C6*.xlsx", nom_etude, 1),
+        # Recursif: chercher dans tous les sous-dossiers
+        (index.glob, "*Annexe*C6*.xlsx", nom_etude, None),
+        (index.glob, "*C6*.xlsx", nom_etude, None),
+        (index.find, nom_fichier, None, None),
+        # Fichier direct avec nom etude
+        (index.glob, f"*{glob.escape(nom_etude)}*.xlsx", None, 0),
+        # Dernier recours: n'importe quel xlsx dans le dossier etude
+        (index.glob, "*.xlsx", nom_etude, None),
+    ]
+    for chercher, motif, parent, max_depth in recherches:
+        # Filtrer les fichiers non-C6 (FicheAppui, C7, GESPOT)
+        for match in chercher(motif, parent, max_depth):
+            if not is_plugin_output_file(os.path.basename(match)):
+                return match
+    return None
+
+
+def get_index(root: str, max_age_s: float = DEFAULT_MAX_AGE_S) -> FileIndex:
+    """Index partage de root, construit au premier appel (ou apres max_age_s)."""
+    key = os.path.normcase(os.path.abspath(root))
+    with _lock:
+        index = _indexes.get(key)
+        if index is not None and (not max_age_s or time.monotonic() - index.built_at <= max_age_s):
+            return index
+    # Parcours hors verrou : deux racines differentes s'indexent en parallele
+    index = FileIndex(root)
+    with _lock:
+        _indexes[key] = index
+    return index
+
+
+def clear() -> None:
+    """Oublie les index partages (nouveau batch)."""
+    with _lock:
+        _indexes.clear()
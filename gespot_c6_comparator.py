@@ -6,6 +6,11 @@ Responsabilité unique : lire les colonnes utiles de l'onglet Export 1,
 agréger la whitelist depuis l'onglet Bases, puis produire les statuts
 de comparaison C1-C11 par appui.
 
+Les classeurs C6 sont lus en mode read_only (flux de lignes). La
+comparaison aligne GESPOT et C6 en colonnes triées par NUM normalisé et
+évalue chaque critère sur la colonne entière ; les détails ne sont
+formatés que pour les écarts.
+
 Zéro dépendance QGIS - thread-safe.
 """
 
@@ -13,12 +18,18 @@ import os
 import re as _re
 from dataclasses import dataclass, field
 from datetime import datetime
+from operator import attrgetter
 from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 import openpyxl
 
-from .core_utils import is_plugin_output_file, normalize_appui_num
-from .gespot_reader import GespotRecord, GespotLoadResult
+try:
+    from .core_utils import is_plugin_output_file, normalize_appui_num
+    from .gespot_reader import GespotRecord, GespotLoadResult, load_gespot_dir
+except ImportError:
+    from core_utils import is_plugin_output_file, normalize_appui_num
+    from gespot_reader import GespotRecord, GespotLoadResult, load_gespot_dir
 
 _PLACEHOLDERS_NUM_VOIE = {'9999', '99999'}
 _RE_LEADING_NUM = _re.compile(r'^(\d+)\s+')
@@ -54,6 +65,20 @@ _COMPARISONS = [
     'elec', 'inacc', 'vertic', 'yellow', 'usable', 'ctrl_vis',
 ]
 
+# Critères C2-C11 : (nom, attribut GESPOT, attribut C6, libellé des détails)
+_CRITERIA = [
+    ('centre', 'centre', 'centre', 'Centre'),
+    ('type', 'type_calc', 'type_c6', 'Type'),
+    ('strat', 'strategie_calc', 'strat', 'Strategie'),
+    ('env', 'milieu_calc', 'env', 'Milieu'),
+    ('elec', 'pres_elect_calc', 'elec', 'Risque elec'),
+    ('inacc', 'inacc_calc', 'inacc', 'Inacc'),
+    ('vertic', None, 'vertic', 'Verticalite'),
+    ('yellow', 'etat_no_yellow', 'yellow', 'Etiquette jaune'),
+    ('usable', 'etat_usable', 'usable', 'Utilisable'),
+    ('ctrl_vis', 'ctrl_visuel', 'ctrl_vis', 'Ctrl visuel'),
+]
+
 
 # ===========================================================================
 #  DATACLASSES
@@ -169,11 +194,6 @@ class GespotC6Result:
 #  LECTURE C6
 # ===========================================================================
 
-def _cell_str(ws, row: int, col: int) -> str:
-    val = ws.cell(row=row, column=col).value
-    return str(val).strip() if val is not None else ''
-
-
 def _safe_cell(row_tuple, idx: int) -> str:
     """Extrait une cellule d'un tuple openpyxl en toute securite."""
     if idx < len(row_tuple) and row_tuple[idx] is not None:
@@ -186,8 +206,11 @@ def _read_whitelist(wb: openpyxl.Workbook) -> set:
     if 'Bases' not in wb.sheetnames:
         return whitelist
     ws = wb['Bases']
-    for row_idx in range(_BASES_STRAT_ROW_START, ws.max_row + 1):
-        val = ws.cell(row=row_idx, column=_BASES_STRAT_COL).value
+    # Meme precaution que 'Export 1' : ne pas s'arreter a la dimension declaree
+    ws.reset_dimensions()
+    for (val,) in ws.iter_rows(min_row=_BASES_STRAT_ROW_START,
+                               min_col=_BASES_STRAT_COL, max_col=_BASES_STRAT_COL,
+                               values_only=True):
         if val is None:
             continue
         s = str(val).strip()
@@ -201,7 +224,7 @@ def _read_one_c6(filepath: str,
     """Lit un fichier C6 Excel. Retourne (records_dict, whitelist, anomalies)."""
     anomalies = []
     try:
-        wb = openpyxl.load_workbook(filepath, data_only=True)
+        wb = openpyxl.load_workbook(filepath, read_only=True, data_only=True)
     except Exception as e:
         anomalies.append({
             'source': 'C6', 'fichier': fname, 'num': '',
@@ -234,8 +257,13 @@ def _read_one_c6(filepath: str,
             return None, set(), anomalies
 
         ws = wb['Export 1']
+        # Dimensions déclarées parfois fausses : lire les lignes jusqu'au bout
+        ws.reset_dimensions()
         whitelist = _read_whitelist(wb)
-        centre_raw = _cell_str(ws, _C6_CENTRE_ROW + 1, _C6_CENTRE_COL + 1)
+        centre_raw = ''
+        for row in ws.iter_rows(min_row=_C6_CENTRE_ROW + 1, max_row=_C6_CENTRE_ROW + 1,
+                                values_only=True):
+            centre_raw = _safe_cell(row, _C6_CENTRE_COL)
         if not centre_raw:
             anomalies.append({
                 'source': 'C6', 'fichier': fname, 'num': '',
@@ -395,7 +423,7 @@ def _compare_adresse(gespot: GespotRecord,
     adr_c6 = c6_adresse.strip()
 
     has_num = bool(num_voie) and num_voie not in _PLACEHOLDERS_NUM_VOIE
-    adresse_gespot = f"{num_voie} {voie}" if has_num else voie
+    adresse_gespot = _adresse_gespot(gespot)
 
     ag = adresse_gespot.lower()
     ac = adr_c6.lower()
@@ -420,45 +448,102 @@ def _compare_adresse(gespot: GespotRecord,
     return 'KO', f"GESPOT='{adresse_gespot}' vs C6='{adr_c6}'"
 
 
-def _compare_one(gespot: GespotRecord, c6: C6Record) -> ComparisonResult:
-    vertic_gespot = _recalage_to_vertic(gespot.recalage_raw)
-
-    s_adr, d_adr = _compare_adresse(gespot, c6.adresse)
-    s_ctr, d_ctr = _cmp(gespot.centre, c6.centre, 'Centre GESPOT', 'Centre C6')
-    s_typ, d_typ = _cmp(gespot.type_calc, c6.type_c6, 'Type GESPOT', 'Type C6')
-    s_str, d_str = _cmp(gespot.strategie_calc, c6.strat, 'Strategie GESPOT', 'Strategie C6')
-    s_env, d_env = _cmp(gespot.milieu_calc, c6.env, 'Milieu GESPOT', 'Milieu C6')
-    s_elc, d_elc = _cmp(gespot.pres_elect_calc, c6.elec, 'Risque elec GESPOT', 'Risque elec C6')
-    s_ina, d_ina = _cmp(gespot.inacc_calc, c6.inacc, 'Inacc GESPOT', 'Inacc C6')
-    s_vtc, d_vtc = _cmp(vertic_gespot, c6.vertic, 'Verticalite GESPOT', 'Verticalite C6')
-    s_ylw, d_ylw = _cmp(gespot.etat_no_yellow, c6.yellow, 'Etiquette jaune GESPOT', 'Etiquette jaune C6')
-    s_usb, d_usb = _cmp(gespot.etat_usable, c6.usable, 'Utilisable GESPOT', 'Utilisable C6')
-    s_ctv, d_ctv = _cmp(gespot.ctrl_visuel, c6.ctrl_vis, 'Ctrl visuel GESPOT', 'Ctrl visuel C6')
-
-    all_statuts = [s_adr, s_ctr, s_typ, s_str, s_env, s_elc, s_ina, s_vtc, s_ylw, s_usb, s_ctv]
-    nb_ecarts = sum(1 for s in all_statuts if s == 'KO')
-
-    return ComparisonResult(
-        num=gespot.num,
-        voie_gespot=gespot.voie, num_voie_gespot=gespot.num_voie,
-        adresse_c6=c6.adresse, statut_adresse=s_adr, detail_adresse=d_adr,
-        centre_gespot=gespot.centre, centre_c6=c6.centre, statut_centre=s_ctr, detail_centre=d_ctr,
-        type_gespot=gespot.type_calc, type_c6=c6.type_c6, statut_type=s_typ, detail_type=d_typ,
-        strat_gespot=gespot.strategie_calc, strat_c6=c6.strat, statut_strat=s_str, detail_strat=d_str,
-        env_gespot=gespot.milieu_calc, env_c6=c6.env, statut_env=s_env, detail_env=d_env,
-        elec_gespot=gespot.pres_elect_calc, elec_c6=c6.elec, statut_elec=s_elc, detail_elec=d_elc,
-        inacc_gespot=gespot.inacc_calc, inacc_c6=c6.inacc, statut_inacc=s_ina, detail_inacc=d_ina,
-        recalage_gespot=gespot.recalage_raw,
-        vertic_c6=c6.vertic, statut_vertic=s_vtc, detail_vertic=d_vtc,
-        yellow_gespot=gespot.etat_no_yellow, yellow_c6=c6.yellow, statut_yellow=s_ylw, detail_yellow=d_ylw,
-        usable_gespot=gespot.etat_usable, usable_c6=c6.usable, statut_usable=s_usb, detail_usable=d_usb,
-        ctrl_vis_gespot=gespot.ctrl_visuel, ctrl_vis_c6=c6.ctrl_vis, statut_ctrl_vis=s_ctv, detail_ctrl_vis=d_ctv,
-        dist_elec_gespot=gespot.dist_elec,
-        nb_ecarts=nb_ecarts,
-        statut_global='OK' if nb_ecarts == 0 else 'KO',
-        source_gespot=gespot.source_file,
-        source_c6=c6.source_file,
-    )
+def _adresse_gespot(gespot: GespotRecord) -> str:
+    """Adresse GESPOT comparée au C6 : 'num_voie voie' si num_voie valide."""
+    voie = gespot.voie.strip()
+    num_voie = gespot.num_voie.strip()
+    if num_voie and num_voie not in _PLACEHOLDERS_NUM_VOIE:
+        return f"{num_voie} {voie}"
+    return voie
+
+
+def _column(records: list, attr: str) -> np.ndarray:
+    """Colonne objet alignée sur records."""
+    col = np.empty(len(records), dtype=object)
+    col[:] = list(map(attrgetter(attr), records))
+    return col
+
+
+def _mapped(col: np.ndarray, fn) -> np.ndarray:
+    """fn appliquée une fois par valeur distincte de la colonne."""
+    values = col.tolist()
+    table = {v: fn(v) for v in set(values)}
+    out = np.empty(len(values), dtype=object)
+    out[:] = list(map(table.__getitem__, values))
+    return out
+
+
+def _normalized(col: np.ndarray) -> np.ndarray:
+    return _mapped(col, lambda v: v.strip().lower())
+
+
+def _cmp_columns(gespot_col: np.ndarray, c6_col: np.ndarray, label: str):
+    """Version colonne de _cmp : (masque KO, statuts, détails)."""
+    ko = _normalized(gespot_col) != _normalized(c6_col)
+    statuts = np.where(ko, 'KO', 'OK').tolist()
+    details = [''] * len(ko)
+    for i in np.flatnonzero(ko).tolist():
+        details[i] = _cmp(gespot_col[i], c6_col[i], f'{label} GESPOT', f'{label} C6')[1]
+    return ko, statuts, details
+
+
+def _compare_columns(gespots: List[GespotRecord],
+                     c6s: List[C6Record]) -> List[ComparisonResult]:
+    """Compare deux listes alignées (même NUM au même rang), critère par critère."""
+    n = len(gespots)
+    if not n:
+        return []
+    nb_ecarts = np.zeros(n, dtype=np.int64)
+
+    # C1 adresse : égalité directe en colonne, règles de tolérance sur les écarts seulement
+    adr_gespot = np.empty(n, dtype=object)
+    adr_gespot[:] = list(map(_adresse_gespot, gespots))
+    adr_c6 = _column(c6s, 'adresse')
+    ko = _mapped(adr_gespot, str.lower) != _normalized(adr_c6)
+    statuts, details = np.where(ko, 'KO', 'OK').tolist(), [''] * n
+    for i in np.flatnonzero(ko).tolist():
+        statuts[i], details[i] = _compare_adresse(gespots[i], adr_c6[i])
+    nb_ecarts += np.array(statuts, dtype=object) == 'KO'
+    all_statuts, all_details = [statuts], [details]
+
+    # C2-C11
+    for _name, g_attr, c_attr, label in _CRITERIA:
+        if g_attr is None:
+            g_col = _mapped(_column(gespots, 'recalage_raw'), _recalage_to_vertic)
+        else:
+            g_col = _column(gespots, g_attr)
+        ko, statuts, details = _cmp_columns(g_col, _column(c6s, c_attr), label)
+        nb_ecarts += ko
+        all_statuts.append(statuts)
+        all_details.append(details)
+
+    results = []
+    for g, c, nb, statuts, details in zip(gespots, c6s, nb_ecarts.tolist(),
+                                          zip(*all_statuts), zip(*all_details)):
+        s_adr, s_ctr, s_typ, s_str, s_env, s_elc, s_ina, s_vtc, s_ylw, s_usb, s_ctv = statuts
+        d_adr, d_ctr, d_typ, d_str, d_env, d_elc, d_ina, d_vtc, d_ylw, d_usb, d_ctv = details
+        results.append(ComparisonResult(
+            num=g.num,
+            voie_gespot=g.voie, num_voie_gespot=g.num_voie,
+            adresse_c6=c.adresse, statut_adresse=s_adr, detail_adresse=d_adr,
+            centre_gespot=g.centre, centre_c6=c.centre, statut_centre=s_ctr, detail_centre=d_ctr,
+            type_gespot=g.type_calc, type_c6=c.type_c6, statut_type=s_typ, detail_type=d_typ,
+            strat_gespot=g.strategie_calc, strat_c6=c.strat, statut_strat=s_str, detail_strat=d_str,
+            env_gespot=g.milieu_calc, env_c6=c.env, statut_env=s_env, detail_env=d_env,
+            elec_gespot=g.pres_elect_calc, elec_c6=c.elec, statut_elec=s_elc, detail_elec=d_elc,
+            inacc_gespot=g.inacc_calc, inacc_c6=c.inacc, statut_inacc=s_ina, detail_inacc=d_ina,
+            recalage_gespot=g.recalage_raw,
+            vertic_c6=c.vertic, statut_vertic=s_vtc, detail_vertic=d_vtc,
+            yellow_gespot=g.etat_no_yellow, yellow_c6=c.yellow, statut_yellow=s_ylw, detail_yellow=d_ylw,
+            usable_gespot=g.etat_usable, usable_c6=c.usable, statut_usable=s_usb, detail_usable=d_usb,
+            ctrl_vis_gespot=g.ctrl_visuel, ctrl_vis_c6=c.ctrl_vis, statut_ctrl_vis=s_ctv, detail_ctrl_vis=d_ctv,
+            dist_elec_gespot=g.dist_elec,
+            nb_ecarts=nb,
+            statut_global='OK' if nb == 0 else 'KO',
+            source_gespot=g.source_file,
+            source_c6=c.source_file,
+        ))
+    return results
 
 
 def compare(gespot_result: GespotLoadResult,
@@ -471,10 +556,11 @@ def compare(gespot_result: GespotLoadResult,
     gespot_keys = set(gespot_result.records)
     c6_keys = set(c6_result.records)
 
-    for num in sorted(gespot_keys & c6_keys):
-        out.comparisons.append(
-            _compare_one(gespot_result.records[num], c6_result.records[num])
-        )
+    common = sorted(gespot_keys & c6_keys)
+    out.comparisons = _compare_columns(
+        [gespot_result.records[num] for num in common],
+        [c6_result.records[num] for num in common],
+    )
 
     for num in sorted(gespot_keys - c6_keys):
         out.absent_c6.append(gespot_result.records[num])
@@ -559,6 +645,7 @@ def _write_analyse(wb: openpyxl.Workbook,
         cell = ws.cell(row=1, column=col_idx, value=h)
         cell.fill = hfill
         cell.font = hfont
+    widths = _ColumnWidths(headers)
 
     fills = _fills()
     zebra = _PF('solid', fgColor='F2F2F2')
@@ -580,25 +667,27 @@ def _write_analyse(wb: openpyxl.Workbook,
             cmp.dist_elec_gespot, cmp.nb_ecarts, cmp.statut_global,
             cmp.source_gespot, cmp.source_c6,
         ]
+        widths.add(values)
         bg = zebra if row_idx % 2 == 0 else None
         for col_idx, val in enumerate(values, 1):
             cell = ws.cell(row=row_idx, column=col_idx, value=val)
             if bg and col_idx not in statut_cols and col_idx != nb_ko_col and col_idx != statut_global_col:
                 cell.fill = bg
         for col_idx in statut_cols | {statut_global_col}:
-            cell = ws.cell(row=row_idx, column=col_idx)
-            cell.fill = fills.get(str(cell.value), fills['KO'])
+            ws.cell(row=row_idx, column=col_idx).fill = fills.get(str(values[col_idx - 1]), fills['KO'])
         nb_cell = ws.cell(row=row_idx, column=nb_ko_col)
         nb_cell.fill = fills['KO'] if cmp.nb_ecarts > 0 else fills['OK']
 
     nb_ok = sum(1 for c in comparisons if c.statut_global == 'OK')
     nb_ko = len(comparisons) - nb_ok
     summary_row = len(comparisons) + 3
-    ws.cell(row=summary_row, column=1, value=f"Total: {len(comparisons)} appuis | {nb_ok} OK | {nb_ko} KO")
+    summary = f"Total: {len(comparisons)} appuis | {nb_ok} OK | {nb_ko} KO"
+    ws.cell(row=summary_row, column=1, value=summary)
     ws.cell(row=summary_row, column=1).font = Font(bold=True)
+    widths.add([summary])
 
     ws.freeze_panes = 'A2'
-    _auto_widths(ws)
+    widths.apply(ws)
 
 
 def _write_absent_c6(wb: openpyxl.Workbook,
@@ -608,12 +697,15 @@ def _write_absent_c6(wb: openpyxl.Workbook,
                'STRAT_GESPOT', 'ENV_GESPOT', 'ELEC_GESPOT',
                'INACC_GESPOT', 'RECALAGE', 'DIST_ELEC', 'SOURCE_GESPOT']
     _write_sheet_header(ws, headers)
+    widths = _ColumnWidths(headers)
     for r in records:
-        ws.append([r.num, r.voie, r.num_voie, r.centre, r.type_calc,
-                   r.strategie_calc, r.milieu_calc, r.pres_elect_calc,
-                   r.inacc_calc, r.recalage_raw, r.dist_elec, r.source_file])
+        values = [r.num, r.voie, r.num_voie, r.centre, r.type_calc,
+                  r.strategie_calc, r.milieu_calc, r.pres_elect_calc,
+                  r.inacc_calc, r.recalage_raw, r.dist_elec, r.source_file]
+        widths.add(values)
+        ws.append(values)
     ws.freeze_panes = 'A2'
-    _auto_widths(ws)
+    widths.apply(ws)
 
 
 def _write_absent_gespot(wb: openpyxl.Workbook,
@@ -622,11 +714,14 @@ def _write_absent_gespot(wb: openpyxl.Workbook,
     headers = ['NUM', 'ADRESSE_C6', 'CENTRE_C6', 'TYPE_C6', 'STRAT_C6',
                'ENV_C6', 'ELEC_C6', 'INACC_C6', 'VERTIC_C6', 'SOURCE_C6']
     _write_sheet_header(ws, headers)
+    widths = _ColumnWidths(headers)
     for r in records:
-        ws.append([r.num, r.adresse, r.centre, r.type_c6, r.strat,
-                   r.env, r.elec, r.inacc, r.vertic, r.source_file])
+        values = [r.num, r.adresse, r.centre, r.type_c6, r.strat,
+                  r.env, r.elec, r.inacc, r.vertic, r.source_file]
+        widths.add(values)
+        ws.append(values)
     ws.freeze_panes = 'A2'
-    _auto_widths(ws)
+    widths.apply(ws)
 
 
 def _write_anomalies(wb: openpyxl.Workbook,
@@ -635,12 +730,15 @@ def _write_anomalies(wb: openpyxl.Workbook,
     headers = ['SOURCE', 'FICHIER_CONCERNE', 'APPUI_CONCERNE', 'CODE_ANOMALIE',
                'EXPLICATION', 'ACTION_A_REALISER']
     _write_sheet_header(ws, headers)
+    widths = _ColumnWidths(headers)
     for a in anomalies:
-        ws.append([a.get('source', ''), a.get('fichier', ''),
-                   a.get('num', ''), a.get('type', ''),
-                   a.get('detail', ''), a.get('action', '')])
+        values = [a.get('source', ''), a.get('fichier', ''),
+                  a.get('num', ''), a.get('type', ''),
+                  a.get('detail', ''), a.get('action', '')]
+        widths.add(values)
+        ws.append(values)
     ws.freeze_panes = 'A2'
-    _auto_widths(ws)
+    widths.apply(ws)
 
 
 def _write_sheet_header(ws, headers: List[str]) -> None:
@@ -653,16 +751,25 @@ def _write_sheet_header(ws, headers: List[str]) -> None:
         cell.font = hfont
 
 
-def _auto_widths(ws, max_width: int = 50) -> None:
-    from openpyxl.utils import get_column_letter
-    for col in ws.columns:
-        width = max(
-            (len(str(cell.value or '')) for cell in col),
-            default=10,
-        )
-        ws.column_dimensions[get_column_letter(col[0].column)].width = min(
-            width + 2, max_width
-        )
+class _ColumnWidths:
+    """Largeur de colonne = plus long texte écrit (+2, plafonnée), suivie à l'écriture."""
+
+    def __init__(self, headers: List[str]):
+        self._widths = [len(str(h or '')) for h in headers]
+
+    def add(self, values: list) -> None:
+        widths = self._widths
+        if len(values) > len(widths):
+            widths.extend([0] * (len(values) - len(widths)))
+        for idx, val in enumerate(values):
+            size = len(str(val or ''))
+            if size > widths[idx]:
+                widths[idx] = size
+
+    def apply(self, ws, max_width: int = 50) -> None:
+        from openpyxl.utils import get_column_letter
+        for idx, width in enumerate(self._widths, 1):
+            ws.column_dimensions[get_column_letter(idx)].width = min(width + 2, max_width)
 
 
 # ===========================================================================
@@ -671,7 +778,8 @@ def _auto_widths(ws, max_width: int = 50) -> None:
 
 def run_comparison(gespot_dir: str, c6_dir: str,
                    export_dir: str,
-                   progress_cb=None) -> GespotC6Result:
+                   progress_cb=None,
+                   is_cancelled=None) -> GespotC6Result:
     """Orchestre lecture → comparaison → export.
 
     Args:
@@ -679,6 +787,7 @@ def run_comparison(gespot_dir: str, c6_dir: str,
         c6_dir:     Chemin du dossier C6 (= CAP FT).
         export_dir: Dossier de sortie.
         progress_cb: callable(pct, msg) optionnel.
+        is_cancelled: callable optionnel (annulation de la lecture GESPOT).
 
     Returns:
         GespotC6Result avec output_path renseigné.
@@ -691,8 +800,8 @@ def run_comparison(gespot_dir: str, c6_dir: str,
     c6_result = load_c6_dir(c6_dir)
 
     _prog(30, 'Lecture GESPOT...')
-    from .gespot_reader import load_gespot_dir
-    gespot_result = load_gespot_dir(gespot_dir, whitelist=c6_result.whitelist)
+    gespot_result = load_gespot_dir(gespot_dir, whitelist=c6_result.whitelist,
+                                    is_cancelled=is_cancelled)
 
     _prog(60, 'Comparaison...')
     result = compare(gespot_result, c6_result)
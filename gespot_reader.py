@@ -6,15 +6,24 @@ Responsabilité unique : parser les CSV GESPOT et appliquer les règles
 métier BR-01 à BR-06 (+ BR-03bis/ter, BR-04bis) pour produire des
 enregistrements comparables aux champs C6.
 
-Zéro dépendance QGIS - thread-safe.
+Zéro dépendance QGIS - thread-safe. Les fichiers sont lus par le pool de
+processus (process_pool) ; les enregistrements sont indexés par NUM au fil
+de l'eau, sans conserver les lignes des doublons.
 """
 
 import csv
+import hashlib
 import os
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Set, Tuple
+from operator import itemgetter
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
 
-from .core_utils import normalize_appui_num
+try:
+    from .core_utils import normalize_appui_num
+    from . import process_pool
+except ImportError:
+    from core_utils import normalize_appui_num
+    import process_pool
 
 _GESPOT_HEADER_MARKERS = {'NUM', 'CARAC1', 'CENTRE'}
 
@@ -43,6 +52,16 @@ _COL_ETAT_PT3 = 53
 _COL_DECLASS_PT3 = 54
 _COL_DIST_ELEC = 67
 
+# Colonnes lues par _build_record, extraites en un seul appel
+_USED_COLS = (
+    _COL_NUM, _COL_VOIE, _COL_NUM_VOIE, _COL_CENTRE, _COL_TYPE, _COL_STRATEGIQUE,
+    _COL_PRES_ELECT, _COL_SUPPORT_PC, _COL_INACC, _COL_RECALAGE, *_COL_CARAC, *_COL_ENV,
+    _COL_ETAT_PT1, _COL_DECLASS_PT1, _COL_ETAT_PT2, _COL_DECLASS_PT2,
+    _COL_ETAT_PT3, _COL_DECLASS_PT3, _COL_DIST_ELEC,
+)
+_ROW_WIDTH = max(_USED_COLS) + 1
+_pick_used = itemgetter(*_USED_COLS)
+
 _CODES_DECLASSE = {'00', '01'}
 _CODES_INACC_ENV = {'IN8', 'IN9'}
 
@@ -157,6 +176,106 @@ def _br06_calc_recalage(recalage_raw: str) -> str:
     return 'Oui'
 
 
+# ===========================================================================
+#  RÈGLES COMPILÉES (tables de correspondance mémorisées)
+# ===========================================================================
+
+def _memo_map(table: Dict, fn: Callable, keys: Iterable[tuple]) -> list:
+    """fn(*key) pour chaque clé, calculé une fois par tuple distinct."""
+    out = []
+    append = out.append
+    get = table.get
+    for key in keys:
+        value = get(key)
+        if value is None:
+            value = table[key] = fn(*key)
+        append(value)
+    return out
+
+
+class CompiledRules:
+    """Règles BR-01 à BR-05 (+ BR-04bis) compilées en tables par tuple d'entrée.
+
+    Les domaines d'entrée (type, CARAC, ENV, états...) sont de petites
+    énumérations : chaque combinaison distincte est évaluée une fois par les
+    fonctions _brXX, puis lue dans un dict. build_records applique les
+    règles colonne par colonne sur un lot de lignes.
+    """
+
+    def __init__(self, whitelist_upper: Iterable[str] = ()):
+        self.whitelist_upper = frozenset(whitelist_upper)
+        self._type: Dict[tuple, str] = {}
+        self._strategie: Dict[tuple, str] = {}
+        self._env: Dict[tuple, Tuple[str, bool]] = {}
+        self._etat: Dict[tuple, Tuple[str, str, str]] = {}
+        self._pres_elect: Dict[tuple, str] = {}
+        self._inacc: Dict[tuple, str] = {}
+
+    def _calc_type(self, type_raw, *caracs):
+        return _br01_calc_type(type_raw, list(caracs))
+
+    def _calc_strategie(self, strategique, support_pc, *caracs):
+        return _br02_calc_strategie(strategique, support_pc, list(caracs), self.whitelist_upper)
+
+    def _calc_env(self, *envs):
+        return _br03_calc_env(list(envs))
+
+    def _calc_etat(self, e1, d1, e2, d2, e3, d3):
+        return _br04_calc_etat([(e1, d1), (e2, d2), (e3, d3)])
+
+    def build_records(self, rows: Iterable[List[str]], source: str) -> List[GespotRecord]:
+        """GespotRecord de chaque ligne brute, règles évaluées par colonnes."""
+        values = []
+        for row in rows:
+            if len(row) < _ROW_WIDTH:
+                row = list(row) + [''] * (_ROW_WIDTH - len(row))
+            values.append([v.strip() for v in _pick_used(row)])
+        if not values:
+            return []
+        cols = list(zip(*values))
+        caracs = cols[10:15]
+
+        type_calc = _memo_map(self._type, self._calc_type, zip(cols[4], *caracs))
+        strategie = _memo_map(self._strategie, self._calc_strategie,
+                              zip(cols[5], cols[7], *caracs))
+        env = _memo_map(self._env, self._calc_env, zip(*cols[15:20]))
+        etat = _memo_map(self._etat, self._calc_etat, zip(*cols[20:26]))
+        pres_elect = _memo_map(self._pres_elect, _br04bis_calc_pres_elect, zip(cols[6]))
+        inacc = _memo_map(self._inacc, _br05_calc_inacc,
+                          zip(cols[8], (has_inacc for _m, has_inacc in env)))
+
+        return [
+            GespotRecord(
+                num=v[0], voie=v[1], num_voie=v[2], centre=v[3], dist_elec=v[26],
+                source_file=source,
+                type_calc=type_calc[i],
+                strategie_calc=strategie[i],
+                milieu_calc=env[i][0],
+                pres_elect_calc=pres_elect[i],
+                inacc_calc=inacc[i],
+                recalage_raw=v[9],
+                etat_no_yellow=etat[i][0],
+                etat_usable=etat[i][1],
+                ctrl_visuel=etat[i][2],
+            )
+            for i, v in enumerate(values)
+        ]
+
+
+_compiled: Dict[frozenset, CompiledRules] = {}
+
+
+def compiled_rules(whitelist_upper: Iterable[str] = ()) -> CompiledRules:
+    """Règles compilées pour une whitelist (tables conservées dans le processus)."""
+    key = frozenset(whitelist_upper)
+    rules = _compiled.get(key)
+    if rules is None:
+        if len(_compiled) >= 8:
+            _compiled.clear()
+        rules = _compiled[key] = CompiledRules(key)
+    return rules
+
+
 # ===========================================================================
 #  PARSING CSV
 # ===========================================================================
@@ -187,6 +306,62 @@ def _parse_one_csv(filepath: str) -> Tuple[List[List[str]], str]:
     raise ValueError(f"Impossible de decoder {filepath}")
 
 
+def _row_digest(row: List[str]) -> bytes:
+    """Empreinte d'une ligne brute (comparable entre processus, contrairement a hash())."""
+    return hashlib.blake2b('\x1f'.join(row).encode('utf-8'),
+                           digest_size=16).digest()
+
+
+def _read_gespot_file(item: Tuple[str, frozenset]) -> Dict:
+    """Lecture d'un CSV GESPOT (executable dans un processus de travail).
+
+    Args:
+        item: (chemin, whitelist en majuscules)
+
+    Returns:
+        dict: lignes [(num normalise, empreinte ligne, GespotRecord)] des appuis
+        avec NUM, erreur ('' si OK)
+    """
+    filepath, whitelist_upper = item
+    fname = os.path.basename(filepath)
+    try:
+        rows, _ = _parse_one_csv(filepath)
+    except Exception as e:
+        return {'lignes': [], 'erreur': str(e)}
+    keys, valid_rows = [], []
+    for row in rows:
+        num_raw = row[_COL_NUM].strip() if _COL_NUM < len(row) else ''
+        if not num_raw:
+            continue
+        num_key = normalize_appui_num(num_raw)
+        if num_key:
+            keys.append(num_key)
+            valid_rows.append(row)
+    records = compiled_rules(whitelist_upper).build_records(valid_rows, fname)
+    lignes = [(num_key, _row_digest(row), record)
+              for num_key, row, record in zip(keys, valid_rows, records)]
+    return {'lignes': lignes, 'erreur': ''}
+
+
+class _NumEntry:
+    """Occurrences d'un NUM : premier enregistrement, nombre, lignes toutes identiques ?"""
+
+    __slots__ = ('record', 'digest', 'count', 'identical', 'files')
+
+    def __init__(self, record: GespotRecord, digest: bytes):
+        self.record = record
+        self.digest = digest
+        self.count = 1
+        self.identical = True
+        self.files = {record.source_file}
+
+    def add(self, record: GespotRecord, digest: bytes) -> None:
+        self.count += 1
+        self.files.add(record.source_file)
+        if self.identical and digest != self.digest:
+            self.identical = False
+
+
 def _validate_header(header: Optional[List[str]]) -> bool:
     """Vérifie que le header contient les colonnes marqueurs GESPOT."""
     if not header:
@@ -198,39 +373,7 @@ def _validate_header(header: Optional[List[str]]) -> bool:
 def _build_record(row: List[str], source: str,
                   whitelist_upper: set) -> GespotRecord:
     """Construit un GespotRecord depuis une ligne CSV brute."""
-    def col(i):
-        return row[i].strip() if i < len(row) else ''
-
-    caracs = [col(i) for i in _COL_CARAC]
-    envs = [col(i) for i in _COL_ENV]
-    etat_pts = [
-        (col(_COL_ETAT_PT1), col(_COL_DECLASS_PT1)),
-        (col(_COL_ETAT_PT2), col(_COL_DECLASS_PT2)),
-        (col(_COL_ETAT_PT3), col(_COL_DECLASS_PT3)),
-    ]
-
-    milieu, has_inacc_env = _br03_calc_env(envs)
-    etat_no_yellow, etat_usable, ctrl_visuel = _br04_calc_etat(etat_pts)
-    num_voie_raw = col(_COL_NUM_VOIE)
-
-    return GespotRecord(
-        num=col(_COL_NUM),
-        voie=col(_COL_VOIE),
-        num_voie=num_voie_raw,
-        centre=col(_COL_CENTRE),
-        dist_elec=col(_COL_DIST_ELEC),
-        source_file=source,
-        type_calc=_br01_calc_type(col(_COL_TYPE), caracs),
-        strategie_calc=_br02_calc_strategie(
-            col(_COL_STRATEGIQUE), col(_COL_SUPPORT_PC), caracs, whitelist_upper),
-        milieu_calc=milieu,
-        pres_elect_calc=_br04bis_calc_pres_elect(col(_COL_PRES_ELECT)),
-        inacc_calc=_br05_calc_inacc(col(_COL_INACC), has_inacc_env),
-        recalage_raw=col(_COL_RECALAGE),
-        etat_no_yellow=etat_no_yellow,
-        etat_usable=etat_usable,
-        ctrl_visuel=ctrl_visuel,
-    )
+    return compiled_rules(whitelist_upper).build_records([row], source)[0]
 
 
 # ===========================================================================
@@ -238,12 +381,14 @@ def _build_record(row: List[str], source: str,
 # ===========================================================================
 
 def load_gespot_dir(gespot_dir: str,
-                   whitelist: Optional[set] = None) -> GespotLoadResult:
+                   whitelist: Optional[set] = None,
+                   is_cancelled: Optional[Callable[[], bool]] = None) -> GespotLoadResult:
     """Charge tous les CSV d'un répertoire GESPOT.
 
     Args:
         gespot_dir: Chemin absolu du dossier GESPOT/GSPOT.
         whitelist:  Ensemble de codes stratégie valides (depuis Bases col M).
+        is_cancelled: callable optionnel (annulation de la tâche)
 
     Returns:
         GespotLoadResult avec records indexés par NUM, anomalies, compteurs.
@@ -286,19 +431,24 @@ def load_gespot_dir(gespot_dir: str,
         })
         return result
 
-    raw_by_num: Dict[str, List[dict]] = {}
+    by_num: Dict[str, _NumEntry] = {}
+    whitelist_frozen = frozenset(whitelist_upper)
+    lectures = process_pool.map_ordered(
+        _read_gespot_file,
+        [(os.path.join(gespot_dir, f), whitelist_frozen) for f in csv_files],
+        is_cancelled,
+    )
 
-    for fname in csv_files:
-        path = os.path.join(gespot_dir, fname)
-        try:
-            rows, _ = _parse_one_csv(path)
-        except Exception as e:
+    for fname, lecture in zip(csv_files, lectures):
+        if lecture is None:
+            continue
+        if lecture['erreur']:
             result.anomalies.append({
                 'source': 'GESPOT', 'fichier': fname, 'num': '',
                 'type': 'FICHIER_IGNORE',
                 'detail': (
                     f"Le fichier GESPOT '{fname}' n'a pas pu etre lu comme CSV exploitable "
-                    f"({e})"
+                    f"({lecture['erreur']})"
                 ),
                 'action': (
                     f"Verifier le separateur ';', l'encodage et la structure du fichier '{fname}', "
@@ -307,42 +457,34 @@ def load_gespot_dir(gespot_dir: str,
             })
             continue
 
-        valid = 0
-        for row in rows:
-            num_raw = row[_COL_NUM].strip() if _COL_NUM < len(row) else ''
-            if not num_raw:
-                continue
-            num_key = normalize_appui_num(num_raw)
-            if not num_key:
-                continue
-            valid += 1
-            raw_by_num.setdefault(num_key, []).append({'row': row, 'file': fname})
-
-        result.file_counts[fname] = valid
-
-    _resolve_duplicates(raw_by_num, result, whitelist_upper)
+        for num_key, digest, record in lecture['lignes']:
+            entry = by_num.get(num_key)
+            if entry is None:
+                by_num[num_key] = _NumEntry(record, digest)
+            else:
+                entry.add(record, digest)
+
+        result.file_counts[fname] = len(lecture['lignes'])
+
+    _resolve_duplicates(by_num, result)
     return result
 
 
-def _resolve_duplicates(raw_by_num: Dict[str, List[dict]],
-                        result: GespotLoadResult,
-                        whitelist_upper: set) -> None:
+def _resolve_duplicates(by_num: Dict[str, _NumEntry],
+                        result: GespotLoadResult) -> None:
     """Résout les doublons NUM et alimente records + anomalies."""
-    for num, entries in raw_by_num.items():
-        if len(entries) == 1:
-            rec = _build_record(entries[0]['row'], entries[0]['file'], whitelist_upper)
-            result.records[num] = rec
+    for num, entry in by_num.items():
+        if entry.count == 1:
+            result.records[num] = entry.record
             continue
 
-        payloads = [str(e['row']) for e in entries]
-        if len(set(payloads)) == 1:
-            rec = _build_record(entries[0]['row'], entries[0]['file'], whitelist_upper)
-            result.records[num] = rec
+        if entry.identical:
+            result.records[num] = entry.record
             result.anomalies.append({
-                'source': 'GESPOT', 'fichier': entries[0]['file'], 'num': num,
+                'source': 'GESPOT', 'fichier': entry.record.source_file, 'num': num,
                 'type': 'DOUBLON_IDENTIQUE',
                 'detail': (
-                    f"L'appui {num} apparait {len(entries)} fois dans la source GESPOT "
+                    f"L'appui {num} apparait {entry.count} fois dans la source GESPOT "
                     f"avec exactement les memes valeurs. Une seule version a ete conservee automatiquement"
                 ),
                 'action': (
@@ -351,12 +493,12 @@ def _resolve_duplicates(raw_by_num: Dict[str, List[dict]],
                 ),
             })
         else:
-            files = ', '.join(sorted({e['file'] for e in entries}))
+            files = ', '.join(sorted(entry.files))
             result.anomalies.append({
                 'source': 'GESPOT', 'fichier': files, 'num': num,
                 'type': 'DOUBLON_CONFLICTUEL',
                 'detail': (
-                    f"L'appui {num} apparait {len(entries)} fois dans GESPOT avec des valeurs "
+                    f"L'appui {num} apparait {entry.count} fois dans GESPOT avec des valeurs "
                     f"differentes. Le plugin ne peut pas choisir automatiquement la bonne ligne"
                 ),
                 'action': (
@@ -10,6 +10,11 @@ Tables utilisees (sur ~30 dans le format GraceTHD):
   SHP: t_noeud, t_cableline, t_cheminement
   CSV: t_cable, t_ptech, t_ebp
 
+SHP lus par shp_reader (lecteur natif, champs utiles uniquement) : pas de
+fournisseur OGR ni de QgsFeature conserves en memoire. Au premier usage, les
+tables sont importees dans un GeoPackage local (gracethd_store) valide par
+l'empreinte des fichiers sources ; les lectures suivantes passent par lui.
+
 Jointures:
   Cables:  t_cable.csv JOIN t_cableline.shp ON cl_cb_code = cb_code
   BPE:     t_ebp.csv JOIN t_ptech.csv ON bp_pt_code = pt_code
@@ -19,6 +24,8 @@ Jointures:
 
 import csv
 import os
+import sqlite3
+import struct
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple
 
@@ -29,10 +36,16 @@ from qgis.core import (
     QgsFeature,
     QgsGeometry,
     QgsField,
+    QgsPointXY,
 )
 from qgis.PyQt.QtCore import QVariant
 
 from .db_connection import CableSegment
+from .core_utils import get_profile_cache_dir
+from .csv_table import CsvTable, read_csv_table
+from .gracethd_store import GraceTHDStore, remove_stale_stores, store_fingerprint, store_path
+from .module_fingerprint import DigestCache
+from .shp_reader import ShapeTable, read_shapefile
 from .compat import MSG_INFO, MSG_WARNING, MSG_CRITICAL, FIELD_TYPE_STRING
 
 
@@ -44,12 +57,51 @@ _REQUIRED_FILES = ['t_noeud.shp', 't_cableline.shp']
 _OPTIONAL_FILES = ['t_cable.csv', 't_ptech.csv', 't_ebp.csv', 't_cheminement.shp']
 
 _CSV_DELIMITER = ';'
-_CSV_ENCODING = 'utf-8'
+
+# Colonnes lues (et index construits a la lecture) par table CSV
+_CSV_FIELDS = {
+    't_cable.csv': ('cb_code', 'cb_etiquet', 'cb_typelog', 'cb_capafo', 'cb_modulo',
+                    'cb_nd1', 'cb_nd2'),
+    't_ptech.csv': ('pt_code', 'pt_nd_code', 'pt_typephy', 'pt_etiquet', 'pt_nature',
+                    'pt_prop', 'pt_prop_do', 'pt_comment', 'pt_etat'),
+    't_ebp.csv': ('bp_etiquet', 'bp_pt_code', 'bp_typelog', 'bp_typephy', 'bp_codeext'),
+}
+_CSV_INDEXES = {
+    't_ptech.csv': ('pt_code', 'pt_nd_code'),
+}
+
+# Cles de jointure indexees en SQL dans le GeoPackage d'import
+_STORE_KEYS = {
+    't_noeud': ('nd_code',),
+    't_cableline': ('cl_cb_code',),
+    't_cable': ('cb_code',),
+    't_ptech': ('pt_code', 'pt_nd_code'),
+    't_ebp': ('bp_pt_code',),
+}
+
+# Colonnes filtrees par les chargeurs, evaluees en SQL sur l'import (upper())
+_STORE_FILTERS = {
+    't_cable': ('cb_typelog',),
+    't_ptech': ('pt_typephy',),
+    't_ebp': ('bp_typelog',),
+}
 
 _LOG_TAG = 'PoleAerien'
 
 _PLACEHOLDER_ETIQUETS = {'OO-XXXX-XXXX', 'CDAXX_REF-PTO'}
 
+_CHEMINEMENT_FIELDS = (
+    'cm_code', 'cm_ndcode1', 'cm_ndcode2', 'cm_avct', 'cm_typlog', 'cm_typ_imp',
+    'cm_compo', 'cm_comment', 'cm_long', 'cm_prop', 'cm_prop_do',
+)
+
+# Champs lus par table SHP
+_SHP_FIELDS = {
+    't_noeud.shp': ('nd_code', 'nd_codeext'),
+    't_cableline.shp': ('cl_cb_code', 'cl_long'),
+    't_cheminement.shp': _CHEMINEMENT_FIELDS,
+}
+
 
 # ---------------------------------------------------------------------------
 #  Validation result
@@ -77,61 +129,72 @@ class GraceTHDValidation:
 #  CSV loader (pure Python, no QGIS dependency)
 # ---------------------------------------------------------------------------
 
-def _load_csv(filepath: str) -> List[Dict[str, str]]:
-    """Load a semicolon-delimited CSV into a list of dicts.
+def _load_csv(filepath: str, field_names: Optional[Tuple[str, ...]] = None,
+              index_fields: Tuple[str, ...] = ()) -> CsvTable:
+    """Load a semicolon-delimited CSV as columns (requested fields only).
 
-    Tries utf-8 first, falls back to latin-1 (ISO 8859-1) which accepts
-    all byte values and is the encoding used by some GraceTHD exports.
+    Encoding detected once on a prefix sample: utf-8, else latin-1
+    (ISO 8859-1, used by some GraceTHD exports, accepts all byte values).
     """
     if not os.path.isfile(filepath):
-        return []
-    for enc in ('utf-8', 'latin-1'):
-        try:
-            with open(filepath, 'r', encoding=enc) as f:
-                rows = list(csv.DictReader(f, delimiter=_CSV_DELIMITER))
-            if rows:
-                QgsMessageLog.logMessage(
-                    f"CSV {os.path.basename(filepath)}: {len(rows)} lignes, encoding={enc}",
-                    _LOG_TAG, MSG_INFO
-                )
-            return rows
-        except UnicodeDecodeError:
-            continue
-    QgsMessageLog.logMessage(
-        f"CSV {os.path.basename(filepath)}: echec lecture (utf-8 + latin-1)",
-        _LOG_TAG, MSG_WARNING
-    )
-    return []
+        return CsvTable({}, 0)
+    try:
+        table = read_csv_table(filepath, field_names, index_fields, delimiter=_CSV_DELIMITER)
+    except (OSError, csv.Error) as e:
+        QgsMessageLog.logMessage(
+            f"CSV {os.path.basename(filepath)}: echec lecture ({e})",
+            _LOG_TAG, MSG_WARNING
+        )
+        return CsvTable({}, 0)
+    if len(table):
+        QgsMessageLog.logMessage(
+            f"CSV {os.path.basename(filepath)}: {len(table)} lignes, encoding={table.encoding}",
+            _LOG_TAG, MSG_INFO
+        )
+    return table
 
 
 # ---------------------------------------------------------------------------
-#  SHP loader (via QgsVectorLayer OGR provider)
+#  SHP loader (shp_reader, no OGR provider)
 # ---------------------------------------------------------------------------
 
-def _load_shp_features(filepath: str) -> List[QgsFeature]:
-    """Load all features from a shapefile. Returns empty list on failure."""
+def _load_shp(filepath: str, field_names: Optional[Tuple[str, ...]] = None) -> Optional[ShapeTable]:
+    """Load a shapefile (requested fields only). Returns None on failure."""
     if not os.path.isfile(filepath):
-        return []
-    layer = QgsVectorLayer(filepath, os.path.basename(filepath), 'ogr')
-    if not layer.isValid():
+        return None
+    try:
+        return read_shapefile(filepath, field_names)
+    except (OSError, ValueError, IndexError, struct.error) as e:
         QgsMessageLog.logMessage(
-            f"GraceTHD: impossible de charger {filepath}",
+            f"GraceTHD: impossible de charger {filepath} ({e})",
             _LOG_TAG, MSG_WARNING
         )
-        return []
-    features = list(layer.getFeatures())
-    del layer
-    return features
+        return None
+
+
+def _table_geometry(table: ShapeTable, idx: int) -> Optional[QgsGeometry]:
+    """QgsGeometry built from the record coordinate arrays (no WKT round-trip)."""
+    parts = table.parts(idx)
+    if not parts:
+        return None
+    if table.geometry_kind == 'point':
+        x, y = parts[0][0].tolist()
+        return QgsGeometry.fromPointXY(QgsPointXY(x, y))
+    lines = [[QgsPointXY(x, y) for x, y in part.tolist()] for part in parts]
+    if table.geometry_kind == 'multipoint':
+        return QgsGeometry.fromMultiPointXY([line[0] for line in lines])
+    return QgsGeometry.fromMultiPolylineXY(lines)
 
 
-def _load_shp_as_dict(filepath: str, key_field: str) -> Dict[str, QgsFeature]:
-    """Load SHP and index features by a unique key field."""
-    features = _load_shp_features(filepath)
+def _index_by_field(table: Optional[ShapeTable], key_field: str) -> Dict[str, int]:
+    """Index shapefile records by a unique key field: {key: record index}."""
     result = {}
-    for feat in features:
-        key = str(feat[key_field]).strip() if feat[key_field] else ''
+    if table is None:
+        return result
+    for idx, value in enumerate(table.column(key_field)):
+        key = str(value).strip() if value else ''
         if key:
-            result[key] = feat
+            result[key] = idx
     return result
 
 
@@ -152,14 +215,121 @@ class GraceTHDReader:
         poteaux = reader.load_poteaux()
     """
 
-    def __init__(self, gracethd_dir: str):
+    def __init__(self, gracethd_dir: str, use_store: bool = True):
         self._dir = gracethd_dir
-        self._noeuds: Optional[Dict[str, QgsFeature]] = None
-        self._ptech_cache: Optional[List[Dict[str, str]]] = None
+        self._use_store = use_store
+        self._store: Optional[GraceTHDStore] = None
+        self._store_checked = False
+        self._shapes: Dict[str, Optional[ShapeTable]] = {}
+        self._noeuds: Optional[Dict[str, int]] = None
+        self._noeud_table: Optional[ShapeTable] = None
+        # t_cableline lu une fois, partage par load_cables_as_segments/with_nodes
+        self._cablelines: Optional[ShapeTable] = None
+        self._cableline_idx: Optional[Dict[str, int]] = None
+        self._csv_tables: Dict[str, CsvTable] = {}
+        self._ptech_by_nd_cache: Optional[Dict[str, str]] = None
 
     def _path(self, filename: str) -> str:
         return os.path.join(self._dir, filename)
 
+    # ------------------------------------------------------------------
+    #  Local GeoPackage import (one-time conversion of the delivery)
+    # ------------------------------------------------------------------
+
+    def _ensure_store(self) -> Optional[GraceTHDStore]:
+        """GeoPackage import of this delivery, created on first use (None if disabled/failed)."""
+        if not self._store_checked:
+            self._store_checked = True
+            if self._use_store and os.path.isfile(self._path('t_noeud.shp')):
+                self._store = self._open_store()
+        return self._store
+
+    def _source_digests(self, digests: DigestCache) -> Dict[str, str]:
+        sources = {}
+        for filename in (*_SHP_FIELDS, *_CSV_FIELDS):
+            stem, ext = os.path.splitext(filename)
+            for source_ext in (('.shp', '.dbf', '.cpg') if ext == '.shp' else (ext,)):
+                path = self._path(stem + source_ext)
+                if os.path.isfile(path):
+                    sources[stem + source_ext] = digests.digest(path)
+        return sources
+
+    def _open_store(self) -> Optional[GraceTHDStore]:
+        """Reuse the GeoPackage matching the source file hashes, else import the delivery."""
+        cache_dir = get_profile_cache_dir('gracethd')
+        digests = DigestCache(os.path.join(cache_dir, 'digests.json'))
+        try:
+            sources = self._source_digests(digests)
+            digests.save()
+        except OSError as e:
+            QgsMessageLog.logMessage(
+                f"GraceTHD: empreinte des sources impossible ({e}), lecture directe",
+                _LOG_TAG, MSG_WARNING
+            )
+            return None
+        fingerprint = store_fingerprint(sources, {'shp': _SHP_FIELDS, 'csv': _CSV_FIELDS})
+        path = store_path(cache_dir, self._dir, fingerprint)
+
+        store = GraceTHDStore.open(path, fingerprint)
+        if store is not None:
+            QgsMessageLog.logMessage(
+                f"GraceTHD: import local reutilise ({os.path.basename(path)})",
+                _LOG_TAG, MSG_INFO
+            )
+            return store
+
+        # First run on this delivery: parse the sources once, keep them for this reader
+        shapes, tables = {}, {}
+        for filename, fields in _SHP_FIELDS.items():
+            self._shapes[filename] = _load_shp(self._path(filename), fields)
+            shapes[os.path.splitext(filename)[0]] = self._shapes[filename]
+        for filename in _CSV_FIELDS:
+            if os.path.isfile(self._path(filename)):
+                tables[os.path.splitext(filename)[0]] = self._ensure_csv(filename)
+        try:
+            store = GraceTHDStore.create(path, fingerprint, shapes, tables, _STORE_KEYS, _STORE_FILTERS)
+        except (OSError, sqlite3.Error) as e:
+            QgsMessageLog.logMessage(
+                f"GraceTHD: import GeoPackage impossible ({e}), lecture directe",
+                _LOG_TAG, MSG_WARNING
+            )
+            return None
+        remove_stale_stores(cache_dir, self._dir, keep=path)
+        QgsMessageLog.logMessage(
+            f"GraceTHD: livrable importe dans {path}",
+            _LOG_TAG, MSG_INFO
+        )
+        return store
+
+    def _shape(self, filename: str) -> Optional[ShapeTable]:
+        """SHP table (useful fields), from the local import when available, cached per reader."""
+        if filename in self._shapes:
+            return self._shapes[filename]
+        store = self._ensure_store()
+        if filename in self._shapes:
+            # Import just done: sources already parsed by this reader
+            return self._shapes[filename]
+        table = None
+        if store is not None:
+            try:
+                table = store.shape_table(os.path.splitext(filename)[0])
+            except sqlite3.Error as e:
+                QgsMessageLog.logMessage(
+                    f"GraceTHD: lecture {filename} depuis l'import impossible ({e})",
+                    _LOG_TAG, MSG_WARNING
+                )
+                store = None
+        if store is None:
+            table = _load_shp(self._path(filename), _SHP_FIELDS[filename])
+        self._shapes[filename] = table
+        return table
+
+    def table(self, filename: str):
+        """Raw delivery table: CsvTable for a CSV, Optional[ShapeTable] for a SHP."""
+        if filename.endswith('.shp'):
+            return self._shape(filename)
+        return self._ensure_csv(filename)
+
     # ------------------------------------------------------------------
     #  Validation
     # ------------------------------------------------------------------
@@ -189,33 +359,79 @@ class GraceTHDReader:
     #  Noeuds (lazy-loaded, shared across load methods)
     # ------------------------------------------------------------------
 
-    def _ensure_noeuds(self) -> Dict[str, QgsFeature]:
-        """Load t_noeud.shp once, index by nd_code."""
+    def _ensure_noeuds(self) -> Dict[str, int]:
+        """Load t_noeud.shp once, index records by nd_code."""
         if self._noeuds is None:
-            self._noeuds = _load_shp_as_dict(
-                self._path('t_noeud.shp'), 'nd_code'
-            )
+            self._noeud_table = self._shape('t_noeud.shp')
+            self._noeuds = _index_by_field(self._noeud_table, 'nd_code')
             QgsMessageLog.logMessage(
                 f"t_noeud: {len(self._noeuds)} noeuds charges",
                 _LOG_TAG, MSG_INFO
             )
         return self._noeuds
 
-    def _ensure_ptech(self) -> List[Dict[str, str]]:
-        """Load t_ptech.csv once, cache for reuse across load methods."""
-        if self._ptech_cache is None:
-            self._ptech_cache = _load_csv(self._path('t_ptech.csv'))
-        return self._ptech_cache
+    def _ensure_cablelines(self) -> Tuple[Optional[ShapeTable], Dict[str, int]]:
+        """Load t_cableline.shp once (coordinate arrays), index records by cl_cb_code."""
+        if self._cableline_idx is None:
+            self._cablelines = self._shape('t_cableline.shp')
+            self._cableline_idx = _index_by_field(self._cablelines, 'cl_cb_code')
+        return self._cablelines, self._cableline_idx
+
+    def _ensure_csv(self, filename: str) -> CsvTable:
+        """Load a GraceTHD CSV once (useful columns + key indexes), cache per reader."""
+        table = self._csv_tables.get(filename)
+        if table is not None:
+            return table
+        store = self._ensure_store() if filename in _CSV_FIELDS else None
+        table = self._csv_tables.get(filename)
+        if table is None and store is not None:
+            try:
+                table = store.csv_table(
+                    os.path.splitext(filename)[0], _CSV_INDEXES.get(filename, ())
+                )
+                if table is None:
+                    table = CsvTable({}, 0)
+            except sqlite3.Error as e:
+                QgsMessageLog.logMessage(
+                    f"GraceTHD: lecture {filename} depuis l'import impossible ({e})",
+                    _LOG_TAG, MSG_WARNING
+                )
+        if table is None:
+            table = _load_csv(
+                self._path(filename), _CSV_FIELDS.get(filename), _CSV_INDEXES.get(filename, ())
+            )
+        self._csv_tables[filename] = table
+        return table
+
+    def rows_where(self, filename: str, column: str, values) -> List[int]:
+        """Rows of a CSV whose column (upper-cased) is in values: SQL on the import, else scan."""
+        table = self._ensure_csv(filename)
+        if self._store is not None:
+            try:
+                rows = self._store.rows_where(os.path.splitext(filename)[0], column, values)
+                if rows is not None:
+                    return rows
+            except sqlite3.Error as e:
+                QgsMessageLog.logMessage(
+                    f"GraceTHD: filtre {filename}.{column} depuis l'import impossible ({e})",
+                    _LOG_TAG, MSG_WARNING
+                )
+        wanted = {v.upper() for v in values}
+        column_values = table.column(column)
+        return [i for i in range(len(table)) if column_values[i].upper() in wanted]
+
+    def _ensure_ptech(self) -> CsvTable:
+        """t_ptech.csv, shared across load methods."""
+        return self._ensure_csv('t_ptech.csv')
 
     def _ensure_ptech_by_nd(self) -> Dict[str, str]:
         """Build nd_code -> pt_typephy index from t_ptech.csv (cached)."""
-        if not hasattr(self, '_ptech_by_nd_cache') or self._ptech_by_nd_cache is None:
+        if self._ptech_by_nd_cache is None:
             ptech = self._ensure_ptech()
-            self._ptech_by_nd_cache = {}
-            for row in ptech:
-                nd = row.get('pt_nd_code', '').strip()
-                if nd:
-                    self._ptech_by_nd_cache[nd] = row.get('pt_typephy', '').upper()
+            typephy = ptech.column('pt_typephy')
+            self._ptech_by_nd_cache = {
+                nd: typephy[idx].upper() for nd, idx in ptech.index('pt_nd_code').items()
+            }
         return self._ptech_by_nd_cache
 
     def _determine_posemode(self, cb_nd1: str, cb_nd2: str) -> int:
@@ -240,19 +456,25 @@ class GraceTHDReader:
 
     def _noeud_geom_wkt(self, nd_code: str) -> str:
         """Get WKT geometry for a noeud code, or '' if not found."""
-        noeuds = self._ensure_noeuds()
-        feat = noeuds.get(nd_code)
-        if feat and feat.hasGeometry():
-            return feat.geometry().asWkt()
+        idx = self._ensure_noeuds().get(nd_code)
+        if idx is not None and self._noeud_table.has_geometry(idx):
+            return self._noeud_table.wkt(idx)
         return ''
 
     def _noeud_geom(self, nd_code: str) -> Optional[QgsGeometry]:
         """Get QgsGeometry for a noeud code."""
-        noeuds = self._ensure_noeuds()
-        feat = noeuds.get(nd_code)
-        if feat and feat.hasGeometry():
-            return QgsGeometry(feat.geometry())
-        return None
+        idx = self._ensure_noeuds().get(nd_code)
+        if idx is None:
+            return None
+        return _table_geometry(self._noeud_table, idx)
+
+    def _noeud_codeext(self, nd_code: str) -> str:
+        """nd_codeext of a noeud, or '' if absent."""
+        idx = self._ensure_noeuds().get(nd_code)
+        if idx is None:
+            return ''
+        value = self._noeud_table.value(idx, 'nd_codeext')
+        return str(value).strip() if value else ''
 
     # ------------------------------------------------------------------
     #  Cables  (P1-2)
@@ -267,45 +489,40 @@ class GraceTHDReader:
         Returns:
             List of CableSegment compatible with cable_analyzer pipeline.
         """
-        # 1. Load t_cableline.shp indexed by cl_cb_code
-        cableline_feats = _load_shp_as_dict(
-            self._path('t_cableline.shp'), 'cl_cb_code'
-        )
+        # 1. t_cableline.shp indexed by cl_cb_code (loaded once per reader)
+        cableline, cableline_idx = self._ensure_cablelines()
 
         # 2. Load t_cable.csv
-        cables_csv = _load_csv(self._path('t_cable.csv'))
+        cables = self._ensure_csv('t_cable.csv')
 
         # 3. Filter by typelog
+        rows = range(len(cables))
         if typelog_filter:
-            cables_csv = [
-                r for r in cables_csv
-                if r.get('cb_typelog', '').upper() == typelog_filter.upper()
-            ]
+            rows = self.rows_where('t_cable.csv', 'cb_typelog', (typelog_filter,))
 
         # 4. Join and produce CableSegment
         segments = []
         missing_geom = 0
         skipped_placeholder = 0
 
-        for idx, row in enumerate(cables_csv):
-            cb_etiquet = row.get('cb_etiquet', '').strip()
+        for idx, i in enumerate(rows):
+            cb_etiquet = cables.get(i, 'cb_etiquet', '').strip()
             if cb_etiquet in _PLACEHOLDER_ETIQUETS:
                 skipped_placeholder += 1
                 continue
 
-            cb_code = row.get('cb_code', '')
-            cl_feat = cableline_feats.get(cb_code)
+            cb_code = cables.get(i, 'cb_code', '')
+            cl_idx = cableline_idx.get(cb_code)
 
-            if not cl_feat or not cl_feat.hasGeometry():
+            if cl_idx is None or not cableline.has_geometry(cl_idx):
                 missing_geom += 1
                 continue
 
-            geom = cl_feat.geometry()
-            geom_wkt = geom.asWkt()
-            length = geom.length() if geom else 0.0
+            geom_wkt = cableline.wkt(cl_idx)
+            length = cableline.length(cl_idx)
 
             # cl_long from cableline (may be more accurate)
-            cl_long = cl_feat['cl_long']
+            cl_long = cableline.value(cl_idx, 'cl_long')
             try:
                 if cl_long and float(cl_long) > 0:
                     length = float(cl_long)
@@ -313,14 +530,14 @@ class GraceTHDReader:
                 pass
 
             cab_capa = 0
-            raw_capa = row.get('cb_capafo', '0')
+            raw_capa = cables.get(i, 'cb_capafo', '0')
             try:
                 cab_capa = int(raw_capa)
             except (ValueError, TypeError):
                 pass
 
-            cb_nd1 = row.get('cb_nd1', '').strip()
-            cb_nd2 = row.get('cb_nd2', '').strip()
+            cb_nd1 = cables.get(i, 'cb_nd1', '').strip()
+            cb_nd2 = cables.get(i, 'cb_nd2', '').strip()
             posemode = self._determine_posemode(cb_nd1, cb_nd2)
 
             segment = CableSegment(
@@ -330,16 +547,16 @@ class GraceTHDReader:
                 sro='',
                 nro='',
                 length=length,
-                cab_type='CDI' if typelog_filter == 'DI' else row.get('cb_typelog', ''),
+                cab_type='CDI' if typelog_filter == 'DI' else cables.get(i, 'cb_typelog', ''),
                 cab_capa=cab_capa,
-                cab_modulo=int(row.get('cb_modulo', '0') or '0'),
+                cab_modulo=int(cables.get(i, 'cb_modulo', '0') or '0'),
                 isole='',
                 date_modif='',
                 modif_par='',
                 cab_nature='',
                 commentaire='',
                 collecte='',
-                cb_etiquet=row.get('cb_etiquet', ''),
+                cb_etiquet=cables.get(i, 'cb_etiquet', ''),
                 fon='',
                 projet='',
                 dce='',
@@ -369,7 +586,7 @@ class GraceTHDReader:
         )
         QgsMessageLog.logMessage(
             f"GraceTHD cables: {len(segments)} segments {typelog_filter} charges "
-            f"({len(cables_csv)} filtres, {missing_geom} sans geom, "
+            f"({len(rows)} filtres, {missing_geom} sans geom, "
             f"{skipped_placeholder} placeholders exclus) | "
             f"Capacites: [{capas_str}] | Posemode: [{pm_str}]",
             _LOG_TAG, MSG_INFO
@@ -399,41 +616,37 @@ class GraceTHDReader:
              nd1_geom: QgsGeometry|None, nd2_geom: QgsGeometry|None,
              cable_geom: QgsGeometry, cable_length: float}
         """
-        cableline_feats = _load_shp_as_dict(
-            self._path('t_cableline.shp'), 'cl_cb_code'
-        )
-        cables_csv = _load_csv(self._path('t_cable.csv'))
+        cableline, cableline_idx = self._ensure_cablelines()
+        cables = self._ensure_csv('t_cable.csv')
         self._ensure_noeuds()
 
+        rows = range(len(cables))
         if typelog_filter:
-            cables_csv = [
-                r for r in cables_csv
-                if r.get('cb_typelog', '').upper() == typelog_filter.upper()
-            ]
+            rows = self.rows_where('t_cable.csv', 'cb_typelog', (typelog_filter,))
 
         result = []
         missing_geom = 0
 
-        for row in cables_csv:
-            cb_etiquet = row.get('cb_etiquet', '').strip()
+        for i in rows:
+            cb_etiquet = cables.get(i, 'cb_etiquet', '').strip()
             if cb_etiquet in _PLACEHOLDER_ETIQUETS:
                 continue
 
-            cb_code = row.get('cb_code', '')
-            cl_feat = cableline_feats.get(cb_code)
-            if not cl_feat or not cl_feat.hasGeometry():
+            cb_code = cables.get(i, 'cb_code', '')
+            cl_idx = cableline_idx.get(cb_code)
+            if cl_idx is None or not cableline.has_geometry(cl_idx):
                 missing_geom += 1
                 continue
 
-            cable_geom = QgsGeometry(cl_feat.geometry())
-            cable_length = cable_geom.length()
+            cable_geom = _table_geometry(cableline, cl_idx)
+            cable_length = cableline.length(cl_idx)
 
-            cb_nd1 = row.get('cb_nd1', '').strip()
-            cb_nd2 = row.get('cb_nd2', '').strip()
+            cb_nd1 = cables.get(i, 'cb_nd1', '').strip()
+            cb_nd2 = cables.get(i, 'cb_nd2', '').strip()
 
             cab_capa = 0
             try:
-                cab_capa = int(row.get('cb_capafo', '0'))
+                cab_capa = int(cables.get(i, 'cb_capafo', '0'))
             except (ValueError, TypeError):
                 pass
 
@@ -441,7 +654,7 @@ class GraceTHDReader:
 
             result.append({
                 'cb_code': cb_code,
-                'cb_etiquet': row.get('cb_etiquet', ''),
+                'cb_etiquet': cables.get(i, 'cb_etiquet', ''),
                 'cab_capa': cab_capa,
                 'posemode': posemode,
                 'cb_nd1': cb_nd1,
@@ -475,19 +688,16 @@ class GraceTHDReader:
             compatible with db_connection.query_bpe_by_sro() output.
         """
         # 1. Load t_ptech.csv indexed by pt_code
-        ptech_csv = self._ensure_ptech()
-        ptech_by_code = {r['pt_code']: r for r in ptech_csv if r.get('pt_code')}
+        ptech = self._ensure_ptech()
+        ptech_by_code = ptech.index('pt_code')
 
         # 2. Load t_ebp.csv
-        ebp_csv = _load_csv(self._path('t_ebp.csv'))
+        ebp = self._ensure_csv('t_ebp.csv')
 
         # 3. Filter by typelog
+        rows = range(len(ebp))
         if typelog_filter:
-            ebp_csv = [
-                r for r in ebp_csv
-                if r.get('bp_typelog', '').upper() in
-                   tuple(t.upper() for t in typelog_filter)
-            ]
+            rows = self.rows_where('t_ebp.csv', 'bp_typelog', typelog_filter)
 
         # 4. Ensure noeuds loaded
         self._ensure_noeuds()
@@ -498,16 +708,16 @@ class GraceTHDReader:
 
         skipped_placeholder = 0
 
-        for idx, row in enumerate(ebp_csv):
-            bp_etiquet = row.get('bp_etiquet', '').strip()
+        for idx, i in enumerate(rows):
+            bp_etiquet = ebp.get(i, 'bp_etiquet', '').strip()
             if bp_etiquet == 'OO-XXXX-XXXX':
                 skipped_placeholder += 1
                 continue
 
-            bp_pt_code = row.get('bp_pt_code', '').strip()
-            bp_typelog = row.get('bp_typelog', '').upper()
-            bp_typephy = row.get('bp_typephy', '')
-            bp_codeext = row.get('bp_codeext', '').strip()
+            bp_pt_code = ebp.get(i, 'bp_pt_code', '').strip()
+            bp_typelog = ebp.get(i, 'bp_typelog', '').upper()
+            bp_typephy = ebp.get(i, 'bp_typephy', '')
+            bp_codeext = ebp.get(i, 'bp_codeext', '').strip()
 
             # Find geometry via ptech -> noeud
             geom_wkt = ''
@@ -515,8 +725,8 @@ class GraceTHDReader:
 
             if bp_pt_code and bp_pt_code in ptech_by_code:
                 pt = ptech_by_code[bp_pt_code]
-                nd_code = pt.get('pt_nd_code', '')
-                inf_num = pt.get('pt_etiquet', '')
+                nd_code = ptech.get(pt, 'pt_nd_code')
+                inf_num = ptech.get(pt, 'pt_etiquet')
                 geom_wkt = self._noeud_geom_wkt(nd_code)
 
             if not geom_wkt:
@@ -568,17 +778,15 @@ class GraceTHDReader:
         Returns:
             List of dicts {pt_code, inf_num, nd_code, nature, geom_wkt, geom}
         """
-        ptech_csv = self._ensure_ptech()
-        noeuds = self._ensure_noeuds()
+        ptech = self._ensure_ptech()
+        self._ensure_noeuds()
 
         poteaux = []
         no_geom = 0
 
-        for row in ptech_csv:
-            if row.get('pt_typephy', '').upper() != 'A':
-                continue
+        for i in self.rows_where('t_ptech.csv', 'pt_typephy', ('A',)):
 
-            nd_code = row.get('pt_nd_code', '')
+            nd_code = ptech.get(i, 'pt_nd_code', '')
             geom = self._noeud_geom(nd_code)
 
             if not geom:
@@ -586,24 +794,16 @@ class GraceTHDReader:
                 continue
 
             # inf_num from nd_codeext (primary) or pt_etiquet (fallback)
-            inf_num = ''
-            noeud_feat = noeuds.get(nd_code)
-            if noeud_feat:
-                try:
-                    nd_codeext = str(noeud_feat['nd_codeext']).strip() if noeud_feat['nd_codeext'] else ''
-                    if nd_codeext:
-                        inf_num = nd_codeext
-                except (KeyError, IndexError):
-                    pass
+            inf_num = self._noeud_codeext(nd_code)
             if not inf_num:
-                inf_num = row.get('pt_etiquet', '').strip()
+                inf_num = ptech.get(i, 'pt_etiquet', '').strip()
 
             poteaux.append({
-                'pt_code': row.get('pt_code', ''),
+                'pt_code': ptech.get(i, 'pt_code', ''),
                 'inf_num': inf_num,
                 'nd_code': nd_code,
-                'nature': row.get('pt_nature', ''),
-                'geom_wkt': geom.asWkt(),
+                'nature': ptech.get(i, 'pt_nature', ''),
+                'geom_wkt': self._noeud_geom_wkt(nd_code),
                 'geom': geom,
             })
 
@@ -668,20 +868,18 @@ class GraceTHDReader:
             QgsVectorLayer (memory) or None on failure.
         """
         import warnings
-        ptech_csv = self._ensure_ptech()
+        ptech = self._ensure_ptech()
         noeuds = self._ensure_noeuds()
 
-        if not ptech_csv or not noeuds:
+        if not len(ptech) or not noeuds:
             return None
 
         # Build ptech index by pt_nd_code for CSV field access
         ptech_by_nd = {}
-        for row in ptech_csv:
-            if row.get('pt_typephy', '').upper() != 'A':
-                continue
-            nd_code = row.get('pt_nd_code', '').strip()
+        for i in self.rows_where('t_ptech.csv', 'pt_typephy', ('A',)):
+            nd_code = ptech.get(i, 'pt_nd_code').strip()
             if nd_code:
-                ptech_by_nd[nd_code] = row
+                ptech_by_nd[nd_code] = i
 
         # Create memory layer with infra_pt_pot-compatible schema
         lyr = QgsVectorLayer(
@@ -707,29 +905,25 @@ class GraceTHDReader:
         prop_type_cross = {}  # {(pt_prop, inf_type): count}
         prop_method_map = {}  # {pt_prop: method} (last seen)
 
-        for nd_code, ptech_row in ptech_by_nd.items():
-            noeud_feat = noeuds.get(nd_code)
-            if not noeud_feat or not noeud_feat.hasGeometry():
+        for nd_code, i in ptech_by_nd.items():
+            noeud_geom = self._noeud_geom(nd_code)
+            if not noeud_geom:
                 no_geom += 1
                 continue
 
             # inf_num from nd_codeext (primary) or pt_etiquet (fallback)
-            nd_codeext = ''
-            try:
-                nd_codeext = str(noeud_feat['nd_codeext']).strip() if noeud_feat['nd_codeext'] else ''
-            except (KeyError, IndexError):
-                pass
+            nd_codeext = self._noeud_codeext(nd_code)
 
             if not nd_codeext:
-                nd_codeext = ptech_row.get('pt_etiquet', '').strip()
+                nd_codeext = ptech.get(i, 'pt_etiquet', '').strip()
 
             if not nd_codeext:
                 no_codeext += 1
                 continue
 
             # inf_type from pt_prop / pt_prop_do
-            pt_prop = ptech_row.get('pt_prop', '').strip().upper()
-            pt_prop_do = ptech_row.get('pt_prop_do', '').strip().upper()
+            pt_prop = ptech.get(i, 'pt_prop', '').strip().upper()
+            pt_prop_do = ptech.get(i, 'pt_prop_do', '').strip().upper()
             prop_key = pt_prop or pt_prop_do or '(vide)'
             prop_values[prop_key] = prop_values.get(prop_key, 0) + 1
 
@@ -740,12 +934,12 @@ class GraceTHDReader:
             prop_method_map[prop_key] = match_method
 
             # commentaire from pt_comment
-            commentaire = ptech_row.get('pt_comment', '').strip()
+            commentaire = ptech.get(i, 'pt_comment', '').strip()
 
-            etat = ptech_row.get('pt_etat', '').strip()
+            etat = ptech.get(i, 'pt_etat', '').strip()
 
             feat = QgsFeature(lyr.fields())
-            feat.setGeometry(QgsGeometry(noeud_feat.geometry()))
+            feat.setGeometry(noeud_geom)
             feat.setAttribute('inf_num', nd_codeext)
             feat.setAttribute('inf_type', inf_type)
             feat.setAttribute('inf_propri', inf_propri)
@@ -864,35 +1058,33 @@ class GraceTHDReader:
             List of dicts {pt_code, inf_num, inf_type, inf_propri, inf_mat,
                            nd_code, geom_wkt, geom}
         """
-        ptech_csv = self._ensure_ptech()
+        ptech = self._ensure_ptech()
         self._ensure_noeuds()
 
         chambres = []
         no_geom = 0
 
-        for row in ptech_csv:
-            if row.get('pt_typephy', '').upper() != 'C':
-                continue
+        for i in self.rows_where('t_ptech.csv', 'pt_typephy', ('C',)):
 
-            nd_code = row.get('pt_nd_code', '')
+            nd_code = ptech.get(i, 'pt_nd_code', '')
             geom = self._noeud_geom(nd_code)
 
             if not geom:
                 no_geom += 1
                 continue
 
-            pt_prop = row.get('pt_prop', '').strip().upper()
-            pt_prop_do = row.get('pt_prop_do', '').strip().upper()
+            pt_prop = ptech.get(i, 'pt_prop', '').strip().upper()
+            pt_prop_do = ptech.get(i, 'pt_prop_do', '').strip().upper()
             inf_type, inf_propri, _ = self._map_prop_to_chb_type(pt_prop, pt_prop_do)
 
             chambres.append({
-                'pt_code': row.get('pt_code', ''),
-                'inf_num': row.get('pt_etiquet', ''),
+                'pt_code': ptech.get(i, 'pt_code', ''),
+                'inf_num': ptech.get(i, 'pt_etiquet', ''),
                 'inf_type': inf_type,
                 'inf_propri': inf_propri,
-                'inf_mat': row.get('pt_nature', ''),
+                'inf_mat': ptech.get(i, 'pt_nature', ''),
                 'nd_code': nd_code,
-                'geom_wkt': geom.asWkt(),
+                'geom_wkt': self._noeud_geom_wkt(nd_code),
                 'geom': geom,
             })
 
@@ -924,17 +1116,15 @@ class GraceTHDReader:
             List of dicts {pt_code, inf_num, inf_type, inf_propri,
                            nd_code, geom_wkt, geom}
         """
-        ptech_csv = self._ensure_ptech()
+        ptech = self._ensure_ptech()
         self._ensure_noeuds()
 
         facades = []
         no_geom = 0
 
-        for row in ptech_csv:
-            if row.get('pt_typephy', '').upper() != 'F':
-                continue
+        for i in self.rows_where('t_ptech.csv', 'pt_typephy', ('F',)):
 
-            nd_code = row.get('pt_nd_code', '')
+            nd_code = ptech.get(i, 'pt_nd_code', '')
             geom = self._noeud_geom(nd_code)
 
             if not geom:
@@ -942,12 +1132,12 @@ class GraceTHDReader:
                 continue
 
             facades.append({
-                'pt_code': row.get('pt_code', ''),
-                'inf_num': row.get('pt_etiquet', ''),
+                'pt_code': ptech.get(i, 'pt_code', ''),
+                'inf_num': ptech.get(i, 'pt_etiquet', ''),
                 'inf_type': 'FAC',
                 'inf_propri': 'TIERS',
                 'nd_code': nd_code,
-                'geom_wkt': geom.asWkt(),
+                'geom_wkt': self._noeud_geom_wkt(nd_code),
                 'geom': geom,
             })
 
@@ -976,23 +1166,15 @@ class GraceTHDReader:
             List of dicts {cm_code, cm_ndcode1, cm_ndcode2, cm_avct,
             cm_typlog, cm_typ_imp, cm_compo, gc, cm_long, proprio, geom_wkt}
         """
-        features = _load_shp_features(self._path('t_cheminement.shp'))
+        table = self._shape('t_cheminement.shp')
         results = []
 
-        field_names = set()
-        if features:
-            field_names = {f.name() for f in features[0].fields()}
-
-        def _s(feat, name):
-            if name not in field_names:
-                return ''
-            v = feat[name]
+        def _s(idx, name):
+            v = table.value(idx, name)
             return str(v).strip() if v else ''
 
-        def _f(feat, name):
-            if name not in field_names:
-                return 0.0
-            v = feat[name]
+        def _f(idx, name):
+            v = table.value(idx, name)
             if not v:
                 return 0.0
             try:
@@ -1000,23 +1182,23 @@ class GraceTHDReader:
             except (ValueError, TypeError):
                 return 0.0
 
-        for feat in features:
+        for idx in range(len(table) if table is not None else 0):
             # Proprietaire mapping (cm_prop_do SIREN -> label)
-            prop_raw = _s(feat, 'cm_prop_do') or _s(feat, 'cm_prop')
+            prop_raw = _s(idx, 'cm_prop_do') or _s(idx, 'cm_prop')
             propri, _ = self._resolve_propri(prop_raw.upper(), '')
 
             results.append({
-                'cm_code': _s(feat, 'cm_code'),
-                'cm_ndcode1': _s(feat, 'cm_ndcode1'),
-                'cm_ndcode2': _s(feat, 'cm_ndcode2'),
-                'cm_avct': _s(feat, 'cm_avct'),
-                'cm_typlog': _s(feat, 'cm_typlog'),
-                'cm_typ_imp': _s(feat, 'cm_typ_imp'),
-                'cm_compo': _s(feat, 'cm_compo'),
-                'gc': _s(feat, 'cm_comment'),
-                'cm_long': _f(feat, 'cm_long'),
+                'cm_code': _s(idx, 'cm_code'),
+                'cm_ndcode1': _s(idx, 'cm_ndcode1'),
+                'cm_ndcode2': _s(idx, 'cm_ndcode2'),
+                'cm_avct': _s(idx, 'cm_avct'),
+                'cm_typlog': _s(idx, 'cm_typlog'),
+                'cm_typ_imp': _s(idx, 'cm_typ_imp'),
+                'cm_compo': _s(idx, 'cm_compo'),
+                'gc': _s(idx, 'cm_comment'),
+                'cm_long': _f(idx, 'cm_long'),
                 'proprio': propri if propri else prop_raw,
-                'geom_wkt': feat.geometry().asWkt() if feat.hasGeometry() else '',
+                'geom_wkt': table.wkt(idx),
             })
 
         QgsMessageLog.logMessage(
@@ -1108,8 +1290,7 @@ class GraceTHDReader:
         for fname, _id_col in key_csv_tables.items():
             fpath = self._path(fname)
             if os.path.isfile(fpath):
-                rows = _load_csv(fpath)
-                result['key_tables'][fname] = len(rows)
+                result['key_tables'][fname] = len(self._ensure_csv(fname))
             else:
                 result['key_tables'][fname] = -1  # absent
 
@@ -0,0 +1,424 @@
+# -*- coding: utf-8 -*-
+"""
+Import local d'un livrable GraceTHD dans un GeoPackage indexe.
+
+Le repertoire GraceTHD (SHP + CSV) est converti une fois en GeoPackage
+(SQLite) dans le cache du profil : tables t_noeud/t_cableline/t_cheminement
+en tables de features (geometries GPKG, index R-tree), t_cable/t_ptech/t_ebp
+en tables attributaires, index SQL sur les cles de jointure. Le fichier est
+valide par une empreinte des fichiers sources (sha1) : un livrable modifie
+est reimporte, les executions suivantes relisent le GeoPackage par requetes
+SQL au lieu de reparser SHP/DBF/CSV. Les filtres des chargeurs (cb_typelog,
+bp_typelog, pt_typephy) sont evalues en SQL sur des index upper(colonne).
+
+Le GeoPackage est un cache en lecture seule (pas de triggers R-tree) ; il
+reste lisible par QGIS pour controle. Module pur Python (sqlite3 + NumPy).
+"""
+
+import datetime
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import struct
+import threading
+from contextlib import closing
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from .csv_table import CsvTable
+    from .shp_reader import ShapeTable
+except ImportError:
+    from csv_table import CsvTable
+    from shp_reader import ShapeTable
+
+# Incrementer si le schema du GeoPackage change (invalide les imports)
+STORE_VERSION = 2
+
+SRS_ID = 2154
+_SRS_ROWS = (
+    ('Undefined cartesian SRS', -1, 'NONE', -1, 'undefined', ''),
+    ('Undefined geographic SRS', 0, 'NONE', 0, 'undefined', ''),
+    ('WGS 84 geodetic', 4326, 'EPSG', 4326,
+     'GEOGCS["WGS 84",DATUM["WGS_1984",SPHEROID["WGS 84",6378137,298.257223563]],'
+     'PRIMEM["Greenwich",0],UNIT["degree",0.0174532925199433],AUTHORITY["EPSG","4326"]]', ''),
+    ('RGF93 / Lambert-93', SRS_ID, 'EPSG', SRS_ID,
+     'PROJCS["RGF93 / Lambert-93",GEOGCS["RGF93",DATUM["Reseau_Geodesique_Francais_1993",'
+     'SPHEROID["GRS 1980",6378137,298.257222101]],PRIMEM["Greenwich",0],'
+     'UNIT["degree",0.0174532925199433]],PROJECTION["Lambert_Conformal_Conic_2SP"],'
+     'PARAMETER["standard_parallel_1",49],PARAMETER["standard_parallel_2",44],'
+     'PARAMETER["latitude_of_origin",46.5],PARAMETER["central_meridian",3],'
+     'PARAMETER["false_easting",700000],PARAMETER["false_northing",6600000],'
+     'UNIT["metre",1],AUTHORITY["EPSG","2154"]]', ''),
+)
+
+# geometry_kind ShapeTable -> type de geometrie GeoPackage
+_GEOMETRY_TYPES = {
+    'point': 'POINT',
+    'multipoint': 'MULTIPOINT',
+    'line': 'MULTILINESTRING',
+}
+
+_APPLICATION_ID = 0x47504B47  # 'GPKG'
+_USER_VERSION = 10200
+
+
+def store_fingerprint(digests: Dict[str, str], spec: Dict) -> str:
+    """Empreinte du GeoPackage : version, contenu des fichiers sources, champs importes."""
+    payload = json.dumps({'version': STORE_VERSION, 'files': digests, 'spec': spec},
+                         sort_keys=True)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def _store_prefix(gracethd_dir: str) -> str:
+    name = re.sub(r'[^A-Za-z0-9_-]+', '_', os.path.basename(os.path.normpath(gracethd_dir)))
+    dir_hash = hashlib.sha1(os.path.abspath(gracethd_dir).encode('utf-8')).hexdigest()[:8]
+    return f"{name or 'gracethd'}_{dir_hash}_"
+
+
+def store_path(cache_dir: str, gracethd_dir: str, fingerprint: str) -> str:
+    """Chemin du GeoPackage d'un repertoire GraceTHD pour une empreinte."""
+    return os.path.join(cache_dir, f"{_store_prefix(gracethd_dir)}{fingerprint[:16]}.gpkg")
+
+
+def remove_stale_stores(cache_dir: str, gracethd_dir: str, keep: str) -> None:
+    """Supprime les imports precedents du meme repertoire (autre empreinte)."""
+    prefix = _store_prefix(gracethd_dir)
+    try:
+        entries = os.listdir(cache_dir)
+    except OSError:
+        return
+    for entry in entries:
+        path = os.path.join(cache_dir, entry)
+        if entry.startswith(prefix) and entry.endswith('.gpkg') and path != keep:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+# ---------------------------------------------------------------------------
+#  Geometries GPKG (en-tete GP + WKB little-endian)
+# ---------------------------------------------------------------------------
+
+def _encode_geometry(kind: str, parts: List[np.ndarray]) -> Optional[bytes]:
+    if not parts:
+        return None
+    coords = np.concatenate(parts)
+    if kind == 'point':
+        x, y = coords[0].tolist()
+        return b'GP\x00\x01' + struct.pack('<iBIdd', SRS_ID, 1, 1, x, y)
+    (min_x, min_y), (max_x, max_y) = coords.min(axis=0).tolist(), coords.max(axis=0).tolist()
+    out = [b'GP\x00\x03', struct.pack('<i4d', SRS_ID, min_x, max_x, min_y, max_y)]
+    if kind == 'multipoint':
+        out.append(struct.pack('<BII', 1, 4, len(coords)))
+        out.extend(struct.pack('<BIdd', 1, 1, x, y) for x, y in coords.tolist())
+    else:
+        out.append(struct.pack('<BII', 1, 5, len(parts)))
+        for part in parts:
+            out.append(struct.pack('<BII', 1, 2, len(part)))
+            out.append(part.astype('<f8').tobytes())
+    return b''.join(out)
+
+
+_ENVELOPE_SIZES = {0: 0, 1: 32, 2: 48, 3: 48, 4: 64}
+
+
+def _decode_parts(blob: bytes) -> List[np.ndarray]:
+    """Parties (n, 2) d'une geometrie GPKG (Point, MultiPoint, MultiLineString 2D)."""
+    flags = blob[3]
+    pos = 8 + _ENVELOPE_SIZES.get((flags >> 1) & 7, 0)
+    order = '<' if blob[pos] == 1 else '>'
+    wkb_type = struct.unpack_from(f'{order}I', blob, pos + 1)[0] % 1000
+    if wkb_type == 1:
+        return [np.frombuffer(blob, f'{order}f8', 2, pos + 5).reshape(1, 2)]
+    count = struct.unpack_from(f'{order}I', blob, pos + 5)[0]
+    pos += 9
+    parts = []
+    for _ in range(count):
+        order = '<' if blob[pos] == 1 else '>'
+        if wkb_type == 4:
+            parts.append(np.frombuffer(blob, f'{order}f8', 2, pos + 5).reshape(1, 2))
+            pos += 21
+        else:
+            n_points = struct.unpack_from(f'{order}I', blob, pos + 5)[0]
+            parts.append(np.frombuffer(blob, f'{order}f8', 2 * n_points, pos + 9).reshape(-1, 2))
+            pos += 9 + 16 * n_points
+    return parts
+
+
+# ---------------------------------------------------------------------------
+#  Types de colonnes
+# ---------------------------------------------------------------------------
+
+def _sql_type(values: list) -> str:
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            return 'BOOLEAN'
+        if isinstance(value, int):
+            return 'INTEGER'
+        if isinstance(value, float):
+            return 'REAL'
+        if isinstance(value, datetime.date):
+            return 'DATE'
+        return 'TEXT'
+    return 'TEXT'
+
+
+def _sql_value(value):
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    return value
+
+
+def _python_converter(sql_type: str):
+    if sql_type == 'DATE':
+        return lambda v: None if v is None else datetime.date.fromisoformat(v)
+    if sql_type == 'BOOLEAN':
+        return lambda v: None if v is None else bool(v)
+    return None
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+# ---------------------------------------------------------------------------
+#  GeoPackage
+# ---------------------------------------------------------------------------
+
+class GraceTHDStore:
+    """GeoPackage d'import d'un livrable GraceTHD (lecture par requetes SQL)."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path)
+
+    @classmethod
+    def open(cls, path: str, fingerprint: str) -> Optional['GraceTHDStore']:
+        """GeoPackage existant pour cette empreinte, sinon None."""
+        if not os.path.isfile(path):
+            return None
+        store = cls(path)
+        try:
+            with closing(store._connect()) as conn:
+                meta = dict(conn.execute("SELECT key, value FROM poleaerien_meta"))
+        except sqlite3.Error:
+            return None
+        if meta.get('version') != str(STORE_VERSION) or meta.get('fingerprint') != fingerprint:
+            return None
+        return store
+
+    @classmethod
+    def create(cls, path: str, fingerprint: str,
+               shapes: Dict[str, Optional[ShapeTable]],
+               tables: Dict[str, Optional[CsvTable]],
+               keys: Optional[Dict[str, Iterable[str]]] = None,
+               filters: Optional[Dict[str, Iterable[str]]] = None) -> 'GraceTHDStore':
+        """Ecrit le GeoPackage de facon atomique (fichier temporaire + os.replace).
+
+        shapes/tables : {nom de table: contenu} (None = fichier source absent,
+        table non creee). keys : {table: colonnes} indexees en SQL ; filters :
+        {table: colonnes} indexees sur upper(colonne) pour rows_where.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with closing(sqlite3.connect(tmp_path)) as conn:
+                _create_core(conn)
+                meta = [('version', str(STORE_VERSION)), ('fingerprint', fingerprint)]
+                for name, table in shapes.items():
+                    if table is not None:
+                        _write_features(conn, name, table)
+                        meta.append((f'shape_type:{name}', str(table.shape_type)))
+                for name, table in tables.items():
+                    if table is not None:
+                        _write_attributes(conn, name, table)
+                for name, columns in (keys or {}).items():
+                    if shapes.get(name) is not None or tables.get(name) is not None:
+                        for column in columns:
+                            _create_index(conn, name, column)
+                for name, columns in (filters or {}).items():
+                    if shapes.get(name) is not None or tables.get(name) is not None:
+                        for column in columns:
+                            _create_index(conn, name, column, upper=True)
+                conn.executemany("INSERT INTO poleaerien_meta VALUES (?, ?)", meta)
+                conn.commit()
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return cls(path)
+
+    def table_names(self) -> List[str]:
+        with closing(self._connect()) as conn:
+            return [row[0] for row in conn.execute("SELECT table_name FROM gpkg_contents")]
+
+    def _columns(self, conn, name: str) -> List[Tuple[str, str]]:
+        return [(row[1], row[2].upper()) for row in conn.execute(f"PRAGMA table_info({_quote(name)})")
+                if row[1] not in ('fid', 'geom')]
+
+    def shape_table(self, name: str) -> Optional[ShapeTable]:
+        """Table de features relue en ShapeTable (None si non importee)."""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT value FROM poleaerien_meta WHERE key = ?",
+                               (f'shape_type:{name}',)).fetchone()
+            if row is None:
+                return None
+            columns = self._columns(conn, name)
+            select = ', '.join(['geom'] + [_quote(c) for c, _t in columns])
+            records = conn.execute(f"SELECT {select} FROM {_quote(name)} ORDER BY fid").fetchall()
+
+        values = list(zip(*records)) if records else [()] * (len(columns) + 1)
+        data = {}
+        for (column, sql_type), column_values in zip(columns, values[1:]):
+            convert = _python_converter(sql_type)
+            data[column] = [convert(v) for v in column_values] if convert else list(column_values)
+
+        chunks, part_start, record_parts = [], [0], [0]
+        n_points = 0
+        for blob in values[0]:
+            if blob is not None:
+                for part in _decode_parts(blob):
+                    chunks.append(part)
+                    n_points += len(part)
+                    part_start.append(n_points)
+            record_parts.append(len(part_start) - 1)
+        xy = np.concatenate(chunks).astype(np.float64) if chunks else np.empty((0, 2))
+        return ShapeTable(int(row[0]), data, xy, np.asarray(part_start, dtype=np.int64),
+                          np.asarray(record_parts, dtype=np.int64))
+
+    def rows_where(self, name: str, column: str, values: Iterable[str]) -> Optional[List[int]]:
+        """Lignes (0-based, ordre source) dont upper(column) est dans values.
+
+        None si la table ou la colonne n'a pas ete importee.
+        """
+        wanted = sorted({v.upper() for v in values})
+        with closing(self._connect()) as conn:
+            if column not in {c for c, _t in self._columns(conn, name)}:
+                return None
+            placeholders = ', '.join('?' * len(wanted))
+            return [row[0] for row in conn.execute(
+                f"SELECT fid - 1 FROM {_quote(name)} WHERE upper({_quote(column)}) "
+                f"IN ({placeholders}) ORDER BY fid", wanted)]
+
+    def csv_table(self, name: str, index_fields: Iterable[str] = ()) -> Optional[CsvTable]:
+        """Table attributaire relue en CsvTable (None si non importee)."""
+        with closing(self._connect()) as conn:
+            exists = conn.execute("SELECT 1 FROM gpkg_contents WHERE table_name = ? "
+                                  "AND data_type = 'attributes'", (name,)).fetchone()
+            if exists is None:
+                return None
+            columns = [c for c, _t in self._columns(conn, name)]
+            if not columns:
+                n_rows = conn.execute(f"SELECT count(*) FROM {_quote(name)}").fetchone()[0]
+                return CsvTable({}, n_rows, encoding='gpkg')
+            select = ', '.join(_quote(c) for c in columns)
+            records = conn.execute(f"SELECT {select} FROM {_quote(name)} ORDER BY fid").fetchall()
+
+        values = list(zip(*records)) if records else [()] * len(columns)
+        data = {column: list(column_values) for column, column_values in zip(columns, values)}
+        indexes = {}
+        for field in index_fields:
+            if field in data:
+                index = indexes[field] = {}
+                for idx, value in enumerate(data[field]):
+                    key = value.strip() if value else ''
+                    if key:
+                        index[key] = idx
+        return CsvTable(data, len(records), indexes, encoding='gpkg')
+
+
+def _create_core(conn: sqlite3.Connection) -> None:
+    conn.execute(f"PRAGMA application_id = {_APPLICATION_ID}")
+    conn.execute(f"PRAGMA user_version = {_USER_VERSION}")
+    conn.execute(
+        "CREATE TABLE gpkg_spatial_ref_sys (srs_name TEXT NOT NULL, srs_id INTEGER PRIMARY KEY, "
+        "organization TEXT NOT NULL, organization_coordsys_id INTEGER NOT NULL, "
+        "definition TEXT NOT NULL, description TEXT)"
+    )
+    conn.executemany("INSERT INTO gpkg_spatial_ref_sys VALUES (?, ?, ?, ?, ?, ?)", _SRS_ROWS)
+    conn.execute(
+        "CREATE TABLE gpkg_contents (table_name TEXT NOT NULL PRIMARY KEY, data_type TEXT NOT NULL, "
+        "identifier TEXT UNIQUE, description TEXT DEFAULT '', "
+        "last_change DATETIME NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ','now')), "
+        "min_x DOUBLE, min_y DOUBLE, max_x DOUBLE, max_y DOUBLE, srs_id INTEGER, "
+        "CONSTRAINT fk_gc_r_srs_id FOREIGN KEY (srs_id) REFERENCES gpkg_spatial_ref_sys(srs_id))"
+    )
+    conn.execute(
+        "CREATE TABLE gpkg_geometry_columns (table_name TEXT NOT NULL, column_name TEXT NOT NULL, "
+        "geometry_type_name TEXT NOT NULL, srs_id INTEGER NOT NULL, z TINYINT NOT NULL, "
+        "m TINYINT NOT NULL, CONSTRAINT pk_geom_cols PRIMARY KEY (table_name, column_name))"
+    )
+    conn.execute(
+        "CREATE TABLE gpkg_extensions (table_name TEXT, column_name TEXT, "
+        "extension_name TEXT NOT NULL, definition TEXT NOT NULL, scope TEXT NOT NULL, "
+        "CONSTRAINT ge_tce UNIQUE (table_name, column_name, extension_name))"
+    )
+    conn.execute("CREATE TABLE poleaerien_meta (key TEXT PRIMARY KEY, value TEXT)")
+
+
+def _column_defs(columns: Dict[str, list]) -> str:
+    return ''.join(f", {_quote(name)} {_sql_type(values)}" for name, values in columns.items())
+
+
+def _write_features(conn: sqlite3.Connection, name: str, table: ShapeTable) -> None:
+    kind = table.geometry_kind
+    geom_type = _GEOMETRY_TYPES[kind]
+    conn.execute(f"CREATE TABLE {_quote(name)} (fid INTEGER PRIMARY KEY AUTOINCREMENT, "
+                 f"geom {geom_type}{_column_defs(table.columns)})")
+    names = list(table.columns)
+    placeholders = ', '.join('?' * (len(names) + 2))
+    rows, envelopes = [], []
+    for idx in range(len(table)):
+        parts = table.parts(idx)
+        rows.append((idx + 1, _encode_geometry(kind, parts))
+                    + tuple(_sql_value(table.columns[n][idx]) for n in names))
+        if parts:
+            coords = np.concatenate(parts)
+            (min_x, min_y), (max_x, max_y) = coords.min(axis=0).tolist(), coords.max(axis=0).tolist()
+            envelopes.append((idx + 1, min_x, max_x, min_y, max_y))
+    conn.executemany(f"INSERT INTO {_quote(name)} VALUES ({placeholders})", rows)
+
+    rtree = f"rtree_{name}_geom"
+    conn.execute(f"CREATE VIRTUAL TABLE {_quote(rtree)} USING rtree(id, minx, maxx, miny, maxy)")
+    conn.executemany(f"INSERT INTO {_quote(rtree)} VALUES (?, ?, ?, ?, ?)", envelopes)
+    if len(table.xy):
+        (min_x, min_y), (max_x, max_y) = table.xy.min(axis=0).tolist(), table.xy.max(axis=0).tolist()
+    else:
+        min_x = min_y = max_x = max_y = None
+    conn.execute("INSERT INTO gpkg_contents (table_name, data_type, identifier, min_x, min_y, "
+                 "max_x, max_y, srs_id) VALUES (?, 'features', ?, ?, ?, ?, ?, ?)",
+                 (name, name, min_x, min_y, max_x, max_y, SRS_ID))
+    conn.execute("INSERT INTO gpkg_geometry_columns VALUES (?, 'geom', ?, ?, 0, 0)",
+                 (name, geom_type, SRS_ID))
+    conn.execute("INSERT INTO gpkg_extensions VALUES (?, 'geom', 'gpkg_rtree_index', "
+                 "'http://www.geopackage.org/spec120/#extension_rtree', 'write-only')", (name,))
+
+
+def _write_attributes(conn: sqlite3.Connection, name: str, table: CsvTable) -> None:
+    names = table.fields
+    columns = ''.join(f", {_quote(n)} TEXT" for n in names)
+    conn.execute(f"CREATE TABLE {_quote(name)} (fid INTEGER PRIMARY KEY AUTOINCREMENT{columns})")
+    values = [table.column(n) for n in names]
+    placeholders = ', '.join('?' * (len(names) + 1))
+    conn.executemany(f"INSERT INTO {_quote(name)} VALUES ({placeholders})",
+                     ((idx + 1,) + row for idx, row in enumerate(zip(*values)))
+                     if names else ((idx + 1,) for idx in range(len(table))))
+    conn.execute("INSERT INTO gpkg_contents (table_name, data_type, identifier) "
+                 "VALUES (?, 'attributes', ?)", (name, name))
+
+
+def _create_index(conn: sqlite3.Connection, name: str, column: str, upper: bool = False) -> None:
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({_quote(name)})")}
+    if column in existing:
+        suffix, expr = ('_upper', f"upper({_quote(column)})") if upper else ('', _quote(column))
+        conn.execute(f"CREATE INDEX {_quote(f'idx_{name}_{column}{suffix}')} "
+                     f"ON {_quote(name)} ({expr})")
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+Fichier de job du runner sans interface (headless_runner) et resume machine.
+
+Format JSON (ou YAML si PyYAML est installe) :
+
+    {
+      "modules": ["maj", "capft", "comac", "police_c6"],
+      "export_root": "/srv/qc/rapports",
+      "include_comac_drawings": false,
+      "include_data_dictionary": true,
+      "max_parallel": 2,
+      "sros": [
+        {"project_dir": "/srv/livrables/63041-B1I-PMZ-00003"},
+        {"project_dir": "/srv/livrables/63041-B1I-PMZ-00004",
+         "sro": "63041/B1I/PMZ/00004", "modules": ["comac"]}
+      ]
+    }
+
+Les chemins relatifs sont resolus par rapport au dossier du fichier de job.
+max_parallel (defaut 1) : SRO traites simultanement, borne par le budget
+CPU/RAM de la machine (job_queue.parallel_slots).
+Module pur Python (aucune dependance QGIS).
+"""
+
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List
+
+# Codes de sortie (cron)
+EXIT_OK = 0                 # tous les modules de tous les SRO OK
+EXIT_MODULE_ERRORS = 1      # au moins un module en erreur
+EXIT_SRO_NOT_RUN = 2        # au moins un SRO non lance ou interrompu (preflight, qualite donnees, delai)
+EXIT_INVALID_JOB = 3        # fichier de job invalide ou environnement QGIS indisponible
+
+# Message d'un module demande mais jamais termine (crash, annulation, delai)
+MODULE_NOT_FINISHED = "Module non termine"
+
+
+@dataclass
+class SroJob:
+    """Un SRO a traiter : dossier livrable + modules."""
+    project_dir: str
+    modules: List[str]
+    sro: str = ''
+    export_dir: str = ''
+
+
+@dataclass
+class JobSpec:
+    """Job complet : SRO a traiter et options du rapport unifie."""
+    sros: List[SroJob]
+    include_comac_drawings: bool = False
+    include_data_dictionary: bool = True
+    max_parallel: int = 1
+
+
+@dataclass
+class SroOutcome:
+    """Resultat d'un SRO : statut par module, rapports generes, erreurs bloquantes."""
+    sro: str
+    project_dir: str
+    modules: Dict[str, Dict] = field(default_factory=dict)
+    reports: List[str] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    started: bool = False
+    duration_s: float = 0.0
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return self.started and not self.errors and all(
+            m.get('success') for m in self.modules.values()
+        )
+
+    @property
+    def failures(self) -> Dict[str, str]:
+        """{module_key: message} des modules en echec ou non termines."""
+        return {
+            key: m.get('message', '') for key, m in self.modules.items() if not m.get('success')
+        }
+
+    @property
+    def status(self) -> str:
+        """Statut lisible : OK, ERREURS (module en echec) ou NON LANCE."""
+        if not self.started or self.errors:
+            return 'NON LANCE'
+        return 'OK' if self.ok else 'ERREURS'
+
+
+class OutcomeRecorder:
+    """Alimente un SroOutcome depuis les signaux du BatchRunner (ProjectQueue).
+
+    Chaque module demande est d'abord marque en echec (MODULE_NOT_FINISHED) :
+    un module qui ne se termine pas (crash, annulation, delai) reste en echec
+    dans le resume au lieu de disparaitre.
+    """
+
+    def __init__(self, outcome: SroOutcome, modules: Iterable[str], clock=time.perf_counter):
+        self.outcome = outcome
+        self._clock = clock
+        self._t0: Dict[str, float] = {}
+        for key in modules:
+            outcome.modules[key] = {'success': False, 'message': MODULE_NOT_FINISHED}
+
+    def module_started(self, key: str, *_args) -> None:
+        self.outcome.started = True
+        self._t0[key] = self._clock()
+
+    def module_finished(self, key: str, success: bool, message: str = '') -> None:
+        self.outcome.modules[key] = {'success': bool(success), 'message': message or ''}
+        if key in self._t0:
+            self.outcome.timings[key] = round(self._clock() - self._t0[key], 1)
+
+    def modules_finished(self, results: Dict[str, Dict]) -> None:
+        for key, result in results.items():
+            self.outcome.modules[key] = dict(result)
+
+
+def _read_document(path: str) -> Dict:
+    with open(path, encoding='utf-8') as handle:
+        if os.path.splitext(path)[1].lower() in ('.yml', '.yaml'):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("Job YAML : PyYAML non installe (utiliser un job JSON)")
+            return yaml.safe_load(handle) or {}
+        return json.load(handle)
+
+
+def load_job(path: str, known_modules: Iterable[str]) -> JobSpec:
+    """Lit et valide un fichier de job.
+
+    Raises:
+        ValueError: job invalide (module inconnu, dossier absent, aucun SRO)
+        OSError: fichier illisible
+    """
+    try:
+        document = _read_document(path)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Job JSON invalide : {e}")
+    if not isinstance(document, dict):
+        raise ValueError("Job invalide : objet attendu a la racine")
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    known = set(known_modules)
+    default_modules = list(document.get('modules') or [])
+    export_root = document.get('export_root') or ''
+
+    sros = []
+    for i, entry in enumerate(document.get('sros') or []):
+        if isinstance(entry, str):
+            entry = {'project_dir': entry}
+        project_dir = entry.get('project_dir') or ''
+        if not project_dir:
+            raise ValueError(f"SRO #{i + 1} : project_dir manquant")
+        project_dir = os.path.normpath(os.path.join(base_dir, project_dir))
+        if not os.path.isdir(project_dir):
+            raise ValueError(f"SRO #{i + 1} : dossier introuvable {project_dir}")
+
+        modules = list(entry.get('modules') or default_modules)
+        if not modules:
+            raise ValueError(f"SRO #{i + 1} : aucun module")
+        unknown = sorted(set(modules) - known)
+        if unknown:
+            raise ValueError(f"SRO #{i + 1} : module(s) inconnu(s) {', '.join(unknown)}")
+
+        export_dir = entry.get('export_dir') or ''
+        if not export_dir and export_root:
+            export_dir = os.path.join(export_root, os.path.basename(project_dir))
+        if export_dir:
+            export_dir = os.path.normpath(os.path.join(base_dir, export_dir))
+
+        sros.append(SroJob(
+            project_dir=project_dir,
+            modules=modules,
+            sro=entry.get('sro') or '',
+            export_dir=export_dir,
+        ))
+
+    if not sros:
+        raise ValueError("Job invalide : liste 'sros' vide")
+
+    try:
+        max_parallel = int(document.get('max_parallel', 1))
+    except (TypeError, ValueError):
+        raise ValueError("Job invalide : max_parallel doit etre un entier")
+    if max_parallel < 1:
+        raise ValueError("Job invalide : max_parallel doit etre >= 1")
+
+    return JobSpec(
+        sros=sros,
+        include_comac_drawings=bool(document.get('include_comac_drawings', False)),
+        include_data_dictionary=bool(document.get('include_data_dictionary', True)),
+        max_parallel=max_parallel,
+    )
+
+
+def exit_code(outcomes: List[SroOutcome]) -> int:
+    """Code de sortie global : le plus grave des SRO."""
+    if any(not o.started or o.errors for o in outcomes):
+        return EXIT_SRO_NOT_RUN
+    if any(not o.ok for o in outcomes):
+        return EXIT_MODULE_ERRORS
+    return EXIT_OK
+
+
+def build_summary(outcomes: List[SroOutcome], job_path: str = '') -> Dict:
+    """Resume machine (JSON) d'une execution."""
+    return {
+        'job': job_path,
+        'finished': datetime.now().isoformat(timespec='seconds'),
+        'exit_code': exit_code(outcomes),
+        'sros': [dict(asdict(o), ok=o.ok, status=o.status, failures=o.failures)
+                 for o in outcomes],
+    }
+
+
+def write_summary(path: str, summary: Dict) -> str:
+    """Ecrit le resume de facon atomique. Retourne le chemin."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as handle:
+            json.dump(summary, handle, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
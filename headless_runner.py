@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Runner sans interface : controle qualite multi-SRO (cron, nuit).
+
+    python -m PoleAerien.headless_runner job.json [--summary resume.json] [--resume]
+
+Le dossier parent du plugin doit etre dans PYTHONPATH et l'environnement
+Python de QGIS actif (qgis.core importable). Chaque SRO est traite en Mode
+Projet par le BatchOrchestrator habituel (MODULE_DAG, preflight, rapport
+unifie) via batch_queue.ProjectQueue ; max_parallel du job fixe le nombre de
+SRO simultanes. Format du job et codes de sortie : voir headless_job.
+"""
+
+import argparse
+import os
+import sys
+
+from qgis.PyQt.QtCore import QEventLoop
+from qgis.core import QgsApplication
+
+from .batch_queue import DEFAULT_SRO_TIMEOUT_S, ProjectQueue
+from .batch_runner import MODULE_REGISTRY
+from .headless_job import EXIT_INVALID_JOB, build_summary, exit_code, load_job, write_summary
+from .job_queue import available_memory_mb, parallel_slots, write_summary_workbook
+
+
+def run_queue(spec, timeout_s=DEFAULT_SRO_TIMEOUT_S, resume=False):
+    """Traite tous les SRO du job (boucle d'evenements locale jusqu'a la fin de la file).
+
+    resume : reprendre les batchs interrompus (point de reprise valide), sinon
+    chaque SRO est relance en entier.
+    """
+    slots = parallel_slots(spec.max_parallel, available_mb=available_memory_mb())
+    queue = ProjectQueue(
+        spec.sros, slots,
+        include_comac_drawings=spec.include_comac_drawings,
+        include_data_dictionary=spec.include_data_dictionary,
+        timeout_s=timeout_s,
+        resume=resume,
+    )
+    outcomes = []
+    loop = QEventLoop()
+
+    def _on_log(msg, level):
+        print(f"[{level.upper()}] {msg}", file=sys.stderr, flush=True)
+
+    def _on_finished(results):
+        outcomes.extend(results)
+        loop.quit()
+
+    queue.log_message.connect(_on_log)
+    queue.queue_finished.connect(_on_finished)
+    queue.start()
+    if queue.is_running:
+        loop.exec()
+    return outcomes
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='poleaerien-headless',
+        description="Controle qualite Pole Aerien sans interface (multi-SRO).",
+    )
+    parser.add_argument('job', help="Fichier de job JSON/YAML")
+    parser.add_argument('--summary', default='',
+                        help="Resume JSON (defaut : <job>.summary.json)")
+    parser.add_argument('--workbook', default='',
+                        help="Classeur de synthese (defaut : <resume>.xlsx)")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_SRO_TIMEOUT_S,
+                        help="Duree maximale par SRO en secondes")
+    parser.add_argument('--resume', action='store_true',
+                        help="Reprendre les batchs interrompus dont les entrees sont inchangees")
+    args = parser.parse_args(argv)
+
+    try:
+        spec = load_job(args.job, MODULE_REGISTRY)
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        return EXIT_INVALID_JOB
+
+    app = QgsApplication([], False)
+    app.initQgis()
+    try:
+        outcomes = run_queue(spec, args.timeout, args.resume)
+    finally:
+        app.exitQgis()
+
+    summary_path = args.summary or os.path.splitext(args.job)[0] + '.summary.json'
+    write_summary(summary_path, build_summary(outcomes, os.path.abspath(args.job)))
+    print(f"[INFO] Resume : {summary_path}", file=sys.stderr)
+    workbook_path = args.workbook or os.path.splitext(summary_path)[0] + '.xlsx'
+    try:
+        write_summary_workbook(workbook_path, outcomes, MODULE_REGISTRY)
+        print(f"[INFO] Synthese : {workbook_path}", file=sys.stderr)
+    except OSError as e:
+        print(f"[WARNING] Synthese non ecrite : {e}", file=sys.stderr)
+    return exit_code(outcomes)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
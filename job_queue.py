@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+File de projets : budget de parallelisme, dossiers d'une livraison, synthese.
+
+Partie sans QGIS de batch_queue.ProjectQueue : nombre de SRO traites
+simultanement selon le budget CPU/RAM, recherche des dossiers projets d'une
+livraison et classeur de synthese consolide (statut et durees par SRO et
+par module). Module pur Python.
+"""
+
+import os
+import threading
+from typing import Dict, List, Optional
+
+from openpyxl import Workbook
+from openpyxl.styles import Alignment, Font, PatternFill
+from openpyxl.utils import get_column_letter
+
+try:
+    from .project_detector import extract_sro_from_project_name
+except ImportError:
+    from project_detector import extract_sro_from_project_name
+
+# Memoire de travail estimee pour un SRO (couches, fddcpi2, rapport)
+DEFAULT_MEMORY_PER_SRO_MB = 1500
+
+_F_HEAD = Font(name='Calibri', size=10, bold=True, color='FFFFFF')
+_P_HEAD = PatternFill('solid', fgColor='1F4E79')
+_P_STATUS = {
+    'OK': PatternFill('solid', fgColor='C6EFCE'),
+    'ERREURS': PatternFill('solid', fgColor='FFEB9C'),
+    'NON LANCE': PatternFill('solid', fgColor='FFC7CE'),
+}
+_AL_W = Alignment(horizontal='left', vertical='top', wrap_text=True)
+
+
+def available_memory_mb() -> Optional[int]:
+    """Memoire disponible (Mo), ou None si indeterminable."""
+    try:
+        import psutil
+        return int(psutil.virtual_memory().available // (1 << 20))
+    except ImportError:
+        pass
+    try:
+        with open('/proc/meminfo', encoding='ascii') as handle:
+            for line in handle:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) // 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    if os.name == 'nt':
+        import ctypes
+
+        class _MemoryStatus(ctypes.Structure):
+            _fields_ = [
+                ('dwLength', ctypes.c_ulong), ('dwMemoryLoad', ctypes.c_ulong),
+                ('ullTotalPhys', ctypes.c_ulonglong), ('ullAvailPhys', ctypes.c_ulonglong),
+                ('ullTotalPageFile', ctypes.c_ulonglong), ('ullAvailPageFile', ctypes.c_ulonglong),
+                ('ullTotalVirtual', ctypes.c_ulonglong), ('ullAvailVirtual', ctypes.c_ulonglong),
+                ('ullAvailExtendedVirtual', ctypes.c_ulonglong),
+            ]
+
+        status = _MemoryStatus()
+        status.dwLength = ctypes.sizeof(_MemoryStatus)
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return int(status.ullAvailPhys // (1 << 20))
+    return None
+
+
+def parallel_slots(max_parallel: int, cpu_count: Optional[int] = None,
+                   available_mb: Optional[int] = None,
+                   memory_per_sro_mb: int = DEFAULT_MEMORY_PER_SRO_MB) -> int:
+    """Nombre de SRO traites simultanement (au moins 1).
+
+    Borne par max_parallel, par les coeurs (un coeur reserve a QGIS) et par
+    la memoire disponible / memoire estimee d'un SRO (si connue).
+    """
+    slots = max(1, int(max_parallel))
+    cpus = cpu_count if cpu_count is not None else (os.cpu_count() or 1)
+    slots = min(slots, max(1, cpus - 1))
+    if available_mb is not None and memory_per_sro_mb > 0:
+        slots = min(slots, max(1, int(available_mb) // int(memory_per_sro_mb)))
+    return slots
+
+
+def find_project_dirs(root: str) -> List[str]:
+    """Sous-dossiers d'une livraison dont le nom donne un SRO (ex: 63041-B1I-PMZ-00003)."""
+    try:
+        names = sorted(os.listdir(root))
+    except OSError:
+        return []
+    return [
+        os.path.join(root, name) for name in names
+        if os.path.isdir(os.path.join(root, name)) and extract_sro_from_project_name(name)
+    ]
+
+
+def _write_table(ws, headers: List[str], rows: List[List], widths: List[int]) -> None:
+    ws.append(headers)
+    for cell in ws[1]:
+        cell.font = _F_HEAD
+        cell.fill = _P_HEAD
+    for row in rows:
+        ws.append(row)
+    for idx, width in enumerate(widths, start=1):
+        ws.column_dimensions[get_column_letter(idx)].width = width
+    ws.freeze_panes = 'A2'
+    ws.auto_filter.ref = ws.dimensions
+
+
+def write_summary_workbook(path: str, outcomes: List, module_names: Optional[Dict[str, str]] = None) -> str:
+    """Classeur de synthese d'une file de projets (SroOutcome). Retourne le chemin.
+
+    Feuille SYNTHESE : une ligne par SRO (statut, duree, modules, rapport).
+    Feuille MODULES : une ligne par SRO x module (statut, duree, message).
+    """
+    module_names = module_names or {}
+    wb = Workbook()
+    ws = wb.active
+    ws.title = 'SYNTHESE'
+    rows = []
+    for o in outcomes:
+        failed = [k for k, m in o.modules.items() if not m.get('success')]
+        rows.append([
+            o.sro, o.project_dir, o.status, o.duration_s,
+            len(o.modules) - len(failed),
+            ', '.join(module_names.get(k, k) for k in failed),
+            '\n'.join(o.reports), '\n'.join(o.errors),
+        ])
+    _write_table(ws, ['SRO', 'Dossier projet', 'Statut', 'Duree (s)', 'Modules OK',
+                      'Modules en erreur', 'Rapport', 'Erreurs'],
+                 rows, [22, 45, 12, 10, 11, 30, 60, 60])
+    for row_idx, o in enumerate(outcomes, start=2):
+        ws.cell(row=row_idx, column=3).fill = _P_STATUS[o.status]
+        for col in (6, 7, 8):
+            ws.cell(row=row_idx, column=col).alignment = _AL_W
+
+    ws_mod = wb.create_sheet('MODULES')
+    rows = [
+        [o.sro, module_names.get(key, key), 'OK' if m.get('success') else 'ERREUR',
+         o.timings.get(key, ''), m.get('message', '')]
+        for o in outcomes for key, m in o.modules.items()
+    ]
+    _write_table(ws_mod, ['SRO', 'Module', 'Statut', 'Duree (s)', 'Message'],
+                 rows, [22, 26, 10, 10, 80])
+    for row_idx, row in enumerate(rows, start=2):
+        ws_mod.cell(row=row_idx, column=3).fill = _P_STATUS['OK' if row[2] == 'OK' else 'NON LANCE']
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        wb.save(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        wb.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
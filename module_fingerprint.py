@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+"""
+Relance incrementale : empreintes des entrees par module et resultats memorises.
+
+Chaque module du batch recoit une empreinte de ses entrees (contenu des
+fichiers/dossiers livrables, etat des couches, empreinte BDD). Si elle est
+identique a celle du dernier resultat memorise et qu'aucun module dont il
+depend n'est recalcule, le resultat precedent est reutilise tel quel dans le
+rapport unifie. Module pur Python (aucune dependance QGIS).
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# Incrementer si la forme des resultats de modules change (invalide tout)
+RESULTS_VERSION = 1
+
+_IGNORED_PREFIXES = ('~$', '.~lock')
+
+_PLUGIN_DIR = os.path.dirname(os.path.abspath(__file__))
+_code_fp: Optional[str] = None
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """sha1 du contenu d'un fichier."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DigestCache:
+    """sha1 par fichier, recalcule seulement si taille ou mtime changent."""
+
+    def __init__(self, path: str = ''):
+        self.path = path
+        self._entries: Dict[str, List] = {}
+        self._dirty = False
+        if path and os.path.isfile(path):
+            try:
+                with open(path, encoding='utf-8') as handle:
+                    self._entries = json.load(handle)
+            except (OSError, ValueError):
+                self._entries = {}
+
+    def digest(self, path: str) -> str:
+        stat = os.stat(path)
+        key = os.path.abspath(path)
+        entry = self._entries.get(key)
+        if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            return entry[2]
+        value = file_digest(path)
+        self._entries[key] = [stat.st_size, stat.st_mtime_ns, value]
+        self._dirty = True
+        return value
+
+    def save(self) -> None:
+        if not self.path or not self._dirty:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as handle:
+                json.dump(self._entries, handle)
+            os.replace(tmp_path, self.path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self._dirty = False
+
+
+def path_fingerprint(path: str, digests: Optional[DigestCache] = None) -> str:
+    """Empreinte d'un fichier ou d'un dossier (chemins relatifs + contenus).
+
+    Fichiers de verrouillage Office/LibreOffice ignores. Chemin absent -> ''.
+    """
+    if not path or not os.path.exists(path):
+        return ''
+    digests = digests or DigestCache()
+    if os.path.isfile(path):
+        return digests.digest(path)
+    combined = hashlib.sha1()
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            if name.startswith(_IGNORED_PREFIXES):
+                continue
+            full = os.path.join(root, name)
+            rel = os.path.relpath(full, path).replace(os.sep, '/')
+            combined.update(f"{rel}\0{digests.digest(full)}\n".encode('utf-8'))
+    return combined.hexdigest()
+
+
+def code_fingerprint(plugin_dir: str = _PLUGIN_DIR) -> str:
+    """Version metadata.txt + sha1 des sources .py du plugin.
+
+    Une mise a jour du plugin (ou une modification locale des sources)
+    invalide les resultats memorises. Calcule une fois par processus pour
+    le dossier du plugin.
+    """
+    global _code_fp
+    if plugin_dir == _PLUGIN_DIR and _code_fp is not None:
+        return _code_fp
+    version = ''
+    try:
+        with open(os.path.join(plugin_dir, 'metadata.txt'), encoding='utf-8') as handle:
+            for line in handle:
+                if line.startswith('version='):
+                    version = line.split('=', 1)[1].strip()
+                    break
+    except OSError:
+        pass
+    sources = hashlib.sha1()
+    for root, dirs, files in os.walk(plugin_dir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith(('.', '__pycache__', 'tests')))
+        for name in sorted(files):
+            if not name.endswith('.py'):
+                continue
+            full = os.path.join(root, name)
+            rel = os.path.relpath(full, plugin_dir).replace(os.sep, '/')
+            sources.update(f"{rel}\0{file_digest(full)}\n".encode('utf-8'))
+    value = f"{version}|{sources.hexdigest()}"
+    if plugin_dir == _PLUGIN_DIR:
+        _code_fp = value
+    return value
+
+
+def combine(parts: Dict[str, Any]) -> Optional[str]:
+    """Empreinte d'un module depuis ses parties ; None si une partie est inconnue.
+
+    Une partie None signifie "etat non verifiable" (ex: couche en edition,
+    empreinte BDD indisponible) : le module doit etre recalcule. La version
+    du plugin et ses sources (code_fingerprint) font partie de l'empreinte.
+    """
+    if any(value is None for value in parts.values()):
+        return None
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.md5(
+        f"{RESULTS_VERSION}|{code_fingerprint()}|{payload}".encode('utf-8')
+    ).hexdigest()
+
+
+class FingerprintJob:
+    """Empreintes de tous les modules d'un batch, calculees hors du thread GUI.
+
+    Le thread principal fournit, par module, les chemins a hacher et les
+    parties deja connues (couches, champs, parametres). run() hache les
+    fichiers/dossiers (DigestCache persistant) et lit une seule fois
+    l'empreinte des cables de reference (requete BDD) pour les modules
+    qui en dependent.
+    """
+
+    def __init__(self, digest_path: str,
+                 inputs: Dict[str, Optional[Tuple[Dict[str, str], Dict[str, Any], bool]]],
+                 cables_reader: Optional[Callable[[], Optional[str]]] = None):
+        self.digest_path = digest_path
+        self.inputs = inputs
+        self.cables_reader = cables_reader
+
+    def run(self) -> Dict[str, Optional[str]]:
+        """{module: empreinte} ; None si une entree n'est pas verifiable."""
+        digests = DigestCache(self.digest_path)
+        cables: List[Optional[str]] = []
+        fingerprints: Dict[str, Optional[str]] = {}
+        for key, spec in self.inputs.items():
+            if spec is None:
+                fingerprints[key] = None
+                continue
+            paths, known, needs_cables = spec
+            try:
+                parts = dict(known)
+                for name, path in paths.items():
+                    parts[name] = path_fingerprint(path, digests)
+                if needs_cables:
+                    if not cables:
+                        cables.append(self.cables_reader() if self.cables_reader else None)
+                    parts['cables'] = cables[0] or None
+            except (OSError, ValueError):
+                fingerprints[key] = None
+                continue
+            fingerprints[key] = combine(parts)
+        digests.save()
+        return fingerprints
+
+
+def plan_reuse(module_keys: Iterable[str], fingerprints: Dict[str, Optional[str]],
+               stored: Dict[str, Optional[str]],
+               depends_on: Dict[str, List[str]]) -> Set[str]:
+    """Modules dont le resultat precedent peut etre reutilise.
+
+    Reutilisable si l'empreinte courante est connue, egale a l'empreinte
+    memorisee, et si aucune dependance selectionnee n'est recalculee
+    (ex: MAJ BD recalculee -> modules en aval recalcules).
+    """
+    selected = set(module_keys)
+    reused: Set[str] = set()
+    recomputed: Set[str] = set()
+    pending = set(selected)
+    while pending:
+        progressed = False
+        for key in sorted(pending):
+            deps = [d for d in depends_on.get(key, []) if d in selected]
+            if any(d in pending for d in deps):
+                continue
+            fp = fingerprints.get(key)
+            if fp and stored.get(key) == fp and not any(d in recomputed for d in deps):
+                reused.add(key)
+            else:
+                recomputed.add(key)
+            pending.discard(key)
+            progressed = True
+        if not progressed:
+            # Cycle : tout recalculer par prudence
+            return set()
+    return reused
+
+
+class ModuleResultStore:
+    """Resultats de modules memorises (un fichier pickle par module)."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pickle")
+
+    def _read(self, key: str) -> Optional[Dict]:
+        try:
+            with open(self._path(key), 'rb') as handle:
+                entry = pickle.load(handle)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, ValueError):
+            return None
+        if not isinstance(entry, dict) or entry.get('version') != RESULTS_VERSION:
+            return None
+        return entry
+
+    def fingerprint(self, key: str) -> Optional[str]:
+        """Empreinte du resultat memorise, ou None."""
+        entry = self._read(key)
+        return entry['fingerprint'] if entry else None
+
+    def load(self, key: str, fingerprint: str) -> Optional[Dict]:
+        """{'result', 'saved_at'} si l'empreinte correspond, sinon None."""
+        entry = self._read(key)
+        if not entry or entry.get('fingerprint') != fingerprint:
+            return None
+        return {'result': entry['result'], 'saved_at': entry.get('saved_at', '')}
+
+    def save(self, key: str, fingerprint: str, result: Dict) -> bool:
+        """Memorise un resultat. False si non serialisable (objets QGIS...)."""
+        os.makedirs(self.directory, exist_ok=True)
+        entry = {
+            'version': RESULTS_VERSION,
+            'fingerprint': fingerprint,
+            'saved_at': datetime.now().isoformat(timespec='seconds'),
+            'result': result,
+        }
+        tmp_path = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as handle:
+                pickle.dump(entry, handle, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+            return True
+        except (OSError, pickle.PicklingError, TypeError, AttributeError):
+            return False
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
@@ -1,5 +1,10 @@
 # -*- coding: utf-8 -*-
+import hashlib
+import json
 import math
+import os
+import threading
+import time
 from io import BytesIO
 
 from matplotlib.backends.backend_agg import FigureCanvasAgg
@@ -8,7 +13,122 @@ from matplotlib.lines import Line2D
 from matplotlib.patches import Circle, FancyArrowPatch, Rectangle
 
 
+class DrawingCache:
+    """Cache des PNG rendus, en memoire (run courant) et sur disque (entre runs).
+
+    Le cache disque est purge au premier put : fichiers plus vieux que
+    MAX_AGE_S, puis les plus anciens jusqu'a repasser sous MAX_BYTES.
+    """
+
+    MAX_AGE_S = 30 * 24 * 3600
+    MAX_BYTES = 256 * 1024 * 1024
+
+    def __init__(self, cache_dir=None, max_age_s=None, max_bytes=None):
+        self._cache_dir = cache_dir
+        self.max_age_s = self.MAX_AGE_S if max_age_s is None else max_age_s
+        self.max_bytes = self.MAX_BYTES if max_bytes is None else max_bytes
+        self._pruned = False
+        self._memory = {}
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        image_bytes = self._memory.get(key)
+        if image_bytes is not None:
+            self.memory_hits += 1
+            return image_bytes
+        path = self._path(key)
+        if path and os.path.isfile(path):
+            try:
+                with open(path, 'rb') as handle:
+                    image_bytes = handle.read()
+            except OSError:
+                image_bytes = None
+            if image_bytes:
+                self.disk_hits += 1
+                try:
+                    os.utime(path)
+                except OSError:
+                    pass
+                self._memory[key] = image_bytes
+                return image_bytes
+        self.misses += 1
+        return None
+
+    def put(self, key, image_bytes):
+        self._memory[key] = image_bytes
+        path = self._path(key)
+        if not path:
+            return
+        if not self._pruned:
+            self._pruned = True
+            self.prune()
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, 'wb') as handle:
+                handle.write(image_bytes)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def prune(self):
+        """Supprime les PNG trop anciens puis les moins recents au-dela de max_bytes."""
+        if not self._cache_dir or not os.path.isdir(self._cache_dir):
+            return 0
+        now = time.time()
+        entries = []
+        removed = 0
+        for root, _dirs, files in os.walk(self._cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if self.max_age_s and now - stat.st_mtime > self.max_age_s:
+                    removed += self._remove(path)
+                else:
+                    entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _mtime, size, _path in entries)
+        if self.max_bytes and total > self.max_bytes:
+            for _mtime, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if self._remove(path):
+                    total -= size
+                    removed += 1
+        return removed
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            return 0
+        return 1
+
+    @property
+    def lookups(self):
+        return self.memory_hits + self.disk_hits + self.misses
+
+    @property
+    def hit_rate(self):
+        lookups = self.lookups
+        return (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0
+
+    def _path(self, key):
+        if not self._cache_dir:
+            return None
+        return os.path.join(self._cache_dir, key[:2], f"{key}.png")
+
+
 class PcmDrawingRenderer:
+    RENDERER_VERSION = 1
     FIGURE_SIZE = (7.4, 5.4)
     DEFAULT_DPI = 180
     PANEL_BG = '#F8FAFC'
@@ -44,8 +164,9 @@ class PcmDrawingRenderer:
     EFFORT_MAX_RATIO = 0.42
     MAX_LABEL_LENGTH = 38
 
-    def __init__(self, dpi=None):
+    def __init__(self, dpi=None, cache=None):
         self._dpi = dpi or self.DEFAULT_DPI
+        self._cache = cache
 
     def render_supports(self, etudes_pcm, stop_requested=None):
         entries = self.build_support_entries(etudes_pcm, stop_requested)
@@ -92,18 +213,49 @@ class PcmDrawingRenderer:
             context['figure'].clear()
 
     def render_entry(self, entry, context=None):
-        return {
-            'etude': entry['etude'],
-            'support': entry['support_name'],
-            'connections': entry['connections'],
-            'image_bytes': self._render_card(
+        cache_key = self.entry_cache_key(entry)
+        image_bytes = self._cache.get(cache_key) if self._cache is not None else None
+        if image_bytes is None:
+            image_bytes = self._render_card(
                 entry['etude'],
                 entry['support_data'],
                 entry['spans'],
                 entry['armements'],
                 context,
-            ),
+            )
+            if self._cache is not None:
+                self._cache.put(cache_key, image_bytes)
+        return {
+            'etude': entry['etude'],
+            'support': entry['support_name'],
+            'connections': entry['connections'],
+            'cache_key': cache_key,
+            'image_bytes': image_bytes,
+        }
+
+    def entry_cache_key(self, entry):
+        # Tout ce que _render_card dessine entre dans la cle : deux cartes de
+        # meme cle produisent un PNG identique.
+        support = entry['support_data']
+        payload = {
+            'version': self.RENDERER_VERSION,
+            'dpi': self._dpi,
+            'figure_size': list(self.FIGURE_SIZE),
+            'etude': str(entry['etude']),
+            'support': {
+                'nom': str(support.nom),
+                'nature': support.nature,
+                'classe': support.classe,
+                'hauteur': support.hauteur,
+                'orientation': support.orientation,
+                'effort': support.effort,
+                'flags': self._support_flags(support),
+            },
+            'spans': entry['spans'],
+            'armements': entry['armements'],
         }
+        canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
 
     def _index_bt_spans(self, etude):
         index = {}
@@ -15,9 +15,13 @@ from dataclasses import dataclass, field
 from typing import List, Dict, Optional, Tuple
 
 try:
-    from .core_utils import safe_float, safe_int, parse_bool, get_xml_text, get_xml_float
+    from .core_utils import safe_float, safe_int, parse_bool
+    from . import process_pool
+    from .file_index import get_index
 except ImportError:
-    from core_utils import safe_float, safe_int, parse_bool, get_xml_text, get_xml_float
+    from core_utils import safe_float, safe_int, parse_bool
+    import process_pool
+    from file_index import get_index
 
 try:
     from qgis.core import QgsMessageLog, Qgis
@@ -198,24 +202,67 @@ class EtudePCM:
 
 
 # =============================================================================
-# FONCTIONS UTILITAIRES (safe_float, parse_bool, get_xml_text, get_xml_float importés de core_utils)
+# FONCTIONS UTILITAIRES (safe_float, safe_int, parse_bool importés de core_utils)
 # =============================================================================
 
-def _get_bool(element, tag: str) -> bool:
-    """Extrait booléen d'un sous-élément"""
-    return parse_bool(get_xml_text(element, tag))
+def _index_children(element: ET.Element) -> Dict[str, ET.Element]:
+    """Indexe les enfants directs par tag en un seul parcours.
+
+    Le premier enfant d'un tag gagne, comme avec element.find(tag).
+    """
+    index = {}
+    for child in element:
+        if child.tag not in index:
+            index[child.tag] = child
+    return index
+
+
+def _text(children: Dict[str, ET.Element], tag: str, default: str = "") -> str:
+    """Texte nettoyé d'un enfant indexé (équivalent get_xml_text)."""
+    child = children.get(tag)
+    return child.text.strip() if child is not None and child.text else default
+
+
+def _float(children: Dict[str, ET.Element], tag: str) -> float:
+    """Float d'un enfant indexé (équivalent get_xml_float)."""
+    return safe_float(_text(children, tag))
+
+
+def _int(children: Dict[str, ET.Element], tag: str) -> int:
+    """Int d'un enfant indexé."""
+    return safe_int(_text(children, tag))
+
+
+def _bool(children: Dict[str, ET.Element], tag: str) -> bool:
+    """Booléen (0/1) d'un enfant indexé."""
+    return parse_bool(_text(children, tag))
+
+
+def _iter_tag(element: Optional[ET.Element], tag: str):
+    """Enfants directs d'un tag donné (équivalent findall(tag), None toléré)."""
+    if element is None:
+        return
+    for child in element:
+        if child.tag == tag:
+            yield child
 
 
 # =============================================================================
 # PARSING PRINCIPAL
 # =============================================================================
 
-def parse_pcm_file(filepath: str) -> Optional[EtudePCM]:
+def parse_pcm_file(filepath: str, resoudre_capacites: bool = True) -> Optional[EtudePCM]:
     """
     Parse un fichier .pcm et retourne une structure EtudePCM.
+
+    Chaque élément (racine, Support, LigneTCF, LigneBT, Portee) est parcouru
+    une seule fois pour indexer ses enfants par tag, au lieu d'un find()
+    linéaire par champ.
     
     Args:
         filepath: Chemin complet du fichier .pcm
+        resoudre_capacites: False dans un processus de travail (capacités FO
+            résolues ensuite par le référentiel COMAC du processus QGIS)
     
     Returns:
         EtudePCM ou None si erreur
@@ -229,31 +276,29 @@ def parse_pcm_file(filepath: str) -> Optional[EtudePCM]:
     try:
         # Parse XML avec encodage ISO-8859-1
         tree = ET.parse(filepath)
-        root = tree.getroot()
+        root = _index_children(tree.getroot())
         
         # Métadonnées
-        etude.num_etude = get_xml_text(root, 'NumEtude')
-        etude.version = get_xml_text(root, 'Version')
-        etude.commune = get_xml_text(root, 'Commune')
-        etude.insee = get_xml_text(root, 'Insee')
-        etude.rue = get_xml_text(root, 'Rue')
-        etude.operateur = get_xml_text(root, 'Operateur')
-        etude.dist_energie = get_xml_text(root, 'DistEnergie')
-        etude.date_enregistrement = get_xml_text(root, 'DateEnregistrement')
-        etude.description = get_xml_text(root, 'Description')
+        etude.num_etude = _text(root, 'NumEtude')
+        etude.version = _text(root, 'Version')
+        etude.commune = _text(root, 'Commune')
+        etude.insee = _text(root, 'Insee')
+        etude.rue = _text(root, 'Rue')
+        etude.operateur = _text(root, 'Operateur')
+        etude.dist_energie = _text(root, 'DistEnergie')
+        etude.date_enregistrement = _text(root, 'DateEnregistrement')
+        etude.description = _text(root, 'Description')
         
         # Hypothèses climatiques
-        hypotheses_elem = root.find('Hypotheses')
-        if hypotheses_elem is not None:
-            for hyp in hypotheses_elem.findall('Hypothese'):
-                if hyp.text:
-                    etude.hypotheses.append(hyp.text.strip())
+        for hyp in _iter_tag(root.get('Hypotheses'), 'Hypothese'):
+            if hyp.text:
+                etude.hypotheses.append(hyp.text.strip())
         
         # Supports
         _parse_supports(root, etude)
         
         # Lignes TCF (télécom/fibre)
-        _parse_lignes_tcf(root, etude)
+        _parse_lignes_tcf(root, etude, resoudre_capacites)
         
         # Lignes BT
         _parse_lignes_bt(root, etude)
@@ -271,52 +316,49 @@ def parse_pcm_file(filepath: str) -> Optional[EtudePCM]:
     return etude
 
 
-def _parse_supports(root: ET.Element, etude: EtudePCM):
+def _parse_supports(root: Dict[str, ET.Element], etude: EtudePCM):
     """Parse section <Supports>"""
-    supports_elem = root.find('Supports')
-    if supports_elem is None:
-        return
-    
-    for supp_elem in supports_elem.findall('Support'):
-        nom = get_xml_text(supp_elem, 'Nom')
+    for supp_elem in _iter_tag(root.get('Supports'), 'Support'):
+        c = _index_children(supp_elem)
+        nom = _text(c, 'Nom')
         if not nom:
             continue
         
         support = Support(
             nom=nom,
-            nature=get_xml_text(supp_elem, 'Nature'),
-            hauteur=get_xml_float(supp_elem, 'Hauteur'),
-            classe=get_xml_text(supp_elem, 'Classe'),
-            effort=get_xml_float(supp_elem, 'Effort'),
-            traverse_existante=get_xml_float(supp_elem, 'TraverseExistante1'),
-            traverse_a_poser=get_xml_float(supp_elem, 'TraverseAPoser2'),
-            portee_molle=_get_bool(supp_elem, 'PorteeMolle'),
-            non_calcule=_get_bool(supp_elem, 'NonCalcule'),
-            illisible=_get_bool(supp_elem, 'Illisible'),
-            x=get_xml_float(supp_elem, 'X'),
-            y=get_xml_float(supp_elem, 'Y'),
-            etat=get_xml_text(supp_elem, 'Etat'),
-            orientation=get_xml_float(supp_elem, 'Orientation'),
-            facade=_get_bool(supp_elem, 'Facade'),
-            surimplantation=_get_bool(supp_elem, 'Surimplantation'),
-            a_poser=_get_bool(supp_elem, 'APoser'),
-            commentaire=get_xml_text(supp_elem, 'Commentaire'),
-            annee=get_xml_text(supp_elem, 'Annee'),
-            destination_desserte=safe_int(get_xml_text(supp_elem, 'DestinationDesserte')),
-            branchements_bt=safe_int(get_xml_text(supp_elem, 'BranchementsBT')),
-            opt_boitier_fibre=_get_bool(supp_elem, 'optBoitierFibre'),
-            opt_boitier_cuivre=_get_bool(supp_elem, 'optBoitierCuivre'),
-            opt_boitier_coaxial=_get_bool(supp_elem, 'optBoitierCoaxial'),
-            ras_bt=_get_bool(supp_elem, 'RASBT'),
-            ras_ft=_get_bool(supp_elem, 'RASFT'),
-            ras_fo=_get_bool(supp_elem, 'RASFO'),
-            opt_malt_bt=_get_bool(supp_elem, 'optMALTBT'),
-            reservation_ep=_get_bool(supp_elem, 'ReservationEP'),
-            presence_ep=_get_bool(supp_elem, 'PresenceEP'),
-            hauteur_ep=get_xml_float(supp_elem, 'HauteurEP'),
-            nb_raccordements_fibre=safe_int(get_xml_text(supp_elem, 'NbRaccordementsFibre')),
-            nb_raccordements_cuivre=safe_int(get_xml_text(supp_elem, 'NbRaccordementsCuivre')),
-            nb_raccordements_coaxial=safe_int(get_xml_text(supp_elem, 'NbRaccordementsCoaxial')),
+            nature=_text(c, 'Nature'),
+            hauteur=_float(c, 'Hauteur'),
+            classe=_text(c, 'Classe'),
+            effort=_float(c, 'Effort'),
+            traverse_existante=_float(c, 'TraverseExistante1'),
+            traverse_a_poser=_float(c, 'TraverseAPoser2'),
+            portee_molle=_bool(c, 'PorteeMolle'),
+            non_calcule=_bool(c, 'NonCalcule'),
+            illisible=_bool(c, 'Illisible'),
+            x=_float(c, 'X'),
+            y=_float(c, 'Y'),
+            etat=_text(c, 'Etat'),
+            orientation=_float(c, 'Orientation'),
+            facade=_bool(c, 'Facade'),
+            surimplantation=_bool(c, 'Surimplantation'),
+            a_poser=_bool(c, 'APoser'),
+            commentaire=_text(c, 'Commentaire'),
+            annee=_text(c, 'Annee'),
+            destination_desserte=_int(c, 'DestinationDesserte'),
+            branchements_bt=_int(c, 'BranchementsBT'),
+            opt_boitier_fibre=_bool(c, 'optBoitierFibre'),
+            opt_boitier_cuivre=_bool(c, 'optBoitierCuivre'),
+            opt_boitier_coaxial=_bool(c, 'optBoitierCoaxial'),
+            ras_bt=_bool(c, 'RASBT'),
+            ras_ft=_bool(c, 'RASFT'),
+            ras_fo=_bool(c, 'RASFO'),
+            opt_malt_bt=_bool(c, 'optMALTBT'),
+            reservation_ep=_bool(c, 'ReservationEP'),
+            presence_ep=_bool(c, 'PresenceEP'),
+            hauteur_ep=_float(c, 'HauteurEP'),
+            nb_raccordements_fibre=_int(c, 'NbRaccordementsFibre'),
+            nb_raccordements_cuivre=_int(c, 'NbRaccordementsCuivre'),
+            nb_raccordements_coaxial=_int(c, 'NbRaccordementsCoaxial'),
         )
         etude.supports[nom] = support
 
@@ -324,37 +366,34 @@ def _parse_supports(root: ET.Element, etude: EtudePCM):
 # DEBUG FLAG - set False en production
 _DEBUG_COMAC_CAPA = False
 
-def _parse_lignes_tcf(root: ET.Element, etude: EtudePCM):
+def _parse_lignes_tcf(root: Dict[str, ET.Element], etude: EtudePCM, resoudre_capacites: bool = True):
     """Parse section <LignesTCF> (télécom coaxial et fibre)"""
-    tcf_elem = root.find('LignesTCF')
+    tcf_elem = root.get('LignesTCF')
     if tcf_elem is None:
         if _DEBUG_COMAC_CAPA:
             print(f"[PCM_CAPA] Etude {etude.num_etude}: <LignesTCF> non trouvé")
         return
     
-    nb_lignes = len(tcf_elem.findall('LigneTCF'))
+    lignes_elems = list(_iter_tag(tcf_elem, 'LigneTCF'))
+    nb_lignes = len(lignes_elems)
     if _DEBUG_COMAC_CAPA:
         print(f"[PCM_CAPA] Etude {etude.num_etude}: {nb_lignes} lignes TCF trouvées")
     
-    for idx, ligne_elem in enumerate(tcf_elem.findall('LigneTCF')):
-        cable = get_xml_text(ligne_elem, 'Cable')
-        capacite = get_capacite_fo_from_code(cable, debug=_DEBUG_COMAC_CAPA)
-        
-        if _DEBUG_COMAC_CAPA:
-            print(f"[PCM_CAPA] Ligne {idx+1}/{nb_lignes}: cable='{cable}' -> capacite_fo={capacite}")
+    for idx, ligne_elem in enumerate(lignes_elems):
+        c = _index_children(ligne_elem)
+        cable = _text(c, 'Cable')
         
         ligne = LigneTCF(
             cable=cable,
-            capacite_fo=capacite,
-            a_poser=_get_bool(ligne_elem, 'APoser'),
-            tension=get_xml_float(ligne_elem, 'Tension'),
-            porteq=get_xml_float(ligne_elem, 'Porteq'),
-            gis_uid=safe_int(get_xml_text(ligne_elem, 'GIS_UID')),
-            parallele_bt=_get_bool(ligne_elem, 'optParalleleBT'),
+            a_poser=_bool(c, 'APoser'),
+            tension=_float(c, 'Tension'),
+            porteq=_float(c, 'Porteq'),
+            gis_uid=_int(c, 'GIS_UID'),
+            parallele_bt=_bool(c, 'optParalleleBT'),
         )
         
         # Supports et traverses
-        supports_elem = ligne_elem.find('Supports')
+        supports_elem = c.get('Supports')
         if supports_elem is not None:
             for child in supports_elem:
                 if child.tag == 'Support' and child.text:
@@ -363,37 +402,49 @@ def _parse_lignes_tcf(root: ET.Element, etude: EtudePCM):
                     ligne.traverses.append(safe_int(child.text))
         
         # Portées
-        portees_elem = ligne_elem.find('Portees')
-        if portees_elem is not None:
-            for portee_elem in portees_elem.findall('Portee'):
-                if portee_elem.text:
-                    ligne.portees.append(safe_float(portee_elem.text))
+        for portee_elem in _iter_tag(c.get('Portees'), 'Portee'):
+            if portee_elem.text:
+                ligne.portees.append(safe_float(portee_elem.text))
         
-        # Portée max selon capacité
-        if capacite > 0:
-            ligne.portee_max = PORTEES_MAX_ZVN.get(capacite, 0)
+        if resoudre_capacites:
+            _resoudre_capacite_ligne(ligne)
+            if _DEBUG_COMAC_CAPA:
+                print(f"[PCM_CAPA] Ligne {idx+1}/{nb_lignes}: cable='{cable}' -> capacite_fo={ligne.capacite_fo}")
         
         etude.lignes_tcf.append(ligne)
 
 
-def _parse_lignes_bt(root: ET.Element, etude: EtudePCM):
+def _resoudre_capacite_ligne(ligne: LigneTCF):
+    """Capacité FO (référentiel COMAC) et portée max associée."""
+    ligne.capacite_fo = get_capacite_fo_from_code(ligne.cable, debug=_DEBUG_COMAC_CAPA)
+    # Portée max selon capacité
+    if ligne.capacite_fo > 0:
+        ligne.portee_max = PORTEES_MAX_ZVN.get(ligne.capacite_fo, 0)
+
+
+def _parse_pcm_brut(filepath: str) -> Tuple[Optional[EtudePCM], str]:
+    """Lecture XML seule (processus de travail) : (etude, erreur)."""
+    try:
+        return parse_pcm_file(filepath, resoudre_capacites=False), ''
+    except Exception as e:
+        return None, str(e)
+
+
+def _parse_lignes_bt(root: Dict[str, ET.Element], etude: EtudePCM):
     """Parse section <LignesBT>"""
-    bt_elem = root.find('LignesBT')
-    if bt_elem is None:
-        return
-    
-    for ligne_elem in bt_elem.findall('LigneBT'):
+    for ligne_elem in _iter_tag(root.get('LignesBT'), 'LigneBT'):
+        c = _index_children(ligne_elem)
         ligne = LigneBT(
-            conducteur=get_xml_text(ligne_elem, 'Conducteur'),
-            type_conducteur=get_xml_text(ligne_elem, 'TypeConducteur'),
-            parametre=safe_int(get_xml_text(ligne_elem, 'Parametre')),
-            porteq=get_xml_float(ligne_elem, 'Porteq'),
-            a_poser=_get_bool(ligne_elem, 'APoser'),
-            gis_uid=safe_int(get_xml_text(ligne_elem, 'GIS_UID')),
+            conducteur=_text(c, 'Conducteur'),
+            type_conducteur=_text(c, 'TypeConducteur'),
+            parametre=_int(c, 'Parametre'),
+            porteq=_float(c, 'Porteq'),
+            a_poser=_bool(c, 'APoser'),
+            gis_uid=_int(c, 'GIS_UID'),
         )
         
         # Supports + armements (entrelaces: Support, Armement, NomArmement, DecalAccro)
-        supports_elem = ligne_elem.find('Supports')
+        supports_elem = c.get('Supports')
         if supports_elem is not None:
             current_arm = None
             for child in supports_elem:
@@ -410,30 +461,26 @@ def _parse_lignes_bt(root: ET.Element, etude: EtudePCM):
                     current_arm.decal_accro = safe_int(child.text)
         
         # Portées
-        portees_elem = ligne_elem.find('Portees')
-        if portees_elem is not None:
-            for portee_elem in portees_elem.findall('Portee'):
-                if portee_elem.text:
-                    ligne.portees.append(safe_float(portee_elem.text))
+        for portee_elem in _iter_tag(c.get('Portees'), 'Portee'):
+            if portee_elem.text:
+                ligne.portees.append(safe_float(portee_elem.text))
         
         etude.lignes_bt.append(ligne)
 
 
-def _parse_portees_globales(root: ET.Element, etude: EtudePCM):
+def _parse_portees_globales(root: Dict[str, ET.Element], etude: EtudePCM):
     """Parse section <Portees> globale (catalogue physique des spans)."""
-    portees_elem = root.find('Portees')
-    if portees_elem is None:
-        return
-    for p_elem in portees_elem.findall('Portee'):
-        longueur_raw = get_xml_text(p_elem, 'Longueur')
+    for p_elem in _iter_tag(root.get('Portees'), 'Portee'):
+        c = _index_children(p_elem)
+        longueur_raw = _text(c, 'Longueur')
         if not longueur_raw:
             continue
         etude.portees_globales.append(PorteeGlobale(
-            support_gauche=get_xml_text(p_elem, 'SuppG'),
-            support_droit=get_xml_text(p_elem, 'SuppD'),
+            support_gauche=_text(c, 'SuppG'),
+            support_droit=_text(c, 'SuppD'),
             longueur=safe_float(longueur_raw),
-            angle=get_xml_float(p_elem, 'Angle'),
-            route=get_xml_text(p_elem, 'Route') == '1',
+            angle=_float(c, 'Angle'),
+            route=_text(c, 'Route') == '1',
         ))
 
 
@@ -555,13 +602,20 @@ def verifier_securite_etude(etude: EtudePCM, zone: str = 'ZVN') -> List[VerifSec
 # FONCTIONS DE HAUT NIVEAU
 # =============================================================================
 
-def parse_repertoire_pcm(repertoire: str, zone: str = 'ZVN') -> Tuple[Dict[str, EtudePCM], Dict[str, str]]:
+def list_pcm_files(repertoire: str) -> List[str]:
+    """Fichiers .pcm d'un répertoire (récursif, ordre os.walk)."""
+    return get_index(repertoire).glob('*.pcm')
+
+
+def parse_repertoire_pcm(repertoire: str, zone: str = 'ZVN',
+                         is_cancelled=None) -> Tuple[Dict[str, EtudePCM], Dict[str, str]]:
     """
     Parse tous les fichiers .pcm d'un répertoire.
     
     Args:
         repertoire: Chemin du répertoire
         zone: Zone climatique
+        is_cancelled: Callable d'annulation (fichiers restants ignorés)
     
     Returns:
         Tuple (dict études par nom, dict erreurs par fichier)
@@ -569,18 +623,26 @@ def parse_repertoire_pcm(repertoire: str, zone: str = 'ZVN') -> Tuple[Dict[str,
     etudes = {}
     erreurs = {}
     
-    for subdir, _, files in os.walk(repertoire):
-        for name in files:
-            if name.lower().endswith('.pcm'):
-                filepath = os.path.join(subdir, name)
-                try:
-                    etude = parse_pcm_file(filepath)
-                    if etude:
-                        # Vérification sécurité
-                        verifier_securite_etude(etude, zone)
-                        etudes[etude.num_etude or name] = etude
-                except Exception as e:
-                    erreurs[filepath] = str(e)
+    # Lecture XML dans le pool de processus, référentiel et règles ici
+    fichiers = list_pcm_files(repertoire)
+    lus = process_pool.map_ordered(_parse_pcm_brut, fichiers, is_cancelled)
+    for filepath, lu in zip(fichiers, lus):
+        if lu is None:
+            continue
+        etude, erreur = lu
+        if erreur:
+            erreurs[filepath] = erreur
+            continue
+        if not etude:
+            continue
+        try:
+            for ligne in etude.lignes_tcf:
+                _resoudre_capacite_ligne(ligne)
+            # Vérification sécurité
+            verifier_securite_etude(etude, zone)
+            etudes[etude.num_etude or os.path.basename(filepath)] = etude
+        except Exception as e:
+            erreurs[filepath] = str(e)
     
     return etudes, erreurs
 
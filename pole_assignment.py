@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+Affectation poteaux -> polygones etude, calculee une seule fois par batch.
+
+Les predicats geometriques viennent de geometries GEOS preparees
+(qgis_utils.compute_pole_assignment) ; ce module ne porte que l'index en
+grille et le resultat, pur Python : le resultat (noms et index, sans
+geometrie) est transmis aux threads workers.
+
+Statuts par poteau et par polygone :
+- 'in'     : strictement a l'interieur (equivalent QgsGeometry.contains)
+- 'border' : hors du polygone mais dans son buffer de bordure
+             (inclus par le buffer de 0.5 m de extraire_poteaux_etude)
+- 'out'    : dans aucun polygone, ni en bordure
+"""
+
+import math
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+STATUS_IN = 'in'
+STATUS_BORDER = 'border'
+STATUS_OUT = 'out'
+
+
+def study_sort_key(name) -> tuple:
+    """Cle de tri des etudes equivalente a QgsFeatureRequest.OrderBy ascendant.
+
+    Valeurs comparees dans leur type natif ("9" < "10" pour un champ
+    numerique), NULL en dernier.
+    """
+    return (name is None, name if name is not None else 0)
+
+
+class StudyArea:
+    """Polygone etude prepare pour assign_poles (interface).
+
+    name : nom d'etude ; bbox : (xmin, ymin, xmax, ymax) bordure comprise ;
+    locate(x, y) : STATUS_IN, STATUS_BORDER ou None.
+    """
+
+    __slots__ = ('name', 'bbox')
+
+    def locate(self, x: float, y: float) -> Optional[str]:
+        raise NotImplementedError
+
+
+class PoleAssignment:
+    """Resultat d'affectation : appartenance poteau -> etudes (in/border).
+
+    Les etudes sont conservees dans l'ordre fourni (tri par nom cote QGIS) ;
+    seuls leurs noms sont gardes. Les index stockes referencent cet ordre.
+    """
+
+    def __init__(self, study_names: List, inside: Dict, border: Dict, pole_ids,
+                 pole_layer_id: str = '', study_layer_id: str = '', study_field: str = ''):
+        self.names = list(study_names)
+        self.inside = inside
+        self.border = border
+        self.pole_ids = set(pole_ids)
+        self.pole_layer_id = pole_layer_id
+        self.study_layer_id = study_layer_id
+        self.study_field = study_field
+
+    def matches(self, pole_layer_id: str, study_layer_id: str, study_field: str) -> bool:
+        """True si l'affectation a ete calculee pour ces couches et ce champ."""
+        return (
+            self.pole_layer_id == pole_layer_id
+            and self.study_layer_id == study_layer_id
+            and self.study_field == study_field
+        )
+
+    def status(self, pole_id) -> str:
+        if pole_id in self.inside:
+            return STATUS_IN
+        if pole_id in self.border:
+            return STATUS_BORDER
+        return STATUS_OUT
+
+    def study_indexes(self, pole_id, include_border: bool = True) -> List[int]:
+        indexes = list(self.inside.get(pole_id, ()))
+        if include_border:
+            indexes.extend(self.border.get(pole_id, ()))
+            indexes.sort()
+        return indexes
+
+    def studies_for(self, pole_id, include_border: bool = True) -> List:
+        """Noms des etudes contenant le poteau, dans l'ordre des etudes."""
+        return [self.names[i] for i in self.study_indexes(pole_id, include_border)]
+
+    def study_names(self) -> List:
+        """Noms de tous les polygones etude (doublons compris), dans l'ordre."""
+        return list(self.names)
+
+    def poles_by_study(self, include_border: bool = True,
+                       name_pattern: Optional[str] = None) -> List[Tuple[object, List]]:
+        """Liste [(nom_etude, [pole_id...])] par polygone, dans l'ordre des etudes.
+
+        Args:
+            include_border: inclure les poteaux en bordure (semantique buffer)
+            name_pattern: filtre LIKE SQL optionnel sur le nom d'etude ('%', '_')
+        """
+        matcher = _like_matcher(name_pattern) if name_pattern is not None else None
+        by_index = {}
+        sources = (self.inside, self.border) if include_border else (self.inside,)
+        for source in sources:
+            for pole_id, indexes in source.items():
+                for idx in indexes:
+                    by_index.setdefault(idx, []).append(pole_id)
+        result = []
+        for idx, name in enumerate(self.names):
+            if matcher and not matcher(name):
+                continue
+            result.append((name, by_index.get(idx, [])))
+        return result
+
+
+def _like_matcher(pattern: str):
+    regex = ''.join(
+        '.*' if ch == '%' else '.' if ch == '_' else re.escape(ch)
+        for ch in str(pattern)
+    )
+    compiled = re.compile(regex, re.DOTALL)
+    return lambda name: name is not None and compiled.fullmatch(str(name)) is not None
+
+
+def _grid_cell_size(studies: Sequence[StudyArea]) -> float:
+    sizes = [
+        max(s.bbox[2] - s.bbox[0], s.bbox[3] - s.bbox[1])
+        for s in studies if s.bbox
+    ]
+    if not sizes:
+        return 1.0
+    return max(sum(sizes) / len(sizes), 1.0)
+
+
+def assign_poles(points: Dict, studies: Sequence[StudyArea],
+                 pole_layer_id: str = '', study_layer_id: str = '',
+                 study_field: str = '') -> PoleAssignment:
+    """Affecte chaque poteau aux polygones etude en une seule passe.
+
+    Index en grille reguliere sur les bbox des polygones (bordure comprise),
+    puis StudyArea.locate sur les seuls candidats.
+
+    Args:
+        points: {pole_id: (x, y)}
+        studies: polygones prepares, dans l'ordre de restitution souhaite
+
+    Returns:
+        PoleAssignment
+    """
+    cell = _grid_cell_size(studies)
+    grid = {}
+    for idx, study in enumerate(studies):
+        if not study.bbox:
+            continue
+        xmin, ymin, xmax, ymax = study.bbox
+        for gx in range(int(math.floor(xmin / cell)), int(math.floor(xmax / cell)) + 1):
+            for gy in range(int(math.floor(ymin / cell)), int(math.floor(ymax / cell)) + 1):
+                grid.setdefault((gx, gy), []).append(idx)
+
+    inside = {}
+    border = {}
+    for pole_id, (x, y) in points.items():
+        candidates = grid.get((int(math.floor(x / cell)), int(math.floor(y / cell))))
+        if not candidates:
+            continue
+        in_idx = []
+        border_idx = []
+        for idx in candidates:
+            xmin, ymin, xmax, ymax = studies[idx].bbox
+            if x < xmin or x > xmax or y < ymin or y > ymax:
+                continue
+            status = studies[idx].locate(x, y)
+            if status == STATUS_IN:
+                in_idx.append(idx)
+            elif status == STATUS_BORDER:
+                border_idx.append(idx)
+        if in_idx:
+            inside[pole_id] = tuple(in_idx)
+        if border_idx:
+            border[pole_id] = tuple(border_idx)
+
+    return PoleAssignment([study.name for study in studies], inside, border, points.keys(),
+                          pole_layer_id, study_layer_id, study_field)
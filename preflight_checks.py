@@ -11,13 +11,14 @@ Chaque check retourne un dict:
 """
 
 import os
-import csv
 from typing import List, Dict, Optional
 
 from qgis.core import (
     QgsVectorLayer, NULL
 )
 
+from .file_index import get_index
+
 
 def run_data_quality_checks(
     lyr_pot: Optional[QgsVectorLayer],
@@ -188,7 +189,7 @@ def run_data_quality_checks(
     # === PF-06: Dossier COMAC ===
     if 'comac' in mods and comac_dir and os.path.isdir(comac_dir):
         comac_xlsx = 0
-        for _root, _, _files in os.walk(comac_dir):
+        for _root, _, _files in get_index(comac_dir).walk():
             comac_xlsx += sum(1 for f in _files if f.endswith('.xlsx') and '~$' not in f)
         if comac_xlsx == 0:
             results.append({
@@ -204,7 +205,7 @@ def run_data_quality_checks(
     # === PF-07: Dossier CAP_FT ===
     if 'capft' in mods and capft_dir and os.path.isdir(capft_dir):
         fiche_count = 0
-        for _root, _, _files in os.walk(capft_dir):
+        for _root, _, _files in get_index(capft_dir).walk():
             fiche_count += sum(1 for f in _files if 'FicheAppui' in f and f.endswith('.xlsx'))
         if fiche_count == 0:
             results.append({
@@ -250,14 +251,18 @@ def _check_gracethd_mcd(gdir: str) -> List[Dict]:
             'message': f'GraceTHD: fichiers optionnels absents: {", ".join(missing_opt)}'
         })
 
+    # Lecteur propre a la verification ; l'import GeoPackage du livrable (meme empreinte)
+    # est cree ici ou par les modules Axione et reutilise par les suivants
+    from .gracethd_reader import GraceTHDReader
+    reader = GraceTHDReader(gdir)
+
     # PF-10 + PF-10b: Cables DI + join integrity
     t_cable_path = os.path.join(gdir, 't_cable.csv')
     t_cableline_path = os.path.join(gdir, 't_cableline.shp')
     if os.path.isfile(t_cable_path) and os.path.isfile(t_cableline_path):
         try:
-            with open(t_cable_path, 'r', encoding='utf-8', errors='replace') as f:
-                cables = list(csv.DictReader(f, delimiter=';'))
-            cables_di = [r for r in cables if r.get('cb_typelog', '').upper() == 'DI']
+            cables = reader.table('t_cable.csv')
+            cables_di = reader.rows_where('t_cable.csv', 'cb_typelog', ('DI',))
             nb_di = len(cables_di)
 
             if nb_di == 0:
@@ -273,11 +278,10 @@ def _check_gracethd_mcd(gdir: str) -> List[Dict]:
                 })
 
                 # PF-10b: Join cables -> cableline
-                cl_layer = QgsVectorLayer(t_cableline_path, 'cl_check', 'ogr')
-                if cl_layer.isValid():
-                    cl_codes = {str(f['cl_cb_code']).strip() for f in cl_layer.getFeatures() if f['cl_cb_code']}
-                    del cl_layer
-                    cb_codes_di = {r.get('cb_code', '').strip() for r in cables_di}
+                cableline = reader.table('t_cableline.shp')
+                if cableline is not None:
+                    cl_codes = {str(v).strip() for v in cableline.column('cl_cb_code') if v}
+                    cb_codes_di = {cables.get(i, 'cb_code').strip() for i in cables_di}
                     missing_join = cb_codes_di - cl_codes
                     if missing_join:
                         results.append({
@@ -293,7 +297,8 @@ def _check_gracethd_mcd(gdir: str) -> List[Dict]:
 
                 # PF-10e: Capacites
                 valid_capas = {6, 12, 24, 36, 48, 72, 96, 144, 288, 576}
-                invalid = sum(1 for r in cables_di if _invalid_capa(r, valid_capas))
+                invalid = sum(1 for i in cables_di
+                              if _invalid_capa(cables.get(i, 'cb_capafo'), valid_capas))
                 if invalid:
                     results.append({
                         'id': 'PF-10e', 'level': 'WARN',
@@ -312,21 +317,19 @@ def _check_gracethd_mcd(gdir: str) -> List[Dict]:
     t_noeud = os.path.join(gdir, 't_noeud.shp')
     if all(os.path.isfile(p) for p in [t_ebp, t_ptech, t_noeud]):
         try:
-            with open(t_ebp, 'r', encoding='utf-8', errors='replace') as f:
-                ebp_rows = list(csv.DictReader(f, delimiter=';'))
-            with open(t_ptech, 'r', encoding='utf-8', errors='replace') as f:
-                ptech_rows = list(csv.DictReader(f, delimiter=';'))
+            ebp = reader.table('t_ebp.csv')
+            ptech = reader.table('t_ptech.csv')
 
-            pt_codes = {r.get('pt_code', '').strip() for r in ptech_rows}
-            pt_nd_map = {r.get('pt_code', '').strip(): r.get('pt_nd_code', '').strip() for r in ptech_rows}
+            pt_codes = {v.strip() for v in ptech.column('pt_code')}
+            pt_nd_map = {code.strip(): nd.strip()
+                         for code, nd in zip(ptech.column('pt_code'), ptech.column('pt_nd_code'))}
 
-            nd_layer = QgsVectorLayer(t_noeud, 'nd_check', 'ogr')
-            nd_codes = {str(f['nd_code']).strip() for f in nd_layer.getFeatures() if f['nd_code']} if nd_layer.isValid() else set()
-            del nd_layer
+            noeud = reader.table('t_noeud.shp')
+            nd_codes = {str(v).strip() for v in noeud.column('nd_code') if v} if noeud is not None else set()
 
             nb_broken = 0
-            for ebp in ebp_rows:
-                bp_pt = ebp.get('bp_pt_code', '').strip()
+            for bp_pt in ebp.column('bp_pt_code'):
+                bp_pt = bp_pt.strip()
                 if bp_pt not in pt_codes:
                     nb_broken += 1
                 elif pt_nd_map.get(bp_pt, '') not in nd_codes:
@@ -335,13 +338,13 @@ def _check_gracethd_mcd(gdir: str) -> List[Dict]:
             if nb_broken > 0:
                 results.append({
                     'id': 'PF-10c', 'level': 'WARN',
-                    'message': f'GraceTHD jointure BPE : {nb_broken}/{len(ebp_rows)} boitiers (BPE) '
+                    'message': f'GraceTHD jointure BPE : {nb_broken}/{len(ebp)} boitiers (BPE) '
                                f'sans localisation (lien entre les tables GraceTHD rompu).'
                 })
             else:
                 results.append({
                     'id': 'PF-10c', 'level': 'OK',
-                    'message': f'GraceTHD jointure BPE: {len(ebp_rows)} BPE valides'
+                    'message': f'GraceTHD jointure BPE: {len(ebp)} BPE valides'
                 })
         except Exception as e:
             results.append({
@@ -352,9 +355,9 @@ def _check_gracethd_mcd(gdir: str) -> List[Dict]:
     return results
 
 
-def _invalid_capa(row: dict, valid: set) -> bool:
+def _invalid_capa(raw_capa: Optional[str], valid: set) -> bool:
     try:
-        c = int(row.get('cb_capafo', '0') or '0')
+        c = int(raw_capa or '0')
         return c not in valid and c != 0
     except (ValueError, TypeError):
         return True
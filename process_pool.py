@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""
+Pool de processus pour les etapes Python pures (lecture XML/Excel en masse).
+
+Les QgsTask restent des coordinateurs : ils envoient des entrees
+serialisables (chemins, tuples, WKB) a des processus de travail et
+recoivent des resultats simples (dicts, dataclasses, listes). Les threads
+QgsTask partagent le GIL ; les processus utilisent tous les coeurs.
+
+Les fonctions soumises doivent etre de niveau module, sans objet QGIS ni
+acces BDD. Repli transparent dans le thread appelant si le pool est
+desactive (configure(0)), si le lot est trop petit ou si les processus ne
+peuvent pas demarrer. Module pur Python.
+
+Mesure sur une machine cible :
+    python -m PoleAerien.process_pool <dossier COMAC> [--workers 1,4,8]
+"""
+
+import multiprocessing
+import os
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Iterable, List, Optional
+
+AUTO = -1
+# Au-dela, le cout memoire (un interpreteur par processus) depasse le gain
+_MAX_AUTO_WORKERS = 8
+# En dessous, le demarrage/serialisation coute plus que le calcul
+MIN_ITEMS = 3
+_POLL_S = 0.25
+
+_lock = threading.Lock()
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_workers = 0
+_configured = AUTO
+_broken_reason = ''
+
+
+def configure(workers: int = AUTO) -> None:
+    """Nombre de processus : AUTO (coeurs - 1, max 8), 0 ou 1 = desactive."""
+    global _configured
+    _configured = int(workers)
+
+
+def worker_count() -> int:
+    """Nombre de processus effectif (0 si pool desactive ou indisponible)."""
+    if _broken_reason:
+        return 0
+    if _configured == AUTO:
+        workers = min(_MAX_AUTO_WORKERS, (os.cpu_count() or 1) - 1)
+    else:
+        workers = _configured
+    return workers if workers >= 2 else 0
+
+
+def unavailable_reason() -> str:
+    """Raison de l'abandon du pool pour la session, sinon ''."""
+    return _broken_reason
+
+
+def python_executable() -> str:
+    """Interpreteur Python des processus de travail.
+
+    Dans QGIS, sys.executable designe qgis(.exe) et non python : on cherche
+    l'interpreteur de l'environnement (OSGeo4W : <exec_prefix>/python.exe).
+    """
+    exe = sys.executable or ''
+    if os.path.basename(exe).lower().startswith('python'):
+        return exe
+    version = f"{sys.version_info[0]}.{sys.version_info[1]}"
+    if os.name == 'nt':
+        candidates = [os.path.join(sys.exec_prefix, 'python.exe')]
+    else:
+        candidates = [
+            os.path.join(sys.exec_prefix, 'bin', f'python{version}'),
+            os.path.join(sys.exec_prefix, 'bin', 'python3'),
+        ]
+    for candidate in candidates:
+        if os.path.isfile(candidate):
+            return candidate
+    return shutil.which(f'python{version}') or shutil.which('python3') or ''
+
+
+def _get_executor(workers: int) -> ProcessPoolExecutor:
+    """Pool partage (processus gardes chauds entre taches), recree si la taille change."""
+    global _executor, _executor_workers
+    with _lock:
+        if _executor is not None and _executor_workers == workers:
+            return _executor
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+        exe = python_executable()
+        if not exe:
+            raise OSError("interpreteur Python introuvable")
+        # spawn : fork d'un processus Qt multi-thread n'est pas sur
+        context = multiprocessing.get_context('spawn')
+        context.set_executable(exe)
+        _executor = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+        _executor_workers = workers
+        return _executor
+
+
+def shutdown() -> None:
+    """Arrete le pool (dechargement du plugin)."""
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def _mark_broken(reason: str) -> None:
+    global _broken_reason
+    _broken_reason = reason or 'pool interrompu'
+    shutdown()
+
+
+def _map_local(fn: Callable, items: List, is_cancelled: Optional[Callable[[], bool]]) -> List:
+    results = []
+    for item in items:
+        if is_cancelled and is_cancelled():
+            results.extend([None] * (len(items) - len(results)))
+            break
+        results.append(fn(item))
+    return results
+
+
+def map_ordered(fn: Callable, items: Iterable,
+                is_cancelled: Optional[Callable[[], bool]] = None) -> List:
+    """fn(item) pour chaque element, resultats dans l'ordre des entrees.
+
+    Les exceptions de fn sont propagees (comme un appel local) : les
+    fonctions soumises capturent leurs erreurs par element. Apres
+    annulation, les elements non traites valent None.
+    """
+    items = list(items)
+    workers = min(worker_count(), len(items))
+    if workers < 2 or len(items) < MIN_ITEMS:
+        return _map_local(fn, items, is_cancelled)
+    try:
+        executor = _get_executor(worker_count())
+        futures = [executor.submit(fn, item) for item in items]
+    except (OSError, RuntimeError, ValueError) as e:
+        _mark_broken(str(e))
+        return _map_local(fn, items, is_cancelled)
+
+    results = []
+    try:
+        for future in futures:
+            while True:
+                if is_cancelled and is_cancelled():
+                    for pending in futures:
+                        pending.cancel()
+                    return results + [None] * (len(items) - len(results))
+                try:
+                    results.append(future.result(timeout=_POLL_S))
+                    break
+                except FutureTimeout:
+                    continue
+    except BrokenProcessPool as e:
+        # Processus tue (memoire, antivirus...) : tout refaire localement
+        _mark_broken(str(e) or 'processus de travail interrompu')
+        return _map_local(fn, items, is_cancelled)
+    return results
+
+
+def benchmark(fn: Callable, items: List, worker_counts: Iterable[int]) -> List[tuple]:
+    """[(processus, secondes)] pour un meme lot, pool chaud (une passe de chauffe)."""
+    timings = []
+    previous = _configured
+    try:
+        for workers in worker_counts:
+            configure(workers)
+            map_ordered(fn, items[:max(MIN_ITEMS, workers)])
+            t0 = time.perf_counter()
+            map_ordered(fn, items)
+            timings.append((workers, round(time.perf_counter() - t0, 2)))
+    finally:
+        configure(previous)
+        shutdown()
+    return timings
+
+
+def _main(argv=None) -> int:
+    import argparse
+    try:
+        from .pcm_parser import list_pcm_files, parse_pcm_file
+    except ImportError:
+        from pcm_parser import list_pcm_files, parse_pcm_file
+
+    parser = argparse.ArgumentParser(description="Mesure du pool de processus (lecture PCM).")
+    parser.add_argument('directory', help="Dossier COMAC contenant des .pcm")
+    parser.add_argument('--workers', default='1,2,4,8', help="Tailles de pool a mesurer")
+    args = parser.parse_args(argv)
+
+    files = list_pcm_files(args.directory)
+    counts = [int(w) for w in args.workers.split(',') if w.strip()]
+    print(f"{len(files)} fichiers PCM, {os.cpu_count()} coeurs")
+    for workers, seconds in benchmark(parse_pcm_file, files, counts):
+        print(f"  {workers:>2} processus : {seconds:.2f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(_main())
@@ -21,12 +21,22 @@ Real project convention:
 Note: There is NO separate C6 folder. C6 annexes are Excel files
 within the study folders under CAP FT/. For Police C6 and C6 vs BD,
 the CAP FT directory IS the C6 browse directory.
+
+The project tree is read by a single bounded-depth os.scandir walk
+(_ProjectScan): every entry is classified during that pass, so detection
+costs one directory listing per folder, which matters on network shares.
 """
 
 import os
 import re
+import time
 from dataclasses import dataclass, field
-from typing import Optional, List
+from typing import Callable, Dict, Optional, List, Tuple
+
+try:
+    from .shp_reader import first_dbf_value
+except ImportError:
+    from shp_reader import first_dbf_value
 
 
 def extract_sro_from_project_name(project_name: str) -> Optional[str]:
@@ -111,6 +121,13 @@ class DetectionResult:
     # List of (resource_label, hint_message) for resources NOT found
     diagnostics: List[tuple] = field(default_factory=list)
 
+    # Counts gathered by the scan for CAP FT / COMAC: {dir: {'cmd', 'etudes', 'excels'}}
+    dir_counts: Dict[str, Dict[str, int]] = field(default_factory=dict)
+
+    # Scan statistics (entries listed, seconds)
+    scan_entries: int = 0
+    scan_s: float = 0.0
+
     @property
     def has_gracethd(self) -> bool:
         return bool(self.gracethd_dir) and os.path.isdir(self.gracethd_dir)
@@ -241,119 +258,157 @@ _EXPECTED_NAMES = {
     'GraceTHD': 'Dossier contenant t_noeud.shp + t_cableline.shp (nom du dossier libre, detection par contenu)',
 }
 
-# Fichiers GraceTHD requis pour validation
-_GRACETHD_REQUIRED_FILES = ['t_noeud.shp', 't_cableline.shp']
-_GRACETHD_EXPECTED_FILES = ['t_cable.csv', 't_ptech.csv', 't_ebp.csv', 't_cheminement.shp']
+# Depth limits of the scan (0 = project root): CAP FT / COMAC trees are
+# counted down to SCAN_MAX_DEPTH, other folders only searched for GraceTHD
+SCAN_MAX_DEPTH = 8
+_GRACETHD_MAX_DEPTH = 4
 
+_EXCEL_EXTENSIONS = ('.xlsx', '.xls')
 
-def _is_gracethd_content(directory: str) -> bool:
-    """Check if directory contains GraceTHD signature files (case-insensitive).
 
-    A directory is GraceTHD if it contains at least t_noeud.shp AND t_cableline.shp.
-    """
-    try:
-        lower_files = {
-            f.lower() for f in os.listdir(directory)
-            if os.path.isfile(os.path.join(directory, f))
-        }
-    except OSError:
-        return False
-    return _GRACETHD_SIGNATURE_FILES.issubset(lower_files)
+class DetectionCancelled(Exception):
+    """Raised by detect_project when is_cancelled() returns True."""
 
 
-def _find_gracethd_dir(root: str, max_depth: int = 4) -> Optional[str]:
-    """Find GraceTHD directory by content (signature files).
+class _ProjectScan:
+    """Single os.scandir walk of a project tree, entries classified on the fly.
 
-    A directory is GraceTHD if it contains t_noeud.shp + t_cableline.shp,
-    regardless of folder name. Scans breadth-first up to max_depth levels,
-    returns the shallowest match.
+    Keeps the listings of the root and of its sub-folders, recursive counts
+    for the CAP FT / COMAC folders and the shallowest GraceTHD folder.
+    Like os.walk, symlinked folders below the root's sub-folders are listed
+    but not followed.
     """
-    if not root or not os.path.isdir(root):
-        return None
-
-    if _is_gracethd_content(root):
-        return root
 
-    current_level = [root]
-    for _ in range(max_depth):
-        next_level = []
-        for parent in current_level:
+    def __init__(self, root: str, is_cancelled: Optional[Callable[[], bool]] = None):
+        self.root = root
+        self.is_cancelled = is_cancelled
+        self.entries = 0
+        # {dir: (dirnames, filenames)} for the root and its sub-folders
+        self.listings: Dict[str, Tuple[List[str], List[str]]] = {}
+        self.counts: Dict[str, Dict[str, int]] = {}
+        self.gracethd_dir: Optional[str] = None
+        self.gracethd_files: List[str] = []
+        self._gracethd_key: Optional[tuple] = None
+
+        start = time.perf_counter()
+        dirnames, _filenames, walk_into = self._list(root, 0, ())
+        self.capft_dir = _find_dir(root, dirnames, _CAPFT_DIR_PATTERNS)
+        self.comac_dir = _find_dir(root, dirnames, _COMAC_DIR_PATTERNS)
+        for path in (self.capft_dir, self.comac_dir):
+            if path:
+                self.counts[path] = {'cmd': 0, 'etudes': 0, 'excels': 0}
+        stack = [(path, 1, (name,), path if path in self.counts else None)
+                 for name, path in walk_into]
+        while stack:
+            path, depth, parts, counted = stack.pop()
+            dirnames, filenames, walk_into = self._list(path, depth, parts)
+            if counted:
+                counts = self.counts[counted]
+                counts['excels'] += sum(1 for f in filenames if f.lower().endswith(_EXCEL_EXTENSIONS))
+                counts['etudes'] += sum(1 for d in dirnames if 'ETUDE' in d.upper())
+                if depth == 1:
+                    counts['cmd'] = sum(1 for d in dirnames if re.match(r'^CMD', d, re.IGNORECASE))
+            limit = SCAN_MAX_DEPTH if counted else _GRACETHD_MAX_DEPTH
+            if depth < limit:
+                stack.extend((sub, depth + 1, parts + (name,), counted) for name, sub in walk_into)
+        self.elapsed = time.perf_counter() - start
+
+    def _list(self, path: str, depth: int, parts: tuple) -> tuple:
+        """(dirnames, filenames, [(name, path) to walk into]) of one folder."""
+        if self.is_cancelled is not None and self.is_cancelled():
+            raise DetectionCancelled()
+        try:
+            with os.scandir(path) as it:
+                entries = list(it)
+        except OSError:
+            entries = []
+        self.entries += len(entries)
+        dirnames, filenames, walk_into = [], [], []
+        for entry in entries:
             try:
-                entries = sorted(os.listdir(parent))
+                is_dir = entry.is_dir()
             except OSError:
+                is_dir = False
+            if not is_dir:
+                filenames.append(entry.name)
                 continue
-            for entry in entries:
-                full = os.path.join(parent, entry)
-                if not os.path.isdir(full):
-                    continue
-                if _is_gracethd_content(full):
-                    return full
-                next_level.append(full)
-        current_level = next_level
-        if not current_level:
-            break
+            dirnames.append(entry.name)
+            try:
+                # Root sub-folders are always followed (CAP FT may be a link)
+                if depth == 0 or not entry.is_symlink():
+                    walk_into.append((entry.name, entry.path))
+            except OSError:
+                pass
+        if depth <= 1:
+            self.listings[path] = (dirnames, filenames)
+        if depth <= _GRACETHD_MAX_DEPTH and _is_gracethd_content(filenames):
+            # Shallowest folder first, then sorted names (breadth-first order)
+            key = (depth, parts)
+            if self._gracethd_key is None or key < self._gracethd_key:
+                self._gracethd_key = key
+                self.gracethd_dir = path
+                self.gracethd_files = filenames
+        return dirnames, filenames, walk_into
+
+    def listing(self, path: str) -> Tuple[List[str], List[str]]:
+        """(dirnames, filenames) of the root or of one of its sub-folders."""
+        return self.listings.get(path, ([], []))
+
+
+def _is_gracethd_content(filenames: List[str]) -> bool:
+    """Check if a folder's files include the GraceTHD signature (case-insensitive).
 
-    return None
+    A directory is GraceTHD if it contains at least t_noeud.shp AND t_cableline.shp.
+    """
+    lower_files = {f.lower() for f in filenames}
+    return _GRACETHD_SIGNATURE_FILES.issubset(lower_files)
 
 
-def _extract_sro_from_gracethd(gracethd_dir: str) -> Optional[str]:
+def _extract_sro_from_gracethd(gracethd_dir: str, filenames: List[str]) -> Optional[str]:
     """Extract SRO from a GraceTHD directory.
 
     Tries in order:
     1. t_zsro.shp  -> champ zs_refpm
-    2. t_cheminement.shp -> champ cm_r3_code (first non-empty unique value)
+    2. t_cheminement.shp -> champ cm_r3_code (first non-empty value)
 
     Returns:
         SRO string (e.g. '63041/B1I/PMZ/00003') or None if unavailable.
     """
-    try:
-        from qgis.core import QgsVectorLayer
-    except Exception:
-        return None
-
     # --- Tentative 1 : t_zsro.shp ---
-    sro = _read_shp_field(gracethd_dir, 't_zsro.shp', 'zs_refpm')
+    sro = _read_shp_field(gracethd_dir, filenames, 't_zsro.shp', 'zs_refpm')
     if sro:
         return sro
 
     # --- Tentative 2 : t_cheminement.shp (cm_r3_code) ---
-    return _read_shp_field(gracethd_dir, 't_cheminement.shp', 'cm_r3_code')
+    return _read_shp_field(gracethd_dir, filenames, 't_cheminement.shp', 'cm_r3_code')
 
 
-def _read_shp_field(directory: str, filename: str, field_name: str) -> Optional[str]:
-    """Read the first non-empty value of a field from a shapefile."""
-    path = os.path.join(directory, filename)
-    if not os.path.isfile(path):
+def _read_shp_field(directory: str, filenames: List[str], filename: str,
+                    field_name: str) -> Optional[str]:
+    """Read the first non-empty value of a field from a shapefile's DBF.
+
+    Only the DBF header and the leading records are read (no QGIS layer).
+    """
+    by_lower = {f.lower(): f for f in filenames}
+    dbf_name = by_lower.get(filename[:-4] + '.dbf')
+    if filename not in by_lower or not dbf_name:
         return None
     try:
-        from qgis.core import QgsVectorLayer
-        layer = QgsVectorLayer(path, filename.replace('.shp', ''), 'ogr')
-        if not layer.isValid():
-            return None
-        for feat in layer.getFeatures():
-            val = feat[field_name]
-            if val:
-                raw = str(val).strip()
-                if raw:
-                    return raw
-        return None
+        val = first_dbf_value(os.path.join(directory, dbf_name), field_name)
     except Exception:
         return None
+    raw = str(val).strip() if val else ''
+    return raw or None
 
 
-def _list_folder_contents(root: str, max_items: int = 12) -> tuple:
+def _list_folder_contents(dirnames: List[str], filenames: List[str], max_items: int = 12) -> tuple:
     """List directories and Excel files in a folder for diagnostics.
 
     Returns:
         (dirs: List[str], excels: List[str]) basenames only, sorted.
     """
-    try:
-        entries = os.listdir(root)
-    except OSError:
-        return [], []
-    dirs = sorted(e for e in entries if os.path.isdir(os.path.join(root, e)))
-    excels = sorted(e for e in entries if e.lower().endswith(('.xlsx', '.xls'))
-                    and os.path.isfile(os.path.join(root, e)))
+    dirs = sorted(dirnames)
+    excels = sorted(e for e in filenames if e.lower().endswith(_EXCEL_EXTENSIONS))
     return dirs[:max_items], excels[:max_items]
 
 
@@ -365,16 +420,11 @@ def _match_dir(name: str, patterns: list) -> bool:
     return False
 
 
-def _find_dir(root: str, patterns: list) -> Optional[str]:
+def _find_dir(root: str, dirnames: List[str], patterns: list) -> Optional[str]:
     """Find first sub-directory matching patterns."""
-    try:
-        entries = os.listdir(root)
-    except OSError:
-        return None
-    for entry in sorted(entries):
-        full = os.path.join(root, entry)
-        if os.path.isdir(full) and _match_dir(entry, patterns):
-            return full
+    for entry in sorted(dirnames):
+        if _match_dir(entry, patterns):
+            return os.path.join(root, entry)
     return None
 
 
@@ -384,17 +434,13 @@ def _is_output_file(filename: str) -> bool:
     return any(upper.startswith(prefix.upper()) for prefix in _OUTPUT_FILE_PREFIXES)
 
 
-def _find_excel(root: str, name_patterns: list) -> Optional[str]:
+def _find_excel(root: str, filenames: List[str], name_patterns: list) -> Optional[str]:
     """Find first Excel file matching name patterns in root.
 
     Skips plugin output files to prevent detecting previous results as input.
     """
-    try:
-        entries = os.listdir(root)
-    except OSError:
-        return None
-    xlsx_files = [e for e in entries
-                  if e.lower().endswith(('.xlsx', '.xls'))
+    xlsx_files = [e for e in filenames
+                  if e.lower().endswith(_EXCEL_EXTENSIONS)
                   and not _is_output_file(e)]
     for pat in name_patterns:
         regex = re.compile(pat, re.IGNORECASE)
@@ -404,35 +450,21 @@ def _find_excel(root: str, name_patterns: list) -> Optional[str]:
     return None
 
 
-def _find_excel_in_dir(directory: str) -> Optional[str]:
+def _find_excel_in_dir(directory: str, filenames: List[str]) -> Optional[str]:
     """Find first .xlsx file in a directory.
 
     Skips plugin output files.
     """
-    if not directory or not os.path.isdir(directory):
-        return None
-    for f in sorted(os.listdir(directory)):
-        if f.lower().endswith(('.xlsx', '.xls')) and not _is_output_file(f):
+    for f in sorted(filenames):
+        if f.lower().endswith(_EXCEL_EXTENSIONS) and not _is_output_file(f):
             return os.path.join(directory, f)
     return None
 
 
-def _list_studies(directory: str) -> List[str]:
-    """List sub-directories (study names) in a directory."""
-    if not directory or not os.path.isdir(directory):
-        return []
-    result = []
-    for entry in sorted(os.listdir(directory)):
-        full = os.path.join(directory, entry)
-        if os.path.isdir(full):
-            result.append(entry)
-    return result
-
-
-def _build_diagnostics(result: DetectionResult, project_root: str) -> List[tuple]:
+def _build_diagnostics(result: DetectionResult, scan: _ProjectScan) -> List[tuple]:
     """Generate actionable diagnostic hints for each missing resource."""
     diags = []
-    dirs, excels = _list_folder_contents(project_root)
+    dirs, excels = _list_folder_contents(*scan.listing(scan.root))
 
     if not result.has_ftbt:
         hint = _EXPECTED_NAMES['FT-BT KO']
@@ -497,62 +529,24 @@ def _build_diagnostics(result: DetectionResult, project_root: str) -> List[tuple
     return diags
 
 
-def _count_studies_recursive(capft_dir: str) -> int:
-    """Count study Excel files (FTTH-NGE-ETUDE-*.xlsx) recursively in CAP FT."""
-    count = 0
-    for _, _, filenames in os.walk(capft_dir):
-        for fn in filenames:
-            if fn.lower().endswith('.xlsx') and 'ETUDE' in fn.upper():
-                count += 1
-    return count
-
-
-def _count_excels_recursive(directory: str) -> int:
-    """Count all .xlsx/.xls files recursively."""
-    count = 0
-    for _, _, filenames in os.walk(directory):
-        count += sum(1 for f in filenames if f.lower().endswith(('.xlsx', '.xls')))
-    return count
-
-
-def _count_cmd_folders(capft_dir: str) -> int:
-    """Count CMD sub-folders in CAP FT directory."""
-    if not capft_dir or not os.path.isdir(capft_dir):
-        return 0
-    return sum(
-        1 for e in os.listdir(capft_dir)
-        if os.path.isdir(os.path.join(capft_dir, e))
-        and re.match(r'^CMD', e, re.IGNORECASE)
-    )
-
-
-def _count_etude_folders(directory: str) -> int:
-    """Count FTTH-NGE-ETUDE-* study folders recursively."""
-    count = 0
-    for _, dirnames, _ in os.walk(directory):
-        count += sum(1 for d in dirnames if 'ETUDE' in d.upper())
-    return count
-
-
 def analyse_livrable(result: 'DetectionResult') -> dict:
     """Analyse approfondie du contenu livrable pour le diagnostic.
 
+    Counts come from the detection scan (result.dir_counts), no new walk.
+
     Returns:
         dict with keys per resource, each containing detailed counts.
     """
     analysis = {}
 
     if result.has_capft:
-        cmd = _count_cmd_folders(result.capft_dir)
-        etudes = _count_etude_folders(result.capft_dir)
-        excels = _count_excels_recursive(result.capft_dir)
-        analysis['capft'] = {'cmd': cmd, 'etudes': etudes, 'excels': excels}
+        counts = result.dir_counts.get(result.capft_dir, {})
+        analysis['capft'] = {key: counts.get(key, 0) for key in ('cmd', 'etudes', 'excels')}
 
     if result.has_comac:
-        excels = _count_excels_recursive(result.comac_dir)
         analysis['comac'] = {
             'sous_dossiers': len(result.comac_studies),
-            'excels': excels,
+            'excels': result.dir_counts.get(result.comac_dir, {}).get('excels', 0),
         }
 
     if result.has_ftbt:
@@ -567,6 +561,26 @@ def analyse_livrable(result: 'DetectionResult') -> dict:
     return analysis
 
 
+def detected_modules(result: 'DetectionResult') -> dict:
+    """Ressource detectee par module du batch.
+
+    Returns:
+        {module: (trouve, chemin, libelle ressource)}
+    """
+    d = result
+    return {
+        'maj':       (d.has_ftbt,  d.ftbt_excel,  'FT-BT KO'),
+        'capft':     (d.has_capft, d.capft_dir,   'CAP FT'),
+        'comac':     (d.has_comac, d.comac_dir,   'COMAC'),
+        'c6bd':      (d.has_c6,    d.c6_dir,      'C6 (via CAP FT)'),
+        'police_c6': (d.has_c6,    d.c6_dir,      'C6 (via CAP FT)'),
+        'c6c3a':     ((d.has_c6 or d.has_c6_annexe) and (d.has_c7 or d.has_c3a),
+                      d.c6_annexe_file or d.c6_dir, 'C6 annexe'),
+        'gespot_c6': (d.has_gespot and d.has_c6,
+                      d.gespot_dir, 'GESPOT'),
+    }
+
+
 def _deduplicate_files(result: DetectionResult) -> None:
     """Resolve overlapping or duplicate file detections in-place.
 
@@ -626,11 +640,14 @@ def _deduplicate_files(result: DetectionResult) -> None:
             basename_map[bn] = (label, val)
 
 
-def detect_project(project_root: str) -> DetectionResult:
+def detect_project(project_root: str,
+                   is_cancelled: Optional[Callable[[], bool]] = None) -> DetectionResult:
     """Detect project structure from root directory.
 
     Args:
         project_root: Absolute path to project root folder.
+        is_cancelled: Optional callable polled once per folder listed
+            (e.g. QgsTask.isCanceled); raises DetectionCancelled when True.
 
     Returns:
         DetectionResult with all detected paths.
@@ -647,33 +664,39 @@ def detect_project(project_root: str) -> DetectionResult:
     # Derive SRO from project name (e.g. 63041-B1I-PMZ-00003 -> 63041/B1I/PMZ/00003)
     result.sro = extract_sro_from_project_name(result.project_name) or ''
 
+    scan = _ProjectScan(project_root, is_cancelled)
+    root_dirs, root_files = scan.listing(project_root)
+    result.dir_counts = scan.counts
+    result.scan_entries = scan.entries
+    result.scan_s = scan.elapsed
+
     # FT-BT KO Excel (in root)
-    ftbt = _find_excel(project_root, _FTBT_PATTERNS)
+    ftbt = _find_excel(project_root, root_files, _FTBT_PATTERNS)
     if ftbt:
         result.ftbt_excel = ftbt
 
     # CAP FT directory
-    capft = _find_dir(project_root, _CAPFT_DIR_PATTERNS)
+    capft = scan.capft_dir
     if capft:
         result.capft_dir = capft
-        result.capft_studies = _list_studies(capft)
+        result.capft_studies = sorted(scan.listing(capft)[0])
         # CAP FT IS the C6 browse directory for Police C6 and C6 vs BD
         result.c6_dir = capft
 
     # COMAC directory
-    comac = _find_dir(project_root, _COMAC_DIR_PATTERNS)
+    comac = scan.comac_dir
     if comac:
         result.comac_dir = comac
-        result.comac_studies = _list_studies(comac)
+        result.comac_studies = sorted(scan.listing(comac)[0])
 
     # C6 annexe file (standalone C6 folder or root-level C6 Excel)
-    c6_annexe = _find_excel(project_root, [r'\bC6\b', r'Annexe[\s_-]*C6'])
+    c6_annexe = _find_excel(project_root, root_files, [r'\bC6\b', r'Annexe[\s_-]*C6'])
     if c6_annexe:
         result.c6_annexe_file = c6_annexe
     else:
-        c6_standalone = _find_dir(project_root, _C6_DIR_PATTERNS)
+        c6_standalone = _find_dir(project_root, root_dirs, _C6_DIR_PATTERNS)
         if c6_standalone:
-            c6_f = _find_excel_in_dir(c6_standalone)
+            c6_f = _find_excel_in_dir(c6_standalone, scan.listing(c6_standalone)[1])
             if c6_f:
                 result.c6_annexe_file = c6_f
             # If standalone C6 dir exists but no capft, also use as c6_dir
@@ -681,38 +704,38 @@ def detect_project(project_root: str) -> DetectionResult:
                 result.c6_dir = c6_standalone
 
     # C7 file (file or directory)
-    c7_file = _find_excel(project_root, [r'\bC7\b', r'Annexe[\s_-]*C7\b'])
+    c7_file = _find_excel(project_root, root_files, [r'\bC7\b', r'Annexe[\s_-]*C7\b'])
     if c7_file:
         result.c7_file = c7_file
     else:
-        c7_dir = _find_dir(project_root, [r'^C7$', r'^Annexe[\s_-]*C7$'])
+        c7_dir = _find_dir(project_root, root_dirs, [r'^C7$', r'^Annexe[\s_-]*C7$'])
         if c7_dir:
-            c7_f = _find_excel_in_dir(c7_dir)
+            c7_f = _find_excel_in_dir(c7_dir, scan.listing(c7_dir)[1])
             if c7_f:
                 result.c7_file = c7_f
 
     # C3A file (file or directory)
-    c3a_file = _find_excel(project_root, [r'\bC3A\b', r'Annexe[\s_-]*C3A\b'])
+    c3a_file = _find_excel(project_root, root_files, [r'\bC3A\b', r'Annexe[\s_-]*C3A\b'])
     if c3a_file:
         result.c3a_file = c3a_file
     else:
-        c3a_dir = _find_dir(project_root, [r'^C3A$', r'^Annexe[\s_-]*C3A$'])
+        c3a_dir = _find_dir(project_root, root_dirs, [r'^C3A$', r'^Annexe[\s_-]*C3A$'])
         if c3a_dir:
-            c3a_f = _find_excel_in_dir(c3a_dir)
+            c3a_f = _find_excel_in_dir(c3a_dir, scan.listing(c3a_dir)[1])
             if c3a_f:
                 result.c3a_file = c3a_f
 
     # GESPOT directory - name-based detection
-    gespot = _find_dir(project_root, _GESPOT_DIR_PATTERNS)
+    gespot = _find_dir(project_root, root_dirs, _GESPOT_DIR_PATTERNS)
     if gespot:
         result.gespot_dir = gespot
 
     # GraceTHD directory (for Axione SROs) - content-based detection
-    gracethd = _find_gracethd_dir(project_root)
+    gracethd = scan.gracethd_dir
     if gracethd:
         result.gracethd_dir = gracethd
-        # Extract SRO from t_zsro.shp if present
-        zsro_sro = _extract_sro_from_gracethd(gracethd)
+        # Extract SRO from t_zsro.dbf if present
+        zsro_sro = _extract_sro_from_gracethd(gracethd, scan.gracethd_files)
         if zsro_sro:
             result.gracethd_sro = zsro_sro
             # If no SRO from folder name, use GraceTHD SRO
@@ -724,6 +747,6 @@ def detect_project(project_root: str) -> DetectionResult:
 
     # --- Generate diagnostics for missing resources ---
     # Extend rather than replace: _deduplicate_files may have added warnings
-    result.diagnostics.extend(_build_diagnostics(result, project_root))
+    result.diagnostics.extend(_build_diagnostics(result, scan))
 
     return result
@@ -7,9 +7,9 @@ ATTENTION: Ne pas importer dans les workers threads sans précaution.
 
 from qgis.core import (
     QgsProject, QgsLayerTreeLayer, QgsMessageLog, Qgis, 
-    QgsSpatialIndex, QgsFeatureRequest, NULL
+    QgsSpatialIndex, QgsFeatureRequest, QgsGeometry, QgsPoint, NULL
 )
-from .compat import MSG_INFO, MSG_WARNING
+from .compat import MSG_INFO, MSG_WARNING, FR_NO_GEOMETRY
 import re
 from .core_utils import normalize_appui_num
 
@@ -112,6 +112,25 @@ def show_feature_count(layer):
         node.setCustomProperty("showFeatureCount", True)
 
 
+def layer_fingerprint(layer):
+    """Etat d'une couche pour la relance incrementale (module_fingerprint).
+
+    Source + filtre, nombre d'entites, fid max et date_modif max si le champ
+    existe. None si la couche est invalide ou a des modifications non
+    enregistrees (etat non verifiable).
+    """
+    if not layer or not layer.isValid() or layer.isModified():
+        return None
+    request = QgsFeatureRequest().setFlags(FR_NO_GEOMETRY).setNoAttributes()
+    max_fid = max((f.id() for f in layer.getFeatures(request)), default=-1)
+    idx_date = layer.fields().indexFromName('date_modif')
+    max_date = layer.maximumValue(idx_date) if idx_date >= 0 else None
+    return "|".join(str(v) for v in (
+        layer.source(), layer.subsetString(), layer.featureCount(), max_fid,
+        '' if max_date is None or max_date == NULL else max_date,
+    ))
+
+
 def get_layer_safe(layer_name, context=""):
     """Récupère une couche QGIS de manière sécurisée.
     
@@ -203,9 +222,22 @@ def build_spatial_index(layer, request=None):
     return idx, cache
 
 
+def _candidates_par_etude(etude, req_etude, colonne_etude, idx_pot, poteaux_dict):
+    """Passe spatiale historique : fid des poteaux dans chaque etude bufferisee."""
+    for feat_etude in etude.getFeatures(req_etude):
+        if not feat_etude.hasGeometry():
+            continue
+        geom_etude = feat_etude.geometry().buffer(_ETUDE_POLYGON_BUFFER_M, 5)
+        bbox = geom_etude.boundingBox()
+        yield feat_etude[colonne_etude], [
+            fid for fid in idx_pot.intersects(bbox)
+            if geom_etude.contains(poteaux_dict[fid].geometry())
+        ]
+
+
 def extraire_poteaux_etude(
     table_poteau, table_etude, colonne_etude,
-    pot_type_filter, context, keep_commune=False
+    pot_type_filter, context, keep_commune=False, assignment=None
 ):
     """Extraction complete poteaux/etude en une seule passe.
     
@@ -220,6 +252,8 @@ def extraire_poteaux_etude(
         pot_type_filter: 'POT-FT' ou 'POT-BT'
         context: Contexte erreur
         keep_commune: Si True, conserve /commune dans all_inf_nums (pour COMAC)
+        assignment: PoleAssignment pre-calcule (batch) ; remplace la passe
+            spatiale si calcule pour ces couches et ce champ
     
     Returns:
         tuple: (doublons_etudes, poteaux_hors_etude, dict_poteaux_par_etude, dict_poteaux_prives)
@@ -242,11 +276,22 @@ def extraire_poteaux_etude(
     req_etude.setOrderBy(QgsFeatureRequest.OrderBy(
         [QgsFeatureRequest.OrderByClause(colonne_etude, ascending=True)]))
     
-    # Index spatial poteaux (une seule construction)
-    idx_pot, poteaux_dict = build_spatial_index(infra_pt_pot, req_pot)
+    if assignment is not None and not assignment.matches(
+            infra_pt_pot.id(), etude.id(), colonne_etude):
+        assignment = None
+    
+    # Index spatial poteaux (une seule construction) - inutile si affectation fournie
+    if assignment is None:
+        idx_pot, poteaux_dict = build_spatial_index(infra_pt_pot, req_pot)
+    else:
+        idx_pot = None
+        poteaux_dict = {
+            feat.id(): feat for feat in infra_pt_pot.getFeatures(req_pot) if feat.hasGeometry()
+        }
     
     QgsMessageLog.logMessage(
-        f"[{context}] {len(poteaux_dict)}/{total_couche} poteaux {pot_type_filter} dans {len(list(etude.getFeatures()))} zones etude",
+        f"[{context}] {len(poteaux_dict)}/{total_couche} poteaux {pot_type_filter} dans "
+        f"{len(assignment.names) if assignment else len(list(etude.getFeatures()))} zones etude",
         "PoleAerien", MSG_INFO
     )
     
@@ -259,25 +304,24 @@ def extraire_poteaux_etude(
     dico_etude = {}
     dico_prives = {}
     
-    for feat_etude in etude.getFeatures(req_etude):
-        if not feat_etude.hasGeometry():
-            continue
-        
+    if assignment is not None:
+        candidates_par_etude = assignment.poles_by_study(include_border=True)
+    else:
+        candidates_par_etude = _candidates_par_etude(etude, req_etude, colonne_etude, idx_pot, poteaux_dict)
+    
+    for nom_etude, candidates in candidates_par_etude:
         liste_pot = []
         liste_priv = []
-        nom_etude = feat_etude[colonne_etude]
-        geom_etude = feat_etude.geometry().buffer(_ETUDE_POLYGON_BUFFER_M, 5)
-        bbox = geom_etude.boundingBox()
-        
-        for fid in idx_pot.intersects(bbox):
-            feat_pot = poteaux_dict[fid]
-            if geom_etude.contains(feat_pot.geometry()):
-                raw_inf = feat_pot["inf_num"]
-                if raw_inf and raw_inf != NULL:
-                    liste_pot.append(raw_inf)
-                    fids_dans_etude.add(fid)
-                    if idx_commentaire >= 0 and est_terrain_prive(feat_pot[idx_commentaire]):
-                        liste_priv.append(raw_inf)
+        for fid in candidates:
+            feat_pot = poteaux_dict.get(fid)
+            if feat_pot is None:
+                continue
+            raw_inf = feat_pot["inf_num"]
+            if raw_inf and raw_inf != NULL:
+                liste_pot.append(raw_inf)
+                fids_dans_etude.add(fid)
+                if idx_commentaire >= 0 and est_terrain_prive(feat_pot[idx_commentaire]):
+                    liste_priv.append(raw_inf)
         
         if liste_pot:
             dico_etude.setdefault(nom_etude, []).extend(liste_pot)
@@ -295,8 +339,11 @@ def extraire_poteaux_etude(
     # Doublons etudes
     doublons = []
     _vus = set()
-    for _f in etude.getFeatures(req_etude):
-        _v = _f[colonne_etude]
+    if assignment is not None:
+        noms_etudes = assignment.study_names()
+    else:
+        noms_etudes = [_f[colonne_etude] for _f in etude.getFeatures(req_etude)]
+    for _v in noms_etudes:
         if _v in _vus:
             if _v not in doublons:
                 doublons.append(_v)
@@ -331,3 +378,87 @@ def extraire_poteaux_etude(
     
     return doublons, hors_etude, dico_etude, dico_prives, all_inf_nums, coords_qgis
 
+
+class _PreparedStudy:
+    """Polygone etude GEOS prepare : contains strict et contains du buffer.
+
+    Memes predicats que la passe historique (buffer(0.5, 5).contains) ;
+    les geometries sont conservees, les moteurs ne les possedent pas.
+    """
+
+    __slots__ = ('name', 'bbox', '_geoms', '_engine', '_border_engine')
+
+    def __init__(self, name, geom, border_m):
+        buffered = geom.buffer(border_m, 5)
+        self.name = name
+        self._geoms = (geom, buffered)
+        self._engine = QgsGeometry.createGeometryEngine(geom.constGet())
+        self._engine.prepareGeometry()
+        self._border_engine = QgsGeometry.createGeometryEngine(buffered.constGet())
+        self._border_engine.prepareGeometry()
+        rect = buffered.boundingBox()
+        self.bbox = None if rect.isNull() else (
+            rect.xMinimum(), rect.yMinimum(), rect.xMaximum(), rect.yMaximum())
+
+    def locate(self, x, y):
+        from .pole_assignment import STATUS_BORDER, STATUS_IN
+        point = QgsPoint(x, y)
+        if self._engine.contains(point):
+            return STATUS_IN
+        if self._border_engine.contains(point):
+            return STATUS_BORDER
+        return None
+
+
+def compute_pole_assignment(lyr_pot, lyr_etude, colonne_etude,
+                            border_m=_ETUDE_POLYGON_BUFFER_M):
+    """Affectation poteaux -> etudes, un seul parcours de chaque couche.
+
+    Les polygones sont tries par nom d'etude (meme ordre que
+    extraire_poteaux_etude) et prepares par GEOS (contains strict et
+    contains du buffer de bordure). Le resultat est pur Python et peut
+    etre transmis aux workers.
+
+    Args:
+        lyr_pot: QgsVectorLayer poteaux (tous types)
+        lyr_etude: QgsVectorLayer polygones etude
+        colonne_etude: Champ nom etude
+        border_m: Tolerance de bordure (buffer des etudes)
+
+    Returns:
+        PoleAssignment
+    """
+    from .pole_assignment import assign_poles, study_sort_key
+
+    validate_same_crs(lyr_pot, lyr_etude, "AFFECTATION")
+    studies = []
+    for feat in lyr_etude.getFeatures():
+        if not feat.hasGeometry():
+            continue
+        raw_name = feat[colonne_etude]
+        name = None if raw_name == NULL else raw_name
+        study = _PreparedStudy(name, feat.geometry(), border_m)
+        if study.bbox:
+            studies.append(study)
+    # Ordre de OrderBy(colonne_etude) : types natifs, NULL en dernier
+    studies.sort(key=lambda s: study_sort_key(s.name))
+
+    points = {}
+    req = QgsFeatureRequest().setNoAttributes()
+    for feat in lyr_pot.getFeatures(req):
+        if not feat.hasGeometry():
+            continue
+        pt = feat.geometry().asPoint()
+        points[feat.id()] = (pt.x(), pt.y())
+
+    assignment = assign_poles(
+        points, studies,
+        pole_layer_id=lyr_pot.id(), study_layer_id=lyr_etude.id(),
+        study_field=colonne_etude,
+    )
+    QgsMessageLog.logMessage(
+        f"[AFFECTATION] {lyr_etude.name()}: {len(points)} poteaux, {len(studies)} etudes, "
+        f"{len(assignment.inside)} in, {len(assignment.border)} bordure",
+        "PoleAerien", MSG_INFO
+    )
+    return assignment
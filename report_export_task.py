@@ -21,6 +21,7 @@ class UnifiedReportExportTask(AsyncTaskBase):
                 'message': self.emit_message,
                 'is_cancelled': self.isCanceled,
                 'sro': self.params.get('sro', ''),
+                'drawing_cache': self.params.get('drawing_cache'),
             }
         )
 
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Cache de session des donnees d'extraction d'un batch.
+
+Relancer un module apres une retouche ne recharge ni les couches BDD ni
+les donnees pre-extraites (appuis, affectations poteaux/etudes, cables
+fddcpi2/BPE/attaches) tant que les couches sources n'ont pas change.
+Une seule entree (cle = SRO, emprise) : changer de projet vide le cache.
+
+Chaque partie depend de couches identifiees par leur role ('pot', 'cap',
+'com') : une modification validee sur une couche (signaux committed* de
+QgsVectorLayer, relayes par BatchOrchestrator), un changement de couche
+pour un role ou de son etat (filtre, emprise) n'invalide que les parties
+concernees. Module pur Python.
+"""
+
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Age maximal d'une partie (modifications BDD faites hors de cette session QGIS)
+DEFAULT_MAX_AGE_S = 1800
+
+# Parties invalidees par une modification de la couche du role
+ROLE_PARTS = {
+    'pot': ('appuis', 'assignment_capft', 'assignment_comac', 'pg'),
+    'cap': ('assignment_capft',),
+    'com': ('assignment_comac',),
+}
+
+
+class SessionCache:
+    """Parties d'extraction d'un SRO conservees entre deux batchs."""
+
+    def __init__(self, max_age_s: float = DEFAULT_MAX_AGE_S,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_age_s = max_age_s
+        self._clock = clock
+        self._key: Optional[Tuple] = None
+        self._parts: Dict[str, Tuple[Any, float]] = {}
+        self._layer_ids: Dict[str, str] = {}
+        self._layer_states: Dict[str, Any] = {}
+
+    @property
+    def key(self) -> Optional[Tuple]:
+        return self._key
+
+    def bind(self, key: Tuple) -> bool:
+        """Selectionne le projet courant. False si le cache a ete vide (autre projet)."""
+        if key == self._key:
+            return True
+        self.clear()
+        self._key = key
+        return False
+
+    def track_layer(self, role: str, layer_id: str, state: Any = None) -> None:
+        """Couche utilisee pour un role, avec son etat (ex: filtre, emprise).
+
+        Une autre couche, ou la meme couche dans un autre etat (filtre
+        modifie sans commit), invalide les parties du role.
+        """
+        previous = self._layer_ids.get(role)
+        if previous is not None and (previous != layer_id or self._layer_states.get(role) != state):
+            self.invalidate_role(role)
+        self._layer_ids[role] = layer_id
+        self._layer_states[role] = state
+
+    def get(self, part: str) -> Any:
+        """Valeur en cache, ou None (absente ou trop ancienne)."""
+        entry = self._parts.get(part)
+        if entry is None:
+            return None
+        value, stored = entry
+        if self.max_age_s and self._clock() - stored > self.max_age_s:
+            del self._parts[part]
+            return None
+        return value
+
+    def age(self, part: str) -> Optional[float]:
+        """Age (s) d'une partie en cache, ou None si absente."""
+        entry = self._parts.get(part)
+        return None if entry is None else self._clock() - entry[1]
+
+    def put(self, part: str, value: Any) -> None:
+        if value is None:
+            self._parts.pop(part, None)
+        else:
+            self._parts[part] = (value, self._clock())
+
+    def invalidate_role(self, role: str) -> List[str]:
+        """Supprime les parties dependant de la couche du role. Retourne les parties supprimees."""
+        dropped = [part for part in ROLE_PARTS.get(role, ()) if part in self._parts]
+        for part in dropped:
+            del self._parts[part]
+        return dropped
+
+    def invalidate_layer(self, layer_id: str) -> List[str]:
+        """Modification validee sur une couche : invalide les parties de ses roles."""
+        dropped = []
+        for role, tracked_id in self._layer_ids.items():
+            if tracked_id == layer_id:
+                dropped.extend(self.invalidate_role(role))
+        return dropped
+
+    def clear(self) -> None:
+        self._key = None
+        self._parts = {}
+        self._layer_ids = {}
+        self._layer_states = {}
@@ -0,0 +1,368 @@
+# -*- coding: utf-8 -*-
+"""
+Lecteur natif de shapefiles (SHP + DBF), sans fournisseur QGIS/OGR.
+
+Lit uniquement les champs demandes et produit des colonnes typees et des
+tableaux de coordonnees NumPy, ce qui permet de traiter les livrables
+GraceTHD (t_noeud, t_cableline, t_cheminement) dans un processus de
+travail ou un test sans QGIS. Module pur Python (+ NumPy).
+
+Conventions alignees sur le fournisseur OGR de QGIS :
+- enregistrements DBF supprimes ignores, champ vide = None ;
+- N sans decimale -> int, N/F avec decimales -> float, D -> date, L -> bool ;
+- encodage : fichier .cpg (si reconnu), sinon octet LDID, sinon ISO-8859-1 ;
+- polylignes lues en MultiLineString (couches shapefile QGIS), WKT au
+  format QgsGeometry.asWkt() (17 decimales, zeros de fin supprimes).
+
+Types geres : Point, PolyLine, MultiPoint (variantes Z/M lues en 2D).
+"""
+
+import codecs
+import datetime
+import os
+import struct
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+SHAPE_NULL = 0
+_POINT_TYPES = {1: 20, 11: 36, 21: 28}        # type -> taille du contenu (octets)
+_POLYLINE_TYPES = {3, 13, 23}
+_MULTIPOINT_TYPES = {8, 18, 28}
+
+# Octet 29 du DBF (Language Driver ID) -> encodage Python
+_LDID_ENCODINGS = {
+    0x01: 'cp437', 0x02: 'cp850', 0x03: 'cp1252', 0x57: 'cp1252',
+    0x58: 'cp1252', 0x59: 'cp1252', 0x64: 'cp852', 0x65: 'cp866',
+    0xC8: 'cp1250', 0xC9: 'cp1251',
+}
+_DEFAULT_ENCODING = 'latin-1'
+_WKT_PRECISION = 17
+
+
+class ShapeTable:
+    """Contenu d'un shapefile : colonnes DBF typees + geometries en tableaux.
+
+    Geometries au format CSR : les parties de l'enregistrement i sont
+    record_parts[i]:record_parts[i + 1], les points de la partie j sont
+    xy[part_start[j]:part_start[j + 1]].
+    """
+
+    def __init__(self, shape_type: int, columns: Dict[str, list], xy: np.ndarray,
+                 part_start: np.ndarray, record_parts: np.ndarray):
+        self.shape_type = shape_type
+        # Noms de champs en minuscules (recherche insensible a la casse, comme QGIS)
+        self.columns = columns
+        self.xy = xy
+        self.part_start = part_start
+        self.record_parts = record_parts
+
+    def __len__(self) -> int:
+        return len(self.record_parts) - 1
+
+    @property
+    def geometry_kind(self) -> str:
+        """'point', 'multipoint' ou 'line' (polylignes lues en MultiLineString)."""
+        if self.shape_type in _POINT_TYPES:
+            return 'point'
+        if self.shape_type in _MULTIPOINT_TYPES:
+            return 'multipoint'
+        return 'line'
+
+    @property
+    def fields(self) -> List[str]:
+        return list(self.columns)
+
+    def has_field(self, name: str) -> bool:
+        return name.lower() in self.columns
+
+    def column(self, name: str) -> list:
+        """Valeurs du champ (None si vide) ; [None] * n si champ absent."""
+        values = self.columns.get(name.lower())
+        return values if values is not None else [None] * len(self)
+
+    def value(self, index: int, name: str):
+        values = self.columns.get(name.lower())
+        return values[index] if values is not None else None
+
+    def has_geometry(self, index: int) -> bool:
+        return self.record_parts[index + 1] > self.record_parts[index]
+
+    def parts(self, index: int) -> List[np.ndarray]:
+        """Tableaux (n, 2) des parties de l'enregistrement."""
+        first, last = self.record_parts[index], self.record_parts[index + 1]
+        return [self.xy[self.part_start[j]:self.part_start[j + 1]] for j in range(first, last)]
+
+    def point(self, index: int) -> Optional[Tuple[float, float]]:
+        """Premier point de l'enregistrement, ou None."""
+        if not self.has_geometry(index):
+            return None
+        x, y = self.xy[self.part_start[self.record_parts[index]]]
+        return float(x), float(y)
+
+    def length(self, index: int) -> float:
+        """Longueur planaire (somme des segments, comme QgsGeometry.length())."""
+        total = 0.0
+        for part in self.parts(index):
+            if len(part) > 1:
+                total += float(np.hypot(*np.diff(part, axis=0).T).sum())
+        return total
+
+    def wkt(self, index: int) -> str:
+        """WKT de l'enregistrement ('' si geometrie nulle)."""
+        if not self.has_geometry(index):
+            return ''
+        parts = self.parts(index)
+        if self.shape_type in _POINT_TYPES:
+            return f"Point ({_coords_wkt(parts[0])})"
+        if self.shape_type in _MULTIPOINT_TYPES:
+            return "MultiPoint (" + ','.join(f"({_coords_wkt(p)})" for p in parts) + ")"
+        return "MultiLineString (" + ','.join(f"({_coords_wkt(p)})" for p in parts) + ")"
+
+
+def _fmt(value: float) -> str:
+    """Nombre au format qgsDoubleToString(value, 17)."""
+    text = f"{value:.{_WKT_PRECISION}f}"
+    if '.' in text:
+        text = text.rstrip('0').rstrip('.')
+    return '0' if text == '-0' else text
+
+
+def _coords_wkt(points: np.ndarray) -> str:
+    return ', '.join(f"{_fmt(x)} {_fmt(y)}" for x, y in points.tolist())
+
+
+# ---------------------------------------------------------------------------
+#  DBF
+# ---------------------------------------------------------------------------
+
+def _cpg_codec(text: str) -> Optional[str]:
+    """Codec Python d'un contenu .cpg ('UTF-8', '1252', 'ANSI 1252', '88591'...), None si inconnu."""
+    name = text.strip().upper()
+    if name.startswith('ANSI'):
+        name = name[4:].strip(' _-')
+    if name.startswith('8859') and name[4:].strip('_-').isdigit():
+        name = f"iso8859-{name[4:].strip('_-')}"
+    elif name.isdigit():
+        name = f"cp{name}"
+    try:
+        return codecs.lookup(name).name if name else None
+    except LookupError:
+        return None
+
+
+def _dbf_encoding(dbf_path: str, ldid: int) -> str:
+    cpg_path = os.path.splitext(dbf_path)[0] + '.cpg'
+    if os.path.isfile(cpg_path):
+        try:
+            with open(cpg_path, encoding='ascii') as handle:
+                codec = _cpg_codec(handle.read())
+            if codec:
+                return codec
+        except (OSError, UnicodeDecodeError):
+            pass
+    return _LDID_ENCODINGS.get(ldid, _DEFAULT_ENCODING)
+
+
+def _convert(raw: bytes, ftype: str, decimals: int, length: int, encoding: str):
+    if ftype == 'C' or ftype not in 'NFDL':
+        # Espaces de debut et de fin retires (TRIM_DBF_WHITESPACE de shapelib/OGR)
+        text = raw.decode(encoding, errors='replace').strip(' \x00')
+        return text or None
+    text = raw.decode('ascii', errors='replace').strip(' \x00')
+    if not text or text.startswith('*'):
+        return None
+    try:
+        if ftype == 'D':
+            if text == '00000000':
+                return None
+            return datetime.date(int(text[:4]), int(text[4:6]), int(text[6:8]))
+        if ftype == 'L':
+            return True if text in 'YyTt' else False if text in 'NnFf' else None
+        if ftype == 'N' and decimals == 0 and length <= 18:
+            return int(text) if text.lstrip('+-').isdigit() else int(float(text))
+        return float(text)
+    except ValueError:
+        return None
+
+
+def _field_specs(header: bytes, header_len: int, wanted: Optional[set]) -> List[tuple]:
+    """(nom_minuscule, offset, longueur, type, decimales) des champs demandes."""
+    specs = []
+    offset, pos = 1, 32
+    while pos + 32 <= min(header_len, len(header)) and header[pos] != 0x0D:
+        name = header[pos:pos + 11].split(b'\x00', 1)[0].decode('ascii', errors='replace').strip()
+        ftype = chr(header[pos + 11]).upper()
+        length, decimals = header[pos + 16], header[pos + 17]
+        if wanted is None or name.lower() in wanted:
+            specs.append((name.lower(), offset, length, ftype, decimals))
+        offset += length
+        pos += 32
+    return specs
+
+
+def read_dbf(path: str, field_names: Optional[Iterable[str]] = None) -> Tuple[Dict[str, list], List[bool]]:
+    """Colonnes typees d'un DBF {nom_minuscule: valeurs} et drapeaux de suppression.
+
+    field_names limite la lecture aux champs demandes (insensible a la casse).
+    """
+    with open(path, 'rb') as handle:
+        data = handle.read()
+    n_records, header_len, record_len = struct.unpack_from('<IHH', data, 4)
+    encoding = _dbf_encoding(path, data[29])
+
+    wanted = {name.lower() for name in field_names} if field_names is not None else None
+    specs = _field_specs(data, header_len, wanted)
+
+    columns = {spec[0]: [] for spec in specs}
+    deleted = []
+    for idx in range(n_records):
+        start = header_len + idx * record_len
+        record = data[start:start + record_len]
+        if len(record) < record_len:
+            break
+        deleted.append(record[0] == 0x2A)
+        for name, f_offset, length, ftype, decimals in specs:
+            columns[name].append(
+                _convert(record[f_offset:f_offset + length], ftype, decimals, length, encoding)
+            )
+    return columns, deleted
+
+
+def first_dbf_value(path: str, field_name: str):
+    """Premiere valeur non vide d'un champ DBF (supprimes ignores), ou None.
+
+    Lit l'en-tete puis les enregistrements un par un jusqu'a la premiere
+    valeur : le fichier n'est pas charge en entier.
+    """
+    with open(path, 'rb') as handle:
+        head = handle.read(32)
+        if len(head) < 32:
+            return None
+        n_records, header_len, record_len = struct.unpack_from('<IHH', head, 4)
+        specs = _field_specs(head + handle.read(max(header_len - 32, 0)), header_len, {field_name.lower()})
+        if not specs:
+            return None
+        _name, f_offset, length, ftype, decimals = specs[0]
+        encoding = _dbf_encoding(path, head[29])
+        handle.seek(header_len)
+        for _ in range(n_records):
+            record = handle.read(record_len)
+            if len(record) < record_len:
+                break
+            if record[0] == 0x2A:
+                continue
+            value = _convert(record[f_offset:f_offset + length], ftype, decimals, length, encoding)
+            if value:
+                return value
+    return None
+
+
+# ---------------------------------------------------------------------------
+#  SHP
+# ---------------------------------------------------------------------------
+
+def _read_points_fast(data: bytes, shape_type: int):
+    """Fichier de points sans geometrie nulle : lecture vectorisee, sinon None."""
+    content = _POINT_TYPES[shape_type]
+    record_size = 8 + content
+    body = len(data) - 100
+    if body % record_size:
+        return None
+    dtype = np.dtype([('hdr', '>i4', 2), ('type', '<i4'), ('x', '<f8'), ('y', '<f8'),
+                      ('rest', f'V{content - 20}')] if content > 20 else
+                     [('hdr', '>i4', 2), ('type', '<i4'), ('x', '<f8'), ('y', '<f8')])
+    records = np.frombuffer(data, dtype=dtype, offset=100)
+    if not np.all(records['type'] == shape_type) or not np.all(records['hdr'][:, 1] * 2 == content):
+        return None
+    n = len(records)
+    xy = np.column_stack([records['x'], records['y']]).astype(np.float64)
+    return xy, np.arange(n + 1, dtype=np.int64), np.arange(n + 1, dtype=np.int64)
+
+
+def read_shp(path: str) -> Tuple[int, np.ndarray, np.ndarray, np.ndarray]:
+    """Geometries d'un SHP : (type, xy, part_start, record_parts) au format CSR."""
+    with open(path, 'rb') as handle:
+        data = handle.read()
+    if len(data) < 100 or struct.unpack_from('>i', data, 0)[0] != 9994:
+        raise ValueError(f"{os.path.basename(path)}: en-tete shapefile invalide")
+    shape_type = struct.unpack_from('<i', data, 32)[0]
+    if shape_type not in _POINT_TYPES and shape_type not in _POLYLINE_TYPES \
+            and shape_type not in _MULTIPOINT_TYPES and shape_type != SHAPE_NULL:
+        raise ValueError(f"{os.path.basename(path)}: type de geometrie {shape_type} non gere")
+
+    if shape_type in _POINT_TYPES:
+        fast = _read_points_fast(data, shape_type)
+        if fast is not None:
+            return (shape_type,) + fast
+
+    chunks, part_start, record_parts = [], [0], [0]
+    n_points = 0
+    pos = 100
+    while pos + 8 <= len(data):
+        content_len = struct.unpack_from('>i', data, pos + 4)[0] * 2
+        start = pos + 8
+        pos = start + content_len
+        rec_type = struct.unpack_from('<i', data, start)[0] if content_len >= 4 else SHAPE_NULL
+        if rec_type in _POINT_TYPES:
+            chunks.append(np.frombuffer(data, '<f8', 2, start + 4).reshape(1, 2))
+            n_points += 1
+            part_start.append(n_points)
+        elif rec_type in _POLYLINE_TYPES:
+            num_parts, num_points = struct.unpack_from('<ii', data, start + 36)
+            if num_parts <= 0 or num_points <= 0:
+                record_parts.append(len(part_start) - 1)
+                continue
+            starts = list(struct.unpack_from(f'<{num_parts}i', data, start + 44))
+            points = np.frombuffer(data, '<f8', 2 * num_points,
+                                   start + 44 + 4 * num_parts).reshape(-1, 2)
+            chunks.append(points)
+            part_start.extend(n_points + s for s in starts[1:] + [num_points])
+            n_points += num_points
+        elif rec_type in _MULTIPOINT_TYPES:
+            num_points = struct.unpack_from('<i', data, start + 36)[0]
+            chunks.append(np.frombuffer(data, '<f8', 2 * num_points, start + 40).reshape(-1, 2))
+            part_start.extend(range(n_points + 1, n_points + num_points + 1))
+            n_points += num_points
+        record_parts.append(len(part_start) - 1)
+
+    xy = np.concatenate(chunks).astype(np.float64) if chunks else np.empty((0, 2))
+    return (shape_type, xy, np.asarray(part_start, dtype=np.int64),
+            np.asarray(record_parts, dtype=np.int64))
+
+
+def _drop_deleted(table_parts, deleted: List[bool]):
+    """Retire les enregistrements supprimes (DBF) des geometries CSR."""
+    xy, part_start, record_parts = table_parts
+    keep = [i for i, d in enumerate(deleted) if not d and i + 1 < len(record_parts)]
+    new_parts, new_records, chunks = [0], [0], []
+    count = 0
+    for i in keep:
+        for j in range(record_parts[i], record_parts[i + 1]):
+            segment = xy[part_start[j]:part_start[j + 1]]
+            chunks.append(segment)
+            count += len(segment)
+            new_parts.append(count)
+        new_records.append(len(new_parts) - 1)
+    xy = np.concatenate(chunks) if chunks else np.empty((0, 2))
+    return xy, np.asarray(new_parts, dtype=np.int64), np.asarray(new_records, dtype=np.int64)
+
+
+def read_shapefile(path: str, field_names: Optional[Iterable[str]] = None) -> ShapeTable:
+    """Shapefile complet (geometries + champs demandes du DBF associe)."""
+    shape_type, xy, part_start, record_parts = read_shp(path)
+    dbf_path = os.path.splitext(path)[0] + '.dbf'
+    if not os.path.isfile(dbf_path):
+        dbf_path = os.path.splitext(path)[0] + '.DBF'
+    columns, deleted = read_dbf(dbf_path, field_names) if os.path.isfile(dbf_path) else ({}, [])
+    if any(deleted):
+        xy, part_start, record_parts = _drop_deleted((xy, part_start, record_parts), deleted)
+        columns = {name: [v for v, d in zip(values, deleted) if not d]
+                   for name, values in columns.items()}
+    n = len(record_parts) - 1
+    for name, values in columns.items():
+        if len(values) != n:
+            raise ValueError(
+                f"{os.path.basename(path)}: {n} geometries pour {len(values)} lignes DBF"
+            )
+    return ShapeTable(shape_type, columns, xy, part_start, record_parts)
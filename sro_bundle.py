@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+Bundle SRO hors ligne : enregistrement / rejeu d'une extraction batch.
+
+Un fichier par SRO (JSON compresse gzip, versionne) contenant les champs
+d'ExtractedData : cables, BPE, attaches, appuis WKB, dictionnaires
+CAP_FT / COMAC / C6 vs BD. Permet de rejouer une analyse sans base
+PostgreSQL (profilage, reproduction d'anomalies, jeu de test deterministe).
+
+Module pur Python : la conversion vers ExtractedData / CableSegment est
+faite par batch_extractor.
+"""
+
+import base64
+import gzip
+import json
+import os
+import re
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict
+
+BUNDLE_VERSION = 1
+BUNDLE_SUFFIX = '.sro.json.gz'
+
+
+def bundle_path(directory: str, sro: str) -> str:
+    """Chemin du bundle d'un SRO (caracteres hors [A-Za-z0-9-] remplaces)."""
+    safe = re.sub(r'[^A-Za-z0-9-]+', '_', sro or '').strip('_') or 'sans_sro'
+    return os.path.join(directory, safe + BUNDLE_SUFFIX)
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, bytes):
+        return {'__b64__': base64.b64encode(value).decode('ascii')}
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, date):
+        return {'__date__': value.isoformat()}
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return {'__set__': [_encode(v) for v in sorted(value, key=repr)]}
+    if isinstance(value, tuple):
+        return {'__tuple__': [_encode(v) for v in value]}
+    if isinstance(value, list):
+        return [_encode(v) for v in value]
+    if isinstance(value, dict):
+        if all(isinstance(k, str) for k in value):
+            return {'__dict__': {k: _encode(v) for k, v in value.items()}}
+        return {'__items__': [[_encode(k), _encode(v)] for k, v in value.items()]}
+    if type(value).__name__ == 'DataFrame' and hasattr(value, 'to_dict'):
+        split = value.to_dict(orient='split')
+        return {'__df__': {
+            'columns': [_encode(c) for c in split['columns']],
+            'index': [_encode(i) for i in split['index']],
+            'data': [[_encode(v) for v in row] for row in split['data']],
+        }}
+    if hasattr(value, 'item') and type(value).__module__ == 'numpy':
+        return value.item()
+    return value
+
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+    if '__b64__' in value:
+        return base64.b64decode(value['__b64__'])
+    if '__datetime__' in value:
+        return datetime.fromisoformat(value['__datetime__'])
+    if '__date__' in value:
+        return date.fromisoformat(value['__date__'])
+    if '__set__' in value:
+        return {_decode(v) for v in value['__set__']}
+    if '__tuple__' in value:
+        return tuple(_decode(v) for v in value['__tuple__'])
+    if '__dict__' in value:
+        return {k: _decode(v) for k, v in value['__dict__'].items()}
+    if '__items__' in value:
+        return {_decode(k): _decode(v) for k, v in value['__items__']}
+    if '__df__' in value:
+        import pandas as pd
+        split = value['__df__']
+        return pd.DataFrame(
+            [[_decode(v) for v in row] for row in split['data']],
+            index=[_decode(i) for i in split['index']],
+            columns=[_decode(c) for c in split['columns']],
+        )
+    return value
+
+
+def save_bundle(path: str, sro: str, fields: Dict[str, Any]) -> str:
+    """Ecrit le bundle (ecriture atomique). Retourne le chemin."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    document = {
+        'version': BUNDLE_VERSION,
+        'sro': sro,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'fields': {name: _encode(value) for name, value in fields.items()},
+    }
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as handle:
+            json.dump(document, handle, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+def load_bundle(path: str) -> Dict[str, Any]:
+    """Lit un bundle : {'sro', 'created', 'fields'}.
+
+    Raises:
+        ValueError: bundle tronque, illisible, incomplet ou de version non supportee
+        OSError: fichier absent ou illisible
+    """
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as handle:
+            document = json.load(handle)
+    except (EOFError, gzip.BadGzipFile, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Bundle SRO illisible ({path}): {e}") from e
+    if not isinstance(document, dict):
+        raise ValueError(f"Bundle SRO invalide ({path}): document JSON inattendu")
+    if document.get('version') != BUNDLE_VERSION:
+        raise ValueError(
+            f"Bundle SRO version {document.get('version')} non supportee (attendu {BUNDLE_VERSION})"
+        )
+    fields = document.get('fields')
+    if not isinstance(fields, dict):
+        raise ValueError(f"Bundle SRO invalide ({path}): section 'fields' absente")
+    return {
+        'sro': document.get('sro', ''),
+        'created': document.get('created', ''),
+        'fields': {name: _decode(value) for name, value in fields.items()},
+    }
@@ -0,0 +1,28 @@
+import logging
+
+BENCH_LOGGER = 'PoleAerien.bench'
+
+
+class _BenchRecords(logging.Handler):
+    """Garde les mesures des benchmarks pour le resume de fin de session."""
+
+    def __init__(self):
+        super().__init__(logging.INFO)
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(self.format(record))
+
+
+_records = _BenchRecords()
+_logger = logging.getLogger(BENCH_LOGGER)
+_logger.setLevel(logging.INFO)
+_logger.addHandler(_records)
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not _records.lines:
+        return
+    terminalreporter.section('PoleAerien benchmarks')
+    for line in _records.lines:
+        terminalreporter.write_line(line)
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+
+from appuis_snapshot import AppuiRecord, AppuisSnapshot
+from core_utils import normalize_appui_num
+from sro_bundle import load_bundle, save_bundle
+
+
+def _snapshot():
+    return AppuisSnapshot([
+        AppuiRecord('0078/63041', inf_num='BT-0078/63041', feature_id=1, geom_wkb=b'\x01', x=1.0, y=2.0,
+                    inf_type='POT', etat='EN SERVICE'),
+        AppuiRecord('E000123', feature_id=2, geom_wkb=None),
+        AppuiRecord('', feature_id=3, geom_wkb=b'\x03'),
+    ], layer_id='infra_pt_pot_1')
+
+
+class TestAppuisSnapshot(unittest.TestCase):
+    def test_views_match_per_variant_normalization(self):
+        snapshot = _snapshot()
+
+        for keep_commune in (True, False):
+            view = snapshot.view(keep_commune)
+            self.assertEqual(
+                [normalize_appui_num('0078/63041', keep_commune=keep_commune),
+                 normalize_appui_num('E000123', keep_commune=keep_commune)],
+                [a['num_appui'] for a in view],
+            )
+        self.assertEqual('78/63041', snapshot.view(True)[0]['num_appui'])
+        self.assertEqual('78', snapshot.view(False)[0]['num_appui'])
+        self.assertEqual('E000123', snapshot.view(False)[1]['inf_num'])
+
+    def test_views_share_wkb_and_are_memoized(self):
+        snapshot = _snapshot()
+
+        commune, plain = snapshot.view(True), snapshot.view(False)
+
+        self.assertIs(commune, snapshot.view(True))
+        self.assertIs(commune[0]['geom_wkb'], plain[0]['geom_wkb'])
+        self.assertEqual(2, len(snapshot))
+
+    def test_commune_coords_and_layer_match(self):
+        snapshot = _snapshot()
+
+        self.assertEqual('63041', snapshot.records[0].commune)
+        self.assertIsNone(snapshot.records[1].commune)
+        self.assertEqual({'78/63041': (1.0, 2.0)}, snapshot.coords())
+        self.assertTrue(snapshot.matches('infra_pt_pot_1'))
+        self.assertFalse(snapshot.matches('other'))
+        self.assertFalse(AppuisSnapshot([]).matches(''))
+
+    def test_bundle_roundtrip_keeps_wkb_and_attributes(self):
+        snapshot = _snapshot()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'sro.json.gz')
+            save_bundle(path, 'SRO-1', {'appuis': snapshot.to_dict()})
+            restored = AppuisSnapshot.from_dict(load_bundle(path)['fields']['appuis'])
+
+        self.assertTrue(restored.matches('infra_pt_pot_1'))
+        self.assertEqual([r.to_dict() for r in snapshot.records],
+                         [r.to_dict() for r in restored.records])
+        self.assertEqual(snapshot.view(True), restored.view(True))
+        self.assertEqual(snapshot.view(False), restored.view(False))
+        self.assertEqual(snapshot.coords(), restored.coords())
+
+
+if __name__ == '__main__':
+    unittest.main()
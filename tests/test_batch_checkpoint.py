@@ -0,0 +1,106 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timedelta
+
+from batch_checkpoint import CHECKPOINT_MAX_AGE_S, BatchCheckpoint
+
+
+class TestBatchCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self._tmp.name, 'checkpoint')
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_interrupted_run_resumes_completed_modules(self):
+        checkpoint = BatchCheckpoint(self.directory)
+        checkpoint.begin(['maj', 'capft', 'gespot_c6'], label='63041/B1I/PMZ/00003')
+        self.assertTrue(checkpoint.record('maj', {'success': True, 'rows': [1, 2]}))
+        self.assertTrue(checkpoint.record('capft', {'success': True}))
+
+        # Nouvelle session (QGIS relance)
+        reopened = BatchCheckpoint(self.directory)
+        manifest = reopened.resumable()
+        self.assertEqual('63041/B1I/PMZ/00003', manifest['label'])
+        self.assertEqual({'maj', 'capft'}, set(manifest['completed']))
+
+        results = reopened.resume(['capft', 'gespot_c6', 'comac'])
+
+        self.assertEqual({'capft': {'success': True}}, results)
+        self.assertEqual(['maj', 'capft', 'gespot_c6', 'comac'], reopened.resumable()['modules'])
+
+    def test_completed_or_empty_run_is_not_resumable(self):
+        checkpoint = BatchCheckpoint(self.directory)
+        self.assertIsNone(checkpoint.resumable())
+        self.assertEqual({}, checkpoint.resume(['maj']))
+
+        checkpoint.begin(['maj', 'capft'])
+        self.assertIsNone(checkpoint.resumable())
+        checkpoint.record('maj', {'success': True})
+        checkpoint.record('capft', {'success': True})
+
+        self.assertIsNone(BatchCheckpoint(self.directory).resumable())
+
+    def test_begin_and_clear_discard_previous_run(self):
+        checkpoint = BatchCheckpoint(self.directory)
+        checkpoint.begin(['maj', 'capft'])
+        checkpoint.record('maj', {'success': True})
+
+        checkpoint.begin(['maj', 'capft'])
+        self.assertIsNone(checkpoint.resumable())
+
+        checkpoint.record('maj', {'success': True})
+        checkpoint.clear()
+        self.assertFalse(os.path.exists(self.directory))
+        self.assertFalse(checkpoint.record('capft', {'success': True}))
+
+    def test_unpicklable_result_is_not_marked_completed(self):
+        checkpoint = BatchCheckpoint(self.directory)
+        checkpoint.begin(['maj', 'capft'])
+
+        self.assertFalse(checkpoint.record('maj', {'lock': threading.Lock()}))
+        self.assertIsNone(checkpoint.resumable())
+
+    def _interrupted(self, fingerprints):
+        checkpoint = BatchCheckpoint(self.directory)
+        checkpoint.begin(['maj', 'capft', 'comac'], fingerprints=fingerprints)
+        checkpoint.record('maj', {'success': True})
+        checkpoint.record('capft', {'success': True})
+        return BatchCheckpoint(self.directory)
+
+    def test_resume_requires_unchanged_input_fingerprints(self):
+        fps = {'maj': 'm1', 'capft': 'c1', 'comac': 'x1'}
+        reopened = self._interrupted(fps)
+
+        # Module non termine modifie : reprise possible
+        self.assertIsNotNone(reopened.resumable(dict(fps, comac='x2')))
+        # Dossier CAP FT modifie, empreinte BDD indisponible, ou pas d'empreintes
+        self.assertIsNone(reopened.resumable(dict(fps, capft='c2')))
+        self.assertIsNone(reopened.resumable(dict(fps, maj=None)))
+        self.assertIsNone(reopened.resumable({}))
+        self.assertEqual({}, reopened.resume(['maj', 'capft', 'comac'], dict(fps, capft='c2')))
+
+        results = reopened.resume(['maj', 'capft', 'comac'], dict(fps, comac='x2'))
+        self.assertEqual({'maj', 'capft'}, set(results))
+        self.assertEqual('x2', reopened.resumable()['fingerprints']['comac'])
+
+    def test_old_run_is_not_resumable(self):
+        fps = {'maj': 'm1', 'capft': 'c1', 'comac': 'x1'}
+        reopened = self._interrupted(fps)
+        with open(reopened.manifest_path, encoding='utf-8') as handle:
+            manifest = json.load(handle)
+        started = datetime.now() - timedelta(seconds=CHECKPOINT_MAX_AGE_S + 60)
+        manifest['started'] = started.isoformat(timespec='seconds')
+        with open(reopened.manifest_path, 'w', encoding='utf-8') as handle:
+            json.dump(manifest, handle)
+
+        self.assertIsNone(reopened.resumable(fps))
+        self.assertIsNotNone(reopened.resumable(fps, max_age_s=CHECKPOINT_MAX_AGE_S + 3600))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,246 @@
+import datetime
+import logging
+import os
+import re
+import tempfile
+import time
+import unittest
+import zipfile
+
+import openpyxl
+from openpyxl.styles import Font
+
+from c6_annexe import lire_feuille_annexe
+from core_utils import normalize_appui_num
+
+
+def _find_column_index(headers, candidates):
+    import unicodedata
+
+    def normalize(s):
+        s = unicodedata.normalize('NFD', s)
+        s = ''.join(c for c in s if unicodedata.category(c) != 'Mn')
+        return s.lower().strip()
+
+    for candidate in candidates:
+        c_norm = normalize(candidate)
+        for idx, header in enumerate(headers):
+            h_norm = normalize(header)
+            if c_norm in h_norm or h_norm in c_norm:
+                return idx
+    return -1
+
+
+def _reference(chemin):
+    """Lecture openpyxl complete d'origine (PoliceC6.lire_annexe_c6), sans journal."""
+    donnees_par_appui, liste_brute, boitier_par_appui = {}, [], {}
+    wb = openpyxl.load_workbook(chemin, data_only=True)
+    sheet = None
+    for name in ['Export 1', 'export 1', 'Appui', 'APPUI', 'appui', 'Appuis']:
+        if name in wb.sheetnames:
+            sheet = wb[name]
+            break
+    if not sheet:
+        sheet = wb.active
+    header_row_idx = None
+    col_num_appui = col_nom_cable = col_effort_dispo = col_pose_boitier = -1
+    appui_candidates = ['n° appui', 'n°appui', 'num_appui', 'numero_appui', 'numappui', 'pt_ad_numsu', 'num appui']
+    cable_candidates = ['nom du câble', 'nom du cable', 'nom_cable', 'nomcable', 'nom_du_cable', 'nom_du_câble',
+                        'cable', 'câble']
+    effort_candidates = ['effort disponible avant ajout câble', 'effort disponible avant ajout cable',
+                         'effort disponible avant ajout', 'effort dispo avant ajout', 'effort disponible']
+    boitier_candidates = ["pose d'un boitier optique", "pose d'un boîtier optique", "pose d'un boitier",
+                          "pose d'un boîtier", 'pose boitier optique', 'pose boîtier optique', 'pose boitier',
+                          'pose boîtier', 'pose_boitier', 'pose_boîtier']
+    for row_idx, row in enumerate(sheet.iter_rows(min_row=1, max_row=15, values_only=True), start=1):
+        if not row:
+            continue
+        row_headers = [str(cell or '').strip().lower() for cell in row]
+        test_appui = _find_column_index(row_headers, appui_candidates)
+        test_cable = _find_column_index(row_headers, cable_candidates)
+        if test_appui >= 0 and test_cable >= 0 and test_appui != test_cable:
+            header_row_idx = row_idx
+            col_num_appui, col_nom_cable = test_appui, test_cable
+            col_effort_dispo = _find_column_index(row_headers, effort_candidates)
+            col_pose_boitier = _find_column_index(row_headers, boitier_candidates)
+            break
+    if header_row_idx is None or col_num_appui == -1:
+        debug_rows = []
+        for r_idx, r in enumerate(sheet.iter_rows(min_row=1, max_row=5, values_only=True), start=1):
+            if r:
+                debug_rows.append(f"  Row{r_idx}: {[str(c or '')[:30] for c in r[:5]]}")
+        wb.close()
+        return donnees_par_appui, liste_brute, boitier_par_appui, debug_rows
+    current_appui = None
+    appuis_edf = set()
+    for row_idx, row in enumerate(sheet.iter_rows(min_row=header_row_idx + 1, values_only=False),
+                                  start=header_row_idx + 1):
+        if not row or all(c.value is None for c in row):
+            continue
+        raw_num = str(row[col_num_appui].value or '').strip() if col_num_appui < len(row) else ''
+        nom_cable = str(row[col_nom_cable].value or '').strip() if 0 <= col_nom_cable < len(row) else ''
+        cable_is_bold = False
+        if 0 <= col_nom_cable < len(row):
+            font = row[col_nom_cable].font
+            cable_is_bold = bool(font and font.bold)
+        effort_val = None
+        if 0 <= col_effort_dispo < len(row):
+            effort_val = row[col_effort_dispo].value
+        boitier_val = ''
+        if 0 <= col_pose_boitier < len(row):
+            bv = str(row[col_pose_boitier].value or '').strip().upper()
+            if bv in ('PB', 'PEO'):
+                boitier_val = bv
+        if raw_num:
+            current_appui = normalize_appui_num(raw_num)
+            if current_appui not in donnees_par_appui:
+                donnees_par_appui[current_appui] = []
+            if col_effort_dispo >= 0 and (effort_val is None or str(effort_val).strip() == ''):
+                appuis_edf.add(current_appui)
+            if boitier_val and current_appui not in boitier_par_appui:
+                boitier_par_appui[current_appui] = boitier_val
+        if current_appui and nom_cable:
+            is_cable = bool(re.match(r'^L\d', nom_cable, re.IGNORECASE))
+            if is_cable and cable_is_bold:
+                donnees_par_appui[current_appui].append(nom_cable)
+            liste_brute.append({'ligne': row_idx, 'num_appui': raw_num or current_appui,
+                                'num_appui_norm': current_appui, 'nom_cable': nom_cable, 'is_cable': is_cable,
+                                'is_bold': cable_is_bold, 'is_edf': current_appui in appuis_edf})
+    for appui_edf in appuis_edf:
+        donnees_par_appui.pop(appui_edf, None)
+    wb.close()
+    return donnees_par_appui, liste_brute, boitier_par_appui, None
+
+
+_HEADERS = ['N° appui', 'Type appui', 'Nom du câble', 'Capacité', 'Diamètre (mm)',
+            'Effort disponible avant ajout câble', "Pose d'un boîtier optique", 'Observations']
+
+
+def _write_annexe(path, n_appuis=40, headers=_HEADERS, wide_last_row=False):
+    """Annexe C6 type : metadonnees, en-tetes ligne 8, N° appui fusionne sur ses lignes cables."""
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = 'Export 1'
+    ws['A1'] = 'ANNEXE C6 - ETUDE DE CHARGE'
+    ws.merge_cells('A1:H1')
+    ws['A3'], ws['C3'] = 'N° de commande', 'CMD-2024-117'
+    ws['A4'], ws['C4'] = 'Date', datetime.datetime(2024, 3, 12)
+    ws['A5'] = 'Commune'
+    ws['C5'] = 63041
+    ws.append([])
+    ws.append([])
+    ws.append(headers)
+    for cell in ws[8]:
+        cell.font = Font(bold=True)
+    bold, plain = Font(bold=True), Font(bold=False)
+    row = 8
+    for n in range(n_appuis):
+        cables = [f'L{1000 + n}_{k}' for k in range(1 + n % 3)] + (['Cable FT existant'] if n % 4 == 0 else [])
+        for k, cable in enumerate(cables):
+            num = (f'{n:04d}/63041' if n % 5 else n) if k == 0 else None
+            effort = None if n % 7 == 3 else (f'{n % 9 * 10} daN' if n % 2 else n * 12.5)
+            boitier = ('PB', 'PEO', ' pb ', None)[n % 4] if k == len(cables) - 1 else None
+            ws.append([num, 'BS8' if n % 2 else 'MC8', cable, 6 * (k + 1), 8.5, effort if k == 0 else None,
+                       boitier, None])
+            row += 1
+            ws.cell(row=row, column=3).font = bold if (n + k) % 3 else plain
+        if len(cables) > 1 and n % 2:
+            ws.merge_cells(start_row=row - len(cables) + 1, start_column=1, end_row=row, end_column=1)
+        if n % 11 == 0:
+            ws.append([])
+            row += 1
+    if wide_last_row:
+        ws.cell(row=row + 2, column=26, value='note')
+    wb.create_sheet('Bases')
+    wb.save(path)
+
+
+def _rewrite_sheet(path, fn):
+    tmp = path + '.tmp'
+    with zipfile.ZipFile(path) as zin, zipfile.ZipFile(tmp, 'w', zipfile.ZIP_DEFLATED) as zout:
+        for item in zin.infolist():
+            data = zin.read(item.filename)
+            if item.filename == 'xl/worksheets/sheet1.xml':
+                data = fn(data)
+            zout.writestr(item, data)
+    os.replace(tmp, path)
+
+
+class TestC6Annexe(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, 'annexe_c6.xlsx')
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _assert_parity(self):
+        donnees, liste, boitiers, debug = _reference(self.path)
+        result = lire_feuille_annexe(self.path)
+        self.assertEqual(donnees, result['donnees_par_appui'])
+        self.assertEqual(liste, result['liste_brute'])
+        self.assertEqual(boitiers, result['boitier_par_appui'])
+        if debug is None:
+            self.assertEqual('', result['erreur'])
+        else:
+            self.assertEqual("En-têtes C6 non trouvées. Premières lignes:\n" + "\n".join(debug), result['erreur'])
+        return result
+
+    def test_parity_on_annex_layout(self):
+        _write_annexe(self.path)
+
+        result = self._assert_parity()
+
+        self.assertEqual(['L1001_0', 'L1001_1'], result['donnees_par_appui']['1'])
+        self.assertNotIn('3', result['donnees_par_appui'])  # appui EDF
+        self.assertEqual(('PB', 'PEO'), (result['boitier_par_appui']['6'], result['boitier_par_appui']['9']))
+        self.assertTrue(any(not e['is_bold'] for e in result['liste_brute']))
+
+    def test_parity_with_value_hidden_under_merge(self):
+        _write_annexe(self.path)
+        # Valeur conservee sous une fusion (classeur repasse par un autre tableur)
+        _rewrite_sheet(self.path, lambda xml: xml.replace(
+            b'<row r="13">', b'<row r="13"><c r="A13" t="inlineStr"><is><t>0099</t></is></c>'))
+
+        result = self._assert_parity()
+
+        self.assertNotIn('99', result['donnees_par_appui'])
+
+    def test_parity_when_width_is_only_known_at_end(self):
+        _write_annexe(self.path, headers=["Numéro d'appui"] + _HEADERS[1:], wide_last_row=True)
+        _rewrite_sheet(self.path, lambda xml: re.sub(rb'<dimension [^>]*/>', b'', xml))
+
+        self._assert_parity()
+
+    def test_missing_header_and_bad_file(self):
+        _write_annexe(self.path, headers=['A', 'B', 'C'])
+        self._assert_parity()
+
+        with open(self.path, 'wb') as handle:
+            handle.write(b'pas un xlsx')
+        self.assertTrue(lire_feuille_annexe(self.path)['erreur'].startswith('Erreur lecture C6'))
+
+
+@unittest.skipUnless(os.environ.get('POLEAERIEN_BENCH'), 'benchmark: set POLEAERIEN_BENCH=1')
+class TestC6AnnexeBenchmark(unittest.TestCase):
+    """Annexe C6 de 8 000 appuis (~16 000 lignes cables)."""
+
+    def test_stream_vs_openpyxl(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, 'annexe_c6.xlsx')
+            _write_annexe(path, n_appuis=8000)
+            start = time.perf_counter()
+            reference = _reference(path)
+            t_ref = time.perf_counter() - start
+            start = time.perf_counter()
+            result = lire_feuille_annexe(path)
+            t_stream = time.perf_counter() - start
+
+        summary = f"Annexe C6 : openpyxl {t_ref:.2f} s, flux {t_stream:.2f} s (x{t_ref / t_stream:.1f})"
+        logging.getLogger('PoleAerien.bench').info(summary)
+        self.assertEqual(reference[1], result['liste_brute'])
+        self.assertLess(t_stream, t_ref, summary)
+
+
+if __name__ == '__main__':
+    unittest.main()
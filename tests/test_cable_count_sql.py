@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Validation de rip_avg_nge.compter_cables_appuis contre le calcul client
+(cable_analyzer.compter_cables_par_appui) sur une base PostGIS locale.
+
+Execution : console Python QGIS ou pytest-qgis, avec
+POLEAERIEN_TEST_PG_DSN="dbname=test user=... host=localhost".
+Tout est cree dans une transaction annulee en fin de test.
+"""
+
+import os
+import unittest
+
+SQL_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'sql')
+PG_DSN = os.environ.get('POLEAERIEN_TEST_PG_DSN')
+
+_FIXTURE_SQL = """
+CREATE SCHEMA IF NOT EXISTS rip_avg_nge;
+CREATE TEMP TABLE fixture_cables (
+    gid_dc2 bigint, gid integer, cab_type varchar, cab_capa integer,
+    cb_etiquet varchar, posemode integer, geom geometry
+);
+INSERT INTO fixture_cables VALUES
+    (1, 10, 'CDI', 144, 'C1', 1, ST_GeomFromText('LINESTRING(0 0, 40 0)', 2154)),
+    (2, 10, 'CDI', 144, 'C1', 1, ST_GeomFromText('LINESTRING(40 0, 80 0)', 2154)),
+    (3, 11, 'TRA', 72, 'C2', 2, ST_GeomFromText('LINESTRING(0.8 0.6, 0 40)', 2154)),
+    (4, 12, 'CDI', 36, 'C3', 0, ST_GeomFromText('LINESTRING(0 0, -40 0)', 2154)),
+    (5, 13, 'CDI', 12, 'C4', 1, ST_GeomFromText('LINESTRING(83 3, 120 3)', 2154));
+CREATE OR REPLACE FUNCTION rip_avg_nge.fddcpi2(zasro text)
+    RETURNS TABLE(gid_dc2 bigint, gid_dc bigint, gid integer, sro character varying, nro character varying, length double precision, cab_type character varying, cab_capa integer, cab_modulo bigint, isole character varying, date_modif timestamp with time zone, modif_par character varying, geom geometry, cab_nature character varying, commentaire character varying, collecte character varying, cb_etiquet character varying, fon character varying, projet character varying, "DCE" character varying, dist_type text, affectation character varying, posemode integer)
+    LANGUAGE sql AS $$
+    SELECT f.gid_dc2, f.gid_dc2, f.gid, zasro::varchar, ''::varchar, ST_Length(f.geom), f.cab_type,
+           f.cab_capa, 12::bigint, ''::varchar, now(), ''::varchar, f.geom, ''::varchar, ''::varchar,
+           ''::varchar, f.cb_etiquet, ''::varchar, ''::varchar, ''::varchar, ''::text, ''::varchar, f.posemode
+    FROM fixture_cables f ORDER BY f.gid_dc2
+$$;
+CREATE TABLE IF NOT EXISTS rip_avg_nge.attaches (gid integer, sro varchar, geom geometry);
+INSERT INTO rip_avg_nge.attaches VALUES
+    (1, 'SRO-TEST', ST_GeomFromText('LINESTRING(80.5 0, 83 3)', 2154));
+"""
+
+
+@unittest.skipUnless(PG_DSN, 'PostGIS: set POLEAERIEN_TEST_PG_DSN')
+class TestCompterCablesSql(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        import psycopg2
+        from qgis.core import QgsGeometry, QgsPointXY
+        from PoleAerien.cable_analyzer import _parse_attaches_geoms, compter_cables_par_appui
+        from PoleAerien.db_connection import DatabaseConnection
+
+        cls.compter_client = staticmethod(compter_cables_par_appui)
+        cls.parse_attaches = staticmethod(_parse_attaches_geoms)
+        cls.conn = psycopg2.connect(PG_DSN)
+        cur = cls.conn.cursor()
+        cur.execute(_FIXTURE_SQL)
+        with open(os.path.join(SQL_DIR, 'compter_cables_appuis'), encoding='utf-8') as handle:
+            ddl = handle.read().split('ALTER FUNCTION', 1)[0]
+        cur.execute(ddl)
+        cur.execute("SELECT gid_dc2, gid_dc, gid, sro, nro, length, cab_type, cab_capa, cab_modulo, "
+                    "isole, date_modif, modif_par, geom, cab_nature, commentaire, collecte, cb_etiquet, "
+                    "fon, projet, \"DCE\", dist_type, affectation, posemode, ST_AsText(geom) "
+                    "FROM rip_avg_nge.fddcpi2('SRO-TEST')")
+        cls.rows = cur.fetchall()
+        cur.execute("SELECT gid, ST_AsText(geom) FROM rip_avg_nge.attaches WHERE sro = 'SRO-TEST'")
+        cls.attaches_raw = [{'gid': gid, 'geom_wkt': wkt} for gid, wkt in cur.fetchall()]
+
+        cls.db = DatabaseConnection()
+        cls.db.connection = cls.conn
+        cls.appuis = [
+            {'num_appui': 'A', 'geom': QgsGeometry.fromPointXY(QgsPointXY(0, 0))},
+            {'num_appui': 'B', 'geom': QgsGeometry.fromPointXY(QgsPointXY(40, 1))},
+            {'num_appui': 'C', 'geom': QgsGeometry.fromPointXY(QgsPointXY(80, 0))},
+            {'num_appui': 'D', 'geom': None},
+        ]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.conn.rollback()
+        cls.conn.close()
+
+    def _cables(self):
+        from PoleAerien.db_connection import CableSegment
+        return [
+            CableSegment(
+                gid_dc2=r[0] or 0, gid_dc=r[1] or 0, gid=r[2] or 0, sro=r[3] or '', nro=r[4] or '',
+                length=r[5] or 0.0, cab_type=r[6] or '', cab_capa=r[7] or 0, cab_modulo=r[8] or 0,
+                isole=r[9] or '', date_modif='', modif_par=r[11] or '', cab_nature=r[13] or '',
+                commentaire=r[14] or '', collecte=r[15] or '', cb_etiquet=r[16] or '', fon=r[17] or '',
+                projet=r[18] or '', dce=r[19] or '', dist_type=r[20] or '', affectation=r[21] or '',
+                posemode=r[22] or 0, geom_wkt=r[23] or '',
+            )
+            for r in self.rows
+        ]
+
+    def _assert_same(self, **kwargs):
+        with_attaches = kwargs.pop('with_attaches', False)
+        client = self.compter_client(
+            self._cables(), self.appuis,
+            attaches_parsed=self.parse_attaches(self.attaches_raw) if with_attaches else None,
+            **kwargs
+        )
+        server = self.db.compter_cables_par_appui_sql(
+            'SRO-TEST', self.appuis, with_attaches=with_attaches, **kwargs
+        )
+        self.assertEqual(client, server)
+        return server
+
+    def test_endpoint_tolerance(self):
+        result = self._assert_same(tolerance=1.5)
+        self.assertEqual(2, result['A']['count'])
+        self.assertEqual(0, result['D']['count'])
+
+    def test_group_by_gid_and_cab_types(self):
+        result = self._assert_same(tolerance=1.5, group_by_gid=True, cab_types={'CDI'})
+        self.assertEqual(1, result['B']['count'])
+
+    def test_attache_extension(self):
+        result = self._assert_same(tolerance=1.5, with_attaches=True)
+        self.assertIn(13, [c['gid'] for c in result['C']['cables']])
+
+    def test_min_capa_matches_client_prefilter(self):
+        client = self.compter_client(
+            [c for c in self._cables() if c.cab_capa >= 6], self.appuis,
+            tolerance=1.5, group_by_gid=True, cab_types={'CDI'}
+        )
+        server = self.db.compter_cables_par_appui_sql(
+            'SRO-TEST', self.appuis, tolerance=1.5, group_by_gid=True,
+            cab_types={'CDI'}, min_capa=6
+        )
+        self.assertEqual(client, server)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""Lecture fddcpi2 par lots (curseur simule) et index cables -> appuis incremental."""
+
+import unittest
+
+from cable_index import CablePoleIndex, fetch_chunks, wkt_endpoints
+
+
+class _FakeCursor:
+    """Curseur serveur simule : enregistre la taille de chaque fetchmany()."""
+
+    def __init__(self, rows):
+        self._rows = list(rows)
+        self._pos = 0
+        self.fetch_sizes = []
+
+    def fetchmany(self, size):
+        batch = self._rows[self._pos:self._pos + size]
+        self._pos += len(batch)
+        self.fetch_sizes.append(len(batch))
+        return batch
+
+    def fetchall(self):
+        batch = self._rows[self._pos:]
+        self._pos = len(self._rows)
+        return batch
+
+
+class _Segment:
+    __slots__ = ('gid_dc2', 'posemode', 'cab_capa', 'geom_wkt')
+
+    def __init__(self, row):
+        self.gid_dc2, self.posemode, self.cab_capa, self.geom_wkt = row
+
+    def __eq__(self, other):
+        return (self.gid_dc2, self.posemode, self.cab_capa, self.geom_wkt) == \
+            (other.gid_dc2, other.posemode, other.cab_capa, other.geom_wkt)
+
+
+def _rows(n):
+    # Segments de 10 m entre appuis espaces de 10 m sur l'axe x ; 1 sur 4 en souterrain
+    return [(i, 7 if i % 4 == 3 else 1, 6 + i % 3,
+             f"LINESTRING({i * 10} 0,{i * 10 + 5} 0.2,{i * 10 + 10} 0.3)")
+            for i in range(n)]
+
+
+class TestFetchChunks(unittest.TestCase):
+    def test_chunk_boundaries(self):
+        cursor = _FakeCursor(_rows(7))
+        chunks = list(fetch_chunks(cursor, 3, _Segment))
+        self.assertEqual([3, 3, 1], [len(c) for c in chunks])
+        self.assertEqual([3, 3, 1, 0], cursor.fetch_sizes)
+        self.assertEqual([[0, 1, 2], [3, 4, 5], [6]],
+                         [[s.gid_dc2 for s in c] for c in chunks])
+
+    def test_exact_multiple_and_empty(self):
+        self.assertEqual([2, 2], [len(c) for c in fetch_chunks(_FakeCursor(_rows(4)), 2, _Segment)])
+        self.assertEqual([], list(fetch_chunks(_FakeCursor([]), 2, _Segment)))
+
+    def test_streamed_equals_fetchall_list(self):
+        rows = _rows(25)
+        streamed = [s for chunk in fetch_chunks(_FakeCursor(rows), 4, _Segment) for s in chunk]
+        old = [_Segment(row) for row in _FakeCursor(rows).fetchall()]
+        self.assertEqual(old, streamed)
+
+
+class TestCablePoleIndex(unittest.TestCase):
+    def setUp(self):
+        self.poles = {f"A{i}": (i * 10.0, 0.0) for i in range(26)}
+        self.poles['LOIN'] = (5.0, 50.0)
+
+    def _index(self, itersize):
+        index = CablePoleIndex(self.poles, tolerance=0.5)
+        for chunk in fetch_chunks(_FakeCursor(_rows(25)), itersize, _Segment):
+            index.add_chunk(chunk)
+        return index
+
+    def test_index_does_not_depend_on_chunk_size(self):
+        whole = CablePoleIndex(self.poles, tolerance=0.5)
+        whole.add_chunk([_Segment(row) for row in _rows(25)])
+        for itersize in (1, 3, 25, 100):
+            index = self._index(itersize)
+            self.assertEqual(whole.nb_indexed, index.nb_indexed)
+            for num in self.poles:
+                self.assertEqual([c.gid_dc2 for c in whole.cables_for(num)],
+                                 [c.gid_dc2 for c in index.cables_for(num)])
+
+    def test_endpoints_within_tolerance_and_posemode(self):
+        index = self._index(4)
+        self.assertEqual(25, index.nb_cables)
+        self.assertEqual(19, index.nb_indexed)
+        self.assertEqual([0], [c.gid_dc2 for c in index.cables_for('A0')])
+        self.assertEqual([1, 2], [c.gid_dc2 for c in index.cables_for('A2')])
+        # Segment 3 souterrain (posemode 7) : ni A3 ni A4 ne le voient
+        self.assertEqual([2], [c.gid_dc2 for c in index.cables_for('A3')])
+        self.assertEqual([], index.cables_for('LOIN'))
+        self.assertEqual([], index.cables_for('INCONNU'))
+
+    def test_all_posemodes_when_requested(self):
+        index = CablePoleIndex(self.poles, tolerance=0.5, posemodes=None)
+        index.add_chunk([_Segment(row) for row in _rows(25)])
+        self.assertEqual(25, index.nb_indexed)
+        self.assertEqual([2, 3], [c.gid_dc2 for c in index.cables_for('A3')])
+
+    def test_wkt_endpoints(self):
+        self.assertEqual(((0.0, 0.0), (3.0, 4.0)), wkt_endpoints('LINESTRING(0 0, 1 1, 3 4)'))
+        self.assertEqual(((1.0, 2.0), (5.0, 6.0)),
+                         wkt_endpoints('MULTILINESTRING((1 2 0,5 6 0),(9 9,8 8))'))
+        self.assertIsNone(wkt_endpoints('LINESTRING EMPTY'))
+        self.assertIsNone(wkt_endpoints('POINT(1 2)'))
+        self.assertIsNone(wkt_endpoints(''))
+
+    def test_multilinestring_parity_with_legacy_police_c6(self):
+        # L'ancien PoliceC6 passait par QgsGeometry.asPolyline(), vide pour une
+        # geometrie multipart : les MULTILINESTRING etaient ignores. L'index
+        # retient la 1re partie, comme compter_cables_appuis (ST_GeometryN 1)
+        # et le comptage COMAC : ces segments sont desormais comptes.
+        rows = [
+            (1, 1, 12, 'LINESTRING(0 0,10 0)'),
+            (2, 1, 12, 'MULTILINESTRING((0 0.2,10 0.1))'),
+            (3, 2, 6, 'MULTILINESTRING((10 0,20 0),(40 40,50 50))'),
+        ]
+        index = CablePoleIndex(self.poles, tolerance=0.5)
+        index.add_chunk([_Segment(row) for row in rows])
+
+        def legacy(num):
+            px, py = self.poles[num]
+            found = []
+            for gid, _pose, _capa, wkt in rows:
+                if not wkt.startswith('LINESTRING'):
+                    continue
+                ends = wkt_endpoints(wkt)
+                if any((px - x) ** 2 + (py - y) ** 2 <= 0.25 for x, y in ends):
+                    found.append(gid)
+            return found
+
+        self.assertEqual([1], legacy('A0'))
+        self.assertEqual([1, 2], [c.gid_dc2 for c in index.cables_for('A0')])
+        self.assertEqual([1], legacy('A1'))
+        self.assertEqual([1, 2, 3], [c.gid_dc2 for c in index.cables_for('A1')])
+        self.assertEqual([], legacy('A2'))
+        self.assertEqual([3], [c.gid_dc2 for c in index.cables_for('A2')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+import comac_snapshot
+from comac_snapshot import SNAPSHOT_TABLES, ComacSnapshot, fingerprint_sql
+
+
+def _payload():
+    return {
+        'cables': {'L1092-12-P': {'nom': 'L1092-12-P', 'capacite_fo': 12, 'description': 'câble 12 fo'}},
+        'supports': {'BE 8 C': {'nom': 'BE 8 C', 'effort_nominal': 400.0}},
+        'commune': {'63113': {'insee': '63113', 'nom': 'Clermont', 'departement': '63'}},
+        'hypothese': {},
+        'armements': ['A1', 'B2'],
+        'cable_capacites_possibles': {'L1092-13-P': [18, 24, 36]},
+    }
+
+
+class TestComacSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'comac', 'comac_snapshot.sqlite')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_roundtrip_with_matching_fingerprint(self):
+        snapshot = ComacSnapshot(self.path)
+        snapshot.save('fp1', _payload())
+
+        self.assertEqual(_payload(), snapshot.load('fp1'))
+        self.assertEqual(_payload(), snapshot.load())
+        self.assertEqual('fp1', snapshot.fingerprint())
+
+    def test_stale_fingerprint_or_missing_file_returns_none(self):
+        snapshot = ComacSnapshot(self.path)
+        self.assertIsNone(snapshot.load('fp1'))
+
+        snapshot.save('fp1', _payload())
+
+        self.assertIsNone(snapshot.load('fp2'))
+
+    def test_other_version_is_ignored(self):
+        snapshot = ComacSnapshot(self.path)
+        snapshot.save('fp1', _payload())
+        with sqlite3.connect(self.path) as conn:
+            conn.execute("UPDATE meta SET value = ? WHERE key = 'version'",
+                         (str(comac_snapshot.SNAPSHOT_VERSION + 1),))
+
+        self.assertIsNone(snapshot.load('fp1'))
+
+    def test_corrupt_file_returns_none(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, 'wb') as handle:
+            handle.write(b'not a database')
+
+        self.assertIsNone(ComacSnapshot(self.path).load())
+
+    def test_fingerprint_sql_covers_every_table(self):
+        query = fingerprint_sql('comac')
+
+        for table in SNAPSHOT_TABLES:
+            self.assertIn(f"comac.{table}", query)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import csv
+import os
+import tempfile
+import unittest
+
+from csv_table import detect_encoding, read_csv_table
+
+
+def _dict_rows(path):
+    """Lecture de reference : csv.DictReader, utf-8 puis latin-1."""
+    for enc in ('utf-8', 'latin-1'):
+        try:
+            with open(path, 'r', encoding=enc) as f:
+                return list(csv.DictReader(f, delimiter=';'))
+        except UnicodeDecodeError:
+            continue
+
+
+class TestCsvTable(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, 't_ptech.csv')
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _write(self, data):
+        with open(self.path, 'wb') as handle:
+            handle.write(data)
+
+    def _assert_same_as_dictreader(self, table, fields):
+        rows = _dict_rows(self.path)
+        self.assertEqual(len(rows), len(table))
+        for idx, row in enumerate(rows):
+            for name in fields:
+                self.assertEqual(row.get(name, ''), table.get(idx, name), f"{idx}.{name}")
+
+    def test_values_match_dictreader(self):
+        self._write(
+            'pt_code;pt_nd_code;pt_typephy;pt_comment\r\n'
+            'PT1;ND1;A;poteau é\r\n'
+            '\r\n'
+            'PT2; ND2 ;C;"ligne 1\r\nligne 2;x"\r\n'
+            'PT3;ND1\r\n'
+            'PT4;;F;;extra\r\n'.encode('utf-8')
+        )
+        fields = ('pt_code', 'pt_nd_code', 'pt_typephy', 'pt_comment', 'absent')
+
+        table = read_csv_table(self.path, fields, index_fields=('pt_code', 'pt_nd_code'))
+
+        self._assert_same_as_dictreader(table, fields)
+        self.assertEqual('utf-8', table.encoding)
+        self.assertEqual(['pt_code', 'pt_nd_code', 'pt_typephy', 'pt_comment'], table.fields)
+        self.assertIsNone(table.get(2, 'pt_typephy'))
+        self.assertEqual({'ND1': 2, 'ND2': 1}, table.index('pt_nd_code'))
+        self.assertEqual(3, table.index('pt_code')['PT4'])
+        self.assertEqual(['', '', '', ''], table.column('absent'))
+
+    def test_latin1_after_sample_decoded_once_as_latin1(self):
+        body = ''.join(f'PT{i};ND{i};A;ok\n' for i in range(200))
+        self._write(('pt_code;pt_nd_code;pt_typephy;pt_comment\n' + body).encode('ascii')
+                    + 'PTX;NDX;A;Crête\n'.encode('latin-1'))
+        fields = ('pt_code', 'pt_comment')
+
+        table = read_csv_table(self.path, fields, sample_size=64)
+
+        self.assertEqual('latin-1', table.encoding)
+        self._assert_same_as_dictreader(table, fields)
+        self.assertEqual('Crête', table.get(200, 'pt_comment'))
+
+    def test_detect_encoding_tolerates_cut_multibyte_character(self):
+        data = 'aé'.encode('utf-8') * 10
+        self.assertEqual('utf-8', detect_encoding(data, sample_size=2))
+        self.assertEqual('latin-1', detect_encoding('éa'.encode('latin-1') + b'b', sample_size=2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+Cache serveur fddcpi2 (sql/fddcpi2_cache) sur une base PostGIS de substitution.
+
+Execution : POLEAERIEN_TEST_PG_DSN="dbname=test user=... host=localhost".
+La base doit etre vierge du schema rip_avg_nge : les sources (infra,
+fddcpfa, attaches, fddcpi2) sont remplacees par des tables/fonctions
+minimales, le tout dans une transaction annulee en fin de test.
+"""
+
+import os
+import unittest
+
+SQL_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'sql')
+PG_DSN = os.environ.get('POLEAERIEN_TEST_PG_DSN')
+
+_STAND_IN_SQL = """
+CREATE SCHEMA IF NOT EXISTS rip_avg_nge;
+CREATE TABLE rip_avg_nge.infra_pt_pot (gid serial, sro varchar, date_modif timestamp);
+CREATE TABLE rip_avg_nge.infra_pt_chb (gid serial, sro varchar, date_modif timestamp);
+CREATE TABLE rip_avg_nge.infra_pt_autres (gid serial, sro varchar, date_modif timestamp);
+CREATE TABLE rip_avg_nge.attaches (gid integer, sro varchar, geom geometry);
+CREATE TABLE rip_avg_nge.stand_in_cables (gid integer, sro varchar, date_modif timestamptz, geom geometry);
+CREATE TABLE rip_avg_nge.stand_in_calls (sro text);
+
+INSERT INTO rip_avg_nge.infra_pt_pot (sro, date_modif) VALUES
+    ('SRO-A', '2026-01-01'), ('SRO-A', '2026-01-02'), ('SRO-B', '2026-01-01');
+INSERT INTO rip_avg_nge.stand_in_cables VALUES
+    (1, 'SRO-A', '2026-01-01', ST_GeomFromText('LINESTRING(0 0, 10 0)', 2154)),
+    (2, 'SRO-A', '2026-01-01', ST_GeomFromText('LINESTRING(10 0, 20 0)', 2154)),
+    (3, 'SRO-B', '2026-01-01', ST_GeomFromText('LINESTRING(0 5, 10 5)', 2154));
+
+CREATE FUNCTION rip_avg_nge.fddcpfa(zasro text, mode integer)
+    RETURNS TABLE(gid integer, date_modif timestamptz, geom geometry)
+    LANGUAGE sql AS $$
+    SELECT c.gid, c.date_modif, c.geom FROM rip_avg_nge.stand_in_cables c WHERE c.sro = zasro
+$$;
+
+CREATE FUNCTION rip_avg_nge.fddcpi2(zasro text)
+    RETURNS TABLE(gid_dc2 bigint, gid_dc bigint, gid integer, sro character varying, nro character varying, length double precision, cab_type character varying, cab_capa integer, cab_modulo bigint, isole character varying, date_modif timestamp with time zone, modif_par character varying, geom geometry, cab_nature character varying, commentaire character varying, collecte character varying, cb_etiquet character varying, fon character varying, projet character varying, "DCE" character varying, dist_type text, affectation character varying, posemode integer)
+    LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO rip_avg_nge.stand_in_calls VALUES (zasro);
+    RETURN QUERY
+    SELECT (10 - c.gid)::bigint, c.gid::bigint, c.gid, c.sro, 'NRO'::varchar, ST_Length(c.geom),
+           'CDI'::varchar, 144, 12::bigint, ''::varchar, c.date_modif, ''::varchar, c.geom,
+           ''::varchar, ''::varchar, ''::varchar, ('C' || c.gid)::varchar, ''::varchar, ''::varchar,
+           ''::varchar, ''::text, ''::varchar, 1
+    FROM rip_avg_nge.stand_in_cables c WHERE c.sro = zasro ORDER BY c.gid DESC;
+END;
+$$;
+"""
+
+
+@unittest.skipUnless(PG_DSN, 'PostgreSQL: set POLEAERIEN_TEST_PG_DSN')
+class TestFddcpi2Cache(unittest.TestCase):
+
+    def setUp(self):
+        import psycopg2
+        self.conn = psycopg2.connect(PG_DSN)
+        self.cur = self.conn.cursor()
+        self.cur.execute(_STAND_IN_SQL)
+        with open(os.path.join(SQL_DIR, 'fddcpi2_cache'), encoding='utf-8') as handle:
+            ddl = handle.read().split('ALTER FUNCTION', 1)[0]
+        self.cur.execute(ddl)
+
+    def tearDown(self):
+        self.conn.rollback()
+        self.conn.close()
+
+    def _cached(self, sro):
+        self.cur.execute("SELECT gid_dc2, gid, cb_etiquet FROM rip_avg_nge.fddcpi2_cached(%s)", (sro,))
+        return self.cur.fetchall()
+
+    def _calls(self, sro):
+        self.cur.execute("SELECT count(*) FROM rip_avg_nge.stand_in_calls WHERE sro = %s", (sro,))
+        return self.cur.fetchone()[0]
+
+    def test_same_rows_and_order_as_fddcpi2(self):
+        self.cur.execute("SELECT gid_dc2, gid, cb_etiquet FROM rip_avg_nge.fddcpi2('SRO-A')")
+        direct = self.cur.fetchall()
+
+        self.assertEqual(direct, self._cached('SRO-A'))
+        self.assertEqual(direct, self._cached('SRO-A'))
+
+    def test_unchanged_fingerprint_returns_cached_rows(self):
+        self._cached('SRO-A')
+        self._cached('SRO-A')
+
+        self.assertEqual(1, self._calls('SRO-A'))
+
+    def test_only_changed_sro_is_recomputed(self):
+        self._cached('SRO-A')
+        self._cached('SRO-B')
+        self.cur.execute("UPDATE rip_avg_nge.infra_pt_pot SET date_modif = '2026-02-01' WHERE sro = 'SRO-A'")
+
+        self._cached('SRO-A')
+        self._cached('SRO-B')
+
+        self.assertEqual(2, self._calls('SRO-A'))
+        self.assertEqual(1, self._calls('SRO-B'))
+
+    def test_deleted_cable_invalidates_cache(self):
+        self._cached('SRO-A')
+        self.cur.execute("DELETE FROM rip_avg_nge.stand_in_cables WHERE gid = 2")
+
+        rows = self._cached('SRO-A')
+
+        self.assertEqual([(9, 1, 'C1')], rows)
+        self.assertEqual(2, self._calls('SRO-A'))
+
+    def test_other_roles_read_through_function_but_cannot_write_cache(self):
+        import psycopg2
+        with open(os.path.join(SQL_DIR, 'fddcpi2_cache'), encoding='utf-8') as handle:
+            privileges = 'ALTER FUNCTION' + handle.read().split('ALTER FUNCTION', 1)[1].split('COMMENT ON', 1)[0]
+        self.cur.execute("SELECT current_user")
+        owner = self.cur.fetchone()[0]
+        self.cur.execute(privileges.replace('ownergrp_auvergne', f'"{owner}"'))
+        self.cur.execute("CREATE ROLE poleaerien_test_reader NOLOGIN")
+        self.cur.execute("GRANT USAGE ON SCHEMA rip_avg_nge TO poleaerien_test_reader")
+        self.cur.execute("SET ROLE poleaerien_test_reader")
+
+        self.assertEqual([(8, 2, 'C2'), (9, 1, 'C1')], self._cached('SRO-A'))
+        for statement in ("DELETE FROM rip_avg_nge.fddcpi2_cache_rows",
+                          "UPDATE rip_avg_nge.fddcpi2_cache_meta SET fingerprint = 'x'",
+                          "INSERT INTO rip_avg_nge.fddcpi2_cache_meta (sro, fingerprint, nb_rows) "
+                          "VALUES ('SRO-B', 'x', 0)"):
+            self.cur.execute("SAVEPOINT ecriture")
+            with self.assertRaises(psycopg2.errors.InsufficientPrivilege):
+                self.cur.execute(statement)
+            self.cur.execute("ROLLBACK TO SAVEPOINT ecriture")
+        self.cur.execute("SELECT count(*) FROM rip_avg_nge.fddcpi2_cache_rows")
+        self.assertEqual(2, self.cur.fetchone()[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
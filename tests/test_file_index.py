@@ -0,0 +1,155 @@
+import glob
+import logging
+import os
+import tempfile
+import time
+import unittest
+
+import file_index
+from core_utils import is_plugin_output_file
+from file_index import FileIndex, find_c6_file, get_index
+from pcm_parser import list_pcm_files
+
+
+def _find_c6_glob(repertoire_c6, nom_etude):
+    """Recherche d'origine (PoliceWorkflow.find_c6_file) : neuf glob recursifs."""
+    patterns = [
+        os.path.join(repertoire_c6, "**", nom_etude, f"{nom_etude}.xlsx"),
+        os.path.join(repertoire_c6, nom_etude, f"{nom_etude}.xlsx"),
+        os.path.join(repertoire_c6, nom_etude, "*Annexe*C6*.xlsx"),
+        os.path.join(repertoire_c6, nom_etude, "*C6*.xlsx"),
+        os.path.join(repertoire_c6, "**", nom_etude, "*Annexe*C6*.xlsx"),
+        os.path.join(repertoire_c6, "**", nom_etude, "*C6*.xlsx"),
+        os.path.join(repertoire_c6, "**", f"{nom_etude}.xlsx"),
+        os.path.join(repertoire_c6, f"*{nom_etude}*.xlsx"),
+        os.path.join(repertoire_c6, "**", nom_etude, "*.xlsx"),
+    ]
+    for pattern in patterns:
+        for match in glob.glob(pattern, recursive=True):
+            if is_plugin_output_file(os.path.basename(match)):
+                continue
+            return match
+    return None
+
+
+def _touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, 'w').close()
+
+
+def _make_delivery(root, n_etudes=150, fiches=62):
+    """Livraison type : CMD n/etude/ (C6, FicheAppui_, PCM, COMAC), ~10k fichiers."""
+    etudes = []
+    for n in range(n_etudes):
+        etude = f'FTTH-NGE-ETUDE-{n:04d}'
+        etudes.append(etude)
+        folder = os.path.join(root, f'CMD {n % 5 + 1}', etude)
+        variant = n % 6
+        if variant == 0:
+            _touch(os.path.join(folder, f'{etude}.xlsx'))
+        elif variant == 1:
+            _touch(os.path.join(folder, f'Annexe C6 {n}.xlsx'))
+            _touch(os.path.join(folder, f'Export_{n}_C6.xlsx'))
+        elif variant == 2:
+            _touch(os.path.join(folder, 'releves', f'{n}_C6.xlsx'))
+        elif variant == 3:
+            _touch(os.path.join(root, f'{etude} v2.xlsx'))
+        elif variant == 4:
+            _touch(os.path.join(folder, 'divers.xlsx'))
+        _touch(os.path.join(folder, f'ANALYSE_C6_{n}.xlsx'))
+        _touch(os.path.join(folder, f'{n}_C7.xlsx'))
+        _touch(os.path.join(folder, f'{etude}.pcm'))
+        _touch(os.path.join(folder, f'ExportComac_{n}.xlsx'))
+        for k in range(fiches):
+            _touch(os.path.join(folder, 'CAP_FT', f'FicheAppui_{n:04d}{k:03d}.xlsx'))
+    _touch(os.path.join(root, 'FTTH-NGE-ETUDE-0004', 'FTTH-NGE-ETUDE-0004.xlsx'))
+    return etudes
+
+
+class TestFileIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._tmp = tempfile.TemporaryDirectory()
+        cls.root = cls._tmp.name
+        cls.etudes = _make_delivery(cls.root)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._tmp.cleanup()
+
+    def tearDown(self):
+        file_index.clear()
+
+    def test_walk_matches_os_walk_on_10k_files(self):
+        index = FileIndex(self.root)
+
+        self.assertGreaterEqual(len(index), 10000)
+        self.assertEqual(list(os.walk(self.root)), list(index.walk()))
+        self.assertEqual(
+            [os.path.join(d, f) for d, _, files in os.walk(self.root) for f in files if f.endswith('.pcm')],
+            list_pcm_files(self.root))
+
+    def test_c6_lookup_matches_recursive_glob(self):
+        index = FileIndex(self.root)
+
+        for etude in self.etudes[:24] + ['FTTH-NGE-ETUDE-0004', 'ABSENTE', 'FTTH[1]']:
+            self.assertEqual(_find_c6_glob(self.root, etude), find_c6_file(index, etude), etude)
+        self.assertIsNone(find_c6_file(index, 'FTTH-NGE-ETUDE-0005'))
+
+    def test_lookups_ignore_case_and_respect_depth(self):
+        index = FileIndex(self.root)
+
+        self.assertEqual([os.path.join(self.root, 'CMD 1', 'FTTH-NGE-ETUDE-0000', 'FTTH-NGE-ETUDE-0000.xlsx')],
+                         index.find('ftth-nge-etude-0000.XLSX'))
+        self.assertEqual([os.path.join(self.root, 'FTTH-NGE-ETUDE-0004', 'FTTH-NGE-ETUDE-0004.xlsx')],
+                         index.find('FTTH-NGE-ETUDE-0004.xlsx', max_depth=1))
+        self.assertEqual(150 * 62, len(index.glob('ficheappui_*', parent='CAP_FT', max_depth=3)))
+        self.assertEqual([], index.glob('ficheappui_*', parent='CAP_FT', max_depth=2))
+        self.assertEqual(25, len(index.glob('*v2.xlsx', max_depth=0)))
+
+    def test_lookups_skip_hidden_and_lock_files(self):
+        with tempfile.TemporaryDirectory() as root:
+            for rel in ('E1/~$Annexe C6.xlsx', 'E1/.Annexe C6.xlsx', '.sync/E1/E1.xlsx',
+                        'E1/Annexe C6.xlsx', 'E1/.cache/E1.pcm'):
+                _touch(os.path.join(root, *rel.split('/')))
+            index = FileIndex(root)
+
+            self.assertEqual(os.path.join(root, 'E1', 'Annexe C6.xlsx'), find_c6_file(index, 'E1'))
+            self.assertEqual([os.path.join(root, 'E1', 'Annexe C6.xlsx')], index.glob('*.xlsx'))
+            self.assertEqual([], index.find('E1.xlsx'))
+            self.assertEqual([], index.glob('*.pcm'))
+            self.assertEqual(list(os.walk(root)), list(index.walk()))
+
+    def test_shared_index_is_rebuilt_after_clear(self):
+        with tempfile.TemporaryDirectory() as root:
+            first = get_index(root)
+            _touch(os.path.join(root, 'a', 'b.pcm'))
+            self.assertIs(first, get_index(root + os.sep))
+            self.assertEqual([], first.glob('*.pcm'))
+            file_index.clear()
+            self.assertEqual([os.path.join(root, 'a', 'b.pcm')], get_index(root).glob('*.pcm'))
+
+
+@unittest.skipUnless(os.environ.get('POLEAERIEN_BENCH'), 'benchmark: set POLEAERIEN_BENCH=1')
+class TestFileIndexBenchmark(unittest.TestCase):
+    """150 etudes, ~10k fichiers : C6 de chaque etude, glob recursifs vs index."""
+
+    def test_c6_lookup_all_studies(self):
+        with tempfile.TemporaryDirectory() as root:
+            etudes = _make_delivery(root)
+            start = time.perf_counter()
+            expected = [_find_c6_glob(root, etude) for etude in etudes]
+            t_glob = time.perf_counter() - start
+            start = time.perf_counter()
+            index = FileIndex(root)
+            found = [find_c6_file(index, etude) for etude in etudes]
+            t_index = time.perf_counter() - start
+
+        summary = f"C6 de {len(etudes)} etudes : glob {t_glob:.2f} s, index {t_index:.3f} s"
+        logging.getLogger('PoleAerien.bench').info(summary)
+        self.assertEqual(expected, found)
+        self.assertLess(t_index, t_glob, summary)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import os
+import re
+import tempfile
+import unittest
+import zipfile
+
+import openpyxl
+from openpyxl.utils import get_column_letter
+
+from gespot_c6_comparator import (
+    C6LoadResult, C6Record, compare, export_to_excel, load_c6_dir,
+)
+from gespot_reader import GespotLoadResult, GespotRecord
+
+
+def _gespot(num, **kw):
+    values = dict(num=num, voie='RUE DES LILAS', num_voie='12', centre='CLERMONT', dist_elec='',
+                  source_file='g.csv', type_calc='BS8', strategie_calc='Non', milieu_calc='URB',
+                  pres_elect_calc='Non', inacc_calc='Non', recalage_raw='', etat_no_yellow='Oui',
+                  etat_usable='Oui', ctrl_visuel='Oui')
+    values.update(kw)
+    return GespotRecord(**values)
+
+
+def _c6(num, **kw):
+    values = dict(num=num, adresse='12 RUE DES LILAS', centre='CLERMONT', type_c6='BS8', ctrl_vis='Oui',
+                  vertic='Oui', yellow='Oui', usable='Oui', env='URB', elec='Non', strat='Non',
+                  inacc='Non', source_file='c6.xlsx')
+    values.update(kw)
+    return C6Record(**values)
+
+
+def _write_c6(path, rows, centre='CLERMONT', whitelist=('FO',)):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = 'Export 1'
+    ws['E3'] = centre
+    for row_idx in range(4, 9):
+        ws.cell(row=row_idx, column=1, value=None)
+    for row in rows:
+        ws.append(row)
+    bases = wb.create_sheet('Bases')
+    for idx, val in enumerate(('Appui stratégique', 'Non') + tuple(whitelist), 1):
+        bases.cell(row=idx, column=13, value=val)
+    wb.save(path)
+
+
+def _understate_bases_dimension(path):
+    """Dimension declaree de l'onglet Bases reduite a sa 1re ligne (exports tronques)."""
+    tmp = path + '.tmp'
+    with zipfile.ZipFile(path) as zin, zipfile.ZipFile(tmp, 'w', zipfile.ZIP_DEFLATED) as zout:
+        for item in zin.infolist():
+            data = zin.read(item.filename)
+            if item.filename == 'xl/worksheets/sheet2.xml':
+                data = re.sub(rb'<dimension [^>]*/>', b'<dimension ref="M1"/>', data)
+            zout.writestr(item, data)
+    os.replace(tmp, path)
+
+
+class TestGespotC6Comparator(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_load_c6_streams_rows(self):
+        _write_c6(os.path.join(self.dir, 'c6.xlsx'), [
+            ['0012/63041', 'BS8', '12 RUE DES LILAS', None, None, 'Oui', 'Non'] + [None] * 5 + ['Oui', 'Oui', 'URB'],
+            [None, 'BS8'],
+            [7, ' MC8 '],
+        ])
+        open(os.path.join(self.dir, 'casse.xlsx'), 'w').close()
+
+        result = load_c6_dir(self.dir)
+
+        self.assertEqual({'FO'}, result.whitelist)
+        self.assertEqual(['12', '7'], sorted(result.records))
+        rec = result.records['12']
+        self.assertEqual(('CLERMONT', 'BS8', 'Non', 'URB', ''), (rec.centre, rec.type_c6, rec.vertic, rec.env, rec.inacc))
+        self.assertEqual('MC8', result.records['7'].type_c6)
+        self.assertEqual(['FICHIER_IGNORE'], [a['type'] for a in result.anomalies])
+
+    def test_whitelist_read_past_declared_dimension(self):
+        path = os.path.join(self.dir, 'c6.xlsx')
+        _write_c6(path, [['0012/63041', 'BS8']], whitelist=('FO', 'ENEDIS'))
+        _understate_bases_dimension(path)
+
+        self.assertEqual({'FO', 'ENEDIS'}, load_c6_dir(self.dir).whitelist)
+
+    def test_criteria_and_details(self):
+        gespot = GespotLoadResult(records={
+            '1': _gespot('1'),
+            '2': _gespot('2', num_voie='9999', type_calc=' bs8', recalage_raw='O', inacc_calc='Oui'),
+            '3': _gespot('3', num_voie='', centre='', voie='AV FOCH'),
+            '4': _gespot('4'),
+        })
+        c6 = C6LoadResult(records={
+            '1': _c6('1', adresse='rue des lilas'),
+            '2': _c6('2', adresse='', vertic='Non', inacc=''),
+            '3': _c6('3', adresse='3 av foch', centre='CLERMONT', env='RUR'),
+            '5': _c6('5'),
+        })
+
+        result = compare(gespot, c6)
+
+        self.assertEqual(['1', '2', '3'], [c.num for c in result.comparisons])
+        first, second, third = result.comparisons
+        self.assertEqual((0, 'OK'), (first.nb_ecarts, first.statut_global))
+        self.assertEqual(('KO', "GESPOT='RUE DES LILAS' mais C6 vide"), (second.statut_adresse, second.detail_adresse))
+        self.assertEqual(('OK', 'OK'), (second.statut_type, second.statut_vertic))
+        self.assertEqual("Inacc GESPOT='Oui' mais Inacc C6 est vide", second.detail_inacc)
+        self.assertEqual(2, second.nb_ecarts)
+        self.assertEqual('OK', third.statut_adresse)
+        self.assertEqual("Centre GESPOT est vide mais Centre C6='CLERMONT'", third.detail_centre)
+        self.assertEqual("Milieu GESPOT='URB' vs Milieu C6='RUR'", third.detail_env)
+        self.assertEqual((2, 'KO'), (third.nb_ecarts, third.statut_global))
+        self.assertEqual(['4'], [r.num for r in result.absent_c6])
+        self.assertEqual(['5'], [r.num for r in result.absent_gespot])
+
+    def test_export_widths_match_cell_contents(self):
+        gespot = GespotLoadResult(records={str(n): _gespot(str(n), voie='R' * (n * 7)) for n in range(1, 9)})
+        c6 = C6LoadResult(records={str(n): _c6(str(n)) for n in range(1, 6)},
+                          anomalies=[{'source': 'C6', 'type': 'X', 'detail': 'd' * 80}])
+
+        path = export_to_excel(compare(gespot, c6), self.dir)
+
+        wb = openpyxl.load_workbook(path)
+        for ws in wb.worksheets:
+            for col in ws.columns:
+                expected = min(max(len(str(cell.value or '')) for cell in col) + 2, 50)
+                letter = get_column_letter(col[0].column)
+                self.assertEqual(expected, ws.column_dimensions[letter].width, f'{ws.title}!{letter}')
+
+
+if __name__ == '__main__':
+    unittest.main()
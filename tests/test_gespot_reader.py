@@ -0,0 +1,112 @@
+import logging
+import os
+import tempfile
+import time
+import unittest
+
+import process_pool
+from gespot_reader import load_gespot_dir
+
+
+def _header():
+    cols = [f'COL{i}' for i in range(70)]
+    cols[1], cols[8], cols[21] = 'NUM', 'CENTRE', 'CARAC1'
+    return cols
+
+
+def _row(num, type_appui='BS8', centre='CLERMONT', etat='10'):
+    cols = [''] * 70
+    cols[1], cols[6], cols[8], cols[12], cols[33] = num, 'RUE DES LILAS', centre, type_appui, etat
+    return cols
+
+
+def _write_csv(path, rows, header=None):
+    with open(path, 'w', encoding='utf-8', newline='') as handle:
+        for row in [header or _header()] + rows:
+            handle.write(';'.join(row) + '\n')
+
+
+class TestGespotReader(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+        process_pool.configure(process_pool.AUTO)
+        process_pool.shutdown()
+
+    def test_duplicates_and_ignored_files(self):
+        _write_csv(os.path.join(self.dir, 'a.csv'), [_row('0001/63041'), _row('2'), _row('3'), _row('')])
+        _write_csv(os.path.join(self.dir, 'b.csv'), [_row('1'), _row('2', type_appui='MC8')])
+        _write_csv(os.path.join(self.dir, 'c.csv'), [_row('3')])
+        _write_csv(os.path.join(self.dir, 'casse.csv'), [_row('4')], header=['A', 'B'])
+        process_pool.configure(0)
+
+        result = load_gespot_dir(self.dir)
+
+        self.assertEqual({'a.csv': 3, 'b.csv': 2, 'c.csv': 1}, result.file_counts)
+        self.assertEqual(
+            [('FICHIER_IGNORE', 'casse.csv', ''), ('DOUBLON_CONFLICTUEL', 'a.csv, b.csv', '1'),
+             ('DOUBLON_CONFLICTUEL', 'a.csv, b.csv', '2'), ('DOUBLON_IDENTIQUE', 'a.csv', '3')],
+            [(a['type'], a['fichier'], a['num']) for a in result.anomalies],
+        )
+        # '0001/63041' et '1' : lignes differentes (NUM brut) -> conflit ; '3' identique
+        self.assertEqual({'3'}, set(result.records))
+        self.assertIn('apparait 2 fois', result.anomalies[2]['detail'])
+
+    def test_identical_duplicate_kept_once(self):
+        _write_csv(os.path.join(self.dir, 'a.csv'), [_row('7'), _row('7')])
+        _write_csv(os.path.join(self.dir, 'b.csv'), [_row('7')])
+        process_pool.configure(0)
+
+        result = load_gespot_dir(self.dir)
+
+        self.assertEqual(['DOUBLON_IDENTIQUE'], [a['type'] for a in result.anomalies])
+        self.assertEqual('a.csv', result.anomalies[0]['fichier'])
+        self.assertIn('apparait 3 fois', result.anomalies[0]['detail'])
+        self.assertEqual('BS8', result.records['7'].type_calc)
+
+    def test_pool_matches_serial(self):
+        for f in range(4):
+            _write_csv(os.path.join(self.dir, f'g{f}.csv'),
+                       [_row(str(n), type_appui='BS8' if (n + f) % 5 else 'MC8') for n in range(50 * f, 50 * f + 80)])
+
+        process_pool.configure(0)
+        serial = load_gespot_dir(self.dir)
+        process_pool.configure(2)
+        pooled = load_gespot_dir(self.dir)
+
+        self.assertEqual('', process_pool.unavailable_reason())
+        self.assertEqual(serial.anomalies, pooled.anomalies)
+        self.assertEqual(serial.records, pooled.records)
+        self.assertEqual(serial.file_counts, pooled.file_counts)
+
+
+@unittest.skipUnless(os.environ.get('POLEAERIEN_BENCH'), 'benchmark: set POLEAERIEN_BENCH=1')
+class TestGespotReaderBenchmark(unittest.TestCase):
+    """50 CSV GESPOT generes (2 000 appuis chacun, 10 % de doublons)."""
+
+    def test_load_50_files(self):
+        with tempfile.TemporaryDirectory() as root:
+            for f in range(50):
+                rows = [_row(str(f * 1800 + n)) for n in range(2000)]
+                _write_csv(os.path.join(root, f'GESPOT_{f:02d}.csv'), rows)
+            timings = []
+            for workers in (0, process_pool.AUTO):
+                process_pool.configure(workers)
+                start = time.perf_counter()
+                result = load_gespot_dir(root)
+                timings.append((process_pool.worker_count(), time.perf_counter() - start))
+            process_pool.configure(process_pool.AUTO)
+            process_pool.shutdown()
+
+        summary = 'GESPOT 50 fichiers : ' + ', '.join(f"{w} processus {s:.2f} s" for w, s in timings)
+        logging.getLogger('PoleAerien.bench').info(summary)
+        self.assertEqual(50, len(result.file_counts))
+        (_, t_seq), (_, t_pool) = timings
+        self.assertLess(t_pool, t_seq * 1.5, summary)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import itertools
+import random
+import unittest
+
+from gespot_reader import (
+    _COL_CARAC, _COL_ENV, _br01_calc_type, _br02_calc_strategie, _br03_calc_env,
+    _br04_calc_etat, _br04bis_calc_pres_elect, _br05_calc_inacc, compiled_rules,
+)
+
+_WHITELIST = {'FO', 'CU'}
+_CARACS = ['', 'ANC', ' anc', 'FO', 'fo ', 'XX']
+_ENVS = ['', 'IN8', ' in9', 'URB', 'rur ']
+
+
+def _reference(row):
+    """Composition directe des regles BR-01 a BR-05 sur une ligne brute."""
+    caracs = [row[c] for c in _COL_CARAC]
+    milieu, has_inacc = _br03_calc_env([row[c] for c in _COL_ENV])
+    etat = _br04_calc_etat([(row[33], row[34]), (row[43], row[44]), (row[53], row[54])])
+    return (
+        _br01_calc_type(row[12], caracs),
+        _br02_calc_strategie(row[13], row[15], caracs, _WHITELIST),
+        milieu,
+        _br04bis_calc_pres_elect(row[14]),
+        _br05_calc_inacc(row[17], has_inacc),
+        etat,
+    )
+
+
+class TestCompiledRules(unittest.TestCase):
+    def test_matches_rule_functions_on_domain_product(self):
+        rnd = random.Random(46)
+        rows = []
+        for type_raw, strategique, support_pc, inacc in itertools.product(
+                ['', 'BS8', ' mc8 ', 'MC10'], ['', 'O', ' o', 'N'], ['', 'PC1'], ['', 'O', 'n']):
+            for _ in range(6):
+                row = [''] * 68
+                row[1], row[12], row[13], row[15], row[17] = 'N', type_raw, strategique, support_pc, inacc
+                row[14] = rnd.choice(['', ' Oui', 'Non'])
+                for col in _COL_CARAC:
+                    row[col] = rnd.choice(_CARACS)
+                for col in _COL_ENV:
+                    row[col] = rnd.choice(_ENVS)
+                for col in (33, 43, 53):
+                    row[col] = rnd.choice(['', '00', ' 01', '10'])
+                    row[col + 1] = rnd.choice(['', 'X'])
+                rows.append(row)
+
+        records = compiled_rules(_WHITELIST).build_records(rows, 'f.csv')
+
+        self.assertEqual(len(rows), len(records))
+        for row, rec in zip(rows, records):
+            got = (rec.type_calc, rec.strategie_calc, rec.milieu_calc, rec.pres_elect_calc,
+                   rec.inacc_calc, (rec.etat_no_yellow, rec.etat_usable, rec.ctrl_visuel))
+            self.assertEqual(_reference(row), got, row)
+
+    def test_short_rows_and_whitelists_kept_apart(self):
+        row = [''] * 22
+        row[1], row[12], row[13], row[21] = ' 12 ', 'BS8', 'O', 'FO'
+
+        with_fo = compiled_rules({'FO'}).build_records([row], 'a.csv')[0]
+        without = compiled_rules(set()).build_records([row], 'a.csv')[0]
+
+        self.assertEqual(('12', 'a.csv', 'FO', 'Non'), (with_fo.num, with_fo.source_file,
+                                                        with_fo.strategie_calc, without.strategie_calc))
+        self.assertEqual(('Oui', 'Non'), (with_fo.etat_usable, with_fo.inacc_calc))
+        self.assertEqual([], compiled_rules().build_records([], 'a.csv'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import datetime
+import os
+import sqlite3
+import tempfile
+import unittest
+
+import numpy as np
+
+from csv_table import CsvTable
+from gracethd_store import GraceTHDStore, remove_stale_stores, store_fingerprint, store_path
+from shp_reader import ShapeTable
+
+
+def _noeuds():
+    xy = np.array([[700000.1, 6500000.25], [700010.0, 6500020.0]])
+    return ShapeTable(1, {'nd_code': ['ND1', 'ND2'], 'nd_codeext': ['E1/03158', None],
+                          'nd_date': [datetime.date(2024, 1, 31), None]},
+                      xy, np.arange(3), np.arange(3))
+
+
+def _cablelines():
+    xy = np.array([[0, 0], [3, 4], [3, 10], [0, 0], [1, 0], [5, 5], [5, 7]], dtype=float)
+    return ShapeTable(3, {'cl_cb_code': ['CB1', 'CB2', 'CB3'], 'cl_long': [12.0, None, 3.0]},
+                      xy, np.array([0, 3, 5, 7]), np.array([0, 1, 1, 3]))
+
+
+class TestGraceTHDStore(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_round_trip_and_fingerprint(self):
+        fingerprint = store_fingerprint({'t_noeud.shp': 'abc'}, {'shp': {'t_noeud.shp': ['nd_code']}})
+        path = store_path(self.dir, '/data/GRACE_APD 03', fingerprint)
+        ptech = CsvTable({'pt_code': ['PT1', 'PT2'], 'pt_nd_code': [' ND1 ', None]}, 2)
+        GraceTHDStore.create(path, fingerprint,
+                             {'t_noeud': _noeuds(), 't_cableline': _cablelines(), 't_cheminement': None},
+                             {'t_ptech': ptech, 't_ebp': CsvTable({}, 3)},
+                             {'t_noeud': ('nd_code',), 't_ptech': ('pt_code',), 't_cheminement': ('cm_code',)})
+
+        self.assertIsNone(GraceTHDStore.open(path, 'autre'))
+        store = GraceTHDStore.open(path, fingerprint)
+        self.assertIsNotNone(store)
+
+        noeuds = store.shape_table('t_noeud')
+        self.assertEqual('point', noeuds.geometry_kind)
+        self.assertEqual(['ND1', 'ND2'], noeuds.column('nd_code'))
+        self.assertEqual([datetime.date(2024, 1, 31), None], noeuds.column('nd_date'))
+        self.assertEqual(_noeuds().wkt(0), noeuds.wkt(0))
+
+        lines = store.shape_table('t_cableline')
+        original = _cablelines()
+        self.assertEqual([12.0, None, 3.0], lines.column('cl_long'))
+        for idx in range(3):
+            self.assertEqual(original.wkt(idx), lines.wkt(idx))
+        self.assertFalse(lines.has_geometry(1))
+        self.assertIsNone(store.shape_table('t_cheminement'))
+
+        table = store.csv_table('t_ptech', ('pt_nd_code',))
+        self.assertEqual([' ND1 ', None], table.column('pt_nd_code'))
+        self.assertEqual({'ND1': 0}, table.index('pt_nd_code'))
+        self.assertEqual(3, len(store.csv_table('t_ebp')))
+        self.assertIsNone(store.csv_table('t_cable'))
+
+        with sqlite3.connect(path) as conn:
+            hits = conn.execute("SELECT id FROM rtree_t_cableline_geom "
+                                "WHERE maxx >= 4 AND minx <= 6 AND maxy >= 4 AND miny <= 6").fetchall()
+            kinds = dict(conn.execute("SELECT table_name, data_type FROM gpkg_contents"))
+        self.assertEqual([(3,)], hits)
+        self.assertEqual({'t_noeud': 'features', 't_cableline': 'features',
+                          't_ptech': 'attributes', 't_ebp': 'attributes'}, kinds)
+
+    def test_rows_where_filters_in_sql(self):
+        path = store_path(self.dir, '/data/GRACE', 'c' * 40)
+        cables = CsvTable({'cb_code': ['CB1', 'CB2', 'CB3', 'CB4'],
+                           'cb_typelog': ['DI', 'TR', 'di', '']}, 4)
+        store = GraceTHDStore.create(path, 'c' * 40, {}, {'t_cable': cables},
+                                     {'t_cable': ('cb_code',)}, {'t_cable': ('cb_typelog',)})
+
+        self.assertEqual([0, 2], store.rows_where('t_cable', 'cb_typelog', ('DI',)))
+        self.assertEqual([0, 1, 2], store.rows_where('t_cable', 'cb_typelog', ('tr', 'Di')))
+        self.assertIsNone(store.rows_where('t_cable', 'cb_absente', ('DI',)))
+        with sqlite3.connect(path) as conn:
+            plan = ' '.join(row[-1] for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT fid FROM t_cable WHERE upper(cb_typelog) IN ('DI')"))
+        self.assertIn('idx_t_cable_cb_typelog_upper', plan)
+
+    def test_stale_imports_of_same_directory_removed(self):
+        old = store_path(self.dir, '/data/GRACE', 'a' * 40)
+        new = store_path(self.dir, '/data/GRACE', 'b' * 40)
+        other = store_path(self.dir, '/autre/GRACE', 'a' * 40)
+        for path in (old, new, other):
+            open(path, 'w').close()
+
+        remove_stale_stores(self.dir, '/data/GRACE', keep=new)
+
+        self.assertEqual(sorted(os.path.basename(p) for p in (new, other)), sorted(os.listdir(self.dir)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import json
+import os
+import tempfile
+import unittest
+
+from headless_job import (
+    EXIT_MODULE_ERRORS, EXIT_OK, EXIT_SRO_NOT_RUN, MODULE_NOT_FINISHED, OutcomeRecorder,
+    SroOutcome, build_summary, exit_code, load_job, write_summary,
+)
+
+MODULES = ('maj', 'capft', 'comac', 'c6bd', 'police_c6', 'c6c3a', 'gespot_c6')
+
+
+class _FakeRunner:
+    """BatchRunner simule : (succes, message) par module, None = jamais termine."""
+
+    def __init__(self, behaviour):
+        self.behaviour = behaviour
+
+    def run(self, modules, recorder):
+        results = {}
+        for position, key in enumerate(modules):
+            recorder.module_started(key, position, len(modules))
+            outcome = self.behaviour.get(key, (True, 'OK'))
+            if outcome is None:
+                return  # crash / delai : ni module_finished ni modules_finished
+            recorder.module_finished(key, *outcome)
+            results[key] = {'success': outcome[0], 'message': outcome[1]}
+        recorder.modules_finished(results)
+
+
+class TestHeadlessJob(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+        for name in ('63041-B1I-PMZ-00003', '63041-B1I-PMZ-00004'):
+            os.makedirs(os.path.join(self.root, 'livrables', name))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _write_job(self, document):
+        path = os.path.join(self.root, 'job.json')
+        with open(path, 'w', encoding='utf-8') as handle:
+            json.dump(document, handle)
+        return path
+
+    def test_load_job_resolves_paths_and_defaults(self):
+        path = self._write_job({
+            'modules': ['capft', 'comac'],
+            'export_root': 'rapports',
+            'sros': [
+                'livrables/63041-B1I-PMZ-00003',
+                {'project_dir': 'livrables/63041-B1I-PMZ-00004', 'sro': 'X/Y', 'modules': ['police_c6']},
+            ],
+        })
+
+        spec = load_job(path, MODULES)
+
+        first, second = spec.sros
+        self.assertEqual(os.path.join(self.root, 'livrables', '63041-B1I-PMZ-00003'), first.project_dir)
+        self.assertEqual(['capft', 'comac'], first.modules)
+        self.assertEqual(os.path.join(self.root, 'rapports', '63041-B1I-PMZ-00003'), first.export_dir)
+        self.assertEqual(['police_c6'], second.modules)
+        self.assertEqual('X/Y', second.sro)
+        self.assertTrue(spec.include_data_dictionary)
+        self.assertEqual(1, spec.max_parallel)
+
+    def test_invalid_jobs_raise_value_error(self):
+        for document in (
+            {'modules': ['capft'], 'sros': []},
+            {'modules': ['inconnu'], 'sros': ['livrables/63041-B1I-PMZ-00003']},
+            {'modules': ['capft'], 'sros': ['livrables/absent']},
+            {'sros': ['livrables/63041-B1I-PMZ-00003']},
+            {'modules': ['capft'], 'max_parallel': 0, 'sros': ['livrables/63041-B1I-PMZ-00003']},
+        ):
+            with self.assertRaises(ValueError):
+                load_job(self._write_job(document), MODULES)
+
+    def test_exit_code_is_worst_outcome(self):
+        ok = SroOutcome('A', '/a', modules={'capft': {'success': True}}, started=True)
+        failed = SroOutcome('B', '/b', modules={'capft': {'success': False}}, started=True)
+        not_run = SroOutcome('C', '/c', errors=['Qualite donnees'])
+
+        self.assertEqual(EXIT_OK, exit_code([ok]))
+        self.assertEqual(EXIT_MODULE_ERRORS, exit_code([ok, failed]))
+        self.assertEqual(EXIT_SRO_NOT_RUN, exit_code([ok, failed, not_run]))
+        self.assertEqual(['OK', 'ERREURS', 'NON LANCE'], [o.status for o in (ok, failed, not_run)])
+
+    def test_summary_is_written_as_json(self):
+        outcome = SroOutcome('A', '/a', modules={'capft': {'success': True, 'message': 'OK'}},
+                             reports=['/a/rapport.xlsx'], started=True)
+        path = os.path.join(self.root, 'out', 'summary.json')
+
+        write_summary(path, build_summary([outcome], 'job.json'))
+
+        with open(path, encoding='utf-8') as handle:
+            summary = json.load(handle)
+        self.assertEqual(EXIT_OK, summary['exit_code'])
+        self.assertTrue(summary['sros'][0]['ok'])
+        self.assertEqual(['/a/rapport.xlsx'], summary['sros'][0]['reports'])
+
+    def test_failing_fake_job_records_module_failures(self):
+        path = self._write_job({
+            'modules': ['capft', 'comac', 'police_c6'],
+            'sros': ['livrables/63041-B1I-PMZ-00003', 'livrables/63041-B1I-PMZ-00004'],
+        })
+        spec = load_job(path, MODULES)
+        runners = [
+            _FakeRunner({'comac': (False, 'Erreur lecture Excel COMAC')}),
+            _FakeRunner({'comac': None}),
+        ]
+        ticks = iter(range(100))
+
+        outcomes = []
+        for job, runner in zip(spec.sros, runners):
+            outcome = SroOutcome(sro='', project_dir=job.project_dir)
+            runner.run(job.modules, OutcomeRecorder(outcome, job.modules, clock=lambda: next(ticks)))
+            outcomes.append(outcome)
+
+        failed, crashed = outcomes
+        self.assertEqual({'comac': 'Erreur lecture Excel COMAC'}, failed.failures)
+        self.assertTrue(failed.modules['police_c6']['success'])
+        self.assertEqual({'capft': 1, 'comac': 1, 'police_c6': 1}, failed.timings)
+        self.assertEqual({'comac': MODULE_NOT_FINISHED, 'police_c6': MODULE_NOT_FINISHED},
+                         crashed.failures)
+        self.assertEqual(['ERREURS', 'ERREURS'], [o.status for o in outcomes])
+
+        summary = build_summary(outcomes, path)
+        self.assertEqual(EXIT_MODULE_ERRORS, summary['exit_code'])
+        self.assertEqual(['comac'], list(summary['sros'][0]['failures']))
+        self.assertFalse(summary['sros'][1]['ok'])
+
+
+if __name__ == '__main__':
+    unittest.main()
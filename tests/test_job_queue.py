@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+
+from openpyxl import load_workbook
+
+from headless_job import SroOutcome
+from job_queue import find_project_dirs, parallel_slots, write_summary_workbook
+
+
+class TestJobQueue(unittest.TestCase):
+    def test_parallel_slots_respects_cpu_and_memory_budget(self):
+        self.assertEqual(3, parallel_slots(3, cpu_count=8, available_mb=16000, memory_per_sro_mb=1500))
+        self.assertEqual(3, parallel_slots(8, cpu_count=4, available_mb=None))
+        self.assertEqual(2, parallel_slots(8, cpu_count=16, available_mb=3500, memory_per_sro_mb=1500))
+        self.assertEqual(1, parallel_slots(4, cpu_count=1, available_mb=500))
+        self.assertEqual(1, parallel_slots(0, cpu_count=8))
+
+    def test_find_project_dirs_keeps_sro_folders_only(self):
+        with tempfile.TemporaryDirectory() as root:
+            for name in ('63041-B1I-PMZ-00004', '63041-B1I-PMZ-00003', 'Archives'):
+                os.makedirs(os.path.join(root, name))
+            open(os.path.join(root, '63041-B1I-PMZ-00005.zip'), 'w').close()
+
+            found = find_project_dirs(root)
+
+        self.assertEqual(['63041-B1I-PMZ-00003', '63041-B1I-PMZ-00004'],
+                         [os.path.basename(p) for p in found])
+        self.assertEqual([], find_project_dirs(os.path.join(root, 'absent')))
+
+    def test_summary_workbook_lists_projects_and_module_timings(self):
+        outcomes = [
+            SroOutcome('63041/B1I/PMZ/00003', '/a', started=True, duration_s=125.0,
+                       modules={'capft': {'success': True, 'message': 'OK'},
+                                'comac': {'success': False, 'message': 'Erreur BDD'}},
+                       timings={'capft': 12.5, 'comac': 80.0}, reports=['/a/rapport.xlsx']),
+            SroOutcome('63041/B1I/PMZ/00004', '/b', errors=['Qualite donnees']),
+        ]
+        with tempfile.TemporaryDirectory() as root:
+            path = write_summary_workbook(os.path.join(root, 'out', 'synthese.xlsx'), outcomes,
+                                          {'comac': 'VERIF COMAC'})
+            wb = load_workbook(path)
+            synthese = [[c.value for c in row] for row in wb['SYNTHESE'].iter_rows(min_row=2)]
+            modules = [[c.value for c in row] for row in wb['MODULES'].iter_rows(min_row=2)]
+            wb.close()
+
+        self.assertEqual(['ERREURS', 'NON LANCE'], [r[2] for r in synthese])
+        self.assertEqual([1, 'VERIF COMAC'], synthese[0][4:6])
+        self.assertEqual('/a/rapport.xlsx', synthese[0][6])
+        self.assertEqual(['63041/B1I/PMZ/00003', 'VERIF COMAC', 'ERREUR', 80, 'Erreur BDD'], modules[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
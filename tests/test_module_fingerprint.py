@@ -0,0 +1,145 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from module_fingerprint import (
+    DigestCache, FingerprintJob, ModuleResultStore, code_fingerprint, combine, path_fingerprint,
+    plan_reuse,
+)
+
+DEPENDS_ON = {
+    'maj': [], 'capft': ['maj'], 'comac': ['maj'], 'police_c6': ['maj'], 'gespot_c6': [],
+}
+
+
+class TestModuleFingerprint(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+        self.comac_dir = os.path.join(self.root, 'COMAC')
+        os.makedirs(os.path.join(self.comac_dir, 'E1'))
+        self._write('COMAC/E1/ExportComac.xlsx', b'v1')
+        self._write('COMAC/E1/~$ExportComac.xlsx', b'lock')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _write(self, rel, content):
+        with open(os.path.join(self.root, rel), 'wb') as handle:
+            handle.write(content)
+
+    def test_directory_fingerprint_follows_content_not_lock_files(self):
+        digests = DigestCache(os.path.join(self.root, 'cache', 'digests.json'))
+        before = path_fingerprint(self.comac_dir, digests)
+
+        self._write('COMAC/E1/~$ExportComac.xlsx', b'other lock')
+        self.assertEqual(before, path_fingerprint(self.comac_dir, digests))
+
+        self._write('COMAC/E1/ExportComac.xlsx', b'v2')
+        self.assertNotEqual(before, path_fingerprint(self.comac_dir, digests))
+        self.assertEqual('', path_fingerprint(os.path.join(self.root, 'absent')))
+
+        digests.save()
+        self.assertTrue(os.path.isfile(digests.path))
+
+    def test_digest_cache_saved_concurrently_from_threads(self):
+        path = os.path.join(self.root, 'cache', 'digests.json')
+        source = os.path.join(self.comac_dir, 'E1', 'ExportComac.xlsx')
+        errors = []
+
+        def _save():
+            for _ in range(20):
+                digests = DigestCache(path)
+                digests._dirty = True
+                digests.digest(source)
+                try:
+                    digests.save()
+                except OSError as e:
+                    errors.append(e)
+
+        threads = [threading.Thread(target=_save) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([], errors)
+        self.assertEqual([os.path.abspath(source)], list(DigestCache(path)._entries))
+        self.assertEqual(['digests.json'], os.listdir(os.path.dirname(path)))
+
+    def test_combine_is_none_when_a_part_is_unknown(self):
+        self.assertEqual(combine({'a': '1', 'b': ''}), combine({'b': '', 'a': '1'}))
+        self.assertNotEqual(combine({'a': '1'}), combine({'a': '2'}))
+        self.assertIsNone(combine({'a': '1', 'layer': None}))
+
+    def test_code_fingerprint_follows_version_and_sources(self):
+        plugin = os.path.join(self.root, 'plugin')
+        os.makedirs(os.path.join(plugin, 'workflows'))
+        self._write('plugin/metadata.txt', b'[general]\nversion=3.1.0\n')
+        self._write('plugin/workflows/comac_workflow.py', b'A = 1\n')
+        before = code_fingerprint(plugin)
+        self.assertTrue(before.startswith('3.1.0|'))
+
+        self._write('plugin/workflows/comac_workflow.py', b'A = 2\n')
+        edited = code_fingerprint(plugin)
+        self.assertNotEqual(before, edited)
+
+        self._write('plugin/metadata.txt', b'[general]\nversion=3.2.0\n')
+        self.assertNotEqual(edited, code_fingerprint(plugin))
+
+    def test_fingerprint_job_hashes_inputs_and_reads_cables_once(self):
+        calls = []
+
+        def read_cables():
+            calls.append(1)
+            return 'SRO|abc'
+
+        inputs = {
+            'comac': ({'comac_dir': self.comac_dir}, {'be_type': 'nge'}, True),
+            'police_c6': ({'c6_dir': ''}, {'be_type': 'nge'}, True),
+            'gespot_c6': ({'gespot_dir': self.comac_dir}, {}, False),
+            'maj': None,
+        }
+        job = FingerprintJob(os.path.join(self.root, 'cache', 'digests.json'), inputs, read_cables)
+
+        fingerprints = job.run()
+
+        self.assertEqual(1, len(calls))
+        self.assertIsNone(fingerprints['maj'])
+        self.assertEqual(combine({'comac_dir': path_fingerprint(self.comac_dir), 'be_type': 'nge',
+                                  'cables': 'SRO|abc'}), fingerprints['comac'])
+        self.assertTrue(os.path.isfile(job.digest_path))
+
+        no_db = FingerprintJob('', {'comac': inputs['comac']}, lambda: None).run()
+        self.assertIsNone(no_db['comac'])
+
+    def test_plan_reuse_recomputes_changed_modules_and_dependents(self):
+        keys = ['maj', 'capft', 'comac', 'gespot_c6']
+        stored = {'maj': 'm', 'capft': 'c', 'comac': 'old', 'gespot_c6': 'g'}
+
+        unchanged_maj = plan_reuse(keys, {'maj': 'm', 'capft': 'c', 'comac': 'new', 'gespot_c6': 'g'},
+                                   stored, DEPENDS_ON)
+        changed_maj = plan_reuse(keys, {'maj': 'm2', 'capft': 'c', 'comac': 'old', 'gespot_c6': 'g'},
+                                 stored, DEPENDS_ON)
+        unknown = plan_reuse(['capft'], {'capft': None}, {'capft': None}, DEPENDS_ON)
+
+        self.assertEqual({'maj', 'capft', 'gespot_c6'}, unchanged_maj)
+        self.assertEqual({'gespot_c6'}, changed_maj)
+        self.assertEqual(set(), unknown)
+
+    def test_result_store_roundtrip_and_unpicklable_result(self):
+        store = ModuleResultStore(os.path.join(self.root, 'results'))
+        result = {'resultats': ({'E1': ['1']}, {'E2'}), 'verif_cables': [{'statut': 'OK'}]}
+
+        self.assertTrue(store.save('comac', 'fp1', result))
+
+        self.assertEqual('fp1', store.fingerprint('comac'))
+        self.assertEqual(result, store.load('comac', 'fp1')['result'])
+        self.assertIsNone(store.load('comac', 'fp2'))
+        self.assertFalse(store.save('capft', 'fp1', {'callback': lambda: None}))
+        self.assertIsNone(store.fingerprint('capft'))
+
+
+if __name__ == '__main__':
+    unittest.main()
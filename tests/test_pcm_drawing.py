@@ -1,7 +1,9 @@
+import os
+import tempfile
 import unittest
 from types import SimpleNamespace
 
-from pcm_drawing import PcmDrawingRenderer
+from pcm_drawing import DrawingCache, PcmDrawingRenderer
 
 
 def _support(name, orientation):
@@ -82,5 +84,65 @@ class TestPcmDrawingRenderer(unittest.TestCase):
         self.assertIsNone(entries)
 
 
+    def test_render_entries_renders_identical_cards_once(self):
+        cache = DrawingCache()
+        renderer = PcmDrawingRenderer(dpi=72, cache=cache)
+        entries = renderer.build_support_entries({'ETUDE-1': _etude()})
+
+        diagrams = list(renderer.render_entries(entries + entries))
+
+        self.assertEqual(6, len(diagrams))
+        self.assertEqual(3, cache.misses)
+        self.assertEqual(3, cache.memory_hits)
+        self.assertIs(diagrams[0]['image_bytes'], diagrams[3]['image_bytes'])
+
+    def test_cache_key_depends_on_dpi_and_support_data(self):
+        entries = PcmDrawingRenderer(dpi=72).build_support_entries({'ETUDE-1': _etude()})
+        key_72 = PcmDrawingRenderer(dpi=72).entry_cache_key(entries[0])
+
+        self.assertEqual(key_72, PcmDrawingRenderer(dpi=72).entry_cache_key(entries[0]))
+        self.assertNotEqual(key_72, PcmDrawingRenderer(dpi=96).entry_cache_key(entries[0]))
+        entries[0]['support_data'].effort = 3.5
+        self.assertNotEqual(key_72, PcmDrawingRenderer(dpi=72).entry_cache_key(entries[0]))
+
+    def test_disk_cache_is_reused_across_runs(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            first = PcmDrawingRenderer(dpi=72, cache=DrawingCache(temp_dir))
+            entries = first.build_support_entries({'ETUDE-1': _etude()})
+            rendered = list(first.render_entries(entries))
+
+            second_cache = DrawingCache(temp_dir)
+            second = PcmDrawingRenderer(dpi=72, cache=second_cache)
+            replayed = list(second.render_entries(entries))
+
+            self.assertEqual(3, second_cache.disk_hits)
+            self.assertEqual(0, second_cache.misses)
+            self.assertEqual(
+                [d['image_bytes'] for d in rendered],
+                [d['image_bytes'] for d in replayed],
+            )
+            self.assertTrue(any(os.scandir(temp_dir)))
+
+    def test_disk_cache_prunes_old_and_oversized_entries(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = DrawingCache(temp_dir, max_bytes=250)
+            for key in ('aa01', 'aa02', 'bb03'):
+                cache.put(key, b'x' * 100)
+            oldest = cache._path('aa01')
+            os.utime(oldest, (1, 1))
+            os.utime(cache._path('aa02'), (1000, 1000))
+            os.utime(cache._path('bb03'), (2000, 2000))
+
+            removed = DrawingCache(temp_dir, max_age_s=0, max_bytes=150).prune()
+
+            self.assertEqual(2, removed)
+            self.assertFalse(os.path.exists(oldest))
+            self.assertFalse(os.path.exists(cache._path('aa02')))
+            self.assertTrue(os.path.exists(cache._path('bb03')))
+
+            self.assertEqual(1, DrawingCache(temp_dir, max_age_s=60).prune())
+            self.assertFalse(os.path.exists(cache._path('bb03')))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,105 @@
+import dataclasses
+import json
+import logging
+import os
+import tempfile
+import time
+import unittest
+import xml.etree.ElementTree as ET
+
+from core_utils import get_xml_text
+from pcm_parser import _index_children, _text, parse_pcm_file, verifier_securite_etude
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+SAMPLE_PCM = os.path.join(DATA_DIR, 'sample_etude.pcm')
+SAMPLE_GOLDEN = os.path.join(DATA_DIR, 'sample_etude.golden.json')
+
+_SUPPORT_TAGS = (
+    'Nom', 'Nature', 'Hauteur', 'Classe', 'Effort', 'TraverseExistante1', 'TraverseAPoser2',
+    'PorteeMolle', 'NonCalcule', 'Illisible', 'X', 'Y', 'Etat', 'Orientation', 'Facade',
+    'Surimplantation', 'APoser', 'Commentaire', 'Annee', 'DestinationDesserte', 'BranchementsBT',
+    'optBoitierFibre', 'optBoitierCuivre', 'optBoitierCoaxial', 'RASBT', 'RASFT', 'RASFO',
+    'optMALTBT', 'ReservationEP', 'PresenceEP', 'HauteurEP', 'NbRaccordementsFibre',
+    'NbRaccordementsCuivre', 'NbRaccordementsCoaxial',
+)
+
+
+def _write_large_pcm(path, n_supports):
+    supports = []
+    for idx in range(n_supports):
+        fields = ''.join(f"<{tag}>{idx % 7}</{tag}>" for tag in _SUPPORT_TAGS[1:])
+        supports.append(f"<Support><Nom>BT-{idx:05d}</Nom>{fields}</Support>")
+    portees = ''.join(
+        f"<Portee><SuppG>BT-{idx:05d}</SuppG><SuppD>BT-{idx + 1:05d}</SuppD>"
+        f"<Longueur>{30 + idx % 20}</Longueur><Angle>{idx % 400}</Angle><Route>0</Route></Portee>"
+        for idx in range(n_supports - 1)
+    )
+    xml = (
+        '<?xml version="1.0" encoding="ISO-8859-1"?><Etude><NumEtude>BENCH</NumEtude>'
+        f"<Supports>{''.join(supports)}</Supports><Portees>{portees}</Portees></Etude>"
+    )
+    with open(path, 'wb') as handle:
+        handle.write(xml.encode('iso-8859-1'))
+
+
+class TestPcmParserGolden(unittest.TestCase):
+    def test_sample_file_matches_golden_output(self):
+        etude = parse_pcm_file(SAMPLE_PCM)
+        verifier_securite_etude(etude)
+        with open(SAMPLE_GOLDEN, encoding='utf-8') as handle:
+            golden = json.load(handle)
+
+        actual = json.loads(json.dumps(dataclasses.asdict(etude), ensure_ascii=False))
+
+        self.assertEqual(golden, actual)
+
+    def test_first_duplicate_child_wins_like_find(self):
+        etude = parse_pcm_file(SAMPLE_PCM)
+
+        self.assertEqual('BO', etude.supports['BT-0002'].nature)
+        self.assertEqual('L1092-12-P', etude.lignes_tcf[2].cable)
+
+    def test_index_children_matches_find_for_every_tag(self):
+        support = ET.parse(SAMPLE_PCM).getroot().find('Supports').find('Support')
+        children = _index_children(support)
+
+        for tag in _SUPPORT_TAGS + ('Absent',):
+            self.assertEqual(get_xml_text(support, tag), _text(children, tag), tag)
+
+    def test_missing_file_returns_none(self):
+        self.assertIsNone(parse_pcm_file(os.path.join(DATA_DIR, 'absent.pcm')))
+
+
+@unittest.skipUnless(os.environ.get('POLEAERIEN_BENCH'), 'benchmark: set POLEAERIEN_BENCH=1')
+class BenchPcmParser(unittest.TestCase):
+    def test_parse_speed(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'bench.pcm')
+            _write_large_pcm(path, 5000)
+            supports = list(ET.parse(path).getroot().find('Supports'))
+
+            t0 = time.perf_counter()
+            for support in supports:
+                [get_xml_text(support, tag) for tag in _SUPPORT_TAGS]
+            find_ms = (time.perf_counter() - t0) * 1000
+
+            t0 = time.perf_counter()
+            for support in supports:
+                children = _index_children(support)
+                [_text(children, tag) for tag in _SUPPORT_TAGS]
+            index_ms = (time.perf_counter() - t0) * 1000
+
+            t0 = time.perf_counter()
+            etude = parse_pcm_file(path)
+            parse_ms = (time.perf_counter() - t0) * 1000
+
+        summary = (f"pcm 5000 supports: find() {find_ms:.0f} ms, "
+                   f"index {index_ms:.0f} ms, parse_pcm_file {parse_ms:.0f} ms")
+        logging.getLogger('PoleAerien.bench').info(summary)
+        self.assertEqual(5000, len(etude.supports))
+        self.assertLess(index_ms, find_ms, summary)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+
+from pole_assignment import (STATUS_BORDER, STATUS_IN, STATUS_OUT, StudyArea, assign_poles,
+                             study_sort_key)
+
+
+class _Box(StudyArea):
+    """Rectangle avec bordure (les predicats reels sont GEOS, cote QGIS)."""
+
+    __slots__ = ('_rect', '_border')
+
+    def __init__(self, name, xmin, ymin, xmax, ymax, border=0.5):
+        self.name = name
+        self._rect = (xmin, ymin, xmax, ymax)
+        self._border = border
+        self.bbox = (xmin - border, ymin - border, xmax + border, ymax + border)
+
+    def locate(self, x, y):
+        xmin, ymin, xmax, ymax = self._rect
+        if xmin < x < xmax and ymin < y < ymax:
+            return STATUS_IN
+        b = self._border
+        if xmin - b <= x <= xmax + b and ymin - b <= y <= ymax + b:
+            return STATUS_BORDER
+        return None
+
+
+class TestPoleAssignment(unittest.TestCase):
+    def setUp(self):
+        studies = [
+            _Box('E1', 0, 0, 10, 10),
+            _Box('E2', 10, 0, 20, 10),
+            _Box('GRAND', 100, 100, 400, 400),
+            _Box('E1', 500, 0, 505, 5),
+        ]
+        points = {
+            1: (5, 5),        # E1
+            2: (10.2, 5),     # E2, bordure E1
+            3: (-0.3, 5),     # bordure E1 seulement
+            4: (50, 50),      # hors etude
+            5: (390, 390),    # GRAND, cellule eloignee de son origine
+            6: (502, 2),      # second polygone E1
+        }
+        self.assignment = assign_poles(points, studies,
+                                       pole_layer_id='pot', study_layer_id='cap',
+                                       study_field='nom_etudes')
+
+    def test_status_in_border_out(self):
+        self.assertEqual(STATUS_IN, self.assignment.status(1))
+        self.assertEqual(STATUS_IN, self.assignment.status(2))
+        self.assertEqual(STATUS_BORDER, self.assignment.status(3))
+        self.assertEqual(STATUS_OUT, self.assignment.status(4))
+        self.assertEqual(STATUS_IN, self.assignment.status(5))
+
+    def test_border_included_only_on_request(self):
+        self.assertEqual(['E2'], self.assignment.studies_for(2, include_border=False))
+        self.assertEqual(['E1', 'E2'], self.assignment.studies_for(2))
+        self.assertEqual([], self.assignment.studies_for(3, include_border=False))
+        self.assertEqual(['E1'], self.assignment.studies_for(3))
+
+    def test_poles_by_study_keeps_study_order_and_filters(self):
+        by_study = self.assignment.poles_by_study(include_border=False)
+        self.assertEqual(['E1', 'E2', 'GRAND', 'E1'], [name for name, _ in by_study])
+        self.assertEqual([1], by_study[0][1])
+        self.assertEqual([6], by_study[3][1])
+        self.assertEqual(['E1', 'E2', 'GRAND', 'E1'], self.assignment.study_names())
+
+        filtered = self.assignment.poles_by_study(name_pattern='E_')
+        self.assertEqual([('E1', [1, 2, 3]), ('E2', [2]), ('E1', [6])],
+                         [(name, sorted(fids)) for name, fids in filtered])
+
+    def test_matches_layers_and_field(self):
+        self.assertTrue(self.assignment.matches('pot', 'cap', 'nom_etudes'))
+        self.assertFalse(self.assignment.matches('pot', 'comac', 'nom_etudes'))
+        self.assertFalse(self.assignment.matches('pot', 'cap', 'etudes'))
+
+    def test_sort_key_matches_order_by_with_nulls_last(self):
+        self.assertEqual([2, 9, 10, None, None], sorted([None, 10, None, 9, 2], key=study_sort_key))
+        self.assertEqual(['E-10', 'E-9', 'e-1', None], sorted(['e-1', None, 'E-9', 'E-10'], key=study_sort_key))
+
+
+if __name__ == '__main__':
+    unittest.main()
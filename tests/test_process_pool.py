@@ -0,0 +1,87 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from openpyxl import Workbook
+
+import process_pool
+from comac_excel import lire_feuille_comac
+from pcm_parser import parse_repertoire_pcm
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+SAMPLE_PCM = os.path.join(DATA_DIR, 'sample_etude.pcm')
+
+
+class TestProcessPool(unittest.TestCase):
+    def tearDown(self):
+        process_pool.configure(process_pool.AUTO)
+        process_pool.shutdown()
+
+    def test_worker_count_disabled_below_two(self):
+        process_pool.configure(0)
+        self.assertEqual(0, process_pool.worker_count())
+        process_pool.configure(1)
+        self.assertEqual(0, process_pool.worker_count())
+        process_pool.configure(4)
+        self.assertEqual(4, process_pool.worker_count())
+
+    def test_local_fallback_keeps_order_and_honours_cancel(self):
+        process_pool.configure(0)
+        self.assertEqual([1, 4, 9, 16], process_pool.map_ordered(lambda x: x * x, [1, 2, 3, 4]))
+
+        seen = []
+
+        def square(x):
+            seen.append(x)
+            return x * x
+
+        results = process_pool.map_ordered(square, [1, 2, 3, 4], is_cancelled=lambda: len(seen) >= 2)
+        self.assertEqual([1, 4, None, None], results)
+
+    def test_pool_matches_serial_parse(self):
+        with tempfile.TemporaryDirectory() as root:
+            for idx in range(3):
+                os.makedirs(os.path.join(root, f'etude{idx}'))
+                shutil.copy(SAMPLE_PCM, os.path.join(root, f'etude{idx}', f'etude{idx}.pcm'))
+            open(os.path.join(root, 'etude0', 'casse.pcm'), 'w').close()
+
+            process_pool.configure(0)
+            serial = parse_repertoire_pcm(root)
+            process_pool.configure(2)
+            pooled = parse_repertoire_pcm(root)
+
+        self.assertEqual('', process_pool.unavailable_reason())
+        self.assertEqual(sorted(serial[0]), sorted(pooled[0]))
+        self.assertEqual(sorted(serial[1]), sorted(pooled[1]))
+        for name, etude in serial[0].items():
+            self.assertEqual(
+                [(l.cable, l.capacite_fo, l.portee_max) for l in etude.lignes_tcf],
+                [(l.cable, l.capacite_fo, l.portee_max) for l in pooled[0][name].lignes_tcf],
+            )
+
+    def test_comac_excel_reads_rows_with_support_number(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, 'EXPORTCOMAC_NGE-001.xlsx')
+            wb = Workbook()
+            ws = wb.active
+            ws.cell(row=1, column=9, value='63041')
+            ws.cell(row=4, column=1, value='E000123/63041')
+            ws.cell(row=4, column=41, value='L1092-13-P')
+            ws.cell(row=5, column=2, value='sans numero')
+            wb.save(path)
+
+            lecture = lire_feuille_comac(path)
+            absent = lire_feuille_comac(os.path.join(root, 'absent.xlsx'))
+
+        self.assertEqual('', lecture['erreur'])
+        self.assertEqual('63041', lecture['insee'])
+        self.assertEqual(1, len(lecture['lignes']))
+        self.assertEqual(50, len(lecture['lignes'][0]))
+        self.assertEqual('L1092-13-P', lecture['lignes'][0][40])
+        self.assertTrue(absent['erreur'])
+
+
+if __name__ == '__main__':
+    unittest.main()
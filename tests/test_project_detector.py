@@ -0,0 +1,280 @@
+import logging
+import os
+import re
+import shutil
+import struct
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import project_detector as pd
+from project_detector import DetectionCancelled, analyse_livrable, detect_project
+
+
+# --- Detection d'origine (listdir / isdir / os.walk par recherche), SRO GraceTHD exclu ---
+
+def _legacy_find_dir(root, patterns):
+    for entry in sorted(os.listdir(root)):
+        full = os.path.join(root, entry)
+        if os.path.isdir(full) and any(re.match(p, entry, re.IGNORECASE) for p in patterns):
+            return full
+    return None
+
+
+def _legacy_find_excel(root, patterns):
+    xlsx = [e for e in os.listdir(root) if e.lower().endswith(('.xlsx', '.xls')) and not pd._is_output_file(e)]
+    for pat in patterns:
+        for f in sorted(xlsx):
+            if re.search(pat, f, re.IGNORECASE):
+                return os.path.join(root, f)
+    return None
+
+
+def _legacy_excel_in_dir(directory):
+    for f in sorted(os.listdir(directory)):
+        if f.lower().endswith(('.xlsx', '.xls')) and not pd._is_output_file(f):
+            return os.path.join(directory, f)
+    return None
+
+
+def _legacy_studies(directory):
+    return [e for e in sorted(os.listdir(directory)) if os.path.isdir(os.path.join(directory, e))]
+
+
+def _legacy_is_gracethd(directory):
+    files = {f.lower() for f in os.listdir(directory) if os.path.isfile(os.path.join(directory, f))}
+    return {'t_noeud.shp', 't_cableline.shp'}.issubset(files)
+
+
+def _legacy_gracethd(root, max_depth=4):
+    if _legacy_is_gracethd(root):
+        return root
+    level = [root]
+    for _ in range(max_depth):
+        following = []
+        for parent in level:
+            for entry in sorted(os.listdir(parent)):
+                full = os.path.join(parent, entry)
+                if not os.path.isdir(full):
+                    continue
+                if _legacy_is_gracethd(full):
+                    return full
+                following.append(full)
+        level = following
+    return None
+
+
+def _legacy_counts(directory):
+    cmd = sum(1 for e in os.listdir(directory)
+              if os.path.isdir(os.path.join(directory, e)) and re.match(r'^CMD', e, re.IGNORECASE))
+    etudes = sum(1 for _, dirs, _ in os.walk(directory) for d in dirs if 'ETUDE' in d.upper())
+    excels = sum(1 for _, _, files in os.walk(directory) for f in files if f.lower().endswith(('.xlsx', '.xls')))
+    return {'cmd': cmd, 'etudes': etudes, 'excels': excels}
+
+
+def _legacy_detect(root):
+    found = {'capft_dir': _legacy_find_dir(root, pd._CAPFT_DIR_PATTERNS) or '',
+             'comac_dir': _legacy_find_dir(root, pd._COMAC_DIR_PATTERNS) or ''}
+    found['ftbt_excel'] = _legacy_find_excel(root, pd._FTBT_PATTERNS) or ''
+    found['capft_studies'] = _legacy_studies(found['capft_dir']) if found['capft_dir'] else []
+    found['comac_studies'] = _legacy_studies(found['comac_dir']) if found['comac_dir'] else []
+    found['c6_dir'] = found['capft_dir']
+    for key, file_patterns, dir_patterns in [
+            ('c6_annexe_file', [r'\bC6\b', r'Annexe[\s_-]*C6'], pd._C6_DIR_PATTERNS),
+            ('c7_file', [r'\bC7\b', r'Annexe[\s_-]*C7\b'], [r'^C7$', r'^Annexe[\s_-]*C7$']),
+            ('c3a_file', [r'\bC3A\b', r'Annexe[\s_-]*C3A\b'], [r'^C3A$', r'^Annexe[\s_-]*C3A$'])]:
+        found[key] = _legacy_find_excel(root, file_patterns) or ''
+        if not found[key]:
+            folder = _legacy_find_dir(root, dir_patterns)
+            if folder:
+                found[key] = _legacy_excel_in_dir(folder) or ''
+                if key == 'c6_annexe_file' and not found['c6_dir']:
+                    found['c6_dir'] = folder
+    found['gespot_dir'] = _legacy_find_dir(root, pd._GESPOT_DIR_PATTERNS) or ''
+    found['gracethd_dir'] = _legacy_gracethd(root) or ''
+    # Dedoublonnage inchange (logique de chemins pure)
+    deduplicated = pd.DetectionResult(**found)
+    pd._deduplicate_files(deduplicated)
+    found = {key: getattr(deduplicated, key) for key in found}
+    found['counts'] = {}
+    if found['capft_dir']:
+        found['counts']['capft'] = _legacy_counts(found['capft_dir'])
+    if found['comac_dir']:
+        found['counts']['comac'] = {'excels': _legacy_counts(found['comac_dir'])['excels']}
+    return found
+
+
+def _detected(result):
+    found = {key: getattr(result, key) for key in (
+        'capft_dir', 'comac_dir', 'ftbt_excel', 'capft_studies', 'comac_studies', 'c6_dir',
+        'c6_annexe_file', 'c7_file', 'c3a_file', 'gespot_dir', 'gracethd_dir')}
+    analysis = analyse_livrable(result)
+    found['counts'] = {}
+    if 'capft' in analysis:
+        found['counts']['capft'] = analysis['capft']
+    if 'comac' in analysis:
+        found['counts']['comac'] = {'excels': analysis['comac']['excels']}
+    return found
+
+
+# --- Arborescences de livraison ---
+
+def _touch(path, data=b''):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as handle:
+        handle.write(data)
+
+
+def _zsro_dbf(value):
+    """DBF minimal : un champ ZS_REFPM, un enregistrement supprime puis un valide."""
+    out = bytearray(struct.pack('<BBBBIHH', 3, 126, 1, 1, 2, 65, 21)) + bytes(20)
+    out += b'ZS_REFPM'.ljust(11, b'\x00') + b'C' + bytes(4) + bytes([20, 0]) + bytes(14) + b'\x0D'
+    out += b'*' + b'00000/XXX/PMZ/00000'.ljust(20) + b' ' + value.encode('ascii').ljust(20) + b'\x1A'
+    return bytes(out)
+
+
+def _gracethd(folder, sro=None):
+    for name in ('T_NOEUD.SHP', 't_cableline.shp', 't_cable.csv'):
+        _touch(os.path.join(folder, name))
+    if sro:
+        _touch(os.path.join(folder, 't_zsro.shp'))
+        _touch(os.path.join(folder, 't_zsro.dbf'), _zsro_dbf(sro))
+
+
+def _make_project(root, n_cmd=3, n_etudes=4, fiches=6):
+    """CAP FT / CMD n / etudes, COMAC, FT-BT KO, C7, C3A, GESPOT, GraceTHD."""
+    _touch(os.path.join(root, 'FT-BT KO 63041.xlsx'))
+    _touch(os.path.join(root, 'ANALYSE_C7.xlsx'))
+    _touch(os.path.join(root, 'Annexe C7 v2.xlsx'))
+    _touch(os.path.join(root, 'notes.txt'))
+    capft = os.path.join(root, 'CAP FT')
+    for c in range(n_cmd):
+        for e in range(n_etudes):
+            etude = os.path.join(capft, f'CMD {c + 1}', f'FTTH-NGE-ETUDE-{c}{e:03d}')
+            _touch(os.path.join(etude, f'FTTH-NGE-ETUDE-{c}{e:03d}.xlsx'))
+            _touch(os.path.join(etude, f'Annexe C6 {e}.xlsx'))
+            _touch(os.path.join(etude, f'{e}.pcm'))
+            for k in range(fiches):
+                _touch(os.path.join(etude, 'CAP_FT', f'FicheAppui_{c}{e:03d}{k:03d}.xlsx'))
+            _touch(os.path.join(etude, 'photos', 'releve', f'{e}.jpg'))
+    _touch(os.path.join(capft, 'Divers', 'ETUDES anciennes', 'old.xls'))
+    for e in range(n_etudes):
+        _touch(os.path.join(root, 'ETUDE COMAC', f'ETUDE-{e}', f'ExportComac_{e}.xlsx'))
+    _touch(os.path.join(root, 'C3A', 'VERIF_C3A.xlsx'))
+    _touch(os.path.join(root, 'C3A', 'export.xlsx'))
+    _touch(os.path.join(root, 'GESPOT', 'gespot.csv'))
+    _gracethd(os.path.join(root, 'SIG', 'Livrable', 'GraceTHD'), sro='63041/B1I/PMZ/00003')
+    _gracethd(os.path.join(root, 'ZZ', 'v1', 'GraceTHD'))
+    _gracethd(os.path.join(root, 'AAA', '1', '2', '3', '4'))
+    os.symlink(os.path.join(capft, 'CMD 2'), os.path.join(capft, 'CMD 1', 'ETUDE-lien'))
+
+
+class TestProjectDetector(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self._tmp.name, 'Livraison')
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_single_scan_matches_legacy_detection(self):
+        _make_project(self.root)
+
+        result = detect_project(self.root)
+
+        self.assertEqual(_legacy_detect(self.root), _detected(result))
+        self.assertEqual(os.path.join(self.root, 'C3A', 'export.xlsx'), result.c3a_file)
+        self.assertEqual(os.path.join(self.root, 'SIG', 'Livrable', 'GraceTHD'), result.gracethd_dir)
+        self.assertEqual({'cmd': 3, 'etudes': 14, 'excels': 97}, analyse_livrable(result)['capft'])
+        self.assertEqual('63041/B1I/PMZ/00003', result.sro)
+        self.assertEqual(result.sro, result.gracethd_sro)
+        self.assertGreater(result.scan_entries, 0)
+
+    def test_sparse_project_with_gracethd_at_root(self):
+        os.makedirs(self.root)
+        _gracethd(self.root, sro='63471/S05/PMZ/49785')
+        _touch(os.path.join(self.root, 'Annexe C6', 'RAPPORT_C6.xlsx'))
+        _touch(os.path.join(self.root, 'Annexe C6', 'c6.xlsx'))
+        _touch(os.path.join(self.root, 'plan.xlsx'))
+
+        result = detect_project(self.root)
+
+        self.assertEqual(_legacy_detect(self.root), _detected(result))
+        self.assertEqual(os.path.join(self.root, 'Annexe C6'), result.c6_dir)
+        self.assertEqual('63471/S05/PMZ/49785', result.sro)
+        self.assertIn('Fichiers Excel trouves a la racine: plan.xlsx', result.get_diagnostic('FT-BT KO'))
+        self.assertIn('Sous-dossiers trouves: Annexe C6', result.get_diagnostic('CAP FT'))
+
+    def test_cancellation_stops_the_scan(self):
+        _make_project(self.root)
+        calls = []
+
+        def is_cancelled():
+            calls.append(1)
+            return len(calls) > 3
+
+        with self.assertRaises(DetectionCancelled):
+            detect_project(self.root, is_cancelled=is_cancelled)
+        self.assertEqual(4, len(calls))
+        self.assertEqual(_detected(detect_project(self.root)),
+                         _detected(detect_project(self.root, is_cancelled=lambda: False)))
+
+
+@unittest.skipUnless(os.environ.get('POLEAERIEN_BENCH'), 'benchmark: set POLEAERIEN_BENCH=1')
+class TestProjectDetectorBenchmark(unittest.TestCase):
+    """Livraison de ~20 000 fichiers sur un partage reseau simule (latence par appel)."""
+
+    LIST_LATENCY_S = 0.002
+    STAT_LATENCY_S = 0.0005
+
+    def _slow_fs(self):
+        scandir, listdir, stat = os.scandir, os.listdir, os.stat
+
+        def slow_scandir(*args, **kwargs):
+            time.sleep(self.LIST_LATENCY_S)
+            return scandir(*args, **kwargs)
+
+        def slow_listdir(*args, **kwargs):
+            time.sleep(self.LIST_LATENCY_S)
+            return listdir(*args, **kwargs)
+
+        def slow_stat(*args, **kwargs):
+            time.sleep(self.STAT_LATENCY_S)
+            return stat(*args, **kwargs)
+
+        return mock.patch.multiple(os, scandir=slow_scandir, listdir=slow_listdir, stat=slow_stat)
+
+    def _measure(self, root):
+        with self._slow_fs():
+            start = time.perf_counter()
+            expected = _legacy_detect(root)
+            t_legacy = time.perf_counter() - start
+            start = time.perf_counter()
+            found = _detected(detect_project(root))
+            t_scan = time.perf_counter() - start
+        self.assertEqual(expected, found)
+        return t_legacy, t_scan
+
+    def test_detection_and_diagnostic_on_slow_share(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = os.path.join(tmp, '63041-B1I-PMZ-00003')
+            _make_project(root, n_cmd=5, n_etudes=40, fiches=96)
+            n_files = sum(len(files) for _, _, files in os.walk(root))
+            timings = {'GraceTHD a 3 niveaux': self._measure(root)}
+            # Livraison sans GraceTHD : l'ancienne recherche descendait jusqu'a 4 niveaux
+            for name in ('SIG', 'ZZ', 'AAA'):
+                shutil.rmtree(os.path.join(root, name))
+            timings['sans GraceTHD'] = self._measure(root)
+
+        self.assertGreaterEqual(n_files, 20000)
+        for label, (t_legacy, t_scan) in timings.items():
+            summary = (f"Detection + comptages {label} ({n_files} fichiers, "
+                       f"{self.LIST_LATENCY_S * 1000:.1f} ms/listage, {self.STAT_LATENCY_S * 1000:.1f} ms/stat) : "
+                       f"listdir/stat/walk {t_legacy:.2f} s, parcours unique {t_scan:.2f} s")
+            logging.getLogger('PoleAerien.bench').info(summary)
+            self.assertLess(t_scan, t_legacy, summary)
+
+
+if __name__ == '__main__':
+    unittest.main()
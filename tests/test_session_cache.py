@@ -0,0 +1,75 @@
+import unittest
+
+from session_cache import SessionCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSessionCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = _Clock()
+        self.cache = SessionCache(max_age_s=600, clock=self.clock)
+        self.assertFalse(self.cache.bind(('63041/B1I/PMZ/00003', '')))
+        self.cache.track_layer('pot', 'infra_pt_pot_1')
+        self.cache.track_layer('cap', 'etude_cap_ft_1')
+        for part in ('layers', 'appuis', 'assignment_capft', 'assignment_comac', 'pg'):
+            self.cache.put(part, part.upper())
+        self.clock.now = 1
+
+    def test_commit_on_study_layer_drops_its_assignment_only(self):
+        self.assertEqual(['assignment_capft'], self.cache.invalidate_layer('etude_cap_ft_1'))
+        self.assertEqual([], self.cache.invalidate_layer('autre_couche'))
+
+        self.assertIsNone(self.cache.get('assignment_capft'))
+        self.assertEqual('ASSIGNMENT_COMAC', self.cache.get('assignment_comac'))
+        self.assertEqual('APPUIS', self.cache.get('appuis'))
+
+    def test_pole_layer_change_drops_dependent_parts_but_keeps_layers(self):
+        self.cache.track_layer('pot', 'infra_pt_pot_2')
+
+        for part in ('appuis', 'assignment_capft', 'assignment_comac', 'pg'):
+            self.assertIsNone(self.cache.get(part), part)
+        self.assertEqual('LAYERS', self.cache.get('layers'))
+
+    def test_subset_or_extent_change_on_same_layer_drops_dependent_parts(self):
+        self.cache.track_layer('pot', 'infra_pt_pot_1', ('', 'EXT-1'))
+        for part in ('appuis', 'assignment_capft', 'assignment_comac', 'pg'):
+            self.cache.put(part, part.upper())
+        self.cache.track_layer('pot', 'infra_pt_pot_1', ('', 'EXT-1'))
+        self.assertEqual('APPUIS', self.cache.get('appuis'))
+
+        self.cache.track_layer('pot', 'infra_pt_pot_1', ('"inf_num" LIKE \'E%\'', 'EXT-1'))
+        self.assertIsNone(self.cache.get('appuis'))
+        self.assertIsNone(self.cache.get('pg'))
+
+        self.cache.put('appuis', 'APPUIS')
+        self.cache.track_layer('pot', 'infra_pt_pot_1', ('"inf_num" LIKE \'E%\'', 'EXT-2'))
+        self.assertIsNone(self.cache.get('appuis'))
+        self.assertEqual('LAYERS', self.cache.get('layers'))
+
+    def test_other_project_or_expired_entry_is_not_reused(self):
+        self.assertTrue(self.cache.bind(('63041/B1I/PMZ/00003', '')))
+        self.cache.put('pg', 'PG')
+        self.clock.now = 601
+        self.assertIsNone(self.cache.get('appuis'))
+        self.assertEqual('PG', self.cache.get('pg'))
+
+        self.assertFalse(self.cache.bind(('63041/B1I/PMZ/00004', '')))
+        self.assertIsNone(self.cache.get('layers'))
+
+    def test_age_of_cached_part(self):
+        self.clock.now = 42
+        self.assertEqual(42, self.cache.age('pg'))
+        self.cache.put('pg', 'PG2')
+        self.assertEqual(0, self.cache.age('pg'))
+        self.assertIsNone(self.cache.age('absente'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,201 @@
+import datetime
+import logging
+import os
+import struct
+import tempfile
+import time
+import tracemalloc
+import unittest
+
+from shp_reader import first_dbf_value, read_dbf, read_shapefile
+
+
+GRACETHD_DIR = os.environ.get('POLEAERIEN_TEST_GRACETHD_DIR', '')
+
+
+def _write_dbf(path, fields, rows, deleted=(), ldid=0x57):
+    """fields: [(nom, type, longueur, decimales)], rows: [[valeur texte]]."""
+    header_len = 32 + 32 * len(fields) + 1
+    record_len = 1 + sum(f[2] for f in fields)
+    out = bytearray(struct.pack('<BBBBIHH', 3, 126, 1, 1, len(rows), header_len, record_len))
+    out += bytes(17) + bytes([ldid]) + bytes(2)
+    for name, ftype, length, decimals in fields:
+        out += name.encode('ascii').ljust(11, b'\x00') + ftype.encode('ascii')
+        out += bytes(4) + bytes([length, decimals]) + bytes(14)
+    out += b'\x0D'
+    for idx, row in enumerate(rows):
+        out += b'*' if idx in deleted else b' '
+        for (_name, ftype, length, _dec), value in zip(fields, row):
+            raw = value.encode('cp1252')
+            out += raw.rjust(length) if ftype == 'N' else raw.ljust(length)
+    out += b'\x1A'
+    with open(path, 'wb') as handle:
+        handle.write(out)
+
+
+def _write_shp(path, shape_type, contents):
+    body = bytearray()
+    for number, content in enumerate(contents, start=1):
+        body += struct.pack('>ii', number, len(content) // 2) + content
+    header = struct.pack('>i', 9994) + bytes(20) + struct.pack('>i', (100 + len(body)) // 2)
+    header += struct.pack('<ii', 1000, shape_type) + bytes(64)
+    with open(path, 'wb') as handle:
+        handle.write(header + body)
+
+
+def _point(x, y):
+    return struct.pack('<idd', 1, x, y)
+
+
+def _polyline(*parts):
+    points = [p for part in parts for p in part]
+    starts, count = [], 0
+    for part in parts:
+        starts.append(count)
+        count += len(part)
+    content = struct.pack('<i4dii', 3, 0, 0, 0, 0, len(parts), len(points))
+    content += struct.pack(f'<{len(parts)}i', *starts)
+    for x, y in points:
+        content += struct.pack('<dd', x, y)
+    return content
+
+
+class TestShpReader(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_points_with_typed_requested_fields(self):
+        path = os.path.join(self.dir, 't_noeud.shp')
+        _write_shp(path, 1, [_point(700000.1, 6500000.25), _point(700010.0, 6500020.0)])
+        _write_dbf(path[:-4] + '.dbf',
+                   [('ND_CODE', 'C', 12, 0), ('nd_codeext', 'C', 20, 0),
+                    ('nd_haut', 'N', 6, 2), ('nd_nb', 'N', 4, 0), ('nd_date', 'D', 8, 0)],
+                   [['ND0001', ' E000117/03158 ', '8.50', '3', '20240131'],
+                    ['ND0002', '', '', '', '']])
+
+        table = read_shapefile(path, ('nd_code', 'ND_CODEEXT', 'nd_haut', 'nd_nb', 'nd_date'))
+
+        self.assertEqual(2, len(table))
+        self.assertEqual(['ND0001', 'ND0002'], table.column('nd_code'))
+        self.assertEqual('E000117/03158', table.value(0, 'nd_codeext'))
+        self.assertIsNone(table.value(1, 'nd_codeext'))
+        self.assertEqual([8.5, None], table.column('nd_haut'))
+        self.assertEqual([3, None], table.column('nd_nb'))
+        self.assertEqual(datetime.date(2024, 1, 31), table.value(0, 'nd_date'))
+        self.assertEqual((700000.1, 6500000.25), table.point(0))
+        self.assertEqual('Point (700000.09999999997671694 6500000.25)', table.wkt(0))
+        self.assertEqual('Point (700010 6500020)', table.wkt(1))
+        self.assertEqual('point', table.geometry_kind)
+        self.assertEqual(['nd_code', 'nd_codeext'], list(read_dbf(path[:-4] + '.dbf', ['nd_code', 'nd_codeext'])[0]))
+
+    def test_polylines_null_shapes_and_deleted_records(self):
+        path = os.path.join(self.dir, 't_cableline.shp')
+        _write_shp(path, 3, [
+            _polyline([(0, 0), (3, 4), (3, 10)]),
+            struct.pack('<i', 0),
+            _polyline([(0, 0), (1, 0)], [(5, 5), (5, 7)]),
+            _polyline([(9, 9), (9, 10)]),
+        ])
+        _write_dbf(path[:-4] + '.dbf', [('cl_cb_code', 'C', 10, 0), ('cl_long', 'N', 10, 2)],
+                   [['CB1', '12.00'], ['CB2', '0.00'], ['CB3', '3.00'], ['CB4', '1.00']],
+                   deleted={3})
+
+        table = read_shapefile(path)
+
+        self.assertEqual(['CB1', 'CB2', 'CB3'], table.column('cl_cb_code'))
+        self.assertEqual('line', table.geometry_kind)
+        self.assertEqual(11.0, table.length(0))
+        self.assertEqual('MultiLineString ((0 0, 3 4, 3 10))', table.wkt(0))
+        self.assertFalse(table.has_geometry(1))
+        self.assertEqual('', table.wkt(1))
+        self.assertEqual('MultiLineString ((0 0, 1 0),(5 5, 5 7))', table.wkt(2))
+        self.assertEqual(3.0, table.length(2))
+        self.assertEqual([None, None, None], table.column('absent'))
+
+    def test_cpg_names_and_unknown_cpg_fallback(self):
+        path = os.path.join(self.dir, 't_noeud.dbf')
+        _write_dbf(path, [('nd_codeext', 'C', 20, 0)], [['Épinal-Château']], ldid=0x03)
+        cpg = path[:-4] + '.cpg'
+        for content in ('ANSI 1252', '1252', 'cp1252', 'ANSI_1252\n', 'KOI9-X', ''):
+            with open(cpg, 'w', encoding='ascii') as handle:
+                handle.write(content)
+            self.assertEqual('Épinal-Château', first_dbf_value(path, 'nd_codeext'), repr(content))
+            self.assertEqual(['Épinal-Château'], read_dbf(path, ['nd_codeext'])[0]['nd_codeext'])
+
+        with open(cpg, 'w', encoding='ascii') as handle:
+            handle.write('88591')
+        self.assertEqual('Épinal-Château', first_dbf_value(path, 'nd_codeext'))
+
+    def test_first_dbf_value_skips_deleted_and_empty_records(self):
+        path = os.path.join(self.dir, 't_zsro.dbf')
+        _write_dbf(path, [('zs_code', 'C', 10, 0), ('ZS_REFPM', 'C', 20, 0)],
+                   [['ZS1', '63041/B1I/PMZ/00001'], ['ZS2', ''], ['ZS3', ' 63041/B1I/PMZ/00003 ']],
+                   deleted={0})
+
+        self.assertEqual('63041/B1I/PMZ/00003', first_dbf_value(path, 'zs_refpm'))
+        self.assertIsNone(first_dbf_value(path, 'absent'))
+
+
+@unittest.skipUnless(os.environ.get('POLEAERIEN_BENCH'), 'benchmark: set POLEAERIEN_BENCH=1')
+class TestShpReaderBenchmark(unittest.TestCase):
+    """t_cableline synthetique de 30 000 cables (taille d'une livraison Axione)."""
+
+    def test_cableline_30k(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, 't_cableline.shp')
+            contents = [
+                _polyline([(700000.0 + i, 6500000.0 + j * 10.0) for j in range(12)])
+                for i in range(30000)
+            ]
+            _write_shp(path, 3, contents)
+            _write_dbf(path[:-4] + '.dbf', [('cl_cb_code', 'C', 16, 0), ('cl_long', 'N', 10, 2)],
+                       [[f'CB{i:08d}', '110.00'] for i in range(30000)])
+
+            start = time.perf_counter()
+            table = read_shapefile(path, ('cl_cb_code', 'cl_long'))
+            elapsed = time.perf_counter() - start
+            tracemalloc.start()
+            read_shapefile(path, ('cl_cb_code', 'cl_long'))
+            _current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        summary = f"t_cableline 30k: {elapsed:.2f} s, pic memoire {peak / 1e6:.1f} Mo"
+        logging.getLogger('PoleAerien.bench').info(summary)
+        self.assertEqual(30000, len(table))
+        self.assertEqual(110.0, table.length(29999))
+        self.assertLess(peak, 100e6, summary)
+
+
+@unittest.skipUnless(GRACETHD_DIR, 'GraceTHD: set POLEAERIEN_TEST_GRACETHD_DIR')
+class TestShpReaderQgisParity(unittest.TestCase):
+    """Meme contenu que le fournisseur OGR de QGIS sur un livrable GraceTHD reel."""
+
+    def test_parity_with_ogr_provider(self):
+        from qgis.core import QgsGeometry, QgsVectorLayer
+
+        for name, fields in (('t_noeud.shp', ('nd_code', 'nd_codeext')),
+                             ('t_cableline.shp', ('cl_cb_code', 'cl_long'))):
+            path = os.path.join(GRACETHD_DIR, name)
+            layer = QgsVectorLayer(path, name, 'ogr')
+            features = list(layer.getFeatures())
+            table = read_shapefile(path, fields)
+            self.assertEqual(len(features), len(table), name)
+            for idx, feat in enumerate(features):
+                for field in fields:
+                    expected = feat[field]
+                    expected = None if expected is None or expected == '' or str(expected) == 'NULL' else expected
+                    self.assertEqual(expected, table.value(idx, field), f"{name}[{idx}].{field}")
+                if feat.hasGeometry():
+                    native = QgsGeometry.fromWkt(table.wkt(idx))
+                    self.assertTrue(native.equals(feat.geometry()), f"{name}[{idx}]")
+                    self.assertAlmostEqual(feat.geometry().length(), table.length(idx), places=6)
+                else:
+                    self.assertFalse(table.has_geometry(idx))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from decimal import Decimal
+
+from sro_bundle import BUNDLE_SUFFIX, bundle_path, load_bundle, save_bundle
+
+
+class TestSroBundle(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = bundle_path(self.temp_dir.name, 'SRO-63-001')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_roundtrip_keeps_python_types(self):
+        fields = {
+            'appuis_wkb_plain': [('BT-1', b'\x01\x02\x03'), ('BT-2', b'')],
+            'all_inf_nums_capft': {'BT-1', 'BT-2'},
+            'dico_qgis_capft': {'E1': ['BT-1'], 'E2': []},
+            'coords_qgis_capft': {('E1', 'BT-1'): (652000.5, 6520000.25)},
+            'bpe_list': [{'noe_codext': 'BPE-1', 'date': datetime(2026, 3, 4, 5, 6, 7)}],
+            'attaches_raw': [[1, Decimal('1.5')]],
+            'cables': None,
+            'sro': 'SRO-63-001',
+        }
+        save_bundle(self.path, 'SRO-63-001', fields)
+
+        bundle = load_bundle(self.path)
+
+        self.assertEqual('SRO-63-001', bundle['sro'])
+        expected = dict(fields, attaches_raw=[[1, 1.5]])
+        self.assertEqual(expected, bundle['fields'])
+
+    def test_dataframe_roundtrip(self):
+        try:
+            import pandas as pd
+        except ImportError:
+            self.skipTest('pandas absent')
+        df = pd.DataFrame({'Nom Etudes': ['E1', 'E2'], 'N° appui': ['BT-1', None]})
+        save_bundle(self.path, 'SRO-63-001', {'df_c6bd_in': df})
+
+        loaded = load_bundle(self.path)['fields']['df_c6bd_in']
+
+        pd.testing.assert_frame_equal(df, loaded)
+
+    def test_unsupported_version_raises(self):
+        save_bundle(self.path, 'SRO-63-001', {})
+        with gzip.open(self.path, 'rt', encoding='utf-8') as handle:
+            document = json.load(handle)
+        document['version'] = 999
+        with gzip.open(self.path, 'wt', encoding='utf-8') as handle:
+            json.dump(document, handle)
+
+        with self.assertRaises(ValueError):
+            load_bundle(self.path)
+
+    def test_missing_fields_raises_clear_error(self):
+        with gzip.open(self.path, 'wt', encoding='utf-8') as handle:
+            json.dump({'version': 1, 'sro': 'SRO-63-001'}, handle)
+
+        with self.assertRaisesRegex(ValueError, "'fields' absente"):
+            load_bundle(self.path)
+
+    def test_truncated_bundle_raises_value_error(self):
+        save_bundle(self.path, 'SRO-63-001', {'bpe_list': list(range(1000))})
+        with open(self.path, 'rb') as handle:
+            head = handle.read(40)
+        with open(self.path, 'wb') as handle:
+            handle.write(head)
+
+        with self.assertRaisesRegex(ValueError, 'illisible'):
+            load_bundle(self.path)
+
+    def test_bundle_path_is_filesystem_safe(self):
+        path = bundle_path('/tmp/bundles', 'SRO 63/001')
+
+        self.assertEqual(os.path.join('/tmp/bundles', 'SRO_63_001' + BUNDLE_SUFFIX), path)
+        self.assertTrue(bundle_path('/tmp/bundles', '').endswith('sans_sro' + BUNDLE_SUFFIX))
+
+
+if __name__ == '__main__':
+    unittest.main()
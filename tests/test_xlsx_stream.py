@@ -0,0 +1,133 @@
+import datetime
+import os
+import tempfile
+import unittest
+import zipfile
+
+import openpyxl
+from openpyxl.styles import Font
+
+from xlsx_stream import XlsxReader, column_index, parse_range
+
+_MAIN = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+
+_STYLES = f'''<styleSheet xmlns="{_MAIN}">
+<numFmts count="1"><numFmt numFmtId="164" formatCode="dd/mm/yyyy hh:mm"/></numFmts>
+<fonts count="3"><font><sz val="11"/></font><font><b/></font><font><b val="0"/></font></fonts>
+<fills count="1"><fill><patternFill patternType="none"/></fill></fills>
+<borders count="1"><border/></borders>
+<cellStyleXfs count="1"><xf/></cellStyleXfs>
+<cellXfs count="5"><xf fontId="0"/><xf fontId="1"/><xf fontId="2"/><xf numFmtId="14"/><xf numFmtId="164" fontId="1"/></cellXfs>
+<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>
+</styleSheet>'''
+
+_SHARED = f'''<sst xmlns="{_MAIN}"><si><t>N° appui</t></si><si><r><t>Nom du </t></r><r><rPr><b/></rPr><t>câble</t></r></si>
+<si><t xml:space="preserve"> L1x005F_2 </t><rPh sb="0" eb="1"><t>ignored</t></rPh></si></sst>'''
+
+_SHEET = f'''<worksheet xmlns="{_MAIN}"><dimension ref="A1:F6"/><sheetData>
+<row r="1"><c r="A1" t="s"><v>0</v></c><c r="B1" t="s"><v>1</v></c><c r="E1" t="inlineStr"><is><t>en ligne</t></is></c></row>
+<row r="3"><c r="A3"><v>12</v></c><c r="B3" s="1" t="s"><v>2</v></c><c r="C3" s="3"><v>45322</v></c><c s="4"><v>45322.5</v></c></row>
+<row><c t="b"><v>1</v></c><c t="e"><v>#N/A</v></c><c t="str" s="2"><f>A1</f><v>calc</v></c><c r="F4" s="1"/></row>
+<row r="5"><c r="A5"><v>1.5E3</v></c><c r="B5" t="s"><v>0</v></c><c r="C5"><v>7</v></c></row>
+<row r="6"><c r="A6" t="inlineStr"><is><r><t>a</t></r><r><t>b</t></r></is></c><c r="B6"><v></v></c></row>
+</sheetData><mergeCells count="1"><mergeCell ref="B5:C6"/></mergeCells></worksheet>'''
+
+
+def _write_xlsx(path, sheet_xml, shared=_SHARED, styles=_STYLES, workbook_pr=''):
+    with zipfile.ZipFile(path, 'w') as zf:
+        zf.writestr('[Content_Types].xml', (
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+            '<Override PartName="/xl/sharedStrings.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>'
+            '</Types>'))
+        zf.writestr('_rels/.rels', (
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'<Relationship Id="rId1" Type="{_REL}/officeDocument" Target="xl/workbook.xml"/></Relationships>'))
+        zf.writestr('xl/workbook.xml', (
+            f'<workbook xmlns="{_MAIN}" xmlns:r="{_REL}">{workbook_pr}'
+            '<bookViews><workbookView activeTab="0"/></bookViews>'
+            '<sheets><sheet name="Export 1" sheetId="1" r:id="rId1"/></sheets></workbook>'))
+        zf.writestr('xl/_rels/workbook.xml.rels', (
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'<Relationship Id="rId1" Type="{_REL}/worksheet" Target="worksheets/sheet1.xml"/>'
+            f'<Relationship Id="rId2" Type="{_REL}/styles" Target="/xl/styles.xml"/>'
+            f'<Relationship Id="rId3" Type="{_REL}/sharedStrings" Target="sharedStrings.xml"/></Relationships>'))
+        zf.writestr('xl/styles.xml', styles)
+        zf.writestr('xl/sharedStrings.xml', shared)
+        zf.writestr('xl/worksheets/sheet1.xml', sheet_xml)
+
+
+class TestXlsxStream(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, 'c6.xlsx')
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _assert_same_as_openpyxl(self):
+        wb = openpyxl.load_workbook(self.path, data_only=True)
+        ws = wb.active
+        with XlsxReader(self.path) as book:
+            self.assertEqual(wb.sheetnames, book.sheetnames)
+            self.assertEqual(ws.title, book.active)
+            sheet = book.sheet(book.active)
+            streamed = {idx: (values, styles) for idx, values, styles in sheet.rows(merged_as_empty=True)}
+            self.assertEqual(ws.max_column, sheet.max_column)
+            for row in ws.iter_rows():
+                values, styles = streamed.get(row[0].row, ([], []))
+                width = len(row)
+                self.assertEqual([c.value for c in row], values + [None] * (width - len(values)), row[0].row)
+                for idx, cell in enumerate(row):
+                    if cell.value is not None:
+                        self.assertEqual(bool(cell.font.bold), book.is_bold(styles[idx]), cell.coordinate)
+        wb.close()
+        return streamed
+
+    def test_cell_types_styles_and_merges_match_openpyxl(self):
+        _write_xlsx(self.path, _SHEET)
+
+        streamed = self._assert_same_as_openpyxl()
+
+        values, styles = streamed[3][0], streamed[3][1]
+        self.assertEqual([12, ' L12 ', datetime.datetime(2024, 1, 31), datetime.datetime(2024, 1, 31, 12)], values)
+        self.assertEqual([True, '#N/A', 'calc', None, None, None], streamed[4][0])
+        self.assertEqual([1500.0, 'N° appui', None], streamed[5][0])
+        self.assertEqual(['ab', None], streamed[6][0])
+
+    def test_1904_epoch_and_rows_without_styles(self):
+        sheet = (f'<worksheet xmlns="{_MAIN}"><sheetData><row r="2"><c r="C2" s="3"><v>1</v></c></row>'
+                 f'</sheetData><mergeCells><mergeCell ref="A8:H9"/></mergeCells></worksheet>')
+        _write_xlsx(self.path, sheet, workbook_pr='<workbookPr date1904="1"/>')
+
+        streamed = self._assert_same_as_openpyxl()
+
+        self.assertEqual([None, None, datetime.datetime(1904, 1, 2)], streamed[2][0])
+
+    def test_openpyxl_written_workbook(self):
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.title = 'Appuis'
+        ws.append(['Titre long', None, 'x'])
+        ws.merge_cells('A1:B2')
+        for n in range(30):
+            ws.append([f'{n:04d}/63041', f'L{n}', n * 1.5, None, datetime.date(2024, 1, 1 + n % 28)])
+            ws.cell(row=ws.max_row, column=2).font = Font(bold=n % 3 == 0)
+        wb.create_sheet('Bases')
+        wb.save(self.path)
+
+        self._assert_same_as_openpyxl()
+
+    def test_refs(self):
+        self.assertEqual((1, 28, 702), (column_index('A'), column_index('AB'), column_index('ZZ')))
+        self.assertEqual((2, 2, 5, 4), parse_range('D5:B2'))
+        self.assertEqual((7, 3, 7, 3), parse_range('C7'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,6 +12,7 @@ Style: Calibri 10pt, dark blue headers (#1F4E79), thin grey borders,
 
 import json
 import os
+import time
 from io import BytesIO
 from datetime import datetime
 
@@ -149,7 +150,8 @@ def _write_comac_drawing_sheets(wb, result, report_options):
         except ImportError:
             from pcm_drawing import PcmDrawingRenderer
         stop_fn = lambda: _report_cancelled(report_options)
-        renderer = PcmDrawingRenderer(dpi=_DRAWING_DPI)
+        cache = report_options.get('drawing_cache') or _default_drawing_cache()
+        renderer = PcmDrawingRenderer(dpi=_DRAWING_DPI, cache=cache)
         entries = renderer.build_support_entries(etudes_pcm, stop_fn)
     except Exception as exc:
         _report_message(report_options, f"[REPORT] Erreur rendu dessins COMAC: {exc}", 'orange')
@@ -168,6 +170,9 @@ def _write_comac_drawing_sheets(wb, result, report_options):
     all_entries_flat = [e for b in blocks for e in b['entries']]
     diagrams_iter = renderer.render_entries(all_entries_flat, stop_fn)
     diagram_map = {}
+    hits_before = cache.memory_hits + cache.disk_hits
+    lookups_before = cache.lookups
+    t_render = time.perf_counter()
     for diagram in diagrams_iter:
         if diagram is None:
             break
@@ -175,6 +180,12 @@ def _write_comac_drawing_sheets(wb, result, report_options):
             return False
         key = (diagram.get('etude', ''), diagram.get('support', ''))
         diagram_map[key] = diagram
+    _record_drawing_cache_stats(
+        report_options,
+        (time.perf_counter() - t_render) * 1000,
+        cache.lookups - lookups_before,
+        cache.memory_hits + cache.disk_hits - hits_before,
+    )
     for page_idx, page in enumerate(pages):
         if _report_cancelled(report_options):
             return False
@@ -187,6 +198,35 @@ def _write_comac_drawing_sheets(wb, result, report_options):
     return True
 
 
+def _default_drawing_cache():
+    try:
+        from .pcm_drawing import DrawingCache
+        from .core_utils import get_profile_cache_dir
+    except ImportError:
+        from pcm_drawing import DrawingCache
+        from core_utils import get_profile_cache_dir
+    return DrawingCache(get_profile_cache_dir('drawings'))
+
+
+def _record_drawing_cache_stats(report_options, duration_ms, lookups, hits):
+    if not lookups:
+        return
+    sro = report_options.get('sro', '') or ''
+    try:
+        try:
+            from .perf_logger import PerfLogger
+        except ImportError:
+            from perf_logger import PerfLogger
+        PerfLogger.record('comac', 'dessins_rendu', duration_ms, sro=sro, feature_count=lookups)
+        PerfLogger.record('comac', 'dessins_cache_hit', 0, sro=sro, feature_count=hits)
+    except Exception:
+        pass
+    _report_message(
+        report_options,
+        f"[REPORT] Dessins COMAC: {hits}/{lookups} depuis le cache ({hits * 100 // lookups}%)",
+    )
+
+
 def _study_block_height(n_poles):
     return 1 + n_poles * (1 + _DRAWING_IMG_ROWS)
 
@@ -665,6 +705,10 @@ def _write_dashboard(wb, batch_results):
     if be_label:
         summary_parts.append(be_label.upper())
     summary_parts.append(f"{len(batch_results)} module(s)")
+    reused = [_NAMES.get(k, k) for k, r in batch_results.items()
+              if isinstance(r, dict) and r.get('_reused_from')]
+    if reused:
+        summary_parts.append(f"reutilises (entrees inchangees) : {', '.join(reused)}")
     for key, kpi_fn in _KPI.items():
         res = batch_results.get(key)
         if res:
@@ -711,6 +755,8 @@ def _write_dashboard(wb, batch_results):
             status = "CONFORME" if nok == 0 else "NON CONFORME"
 
             mod_name = _NAMES.get(key, key) if i == 0 else ""
+            if mod_name and res.get('_reused_from'):
+                mod_name += f" (reutilise {res['_reused_from'][:10]})"
 
             _row(ws, row, [mod_name, check_name, status, total, ok, nok,
                            f"{pct:.0f}%", detail])
@@ -1536,6 +1582,7 @@ def _resolve_report_options(report_options):
         'is_cancelled': None,
         'drawings_progress_start': None,
         'drawings_progress_end': None,
+        'drawing_cache': None,
     }
     if isinstance(report_options, dict):
         merged = dict(defaults)
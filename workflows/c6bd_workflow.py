@@ -64,11 +64,13 @@ class C6BdWorkflow(QObject):
         if self.current_task:
             self.current_task.cancel()
 
-    def start_analysis(self, lyr_pot, lyr_cap, col_cap, chemin_c6, chemin_export):
+    def start_analysis(self, lyr_pot, lyr_cap, col_cap, chemin_c6, chemin_export,
+                       pole_assignment=None):
         """
         Lance l'analyse C6 vs BD de manière non-bloquante.
         
         L'extraction est découpée en étapes avec QTimer pour garder l'UI fluide.
+        pole_assignment: affectation batch poteaux -> etudes (optionnelle).
         """
         self._cancelled = False
         
@@ -99,7 +101,8 @@ class C6BdWorkflow(QObject):
             'chemin_export': chemin_export,
             'df_qgis': None,
             'df_poteaux_out': None,
-            'verif_etudes': None
+            'verif_etudes': None,
+            'pole_assignment': pole_assignment
         }
 
         self.progress_changed.emit(5)
@@ -116,7 +119,8 @@ class C6BdWorkflow(QObject):
         try:
             state = self._extraction_state
             df_qgis, df_out = self.c6bd_logic.extraire_poteaux_in_out(
-                state['lyr_pot_name'], state['lyr_cap_name'], state['col_cap']
+                state['lyr_pot_name'], state['lyr_cap_name'], state['col_cap'],
+                assignment=state['pole_assignment']
             )
             state['df_qgis'] = df_qgis
             state['df_poteaux_out'] = df_out
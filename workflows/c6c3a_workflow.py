@@ -84,7 +84,8 @@ class C6C3AWorkflow(QObject):
                 params['table_infra'], 
                 params['table_decoupage'], 
                 params['champs_dcp'], 
-                params['valeur_dcp']
+                params['valeur_dcp'],
+                assignment=params.get('pole_assignment')
             )
             self.progress_changed.emit(40)
             
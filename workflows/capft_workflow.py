@@ -40,7 +40,8 @@ class CapFtWorkflow(QObject):
         if self.current_task:
             self.current_task.cancel()
 
-    def start_analysis(self, lyr_pot, lyr_cap, col_cap, chemin_cap, chemin_export):
+    def start_analysis(self, lyr_pot, lyr_cap, col_cap, chemin_cap, chemin_export,
+                       pole_assignment=None):
         """
         Lance l'analyse CAP_FT.
         
@@ -50,6 +51,7 @@ class CapFtWorkflow(QObject):
             col_cap (str): Colonne identifiant l'étude dans la couche CAP_FT
             chemin_cap (str): Répertoire des fichiers CAP_FT (Fiches Appuis)
             chemin_export (str): Chemin pour le fichier Excel de sortie
+            pole_assignment (PoleAssignment|None): affectation batch poteaux -> etudes
         """
         if not lyr_pot or not lyr_cap:
             self.error_occurred.emit("Couches invalides ou manquantes")
@@ -66,7 +68,8 @@ class CapFtWorkflow(QObject):
         try:
             doublons, hors_etude, dico_qgis, dico_poteaux_prives, all_inf_nums, coords_qgis = (
                 self.cap_logic.extraire_donnees_capft(
-                    lyr_pot.name(), lyr_cap.name(), col_cap
+                    lyr_pot.name(), lyr_cap.name(), col_cap,
+                    assignment=pole_assignment
                 )
             )
         except ValueError as e:
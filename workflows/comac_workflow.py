@@ -11,7 +11,7 @@ from ..Comac import Comac
 from ..async_tasks import ComacTask, ExcelExportTask, run_async_task
 from ..core_utils import build_export_path
 from ..db_connection import extract_sro_from_layer
-from ..cable_analyzer import extraire_appuis_wkb
+from ..cable_analyzer import extraire_appuis_snapshot
 from ..qgis_utils import show_feature_count
 from ..perf_logger import PerfLogger
 import os
@@ -46,7 +46,7 @@ class ComacWorkflow(QObject):
     def start_analysis(self, lyr_pot, lyr_comac, col_comac, chemin_comac, chemin_export,
                         fddcpi_cache=None, sro_appuis_cache=None,
                         be_type='nge', gracethd_dir='', sro=None,
-                        spatial_tolerance=7.5):
+                        spatial_tolerance=7.5, pole_assignment=None, appuis_snapshot=None):
         """
         Lance l'analyse COMAC.
         
@@ -58,6 +58,8 @@ class ComacWorkflow(QObject):
             chemin_export (str): Chemin pour le fichier Excel de sortie
             fddcpi_cache (list|None): CableSegment list from previous fddcpi2 call (batch optimization)
             sro_appuis_cache (dict|None): {'sro': str, 'appuis_wkb': list} from another module (batch optimization)
+            pole_assignment (PoleAssignment|None): batch pole -> study assignment
+            appuis_snapshot (AppuisSnapshot|None): batch appuis snapshot of lyr_pot
         """
         if not lyr_pot or not lyr_comac:
             self.error_occurred.emit("Couches invalides ou manquantes")
@@ -73,7 +75,7 @@ class ComacWorkflow(QObject):
             doublons, hors_etude, dico_qgis, dico_poteaux_prives, all_inf_nums, coords_qgis = (
                 self.comac_logic.extraire_donnees_comac(
                     lyr_pot.name(), lyr_comac.name(), col_comac,
-                    be_type=be_type
+                    be_type=be_type, assignment=pole_assignment
                 )
             )
         except ValueError as e:
@@ -97,13 +99,15 @@ class ComacWorkflow(QObject):
             sro = sro_appuis_cache.get('sro') or sro
         if not sro:
             sro = extract_sro_from_layer(lyr_pot)
-        # Appuis WKB: toujours extraire avec keep_commune=True (COMAC a besoin
+        # Appuis WKB: toujours la vue keep_commune=True (COMAC a besoin
         # de /commune pour distinguer poteaux de communes differentes).
-        # Ne pas reutiliser le cache Police C6 qui est sans commune.
+        # Le snapshot batch est partage avec Police C6 (vue sans commune).
         appuis_wkb = []
         if sro:
             _t1 = time.perf_counter()
-            appuis_wkb = extraire_appuis_wkb(lyr_pot, keep_commune=True)
+            if appuis_snapshot is None or not appuis_snapshot.matches(lyr_pot.id()):
+                appuis_snapshot = extraire_appuis_snapshot(lyr_pot)
+            appuis_wkb = appuis_snapshot.view(keep_commune=True)
             PerfLogger.record('comac', 'appuis_wkb_extract',
                               (time.perf_counter() - _t1) * 1000, sro=sro, feature_count=len(appuis_wkb))
         else:
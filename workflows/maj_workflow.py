@@ -70,12 +70,15 @@ class MajWorkflow(QObject):
         return _detect_etude_field(layer, context="MAJ")
 
     def start_analysis(self, lyr_pot, lyr_cap, lyr_com, excel_path,
-                       col_cap=None, col_com=None):
+                       col_cap=None, col_com=None, assignment_ft=None, assignment_bt=None):
         """Lance l'analyse avec extraction non-bloquante (avec cache).
         
         Args:
             col_cap: Nom du champ etude dans la couche CAP FT (auto-detect si None)
             col_com: Nom du champ etude dans la couche COMAC (auto-detect si None)
+            assignment_ft: PoleAssignment batch CAP FT optionnel (evite
+                l'extraction des polygones CAP FT)
+            assignment_bt: PoleAssignment batch COMAC optionnel
         """
         if not lyr_pot or not lyr_cap or not lyr_com:
             self.error_occurred.emit("Couches invalides ou manquantes")
@@ -130,6 +133,13 @@ class MajWorkflow(QObject):
                 f"Champs: {[f.name() for f in lyr_com.fields()]}")
             return
         
+        if assignment_ft is not None and not assignment_ft.matches(
+                lyr_pot.id(), lyr_cap.id(), col_cap):
+            assignment_ft = None
+        if assignment_bt is not None and not assignment_bt.matches(
+                lyr_pot.id(), lyr_com.id(), col_com):
+            assignment_bt = None
+
         # Initialiser l'état d'extraction
         self._extraction_state = {
             'excel_path': excel_path,
@@ -144,7 +154,9 @@ class MajWorkflow(QObject):
             'poteaux_ft': [],
             'poteaux_bt': [],
             'etudes_cap_ft': [],
-            'etudes_comac': []
+            'etudes_comac': [],
+            'assignment_ft': assignment_ft,
+            'assignment_bt': assignment_bt
         }
         
         self.message_received.emit("Extraction POT-FT...", "grey")
@@ -180,14 +192,14 @@ class MajWorkflow(QObject):
                     if feat.hasGeometry():
                         pt = feat.geometry().asPoint()
                         state['poteaux_ft'].append({
-                            'x': pt.x(), 'y': pt.y(),
+                            'fid': feat.id(), 'x': pt.x(), 'y': pt.y(),
                             'gid': feat["gid"], 'inf_num': feat["inf_num"]
                         })
                 elif phase == 'pot_bt':
                     if feat.hasGeometry():
                         pt = feat.geometry().asPoint()
                         state['poteaux_bt'].append({
-                            'x': pt.x(), 'y': pt.y(),
+                            'fid': feat.id(), 'x': pt.x(), 'y': pt.y(),
                             'gid': feat["gid"], 'inf_num': feat["inf_num"]
                         })
                 elif phase == 'cap_ft':
@@ -244,6 +256,10 @@ class MajWorkflow(QObject):
             QTimer.singleShot(0, self._process_extraction_batch)
             
         elif phase == 'pot_bt':
+            if state['assignment_ft'] is not None and state['assignment_bt'] is not None:
+                # Affectation batch deja calculee : pas de polygones a extraire
+                self._launch_async_task()
+                return
             state['phase'] = 'cap_ft'
             state['iterator'] = state['lyr_cap'].getFeatures()
             self.message_received.emit("Extraction CAP_FT...", "grey")
@@ -268,7 +284,9 @@ class MajWorkflow(QObject):
             'poteaux_ft': state['poteaux_ft'],
             'poteaux_bt': state['poteaux_bt'],
             'etudes_cap_ft': state['etudes_cap_ft'],
-            'etudes_comac': state['etudes_comac']
+            'etudes_comac': state['etudes_comac'],
+            'assignment_ft': state['assignment_ft'],
+            'assignment_bt': state['assignment_bt']
         }
         params = {'fichier_excel': state['excel_path']}
         
@@ -17,13 +17,13 @@ from qgis.core import Qgis, QgsMessageLog, QgsProject, QgsVectorLayer, NULL
 from ..compat import MSG_INFO, MSG_WARNING, MSG_CRITICAL, FIELD_TYPE_STRING, FIELD_TYPE_INT, FIELD_TYPE_DOUBLE, FIELD_TYPE_LONGLONG
 from ..PoliceC6 import PoliceC6, PoliceC6Cancelled
 from ..db_connection import extract_sro_from_layer
-from ..cable_analyzer import extraire_appuis_wkb
+from ..cable_analyzer import extraire_appuis_snapshot
 from ..qgis_utils import get_layer_safe, detect_etude_field as _detect_etude_field, show_feature_count
 from ..async_tasks import PoliceC6Task, run_async_task
 from ..core_utils import is_plugin_output_file
+from ..file_index import find_c6_file, get_index
 from ..perf_logger import PerfLogger
 import os
-import glob
 import time
 from datetime import datetime
 
@@ -100,6 +100,7 @@ class PoliceWorkflow(QObject):
         """
         Trouve le fichier C6 correspondant à une étude.
         Cherche récursivement dans les sous-dossiers (CMD 1, CMD 2, etc.)
+        Delegue a file_index.find_c6_file() (index partagé, un seul parcours).
         
         Args:
             repertoire_c6: Répertoire racine des C6
@@ -111,34 +112,7 @@ class PoliceWorkflow(QObject):
         if not repertoire_c6 or not nom_etude:
             return None
         
-        # Patterns de recherche (priorité décroissante)
-        patterns = [
-            # Pattern principal: **/nom_etude/nom_etude.xlsx (récursif)
-            os.path.join(repertoire_c6, "**", nom_etude, f"{nom_etude}.xlsx"),
-            # Sous-dossier direct avec nom étude
-            os.path.join(repertoire_c6, nom_etude, f"{nom_etude}.xlsx"),
-            os.path.join(repertoire_c6, nom_etude, "*Annexe*C6*.xlsx"),
-            os.path.join(repertoire_c6, nom_etude, "*C6*.xlsx"),
-            # Récursif: chercher dans tous les sous-dossiers
-            os.path.join(repertoire_c6, "**", nom_etude, "*Annexe*C6*.xlsx"),
-            os.path.join(repertoire_c6, "**", nom_etude, "*C6*.xlsx"),
-            os.path.join(repertoire_c6, "**", f"{nom_etude}.xlsx"),
-            # Fichier direct avec nom étude
-            os.path.join(repertoire_c6, f"*{nom_etude}*.xlsx"),
-            # Dernier recours: n'importe quel xlsx dans le dossier etude
-            os.path.join(repertoire_c6, "**", nom_etude, "*.xlsx"),
-        ]
-        
-        for pattern in patterns:
-            # recursive=True pour supporter **
-            matches = glob.glob(pattern, recursive=True)
-            # Filtrer les fichiers non-C6 (FicheAppui, C7, GESPOT)
-            for match in matches:
-                if is_plugin_output_file(os.path.basename(match)):
-                    continue
-                return match
-        
-        return None
+        return find_c6_file(get_index(repertoire_c6), nom_etude)
 
     def get_etudes_from_layer(self, table_etude, colonne_etude):
         """
@@ -211,12 +185,13 @@ class PoliceWorkflow(QObject):
                 _etude_dir_re = _re.compile(
                     r'(FTTH.*ETUDE|NGE-\d)', _re.IGNORECASE
                 )
-                for dirpath, dirnames, filenames in os.walk(repertoire_c6):
+                index = get_index(repertoire_c6)
+                for dirpath, dirnames, filenames in index.walk():
                     for d in dirnames:
                         if _etude_dir_re.search(d):
                             etudes_set.add(d)
                 # 2. Aussi chercher les fichiers *C6*.xlsx (pattern classique NGE)
-                c6_files = glob.glob(os.path.join(repertoire_c6, "**", "*C6*.xlsx"), recursive=True)
+                c6_files = index.glob("*C6*.xlsx")
                 c6_files = [f for f in c6_files if not is_plugin_output_file(os.path.basename(f))]
                 for f in c6_files:
                     etudes_set.add(os.path.splitext(os.path.basename(f))[0])
@@ -267,13 +242,16 @@ class PoliceWorkflow(QObject):
             return
 
         self.message_received.emit(f"SRO: {sro}", "grey")
-        # Appuis WKB: toujours extraire sans commune (Police C6 compare
+        # Appuis WKB: toujours la vue sans commune (Police C6 compare
         # avec C6 Excel qui n'a pas de suffixe /commune).
-        # Ne pas reutiliser le cache COMAC qui est avec commune.
+        # Le snapshot batch est partage avec COMAC (vue avec commune).
         appuis_data = []
         if layer_appuis:
             _t_appuis = time.perf_counter()
-            appuis_data = extraire_appuis_wkb(layer_appuis[0])
+            appuis_snapshot = params.get('appuis_snapshot')
+            if appuis_snapshot is None or not appuis_snapshot.matches(layer_appuis[0].id()):
+                appuis_snapshot = extraire_appuis_snapshot(layer_appuis[0])
+            appuis_data = appuis_snapshot.view(keep_commune=False)
             PerfLogger.record('police_c6', 'appuis_wkb_extract',
                               (time.perf_counter() - _t_appuis) * 1000,
                               sro=sro or '', feature_count=len(appuis_data))
@@ -328,6 +306,17 @@ class PoliceWorkflow(QObject):
             self.error_occurred.emit(result['error'])
             return
         
+        self.load_result_layers(result)
+        
+        # Émettre résultat
+        self.analysis_finished.emit(result)
+        
+        # Message récapitulatif
+        stats = result.get('stats', [])
+        self.message_received.emit(f"Analyse terminée: {len(stats)} études traitées", "green")
+    
+    def load_result_layers(self, result):
+        """Couches temporaires QGIS d'un résultat (calculé ou réutilisé) : câbles + anomalies."""
         # Charger les cables comme couche temporaire QGIS
         cables = result.get('cables', [])
         sro = result.get('sro', '')
@@ -345,13 +334,6 @@ class PoliceWorkflow(QObject):
                 self._load_anomaly_layer(anomaly_cables, sro)
             except Exception as e:
                 self.message_received.emit(f"[!] Erreur couche anomalies: {e}", "orange")
-        
-        # Émettre résultat
-        self.analysis_finished.emit(result)
-        
-        # Message récapitulatif
-        stats = result.get('stats', [])
-        self.message_received.emit(f"Analyse terminée: {len(stats)} études traitées", "green")
     
     def _load_cables_layer(self, cables, sro, be_type='nge'):
         """Charge les cables (fddcpi2 ou GraceTHD) comme couche temporaire dans QGIS."""
@@ -0,0 +1,341 @@
+# -*- coding: utf-8 -*-
+"""
+Lecture XLSX en flux, sans le modele objet openpyxl.
+
+Le XML d'une feuille est parcouru avec iterparse, ligne par ligne ; seules
+les tables du classeur (chaines partagees, styles) sont chargees. Les
+valeurs sont celles de openpyxl.load_workbook(data_only=True) : int/float,
+dates selon le format de la cellule, booleens, chaines partagees ou en
+ligne, codes d'erreur. Le gras d'une cellule se lit depuis son index de
+style (cellXfs -> fonts), resolu seulement quand l'appelant le demande.
+
+Module pur Python (openpyxl n'est utilise que pour ses tables de formats).
+"""
+
+import posixpath
+import re
+import zipfile
+from typing import Dict, Iterator, List, Optional, Tuple
+from xml.etree.ElementTree import fromstring, iterparse
+
+from openpyxl.styles.numbers import builtin_format_code, is_date_format, is_timedelta_format
+from openpyxl.utils.datetime import CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900, from_ISO8601, from_excel
+
+_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+_R_ID = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id'
+
+_ROW = _NS + 'row'
+_C = _NS + 'c'
+_V = _NS + 'v'
+_IS = _NS + 'is'
+_T = _NS + 't'
+_R = _NS + 'r'
+_SHEET_DATA = _NS + 'sheetData'
+_DIMENSION = _NS + 'dimension'
+_MERGE_CELL = _NS + 'mergeCell'
+
+_RE_REF = re.compile(r'([A-Z]+)(\d+)')
+_RE_MERGE = re.compile(rb'<(?:\w+:)?mergeCell\s[^>]*?ref="([A-Z]+\d+(?::[A-Z]+\d+)?)"')
+_DIGITS = '0123456789'
+
+# Taille des blocs lus pour la recherche des cellules fusionnees
+SCAN_CHUNK = 1 << 20
+
+_COLUMNS: Dict[str, int] = {}
+
+
+def column_index(letters: str) -> int:
+    """'A' -> 1, 'AB' -> 28."""
+    idx = _COLUMNS.get(letters)
+    if idx is None:
+        idx = 0
+        for ch in letters:
+            idx = idx * 26 + ord(ch) - 64
+        _COLUMNS[letters] = idx
+    return idx
+
+
+def parse_range(ref: str) -> Tuple[int, int, int, int]:
+    """'B2:D5' -> (min_row, min_col, max_row, max_col) ; 'B2' -> plage d'une cellule."""
+    cells = [(int(row), column_index(col)) for col, row in _RE_REF.findall(ref)]
+    (r1, c1), (r2, c2) = cells[0], cells[-1]
+    return min(r1, r2), min(c1, c2), max(r1, r2), max(c1, c2)
+
+
+def _cast_number(value: str):
+    if '.' in value or 'E' in value or 'e' in value:
+        return float(value)
+    return int(value)
+
+
+def _text_content(node) -> str:
+    """Texte d'un <si>/<is> : <t> direct puis <r><t> (texte phonetique ignore)."""
+    parts = []
+    plain = node.find(_T)
+    if plain is not None and plain.text is not None:
+        parts.append(plain.text)
+    for run in node.iterfind(_R):
+        text = run.findtext(_T)
+        if text is not None:
+            parts.append(text)
+    return ''.join(parts)
+
+
+def _is_bold(font) -> bool:
+    """Regle openpyxl : <b/> vrai, val 'false'/'f'/'0' faux, tout le reste vrai."""
+    b = font.find(_NS + 'b')
+    return b is not None and b.get('val', True) not in ('false', 'f', '0')
+
+
+def _resolve(base: str, target: str) -> str:
+    if target.startswith('/'):
+        return target.lstrip('/')
+    return posixpath.normpath(posixpath.join(base, target))
+
+
+class XlsxSheet:
+    """Feuille lue en flux.
+
+    max_column (cellules + plages fusionnees, comme openpyxl en lecture
+    complete) n'est complet qu'apres avoir epuise rows().
+    """
+
+    def __init__(self, book: 'XlsxReader', part: str):
+        self._book = book
+        self._part = part
+        self.declared_max_column = 0
+        self.max_column = 0
+        self.merged: Optional[List[Tuple[int, int, int, int]]] = None
+
+    def scan_merged(self) -> List[Tuple[int, int, int, int]]:
+        """Plages fusionnees, par recherche d'octets (sans analyse XML)."""
+        if self.merged is None:
+            merged, tail = [], b''
+            with self._book._zip.open(self._part) as handle:
+                while True:
+                    chunk = handle.read(SCAN_CHUNK)
+                    data = tail + chunk
+                    end = len(data) if not chunk else data.rfind(b'<')
+                    if end < 0:
+                        end = 0
+                    merged.extend(parse_range(m.decode('ascii'))
+                                  for m in _RE_MERGE.findall(data, 0, end))
+                    if not chunk:
+                        break
+                    tail = data[end:]
+            self.merged = merged
+        return self.merged
+
+    def _masks(self) -> Dict[int, List[Tuple[int, int]]]:
+        """{ligne: [(col_min, col_max)]} des cellules fusionnees hors ancre."""
+        masks: Dict[int, List[Tuple[int, int]]] = {}
+        for r1, c1, r2, c2 in self.scan_merged():
+            if c2 > c1:
+                masks.setdefault(r1, []).append((c1 + 1, c2))
+            for row in range(r1 + 1, r2 + 1):
+                masks.setdefault(row, []).append((c1, c2))
+        return masks
+
+    def rows(self, merged_as_empty: bool = False) -> Iterator[Tuple[int, list, list]]:
+        """(ligne, valeurs, styles) de chaque <row> du XML, colonnes 0-base.
+
+        Les listes s'arretent a la derniere cellule presente (None / style 0
+        dans les trous). merged_as_empty : cellules fusionnees hors ancre
+        rendues vides, comme les MergedCell d'openpyxl.
+        """
+        book = self._book
+        shared = book.shared_strings
+        date_xf, timedelta_xf, epoch = book.date_xf, book.timedelta_xf, book.epoch
+        masks, max_column = {}, 0
+        if merged_as_empty:
+            masks = self._masks()
+            max_column = max((rng[3] for rng in self.merged), default=0)
+        row_counter = 0
+        sheet_data = None
+
+        with book._zip.open(self._part) as handle:
+            for event, elem in iterparse(handle, events=('start', 'end')):
+                if event == 'start':
+                    if elem.tag == _SHEET_DATA:
+                        sheet_data = elem
+                    continue
+                tag = elem.tag
+                if tag == _ROW:
+                    r_attr = elem.get('r')
+                    row_counter = int(r_attr) if r_attr else row_counter + 1
+                    values, styles = [], []
+                    col = 0
+                    for c in elem:
+                        if c.tag != _C:
+                            continue
+                        ref = c.get('r')
+                        col = column_index(ref.rstrip(_DIGITS)) if ref else col + 1
+                        s_attr = c.get('s')
+                        style = int(s_attr) if s_attr else 0
+                        t = c.get('t', 'n')
+                        if t == 'inlineStr':
+                            node = c.find(_IS)
+                            value = _text_content(node) if node is not None else None
+                        else:
+                            value = c.findtext(_V) or None
+                            if value is not None:
+                                if t == 'n':
+                                    value = _cast_number(value)
+                                    if style in date_xf:
+                                        try:
+                                            value = from_excel(value, epoch,
+                                                               timedelta=style in timedelta_xf)
+                                        except (OverflowError, ValueError):
+                                            value = '#VALUE!'
+                                elif t == 's':
+                                    value = shared[int(value)]
+                                elif t == 'b':
+                                    value = bool(int(value))
+                                elif t == 'd':
+                                    value = from_ISO8601(value)
+                        missing = col - len(values)
+                        if missing > 1:
+                            values.extend([None] * (missing - 1))
+                            styles.extend([0] * (missing - 1))
+                        if missing > 0:
+                            values.append(value)
+                            styles.append(style)
+                        else:
+                            values[col - 1] = value
+                            styles[col - 1] = style
+                    if sheet_data is not None:
+                        sheet_data.clear()
+                    else:
+                        elem.clear()
+                    if len(values) > max_column:
+                        max_column = len(values)
+                    spans = masks.get(row_counter)
+                    if spans:
+                        for c1, c2 in spans:
+                            for idx in range(c1 - 1, min(c2, len(values))):
+                                values[idx] = None
+                                styles[idx] = 0
+                    self.max_column = max_column
+                    yield row_counter, values, styles
+                elif tag == _DIMENSION:
+                    ref = elem.get('ref') or ''
+                    if _RE_REF.search(ref):
+                        self.declared_max_column = parse_range(ref)[3]
+                elif tag == _MERGE_CELL and not merged_as_empty:
+                    ref = elem.get('ref') or ''
+                    if _RE_REF.search(ref):
+                        max_column = max(max_column, parse_range(ref)[3])
+        self.max_column = max(max_column, 1)
+
+
+class XlsxReader:
+    """Classeur .xlsx : noms de feuilles, feuille active, chaines et styles."""
+
+    def __init__(self, path: str):
+        self._zip = zipfile.ZipFile(path)
+        try:
+            self._load()
+        except Exception:
+            self._zip.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        self._zip.close()
+
+    def _rels(self, part: str) -> List:
+        rels_part = posixpath.join(posixpath.dirname(part), '_rels',
+                                   posixpath.basename(part) + '.rels')
+        try:
+            root = fromstring(self._zip.read(rels_part))
+        except KeyError:
+            return []
+        return root.findall(_REL_NS + 'Relationship')
+
+    def _load(self) -> None:
+        wb_part = 'xl/workbook.xml'
+        for rel in self._rels(''):
+            if rel.get('Type', '').endswith('/officeDocument'):
+                wb_part = _resolve('', rel.get('Target'))
+        base = posixpath.dirname(wb_part)
+        rels = {rel.get('Id'): rel for rel in self._rels(wb_part)}
+        root = fromstring(self._zip.read(wb_part))
+
+        self.sheetnames: List[str] = []
+        self._parts: Dict[str, str] = {}
+        for sheet in root.iter(_NS + 'sheet'):
+            rel = rels.get(sheet.get(_R_ID))
+            name = sheet.get('name')
+            self.sheetnames.append(name)
+            if rel is not None:
+                self._parts[name] = _resolve(base, rel.get('Target'))
+
+        active = 0
+        for view in root.iter(_NS + 'workbookView'):
+            if view.get('activeTab') is not None:
+                active = int(view.get('activeTab'))
+                break
+        self.active = self.sheetnames[active] if 0 <= active < len(self.sheetnames) else None
+
+        props = root.find(_NS + 'workbookPr')
+        date1904 = props is not None and props.get('date1904', 'false') not in ('false', 'f', '0')
+        self.epoch = CALENDAR_MAC_1904 if date1904 else CALENDAR_WINDOWS_1900
+
+        targets = {rel.get('Type', '').rsplit('/', 1)[-1]: _resolve(base, rel.get('Target'))
+                   for rel in rels.values()}
+        self.shared_strings = self._read_shared_strings(targets.get('sharedStrings'))
+        self._read_styles(targets.get('styles'))
+
+    def _read_shared_strings(self, part: Optional[str]) -> List[str]:
+        strings = []
+        if not part or part not in self._zip.namelist():
+            return strings
+        with self._zip.open(part) as handle:
+            for _event, node in iterparse(handle):
+                if node.tag == _NS + 'si':
+                    strings.append(_text_content(node).replace('x005F_', ''))
+                    node.clear()
+        return strings
+
+    def _read_styles(self, part: Optional[str]) -> None:
+        self._bold_fonts: List[bool] = []
+        self._xf_fonts: List[int] = []
+        self.date_xf, self.timedelta_xf = set(), set()
+        if not part or part not in self._zip.namelist():
+            return
+        root = fromstring(self._zip.read(part))
+        fonts = root.find(_NS + 'fonts')
+        if fonts is not None:
+            self._bold_fonts = [_is_bold(font) for font in fonts.findall(_NS + 'font')]
+        custom = {}
+        num_fmts = root.find(_NS + 'numFmts')
+        if num_fmts is not None:
+            custom = {int(fmt.get('numFmtId')): fmt.get('formatCode')
+                      for fmt in num_fmts.findall(_NS + 'numFmt')}
+        cell_xfs = root.find(_NS + 'cellXfs')
+        for idx, xf in enumerate(cell_xfs.findall(_NS + 'xf') if cell_xfs is not None else ()):
+            self._xf_fonts.append(int(xf.get('fontId', 0)))
+            num_fmt_id = int(xf.get('numFmtId', 0))
+            fmt = custom[num_fmt_id] if num_fmt_id in custom else builtin_format_code(num_fmt_id)
+            if is_date_format(fmt):
+                self.date_xf.add(idx)
+            if is_timedelta_format(fmt):
+                self.timedelta_xf.add(idx)
+
+    def is_bold(self, style: int) -> bool:
+        """Gras de la police du style de cellule (index cellXfs)."""
+        if style >= len(self._xf_fonts):
+            return False
+        font_id = self._xf_fonts[style]
+        return font_id < len(self._bold_fonts) and self._bold_fonts[font_id]
+
+    def sheet(self, name: str) -> XlsxSheet:
+        if name not in self._parts:
+            raise KeyError(f"Feuille introuvable : {name}")
+        return XlsxSheet(self, self._parts[name])